@@ -8,9 +8,15 @@ This contains Global variables for sx.
 @copyright :  GPLv2
 """
 import sys
+import os
 import os.path
+import re
+import shutil
+import stat
+import hashlib
 import logging
 import datetime
+import time
 
 from sx.logwriter import LogWriter
 """
@@ -265,6 +271,575 @@ class ModifiedArchivedLayout(ModifiedArchiveLayout):
         archivePath = head
         ModifiedArchiveLayout.__init__(self, archivePath, uid, timestamp)
 
+class ContentStore:
+    """
+    This class is a store of the report files and the extracted reports
+    that is keyed by the SHA-256 digest of the report file, so that the
+    same report file is only stored and extracted once for all the
+    archive layouts in an archive path. The files in the store are
+    hardlinked into the archive layouts.
+
+    Example of Layout:
+    Report Files Path:         ~/sxarchive/store/blobs/<digest[:2]>/<digest>
+    Extracted Reports Path:    ~/sxarchive/store/trees/<digest>/tree
+    Extracted Report Info:     ~/sxarchive/store/trees/<digest>/info
+    Extracted Report Manifest: ~/sxarchive/store/trees/<digest>/manifest
+    Report File References:    ~/sxarchive/store/refs/<digest[:2]>/<digest>
+
+    A store entry is not referenced when the report file in the store has
+    no other links and none of the paths in its references file still
+    exist, which happens when the report file is removed from all the
+    compressed reports directories. The references file is needed because
+    the report file is copied instead of hardlinked when the paths are on
+    different filesystems.
+
+    @cvar HASH_BLOCK_SIZE: The number of bytes that are read at a time
+    when the digest of a file is generated.
+    @type HASH_BLOCK_SIZE: Int
+    @cvar TMP_TREE_MAX_AGE: The number of seconds that a temporary
+    directory of an extracted report that is being added has to be
+    unchanged before it is removed as left by an interrupted add.
+    @type TMP_TREE_MAX_AGE: Int
+    """
+    HASH_BLOCK_SIZE = 1024 * 1024
+    TMP_TREE_MAX_AGE = 60 * 60
+
+    def __init__(self, archivePath):
+        """
+        @param archivePath: The root directory where all the files
+        will be archived.
+        @type archivePath: String
+        """
+        self.__pathToStore = os.path.join(archivePath, "store")
+
+    def getPathToStore(self):
+        """
+        Returns the path to the root directory of the store.
+
+        @return: Returns the path to the root directory of the store.
+        @rtype: String
+        """
+        return self.__pathToStore
+
+    def getPathToBlob(self, digest):
+        """
+        Returns the path to the report file in the store.
+
+        @return: Returns the path to the report file in the store.
+        @rtype: String
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        """
+        return os.path.join(os.path.join(os.path.join(self.__pathToStore, "blobs"), digest[:2]), digest)
+
+    def getPathToReferences(self, digest):
+        """
+        Returns the path to the file that lists the paths to the report
+        files in the compressed reports directories that use the report
+        file in the store.
+
+        @return: Returns the path to the references file.
+        @rtype: String
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        """
+        return os.path.join(os.path.join(os.path.join(self.__pathToStore, "refs"), digest[:2]), digest)
+
+    def getPathToTree(self, digest):
+        """
+        Returns the path to the directory that contains the extracted
+        report and the info about the extracted report.
+
+        @return: Returns the path to the directory that contains the
+        extracted report.
+        @rtype: String
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        """
+        return os.path.join(os.path.join(self.__pathToStore, "trees"), digest)
+
+    def hashFile(pathToFile):
+        """
+        Returns the SHA-256 digest of the file as a hex string. An empty
+        string is returned if the file cannot be read.
+
+        @return: Returns the SHA-256 digest of the file.
+        @rtype: String
+
+        @param pathToFile: The path to the file.
+        @type pathToFile: String
+        """
+        sha256 = hashlib.sha256()
+        try:
+            fin = open(pathToFile, "rb")
+            try:
+                data = fin.read(ContentStore.HASH_BLOCK_SIZE)
+                while (len(data) > 0):
+                    sha256.update(data)
+                    data = fin.read(ContentStore.HASH_BLOCK_SIZE)
+            finally:
+                fin.close()
+        except (IOError, os.error):
+            message = "There was an error reading the file: %s." %(pathToFile)
+            logging.getLogger(MAIN_LOGGER_NAME).error(message)
+            return ""
+        return sha256.hexdigest()
+    hashFile = staticmethod(hashFile)
+
+    def linkFile(pathToSrcFile, pathToDstFile):
+        """
+        Hardlinks the file to the destination path. If the file cannot be
+        hardlinked(for example the paths are on different filesystems) then
+        the file is copied.
+
+        @return: Returns True if the file was linked or copied.
+        @rtype: Boolean
+
+        @param pathToSrcFile: The path to the file.
+        @type pathToSrcFile: String
+        @param pathToDstFile: The path the file will be linked to.
+        @type pathToDstFile: String
+        """
+        try:
+            os.link(pathToSrcFile, pathToDstFile)
+            return True
+        except OSError:
+            pass
+        try:
+            shutil.copy2(pathToSrcFile, pathToDstFile)
+            return True
+        except (IOError, os.error):
+            message = "Cannot link or copy the file %s to %s." %(pathToSrcFile, pathToDstFile)
+            logging.getLogger(MAIN_LOGGER_NAME).error(message)
+        return False
+    linkFile = staticmethod(linkFile)
+
+    def linkTree(pathToSrcDir, pathToDstDir):
+        """
+        Creates the directories of the source directory in the
+        destination directory and hardlinks all the files(see
+        linkFile()). The symlinks are recreated and are not followed.
+
+        @return: Returns True if all the files were linked or copied.
+        @rtype: Boolean
+
+        @param pathToSrcDir: The path to the directory that will be
+        linked.
+        @type pathToSrcDir: String
+        @param pathToDstDir: The path to the directory that the files will
+        be linked to.
+        @type pathToDstDir: String
+        """
+        isLinked = True
+        for (dirPath, dirNames, filenames) in os.walk(pathToSrcDir):
+            pathToCurrentDir = os.path.join(pathToDstDir, os.path.relpath(dirPath, pathToSrcDir))
+            try:
+                if (not os.path.isdir(pathToCurrentDir)):
+                    os.makedirs(pathToCurrentDir)
+            except (IOError, os.error):
+                message = "Could not create the directory: %s." %(pathToCurrentDir)
+                logging.getLogger(MAIN_LOGGER_NAME).error(message)
+                return False
+            for name in dirNames + filenames:
+                pathToSrcFile = os.path.join(dirPath, name)
+                pathToDstFile = os.path.join(pathToCurrentDir, name)
+                if (os.path.islink(pathToSrcFile)):
+                    try:
+                        os.symlink(os.readlink(pathToSrcFile), pathToDstFile)
+                    except (IOError, os.error):
+                        message = "Could not create the symlink: %s." %(pathToDstFile)
+                        logging.getLogger(MAIN_LOGGER_NAME).debug(message)
+                elif (name in filenames):
+                    isLinked = (ContentStore.linkFile(pathToSrcFile, pathToDstFile) and isLinked)
+        return isLinked
+    linkTree = staticmethod(linkTree)
+
+    def hasBlob(self, digest):
+        """
+        Returns True if the report file is in the store.
+
+        @return: Returns True if the report file is in the store.
+        @rtype: Boolean
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        """
+        return os.path.isfile(self.getPathToBlob(digest))
+
+    def getBlobSizes(self):
+        """
+        Returns a map of the sizes of the report files in the store, so a
+        report file is only hashed before it is extracted when a report
+        file of the same size is in the store.
+
+        @return: Returns a map of the sizes of the report files in the
+        store.
+        @rtype: Dictionary
+        """
+        blobSizesMap = {}
+        pathToBlobs = os.path.join(self.__pathToStore, "blobs")
+        if (not os.path.isdir(pathToBlobs)):
+            return blobSizesMap
+        for prefix in os.listdir(pathToBlobs):
+            pathToPrefix = os.path.join(pathToBlobs, prefix)
+            try:
+                for digest in os.listdir(pathToPrefix):
+                    blobSizesMap[os.path.getsize(os.path.join(pathToPrefix, digest))] = True
+            except (IOError, os.error):
+                message = "There was an error reading the directory: %s." %(pathToPrefix)
+                logging.getLogger(MAIN_LOGGER_NAME).debug(message)
+        return blobSizesMap
+
+    def addBlob(self, digest, pathToFile):
+        """
+        Adds the report file to the store by hardlinking the file into
+        the store. Nothing is done if the report file is already in the
+        store.
+
+        @return: Returns True if the report file is in the store.
+        @rtype: Boolean
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        @param pathToFile: The path to the report file.
+        @type pathToFile: String
+        """
+        pathToBlob = self.getPathToBlob(digest)
+        if (os.path.isfile(pathToBlob)):
+            return True
+        try:
+            if (not os.path.isdir(os.path.dirname(pathToBlob))):
+                os.makedirs(os.path.dirname(pathToBlob))
+        except (IOError, os.error):
+            message = "Could not create the directory: %s." %(os.path.dirname(pathToBlob))
+            logging.getLogger(MAIN_LOGGER_NAME).error(message)
+            return False
+        return ContentStore.linkFile(pathToFile, pathToBlob)
+
+    def addReference(self, digest, pathToFile):
+        """
+        Adds the path to a report file that uses the report file in the
+        store to the references file, so the report file in the store is
+        not removed while the path exists even if it is a copy.
+
+        @return: Returns True if the path was added.
+        @rtype: Boolean
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        @param pathToFile: The path to the report file in a compressed
+        reports directory.
+        @type pathToFile: String
+        """
+        pathToReferences = self.getPathToReferences(digest)
+        pathToFile = os.path.abspath(pathToFile)
+        if (pathToFile in self.__getReferences(digest)):
+            return True
+        try:
+            if (not os.path.isdir(os.path.dirname(pathToReferences))):
+                os.makedirs(os.path.dirname(pathToReferences))
+            fout = open(pathToReferences, "a")
+            fout.write("%s\n" %(pathToFile))
+            fout.close()
+        except (IOError, os.error):
+            message = "There was an error writing the file: %s." %(pathToReferences)
+            logging.getLogger(MAIN_LOGGER_NAME).error(message)
+            return False
+        return True
+
+    def __getReferences(self, digest):
+        """
+        Returns the list of paths in the references file.
+
+        @return: Returns the list of paths in the references file.
+        @rtype: Array
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        """
+        pathToReferences = self.getPathToReferences(digest)
+        if (not os.path.isfile(pathToReferences)):
+            return []
+        try:
+            fin = open(pathToReferences, "r")
+            try:
+                return fin.read().splitlines()
+            finally:
+                fin.close()
+        except (IOError, os.error):
+            message = "There was an error reading the file: %s." %(pathToReferences)
+            logging.getLogger(MAIN_LOGGER_NAME).error(message)
+        return []
+
+    def __isReferenced(self, digest, blobSize):
+        """
+        Returns True if any of the paths in the references file is still
+        a report file of the same size as the report file in the store.
+        The references file is rewritten with only those paths.
+
+        @return: Returns True if the report file in the store is
+        referenced.
+        @rtype: Boolean
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        @param blobSize: The size of the report file in the store.
+        @type blobSize: Long
+        """
+        listOfReferences = []
+        for pathToFile in self.__getReferences(digest):
+            try:
+                if ((os.path.isfile(pathToFile)) and (os.path.getsize(pathToFile) == blobSize)):
+                    listOfReferences.append(pathToFile)
+            except (IOError, os.error):
+                continue
+        pathToReferences = self.getPathToReferences(digest)
+        try:
+            if (len(listOfReferences) > 0):
+                fout = open(pathToReferences, "w")
+                fout.write("".join(map(lambda pathToFile: "%s\n" %(pathToFile), listOfReferences)))
+                fout.close()
+            elif (os.path.exists(pathToReferences)):
+                os.remove(pathToReferences)
+                try:
+                    os.rmdir(os.path.dirname(pathToReferences))
+                except OSError:
+                    # The directory is not empty.
+                    pass
+        except (IOError, os.error):
+            message = "There was an error writing the file: %s." %(pathToReferences)
+            logging.getLogger(MAIN_LOGGER_NAME).error(message)
+            # Keep the report file when the references cannot be updated.
+            return True
+        return (len(listOfReferences) > 0)
+
+    def getTreeInfo(self, digest):
+        """
+        Returns a tuple of (report name, directory name) for the
+        extracted report in the store. None is returned if the extracted
+        report is not in the store.
+
+        @return: Returns a tuple of (report name, directory name) for the
+        extracted report.
+        @rtype: Tuple
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        """
+        pathToInfoFile = os.path.join(self.getPathToTree(digest), "info")
+        if (not os.path.isfile(pathToInfoFile)):
+            return None
+        try:
+            fin = open(pathToInfoFile, "r")
+            try:
+                lines = fin.read().splitlines()
+            finally:
+                fin.close()
+        except (IOError, os.error):
+            message = "There was an error reading the file: %s." %(pathToInfoFile)
+            logging.getLogger(MAIN_LOGGER_NAME).error(message)
+            return None
+        if (not len(lines) == 2):
+            return None
+        return (lines[0], lines[1])
+
+    def getPathToTreeManifest(self, digest):
+        """
+        Returns the path to the manifest of the extracted report in the
+        store. The file might not exist if no manifest was built when the
+        report file was extracted.
+
+        @return: Returns the path to the manifest of the extracted
+        report.
+        @rtype: String
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        """
+        return os.path.join(self.getPathToTree(digest), "manifest")
+
+    def __removeWritePermissions(self, pathToDir):
+        """
+        Removes the write permissions from all the regular files under
+        the directory. The directories are not changed so the files can
+        still be removed.
+
+        @return: Returns True if the permissions were changed on all the
+        files.
+        @rtype: Boolean
+
+        @param pathToDir: The path to the directory.
+        @type pathToDir: String
+        """
+        writePermissions = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+        for (dirPath, dirNames, filenames) in os.walk(pathToDir):
+            for filename in filenames:
+                pathToFile = os.path.join(dirPath, filename)
+                try:
+                    fileStat = os.lstat(pathToFile)
+                    if (stat.S_ISREG(fileStat.st_mode)):
+                        os.chmod(pathToFile, stat.S_IMODE(fileStat.st_mode) & ~writePermissions)
+                except (IOError, os.error):
+                    message = "Could not remove the write permissions from the file: %s." %(pathToFile)
+                    logging.getLogger(MAIN_LOGGER_NAME).error(message)
+                    return False
+        return True
+
+    def addTree(self, digest, pathToExtractedReport, reportName, pathToManifestFile=""):
+        """
+        Adds the extracted report to the store by hardlinking all the
+        files into the store. The extracted report is linked to a
+        temporary directory that is renamed when done, so an extracted
+        report that is only partially added is never used. Nothing is
+        done if the extracted report is already in the store.
+
+        The files are made read-only since the same files are linked
+        into every archive directory that uses the extracted report, so
+        a file that is changed in place would change the extracted
+        report for all of them.
+
+        @return: Returns True if the extracted report is in the store.
+        @rtype: Boolean
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        @param pathToExtractedReport: The path to the extracted report.
+        @type pathToExtractedReport: String
+        @param reportName: The name of the report type.
+        @type reportName: String
+        @param pathToManifestFile: The path to the manifest of the
+        extracted report which is added if it exists.
+        @type pathToManifestFile: String
+        """
+        pathToTree = self.getPathToTree(digest)
+        if (not self.getTreeInfo(digest) == None):
+            return True
+        pathToTmpTree = os.path.join(os.path.dirname(pathToTree), ".%s.tmp" %(digest))
+        if (os.path.exists(pathToTmpTree)):
+            shutil.rmtree(pathToTmpTree, True)
+        if (not ContentStore.linkTree(pathToExtractedReport, os.path.join(pathToTmpTree, "tree"))):
+            shutil.rmtree(pathToTmpTree, True)
+            return False
+        if ((len(pathToManifestFile) > 0) and (os.path.isfile(pathToManifestFile))):
+            ContentStore.linkFile(pathToManifestFile, os.path.join(pathToTmpTree, "manifest"))
+        if (not self.__removeWritePermissions(pathToTmpTree)):
+            shutil.rmtree(pathToTmpTree, True)
+            return False
+        # The duplicate suffix is removed so the next report that uses the
+        # extracted report gets its own suffix if needed.
+        dirName = re.sub("-duplicate_\d+$", "", os.path.basename(pathToExtractedReport.rstrip("/")))
+        try:
+            fout = open(os.path.join(pathToTmpTree, "info"), "w")
+            fout.write("%s\n%s\n" %(reportName, dirName))
+            fout.close()
+            if (os.path.exists(pathToTree)):
+                shutil.rmtree(pathToTree, True)
+            os.rename(pathToTmpTree, pathToTree)
+        except (IOError, os.error):
+            message = "There was an error adding the extracted report to the store: %s." %(pathToTree)
+            logging.getLogger(MAIN_LOGGER_NAME).error(message)
+            shutil.rmtree(pathToTmpTree, True)
+            return False
+        return True
+
+    def __getLastModifiedTime(self, pathToDir):
+        """
+        Returns the latest modification time of the directory and all
+        the directories under it. A directory is modified when a file is
+        linked into it, so this is the last time anything was added.
+
+        @return: Returns the latest modification time of the directories.
+        @rtype: Float
+
+        @param pathToDir: The path to the directory.
+        @type pathToDir: String
+        """
+        lastModifiedTime = 0
+        for (dirPath, dirNames, filenames) in os.walk(pathToDir):
+            try:
+                lastModifiedTime = max(lastModifiedTime, os.lstat(dirPath).st_mtime)
+            except (IOError, os.error):
+                continue
+        return lastModifiedTime
+
+    def collectGarbage(self):
+        """
+        Removes the report files and the extracted reports in the store
+        that are not referenced by any compressed reports directory. A
+        report file is referenced if it has other hardlinks or if a path
+        in its references file still exists(see addReference()). The
+        extracted reports that were linked into archive layouts are not
+        changed since they are hardlinks or copies. The temporary
+        directories that were left by an interrupted add are removed as
+        well, but only when they have not changed for TMP_TREE_MAX_AGE
+        seconds since another process could still be adding the
+        extracted report.
+
+        @return: Returns a tuple of (number of entries removed, bytes
+        reclaimed).
+        @rtype: Tuple
+        """
+        entriesRemoved = 0
+        bytesReclaimed = 0
+        pathToBlobs = os.path.join(self.__pathToStore, "blobs")
+        pathToTrees = os.path.join(self.__pathToStore, "trees")
+        listOfReferencedDigests = []
+        if (os.path.isdir(pathToBlobs)):
+            for prefix in sorted(os.listdir(pathToBlobs)):
+                pathToPrefix = os.path.join(pathToBlobs, prefix)
+                for digest in sorted(os.listdir(pathToPrefix)):
+                    pathToBlob = os.path.join(pathToPrefix, digest)
+                    try:
+                        blobStat = os.lstat(pathToBlob)
+                        # The references are checked even if the report file
+                        # has other links so the references file is cleaned.
+                        isReferenced = self.__isReferenced(digest, blobStat.st_size)
+                        if ((blobStat.st_nlink > 1) or (isReferenced)):
+                            listOfReferencedDigests.append(digest)
+                            continue
+                        message = "Removing the unreferenced report file from the store: %s" %(digest)
+                        logging.getLogger(MAIN_LOGGER_NAME).debug(message)
+                        os.remove(pathToBlob)
+                        entriesRemoved += 1
+                        bytesReclaimed += blobStat.st_size
+                    except (IOError, os.error):
+                        message = "There was an error removing the file: %s." %(pathToBlob)
+                        logging.getLogger(MAIN_LOGGER_NAME).error(message)
+                        listOfReferencedDigests.append(digest)
+                try:
+                    os.rmdir(pathToPrefix)
+                except OSError:
+                    # The directory is not empty.
+                    pass
+        if (os.path.isdir(pathToTrees)):
+            for digest in sorted(os.listdir(pathToTrees)):
+                if (digest in listOfReferencedDigests):
+                    continue
+                pathToTree = os.path.join(pathToTrees, digest)
+                if ((digest.startswith(".")) and
+                    ((time.time() - self.__getLastModifiedTime(pathToTree)) < ContentStore.TMP_TREE_MAX_AGE)):
+                    message = "The temporary directory in the store is not removed because it was recently changed: %s" %(pathToTree)
+                    logging.getLogger(MAIN_LOGGER_NAME).debug(message)
+                    continue
+                for (dirPath, dirNames, filenames) in os.walk(pathToTree):
+                    for filename in filenames:
+                        try:
+                            fileStat = os.lstat(os.path.join(dirPath, filename))
+                            # The space is only reclaimed if there are no
+                            # other links to the file.
+                            if ((stat.S_ISREG(fileStat.st_mode)) and (fileStat.st_nlink == 1)):
+                                bytesReclaimed += fileStat.st_size
+                        except (IOError, os.error):
+                            pass
+                message = "Removing the unreferenced extracted report from the store: %s" %(digest)
+                logging.getLogger(MAIN_LOGGER_NAME).debug(message)
+                shutil.rmtree(pathToTree, True)
+                entriesRemoved += 1
+        return (entriesRemoved, bytesReclaimed)
+
 class SXConfigurationFiles:
     """
     This class will create the configuration directory structure for
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 """
 Performs operations on a tarball that is archived with tar and
-compressed bzip2, gunzip, or xv. The GNU tar command is used to do all
+compressed bzip2, gunzip, xz, zstd or lz4. The GNU tar command is used to do all
 the functions. In some instances "liblzma" will be needed to provide
 support for tar.
 
@@ -19,22 +19,1108 @@ import logging
 import subprocess
 import shutil
 import time
+import tempfile
+import threading
+import mimetypes
+import fnmatch
+import posixpath
+import zlib
+import bz2
+import hashlib
+import fcntl
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
 
 import sx
 from sx.logwriter import LogWriter
 
+class ArchiveMember:
+    """
+    This class is a container for a file that is contained in an
+    archive.
+    """
+    # The type of members that are in archive.
+    TYPE_FILE = "file"
+    TYPE_DIR = "dir"
+    TYPE_SYMLINK = "symlink"
+    TYPE_HARDLINK = "hardlink"
+    TYPE_OTHER = "other"
+
+    def __init__(self, name, size=-1, offset=-1, memberType=TYPE_FILE, linkName=""):
+        """
+        @param name: The path to the member in the archive.
+        @type name: String
+        @param size: The size of the member in bytes. -1 means the size
+        is unknown.
+        @type size: Long
+        @param offset: The offset of the member's data in the
+        uncompressed archive. -1 means the offset is unknown.
+        @type offset: Long
+        @param memberType: The type of the member.
+        @type memberType: String
+        @param linkName: The path that a link points to.
+        @type linkName: String
+        """
+        self.__name = name
+        self.__size = size
+        self.__offset = offset
+        self.__memberType = memberType
+        self.__linkName = linkName
+
+    def __str__(self):
+        """
+        Returns a formatted string of this object.
+
+        @return: Returns a formatted string of this object.
+        @rtype: String
+        """
+        return "%s(%s): %d bytes at offset %d" %(self.getName(), self.getMemberType(), self.getSize(), self.getOffset())
+
+    def getName(self):
+        """
+        Returns the path to the member in the archive.
+
+        @return: Returns the path to the member in the archive.
+        @rtype: String
+        """
+        return self.__name
+
+    def getSize(self):
+        """
+        Returns the size of the member in bytes. -1 is returned if the
+        size is unknown.
+
+        @return: Returns the size of the member in bytes.
+        @rtype: Long
+        """
+        return self.__size
+
+    def getOffset(self):
+        """
+        Returns the offset of the member's data in the uncompressed
+        archive. -1 is returned if the offset is unknown.
+
+        @return: Returns the offset of the member's data.
+        @rtype: Long
+        """
+        return self.__offset
+
+    def getMemberType(self):
+        """
+        Returns the type of the member.
+
+        @return: Returns the type of the member.
+        @rtype: String
+        """
+        return self.__memberType
+
+    def getLinkName(self):
+        """
+        Returns the path that the link points to. Empty string is
+        returned if not a link.
+
+        @return: Returns the path that the link points to.
+        @rtype: String
+        """
+        return self.__linkName
+
+    def isFile(self):
+        """
+        Returns True if the member is a regular file.
+
+        @return: Returns True if the member is a regular file.
+        @rtype: Boolean
+        """
+        return (self.__memberType == ArchiveMember.TYPE_FILE)
+
+class ArchiveMemberIndex:
+    """
+    This class is an index of all the members in an archive. The index
+    is built with one pass over the archive and then all lookups are
+    done against the index.
+    """
+    def __init__(self, listOfMembers):
+        """
+        @param listOfMembers: A list of all the members in the archive
+        in the order they appear in the archive.
+        @type listOfMembers: Array
+        """
+        self.__listOfMembers = listOfMembers
+        # Map of the path in archive to the member.
+        self.__membersMap = {}
+        # Map of the path in archive with the root directory removed to the
+        # member.
+        self.__strippedMembersMap = {}
+        for member in self.__listOfMembers:
+            name = member.getName().strip("/")
+            if (not self.__membersMap.has_key(name)):
+                self.__membersMap[name] = member
+            splitName = name.split("/", 1)
+            if ((len(splitName) >= 2) and (not self.__strippedMembersMap.has_key(splitName[1]))):
+                self.__strippedMembersMap[splitName[1]] = member
+
+    def __len__(self):
+        """
+        Returns the number of members in the index.
+
+        @return: Returns the number of members in the index.
+        @rtype: Int
+        """
+        return len(self.__listOfMembers)
+
+    def getMembers(self):
+        """
+        Returns a list of all the members in the order they appear in
+        the archive.
+
+        @return: Returns a list of all the members.
+        @rtype: Array
+        """
+        return self.__listOfMembers
+
+    def getNames(self):
+        """
+        Returns a list of the paths to all the members in the order they
+        appear in the archive.
+
+        @return: Returns a list of the paths to all the members.
+        @rtype: Array
+        """
+        listOfNames = []
+        for member in self.__listOfMembers:
+            listOfNames.append(member.getName())
+        return listOfNames
+
+    def getMember(self, pathToFileInArchive):
+        """
+        Returns the member for the path in the archive. None is
+        returned if there is no member with that path.
+
+        @return: Returns the member for the path in the archive.
+        @rtype: ArchiveMember
+
+        @param pathToFileInArchive: The full path to the file in the
+        archive.
+        @type pathToFileInArchive: String
+        """
+        return self.__membersMap.get(pathToFileInArchive.strip("/"))
+
+    def findMember(self, pathToFileInArchive):
+        """
+        Returns the member for the path. The path can be the full path
+        in the archive or the path relative to the root directory of
+        the archive. None is returned if no member is found.
+
+        @return: Returns the member for the path.
+        @rtype: ArchiveMember
+
+        @param pathToFileInArchive: The path to the file in the
+        archive, which can be relative to the root directory in the
+        archive.
+        @type pathToFileInArchive: String
+        """
+        pathToFileInArchive = pathToFileInArchive.strip("/")
+        if (self.__membersMap.has_key(pathToFileInArchive) and
+            (pathToFileInArchive.find("/") < 0)):
+            return self.__membersMap.get(pathToFileInArchive)
+        return self.__strippedMembersMap.get(pathToFileInArchive)
+
+    def getLinkedMember(self, member):
+        """
+        Returns the member that holds the data for the member. A hard
+        link does not contain any data so the member it links to is
+        returned. Any other member is returned unchanged. None is
+        returned if the member a hard link links to is not found.
+
+        @return: Returns the member that holds the data for the member.
+        @rtype: ArchiveMember
+
+        @param member: A member in the file.
+        @type member: ArchiveMember
+        """
+        if ((not member == None) and (member.getMemberType() == ArchiveMember.TYPE_HARDLINK)):
+            return self.getMember(member.getLinkName())
+        return member
+
+    def getStrippedName(member, stripDirectoriesDepth):
+        """
+        Returns the path of the member with the leading directories
+        removed. Empty string is returned if the path is not deep
+        enough.
+
+        @return: Returns the path of the member with the leading
+        directories removed.
+        @rtype: String
+
+        @param member: The member of the archive.
+        @type member: ArchiveMember
+        @param stripDirectoriesDepth: The number of leading directories
+        that will be removed.
+        @type stripDirectoriesDepth: Int
+        """
+        splitName = []
+        for item in member.getName().split("/"):
+            if ((len(item) > 0) and (not item == ".")):
+                splitName.append(item)
+        if (not len(splitName) > stripDirectoriesDepth):
+            return ""
+        return "/".join(splitName[stripDirectoriesDepth:])
+    getStrippedName = staticmethod(getStrippedName)
+
+    def getTopLevelFileNames(self, stripDirectoriesDepth=1):
+        """
+        Returns the names of the regular files that are at the top of
+        the extraction directory once the leading directories are
+        removed. The names are in the order they appear in the archive
+        and each name is only listed once.
+
+        @return: Returns the names of the regular files at the top of
+        the extraction directory.
+        @rtype: Array
+
+        @param stripDirectoriesDepth: The number of leading directories
+        that are removed from each member.
+        @type stripDirectoriesDepth: Int
+        """
+        listOfNames = []
+        namesMap = {}
+        for member in self.getMembers():
+            if (not member.getMemberType() in [ArchiveMember.TYPE_FILE, ArchiveMember.TYPE_HARDLINK]):
+                continue
+            strippedName = ArchiveMemberIndex.getStrippedName(member, stripDirectoriesDepth)
+            if ((len(strippedName) > 0) and (not strippedName.find("/") >= 0) and (not namesMap.has_key(strippedName))):
+                namesMap[strippedName] = True
+                listOfNames.append(strippedName)
+        return listOfNames
+
+    def getSelectedMembers(self, listOfPatterns, stripDirectoriesDepth=1):
+        """
+        Returns a list of members whose path matches one of the
+        patterns. The patterns are shell-style wildcards that are
+        relative to the root directory of the report(after the leading
+        directories are removed) and "*" will match "/". If a pattern
+        matches a directory then all the files under the directory are
+        selected.
+
+        The targets of symbolic links and hard links that are selected
+        are added so that the links are valid when extracted.
+
+        @return: Returns a list of members in the order they appear in
+        the archive.
+        @rtype: Array
+
+        @param listOfPatterns: A list of patterns for the paths that
+        should be selected. For example: "sos_commands/networking/*".
+        @type listOfPatterns: Array
+        @param stripDirectoriesDepth: The number of leading directories
+        that are removed from each member.
+        @type stripDirectoriesDepth: Int
+        """
+        # Map of stripped path to member.
+        strippedMembersMap = {}
+        listOfStrippedNames = []
+        for member in self.__listOfMembers:
+            strippedName = ArchiveMemberIndex.getStrippedName(member, stripDirectoriesDepth)
+            if ((len(strippedName) > 0) and (not strippedMembersMap.has_key(strippedName))):
+                strippedMembersMap[strippedName] = member
+                listOfStrippedNames.append(strippedName)
+        listOfPatterns = map(lambda pattern: pattern.strip("/"), listOfPatterns)
+        selectedMap = {}
+        for strippedName in listOfStrippedNames:
+            for pattern in listOfPatterns:
+                # A pattern for the files in a directory(ends with "/*")
+                # will select the directory too, so empty directories are
+                # extracted.
+                if ((fnmatch.fnmatchcase(strippedName, pattern)) or
+                    (strippedName.startswith("%s/" %(pattern))) or
+                    ((pattern.endswith("/*")) and (strippedName == pattern[:-2]))):
+                    selectedMap[strippedName] = strippedMembersMap.get(strippedName)
+                    break
+        # Add the targets of the links. The targets can be links as well so
+        # keep looking until no new members are added.
+        listOfLinks = selectedMap.keys()
+        while (len(listOfLinks) > 0):
+            listOfTargets = []
+            for strippedName in listOfLinks:
+                member = selectedMap.get(strippedName)
+                target = ""
+                if (member.getMemberType() == ArchiveMember.TYPE_HARDLINK):
+                    linkedMember = self.getMember(member.getLinkName())
+                    if (not linkedMember == None):
+                        target = ArchiveMemberIndex.getStrippedName(linkedMember, stripDirectoriesDepth)
+                elif ((member.getMemberType() == ArchiveMember.TYPE_SYMLINK) and
+                      (not member.getLinkName().startswith("/"))):
+                    target = posixpath.normpath(posixpath.join(posixpath.dirname(strippedName), member.getLinkName()))
+                if ((not len(target) > 0) or (target.startswith("..")) or (selectedMap.has_key(target))):
+                    continue
+                for currentName in listOfStrippedNames:
+                    if (((currentName == target) or (currentName.startswith("%s/" %(target)))) and
+                        (not selectedMap.has_key(currentName))):
+                        selectedMap[currentName] = strippedMembersMap.get(currentName)
+                        listOfTargets.append(currentName)
+            listOfLinks = listOfTargets
+        listOfSelectedMembers = []
+        for strippedName in listOfStrippedNames:
+            if (selectedMap.has_key(strippedName)):
+                listOfSelectedMembers.append(selectedMap.get(strippedName))
+        return listOfSelectedMembers
+
+    def getTotalSize(self):
+        """
+        Returns the total size in bytes of all the members whose size is
+        known.
+
+        @return: Returns the total size in bytes of all the members.
+        @rtype: Long
+        """
+        totalSize = 0
+        for member in self.__listOfMembers:
+            if (member.getSize() > 0):
+                totalSize += member.getSize()
+        return totalSize
+
+class CommandCapabilities:
+    """
+    This class is a process wide cache of the commands that are installed
+    and their versions, so a command is only checked once no matter how
+    many files are extracted with it.
+
+    @cvar CAPABILITIES_MAP: Map of the path to the command and the
+    arguments to print the version to a tuple of whether the command ran
+    and the output of the command.
+    @type CAPABILITIES_MAP: Dictionary
+    @cvar COMMANDS_MAP: Map of the name of a command to the path to the
+    command that was found in the PATH.
+    @type COMMANDS_MAP: Dictionary
+    @cvar CAPABILITIES_LOCK: Lock that protects the maps.
+    @type CAPABILITIES_LOCK: Lock
+    """
+    CAPABILITIES_MAP = {}
+    COMMANDS_MAP = {}
+    CAPABILITIES_LOCK = threading.Lock()
+
+    def findCommand(commandName):
+        """
+        Returns the path to the command with the name that is found
+        first in the PATH. Empty string is returned if the command is not
+        found. No command is ran to find the command.
+
+        @return: Returns the path to the command.
+        @rtype: String
+
+        @param commandName: The name of the command.
+        @type commandName: String
+        """
+        CommandCapabilities.CAPABILITIES_LOCK.acquire()
+        try:
+            if (not CommandCapabilities.COMMANDS_MAP.has_key(commandName)):
+                pathToCommand = ""
+                listOfDirs = os.environ.get("PATH", "").split(os.pathsep) + ["/bin", "/usr/bin"]
+                for pathToDir in listOfDirs:
+                    pathToFile = os.path.join(pathToDir, commandName)
+                    if ((len(pathToDir) > 0) and (os.path.isfile(pathToFile)) and (os.access(pathToFile, os.X_OK))):
+                        pathToCommand = pathToFile
+                        break
+                CommandCapabilities.COMMANDS_MAP[commandName] = pathToCommand
+            return CommandCapabilities.COMMANDS_MAP.get(commandName)
+        finally:
+            CommandCapabilities.CAPABILITIES_LOCK.release()
+    findCommand = staticmethod(findCommand)
+
+    def getVersion(pathToCommand, listOfVersionArgs):
+        """
+        Returns a tuple of whether the command ran with no errors and the
+        output of the command when ran with the arguments to print its
+        version. The command is only ran the first time the version is
+        requested for the command. If the command does not exist then it
+        is not ran and (False, "") is returned.
+
+        @return: Returns a tuple of whether the command ran with no
+        errors and the output of the command.
+        @rtype: Tuple
+
+        @param pathToCommand: The path to the command.
+        @type pathToCommand: String
+        @param listOfVersionArgs: The arguments to print the version of
+        the command.
+        @type listOfVersionArgs: Array
+        """
+        key = (pathToCommand, tuple(listOfVersionArgs))
+        CommandCapabilities.CAPABILITIES_LOCK.acquire()
+        try:
+            if (not CommandCapabilities.CAPABILITIES_MAP.has_key(key)):
+                capability = (False, "")
+                if ((len(pathToCommand) > 0) and (os.access(pathToCommand, os.X_OK))):
+                    try:
+                        task = subprocess.Popen([pathToCommand] + listOfVersionArgs, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                        (stdout, stderr) = task.communicate()
+                        capability = ((task.returncode == 0), stdout)
+                    except OSError:
+                        message = "There was an error checking if the binary is installed: %s." %(pathToCommand)
+                        logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                CommandCapabilities.CAPABILITIES_MAP[key] = capability
+            return CommandCapabilities.CAPABILITIES_MAP.get(key)
+        finally:
+            CommandCapabilities.CAPABILITIES_LOCK.release()
+    getVersion = staticmethod(getVersion)
+
+class DecompressorPipe:
+    """
+    This class runs a decompression command on a file and is a file like
+    object that reads the decompressed data from the command, so that
+    compressions that python does not support can be streamed to
+    tarfile. The commands that decompress with more than one thread are
+    preferred.
+
+    @cvar DECOMPRESSORS_MAP: Map of the encoding to a list of the
+    commands(and their arguments) that can decompress the encoding in
+    the order they are preferred. The commands read the compressed data
+    from stdin and write the decompressed data to stdout when "-d" is
+    added, which is how tar runs a compression program.
+    @type DECOMPRESSORS_MAP: Dictionary
+    """
+    DECOMPRESSORS_MAP = {"gzip":[["pigz"], ["gzip"]],
+                         "bzip2":[["lbzip2"], ["pbzip2"], ["bzip2"]],
+                         "xz":[["pixz"], ["xz", "-T0"]],
+                         "zstd":[["pzstd"], ["zstd", "-T0"]],
+                         "lz4":[["lz4"]]}
+
+    def __init__(self, pathToFile, listOfCommand, digestReader=None):
+        """
+        @param pathToFile: The path to the compressed file.
+        @type pathToFile: String
+        @param listOfCommand: The command and its arguments that will
+        decompress the file(see getCommand()).
+        @type listOfCommand: Array
+        @param digestReader: If not None then the compressed data is read
+        from the DigestReader and written to the command, so the file
+        is hashed while it is decompressed.
+        @type digestReader: DigestReader
+        """
+        self.__digestReader = digestReader
+        # True when all the decompressed data was read.
+        self.__isEndOfData = False
+        self.__fnull = open(os.devnull, "w")
+        if (digestReader == None):
+            self.__fin = open(pathToFile, "rb")
+            stdin = self.__fin
+        else:
+            self.__fin = digestReader
+            (stdin, feedFD) = DigestReader.createPipe()
+        try:
+            try:
+                self.__task = subprocess.Popen(listOfCommand + ["-d"], stdin=stdin, stdout=subprocess.PIPE,
+                                               stderr=self.__fnull, close_fds=True)
+            except OSError:
+                self.__fin.close()
+                self.__fnull.close()
+                if (not digestReader == None):
+                    os.close(feedFD)
+                raise
+        finally:
+            if (not digestReader == None):
+                os.close(stdin)
+        if (not digestReader == None):
+            digestReader.startFeeding(feedFD)
+
+    def getCommand(encoding):
+        """
+        Returns the command and its arguments that will be used to
+        decompress the encoding. The first command in DECOMPRESSORS_MAP
+        that is installed is used. None is returned if there is no
+        command installed for the encoding.
+
+        @return: Returns the command and its arguments that will be used
+        to decompress the encoding.
+        @rtype: Array
+
+        @param encoding: The compression of the file.
+        @type encoding: String
+        """
+        for listOfCommand in DecompressorPipe.DECOMPRESSORS_MAP.get(encoding, []):
+            pathToCommand = CommandCapabilities.findCommand(listOfCommand[0])
+            if (len(pathToCommand) > 0):
+                return [pathToCommand] + listOfCommand[1:]
+        return None
+    getCommand = staticmethod(getCommand)
+
+    def read(self, size=-1):
+        """
+        Returns up to size bytes of the decompressed data. All the data
+        is returned if size is less than 0.
+
+        @return: Returns the decompressed data.
+        @rtype: String
+
+        @param size: The maximum number of bytes to read.
+        @type size: Int
+        """
+        if (size < 0):
+            data = self.__task.stdout.read()
+        else:
+            data = self.__task.stdout.read(size)
+        if ((not len(data) > 0) and (not size == 0)):
+            self.__isEndOfData = True
+        return data
+
+    def close(self):
+        """
+        Stops the command if it is still running and closes the file.
+        """
+        try:
+            self.__task.stdout.close()
+            if (self.__task.poll() == None):
+                if (self.__isEndOfData):
+                    self.__task.wait()
+                else:
+                    try:
+                        self.__task.terminate()
+                    except OSError:
+                        pass
+            self.__task.wait()
+        finally:
+            if (not self.__digestReader == None):
+                # The rest of the file is hashed even if the command
+                # stopped reading it.
+                self.__digestReader.waitForFeeding()
+            self.__fin.close()
+            self.__fnull.close()
+
+    def isComplete(self):
+        """
+        Returns True if all the decompressed data was read and the
+        command did not report an error, which means the compressed data
+        was not truncated or corrupt. Only valid after close() is called.
+
+        @return: Returns True if the file was completely decompressed.
+        @rtype: Boolean
+        """
+        return ((self.__isEndOfData) and (self.__task.returncode == 0))
+
+class DigestReader:
+    """
+    This class is a file like object that reads a file and computes the
+    digests of the data as it is read, so that a file is hashed in the
+    same pass that extracts it. The data can also be written to a file
+    descriptor by a thread, which is how the data is given to a command
+    that decompresses it(see DecompressorPipe).
+
+    @cvar BLOCK_SIZE: The number of bytes that are read at a time when
+    the data is written to a file descriptor.
+    @type BLOCK_SIZE: Int
+    """
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, fileobj, listOfHashNames):
+        """
+        @param fileobj: The file that will be read.
+        @type fileobj: File
+        @param listOfHashNames: The names of the hashlib algorithms that
+        are computed.
+        @type listOfHashNames: Array
+        """
+        self.__fileobj = fileobj
+        self.__hashesMap = {}
+        for hashName in listOfHashNames:
+            self.__hashesMap[hashName] = hashlib.new(hashName)
+        self.__bytesRead = 0
+        self.__feedingThread = None
+
+    def read(self, size=-1):
+        """
+        Returns up to size bytes of the file. All the data is returned
+        if size is less than 0.
+
+        @return: Returns the data that was read.
+        @rtype: String
+
+        @param size: The maximum number of bytes to read.
+        @type size: Int
+        """
+        data = self.__fileobj.read(size)
+        for digest in self.__hashesMap.values():
+            digest.update(data)
+        self.__bytesRead += len(data)
+        return data
+
+    def drain(self):
+        """
+        Reads the rest of the file so that the digests are for the whole
+        file. For example tar stops reading at the end of the archive
+        and does not read the padding after it.
+        """
+        data = self.read(DigestReader.BLOCK_SIZE)
+        while (len(data) > 0):
+            data = self.read(DigestReader.BLOCK_SIZE)
+
+    def close(self):
+        """
+        Closes the file.
+        """
+        self.__fileobj.close()
+
+    def getBytesRead(self):
+        """
+        Returns the number of bytes that were read.
+
+        @return: Returns the number of bytes that were read.
+        @rtype: Int
+        """
+        return self.__bytesRead
+
+    def getHexDigest(self, hashName):
+        """
+        Returns the digest of the data that was read as a hex
+        string. Empty string is returned if the algorithm was not
+        computed.
+
+        @return: Returns the digest of the data that was read.
+        @rtype: String
+
+        @param hashName: The name of the hashlib algorithm.
+        @type hashName: String
+        """
+        if (not self.__hashesMap.has_key(hashName)):
+            return ""
+        return self.__hashesMap.get(hashName).hexdigest()
+
+    def createPipe():
+        """
+        Returns a tuple of (read file descriptor, write file descriptor)
+        for a pipe that a command reads the file from. The write end is
+        not inherited by the commands that are started, so the command
+        reading the pipe gets the end of the file when the write end is
+        closed.
+
+        @return: Returns a tuple of (read file descriptor, write file
+        descriptor).
+        @rtype: Tuple
+        """
+        (readFD, writeFD) = os.pipe()
+        fcntl.fcntl(writeFD, fcntl.F_SETFD, fcntl.fcntl(writeFD, fcntl.F_GETFD) | fcntl.FD_CLOEXEC)
+        return (readFD, writeFD)
+    createPipe = staticmethod(createPipe)
+
+    def __feed(self, fd):
+        """
+        Reads the whole file and writes the data to the file
+        descriptor. If the reader of the file descriptor goes away the
+        rest of the file is still read so the digests are for the whole
+        file. The file descriptor is closed when done.
+
+        @param fd: The file descriptor that the data is written to.
+        @type fd: Int
+        """
+        isWritable = True
+        try:
+            data = self.read(DigestReader.BLOCK_SIZE)
+            while (len(data) > 0):
+                while ((isWritable) and (len(data) > 0)):
+                    try:
+                        data = data[os.write(fd, data):]
+                    except (IOError, os.error):
+                        isWritable = False
+                data = self.read(DigestReader.BLOCK_SIZE)
+        finally:
+            os.close(fd)
+
+    def startFeeding(self, fd):
+        """
+        Starts a thread that writes the whole file to the file
+        descriptor and then closes it.
+
+        @param fd: The file descriptor that the data is written to.
+        @type fd: Int
+        """
+        self.__feedingThread = threading.Thread(target=self.__feed, args=[fd])
+        self.__feedingThread.setDaemon(True)
+        self.__feedingThread.start()
+
+    def waitForFeeding(self):
+        """
+        Waits for the thread that writes the file to a file descriptor to
+        finish. It is safe to call this function if there is no thread.
+        """
+        if (not self.__feedingThread == None):
+            self.__feedingThread.join()
+            self.__feedingThread = None
+
+class ArchiveManifest:
+    """
+    This class is the manifest of a report file that was extracted. It
+    contains the digest and size of the report file and the digest of
+    each file that was extracted, which are computed while the
+    report file is streamed for extraction. The manifest is written next
+    to the extracted report directory so that the files can be compared
+    without reading them again.
+
+    The file lists a file on each line in the same format as sha256sum
+    and the lines that start with "#" describe the manifest and the
+    report file:
+    # version <format version> <hash name>
+    # archive <digest> <size> <filename>
+    <digest>  <path to file relative to the extracted report>
+
+    @cvar HASH_NAME: The name of the hashlib algorithm that is used for
+    all the digests.
+    @type HASH_NAME: String
+    @cvar FORMAT_VERSION: The version of the format of the file.
+    @type FORMAT_VERSION: Int
+    """
+    HASH_NAME = "sha256"
+    FORMAT_VERSION = 1
+
+    def __init__(self, archiveName, archiveDigest, archiveSize):
+        """
+        @param archiveName: The filename of the report file.
+        @type archiveName: String
+        @param archiveDigest: The digest of the report file.
+        @type archiveDigest: String
+        @param archiveSize: The size of the report file.
+        @type archiveSize: Int
+        """
+        self.__archiveName = archiveName
+        self.__archiveDigest = archiveDigest
+        self.__archiveSize = archiveSize
+        # Map of the path to a file relative to the extracted report to
+        # the digest of the file.
+        self.__membersMap = {}
+
+    def getPathToManifestFile(pathToExtractedReport):
+        """
+        Returns the path to the manifest file for the extracted
+        report. The file is next to the extracted report directory.
+
+        @return: Returns the path to the manifest file.
+        @rtype: String
+
+        @param pathToExtractedReport: Path to the extracted report.
+        @type pathToExtractedReport: String
+        """
+        (head, tail) = os.path.split(pathToExtractedReport.rstrip("/"))
+        return os.path.join(head, ".%s.manifest" %(tail))
+    getPathToManifestFile = staticmethod(getPathToManifestFile)
+
+    def getArchiveName(self):
+        """
+        Returns the filename of the report file.
+
+        @return: Returns the filename of the report file.
+        @rtype: String
+        """
+        return self.__archiveName
+
+    def getArchiveDigest(self):
+        """
+        Returns the digest of the report file.
+
+        @return: Returns the digest of the report file.
+        @rtype: String
+        """
+        return self.__archiveDigest
+
+    def getArchiveSize(self):
+        """
+        Returns the size of the report file.
+
+        @return: Returns the size of the report file.
+        @rtype: Int
+        """
+        return self.__archiveSize
+
+    def addMember(self, pathToFile, digest):
+        """
+        Adds the digest of a file that was extracted. The paths that
+        contain a newline are not added since they cannot be written to
+        the file.
+
+        @param pathToFile: The path to the file relative to the extracted
+        report.
+        @type pathToFile: String
+        @param digest: The digest of the file.
+        @type digest: String
+        """
+        if (not pathToFile.find("\n") >= 0):
+            self.__membersMap[pathToFile.strip("/")] = digest
+
+    def getPaths(self):
+        """
+        Returns a sorted list of the paths to the files in the manifest.
+
+        @return: Returns a sorted list of the paths to the files.
+        @rtype: Array
+        """
+        return sorted(self.__membersMap.keys())
+
+    def getMemberDigest(self, pathToFile):
+        """
+        Returns the digest of the file. Empty string is returned if the
+        file is not in the manifest.
+
+        @return: Returns the digest of the file.
+        @rtype: String
+
+        @param pathToFile: The path to the file relative to the extracted
+        report.
+        @type pathToFile: String
+        """
+        return self.__membersMap.get(pathToFile.strip("/"), "")
+
+    def write(self, pathToManifestFile):
+        """
+        Writes the manifest to the file. The file is written to a
+        temporary file that is renamed so a manifest that is only
+        partially written is never read.
+
+        @return: Returns True if the file was written.
+        @rtype: Boolean
+
+        @param pathToManifestFile: The path to the manifest file.
+        @type pathToManifestFile: String
+        """
+        pathToTmpFile = "%s.tmp" %(pathToManifestFile)
+        try:
+            fout = open(pathToTmpFile, "w")
+            try:
+                fout.write("# version %d %s\n" %(ArchiveManifest.FORMAT_VERSION, ArchiveManifest.HASH_NAME))
+                fout.write("# archive %s %d %s\n" %(self.__archiveDigest, self.__archiveSize, self.__archiveName))
+                for pathToFile in self.getPaths():
+                    fout.write("%s  %s\n" %(self.__membersMap.get(pathToFile), pathToFile))
+            finally:
+                fout.close()
+            os.rename(pathToTmpFile, pathToManifestFile)
+        except (IOError, os.error):
+            message = "There was an error writing the file: %s." %(pathToManifestFile)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+            return False
+        return True
+
+    def read(pathToManifestFile):
+        """
+        Returns the manifest that was written to the file. None is
+        returned if the file does not exist or has a different format
+        version.
+
+        @return: Returns the manifest that was written to the file.
+        @rtype: ArchiveManifest
+
+        @param pathToManifestFile: The path to the manifest file.
+        @type pathToManifestFile: String
+        """
+        if (not os.path.isfile(pathToManifestFile)):
+            return None
+        try:
+            fin = open(pathToManifestFile, "r")
+            try:
+                lines = fin.read().splitlines()
+            finally:
+                fin.close()
+        except (IOError, os.error):
+            message = "There was an error reading the file: %s." %(pathToManifestFile)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+            return None
+        if ((len(lines) < 2) or (not lines[0] == "# version %d %s" %(ArchiveManifest.FORMAT_VERSION, ArchiveManifest.HASH_NAME))):
+            message = "The manifest file has a different format version and will be ignored: %s." %(pathToManifestFile)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return None
+        splitArchive = lines[1].split(None, 4)
+        if ((not len(splitArchive) == 5) or (not splitArchive[1] == "archive")):
+            return None
+        try:
+            manifest = ArchiveManifest(splitArchive[4], splitArchive[2], long(splitArchive[3]))
+        except ValueError:
+            return None
+        for line in lines[2:]:
+            splitLine = line.split("  ", 1)
+            if (len(splitLine) == 2):
+                manifest.addMember(splitLine[1], splitLine[0])
+        return manifest
+    read = staticmethod(read)
+
+class FileTypeSniffer:
+    """
+    This class finds the type of a file from the first bytes of the file
+    instead of the filename. The type is a tuple of (type, encoding) like
+    the tuple that is returned by mimetypes.guess_type(). For compressed
+    files the start of the file is decompressed to check if it is a
+    tarball, if the compression cannot be decompressed in python then the
+    filename is used to guess if it is a tarball.
+
+    @cvar TYPE_TAR: The type for a tarball.
+    @type TYPE_TAR: String
+    @cvar TYPE_ZIP: The type for a zip file.
+    @type TYPE_ZIP: String
+    @cvar MAGIC_NUMBERS: A list of tuples of the bytes that a compressed
+    file starts with and the encoding.
+    @type MAGIC_NUMBERS: Array
+    @cvar SNIFF_SIZE: The number of bytes that are read from the start of
+    the file.
+    @type SNIFF_SIZE: Int
+    """
+    TYPE_TAR = "application/x-tar"
+    TYPE_ZIP = "application/zip"
+    MAGIC_NUMBERS = [("\x1f\x8b", "gzip"),
+                     ("BZh", "bzip2"),
+                     ("\xfd7zXZ\x00", "xz"),
+                     ("\x28\xb5\x2f\xfd", "zstd"),
+                     ("\x04\x22\x4d\x18", "lz4")]
+    SNIFF_SIZE = 64 * 1024
+
+    def __isTarHeader(data):
+        """
+        Returns True if the data starts with a tar header.
+
+        @return: Returns True if the data starts with a tar header.
+        @rtype: Boolean
+
+        @param data: The data at the start of the file.
+        @type data: String
+        """
+        return ((len(data) >= 512) and (data[257:262] == "ustar"))
+    __isTarHeader = staticmethod(__isTarHeader)
+
+    def __decompress(data, encoding):
+        """
+        Returns the start of the decompressed data. None is returned if
+        the data cannot be decompressed in python.
+
+        @return: Returns the start of the decompressed data.
+        @rtype: String
+
+        @param data: The data at the start of the file.
+        @type data: String
+        @param encoding: The compression of the data.
+        @type encoding: String
+        """
+        try:
+            if (encoding == "gzip"):
+                return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(data, 1024)
+            elif (encoding == "bzip2"):
+                return bz2.BZ2Decompressor().decompress(data)
+            elif ((encoding == "xz") and (not lzma == None)):
+                return lzma.LZMADecompressor().decompress(data)
+        except Exception:
+            # Each decompressor raises its own errors when the data is
+            # not valid.
+            pass
+        return None
+    __decompress = staticmethod(__decompress)
+
+    def __decompressWithCommand(pathToFile, encoding):
+        """
+        Returns the start of the decompressed data by running the command
+        that decompresses the encoding(see DecompressorPipe). None is
+        returned if there is no command installed or the command failed.
+
+        @return: Returns the start of the decompressed data.
+        @rtype: String
+
+        @param pathToFile: The path to the file.
+        @type pathToFile: String
+        @param encoding: The compression of the file.
+        @type encoding: String
+        """
+        listOfCommand = DecompressorPipe.getCommand(encoding)
+        if (listOfCommand == None):
+            return None
+        try:
+            decompressorPipe = DecompressorPipe(pathToFile, listOfCommand)
+            try:
+                return decompressorPipe.read(1024)
+            finally:
+                decompressorPipe.close()
+        except (IOError, OSError):
+            return None
+    __decompressWithCommand = staticmethod(__decompressWithCommand)
+
+    def sniff(pathToFile):
+        """
+        Returns a tuple of (type, encoding) for the file. The type is
+        None if the file is not a known type. If the file cannot be read
+        then the type is guessed from the filename.
+
+        @return: Returns a tuple of (type, encoding) for the file.
+        @rtype: Tuple
+
+        @param pathToFile: The path to the file.
+        @type pathToFile: String
+        """
+        try:
+            fin = open(pathToFile, "rb")
+            try:
+                data = fin.read(FileTypeSniffer.SNIFF_SIZE)
+            finally:
+                fin.close()
+        except (IOError, os.error):
+            return Extractor.guessMimeType(pathToFile)
+        if (data.startswith("PK\x03\x04") or data.startswith("PK\x05\x06")):
+            return (FileTypeSniffer.TYPE_ZIP, None)
+        for (magicNumber, encoding) in FileTypeSniffer.MAGIC_NUMBERS:
+            if (data.startswith(magicNumber)):
+                decompressedData = FileTypeSniffer.__decompress(data, encoding)
+                if (decompressedData == None):
+                    decompressedData = FileTypeSniffer.__decompressWithCommand(pathToFile, encoding)
+                if (decompressedData == None):
+                    # Could not check the contents so use the filename.
+                    if (Extractor.guessMimeType(pathToFile)[0] == FileTypeSniffer.TYPE_TAR):
+                        return (FileTypeSniffer.TYPE_TAR, encoding)
+                    return (None, encoding)
+                elif ((FileTypeSniffer.__isTarHeader(decompressedData)) or
+                      ((len(decompressedData) > 0) and (Extractor.guessMimeType(pathToFile)[0] == FileTypeSniffer.TYPE_TAR))):
+                    return (FileTypeSniffer.TYPE_TAR, encoding)
+                return (None, encoding)
+        if (FileTypeSniffer.__isTarHeader(data)):
+            return (FileTypeSniffer.TYPE_TAR, None)
+        # Old tarballs do not have the ustar magic so use the filename.
+        if ((len(data) >= 512) and (Extractor.guessMimeType(pathToFile) == (FileTypeSniffer.TYPE_TAR, None))):
+            return (FileTypeSniffer.TYPE_TAR, None)
+        return (None, None)
+    sniff = staticmethod(sniff)
+
 class Extractor :
     """
     @cvar PATH_TO_TEMP_DIR: This is the path to directory that will
     @type PATH_TO_TEMP_DIR: String
+    @cvar MIMETYPES_LOCK: Lock that protects the global mimetypes
+    database since extractors can be used by more than one thread.
+    @type MIMETYPES_LOCK: Lock
+    @cvar CHECKSUM_FILE_SUFFIXES: List of tuples of (suffix, hash name)
+    for the checksum files that can be uploaded with a file.
+    @type CHECKSUM_FILE_SUFFIXES: Array
     """
     PATH_TO_TEMP_DIR = "/tmp/sx-%s" %(time.strftime(sx.UID_TIMESTAMP))
+    MIMETYPES_LOCK = threading.Lock()
+    CHECKSUM_FILE_SUFFIXES = [(".sha256", "sha256"), (".md5", "md5")]
 
     def __init__(self, name, pathToFile, pathToCommand):
         # Descriptive name of extractor
         self.__name = name
         self.__pathToFile = pathToFile
         self.__pathToCommand = pathToCommand
+        # The temporary directory that single files are extracted to. Each
+        # extractor has its own so that extractors running at the same time
+        # do not overwrite each others files.
+        self.__pathToTempDir = ""
+        # The index of the members in the file which is built the first time
+        # it is needed. The lock makes sure it is only built once.
+        self.__memberIndex = None
+        self.__memberIndexLock = threading.Lock()
+        # The tuple of (type, encoding) that is found from the first bytes
+        # of the file.
+        self.__fileType = None
+        # The manifest that was built when the whole file was extracted.
+        self.__manifest = None
+        # True if the file was found to be truncated or corrupt while it
+        # was read.
+        self.__isCorrupt = False
+        # The function that is called when a file has been extracted.
+        self.__extractedFileFunction = None
 
     def __str__(self):
         rstring = "%s: %s" %(self.getName(), self.getPathToFile())
@@ -49,25 +1135,324 @@ class Extractor :
     def getPathToCommand(self):
         return self.__pathToCommand
 
-    def list(self) :
-        commandOptions = self.getListArgs()
-        if (commandOptions == None) :
-            message =  "This file is unknown type and will not list the file contents: %s." %(self.getPathToFile())
+    def getPathToTempDir(self):
+        """
+        Returns the path to the temporary directory that files will be
+        extracted to for this extractor. The directory is created under
+        PATH_TO_TEMP_DIR the first time it is requested. Empty string is
+        returned if the directory could not be created.
+
+        @return: Returns the path to the temporary directory for this
+        extractor.
+        @rtype: String
+        """
+        if (not len(self.__pathToTempDir) > 0):
+            try:
+                if (not os.access(Extractor.PATH_TO_TEMP_DIR, os.F_OK)):
+                    os.makedirs(Extractor.PATH_TO_TEMP_DIR)
+            except (IOError, os.error):
+                # Another extractor could have created the directory.
+                if (not os.path.isdir(Extractor.PATH_TO_TEMP_DIR)):
+                    message = "Could not create the directory to extract file to: %s" % (Extractor.PATH_TO_TEMP_DIR)
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                    return ""
+            try:
+                self.__pathToTempDir = tempfile.mkdtemp(prefix="%s-" %(self.getName().lower()), dir=Extractor.PATH_TO_TEMP_DIR)
+            except (IOError, os.error):
+                message = "Could not create the directory to extract file to under: %s" % (Extractor.PATH_TO_TEMP_DIR)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+        return self.__pathToTempDir
+
+    def guessMimeType(pathToFile):
+        """
+        Returns a tuple of (type, encoding) for the file based on the
+        filename. The mimetypes database is global so access to it is
+        serialized.
+
+        @return: Returns a tuple of (type, encoding) for the file.
+        @rtype: Tuple
+
+        @param pathToFile: The path to the file.
+        @type pathToFile: String
+        """
+        Extractor.MIMETYPES_LOCK.acquire()
+        try:
+            if (not mimetypes.inited):
+                mimetypes.init()
+            mimetypes.encodings_map[".xz"] = "xz"
+            mimetypes.encodings_map[".zst"] = "zstd"
+            mimetypes.encodings_map[".lz4"] = "lz4"
+            return mimetypes.guess_type(pathToFile)
+        finally:
+            Extractor.MIMETYPES_LOCK.release()
+    guessMimeType = staticmethod(guessMimeType)
+
+    def getFileType(self):
+        """
+        Returns a tuple of (type, encoding) for the file that is found
+        from the first bytes of the file(see FileTypeSniffer). The file
+        is only read the first time this is called, unless the type was
+        set with setFileType().
+
+        @return: Returns a tuple of (type, encoding) for the file.
+        @rtype: Tuple
+        """
+        if (self.__fileType == None):
+            self.__fileType = FileTypeSniffer.sniff(self.getPathToFile())
+        return self.__fileType
+
+    def setFileType(self, fileType):
+        """
+        Sets the tuple of (type, encoding) for the file, so that a file
+        is only read once when more than one extractor is checked.
+
+        @param fileType: A tuple of (type, encoding) for the file.
+        @type fileType: Tuple
+        """
+        self.__fileType = fileType
+
+    def getMemberIndex(self):
+        """
+        Returns the index of the members in the file. The index is
+        built the first time this function is called and then the same
+        index is returned for each call after that. An empty index is
+        returned if the file could not be listed.
+
+        @return: Returns the index of the members in the file.
+        @rtype: ArchiveMemberIndex
+        """
+        self.__memberIndexLock.acquire()
+        try:
+            if (self.__memberIndex == None):
+                listOfMembers = []
+                if (not self.isValidMimeType()) :
+                    message =  "This file is unknown type and will not list the file contents: %s." %(self.getPathToFile())
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                elif (not self.isCommandInstalled()):
+                    message = "The %s command does not appear to be installed or incorrect version." %(self.getPathToCommand())
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                else:
+                    listOfMembers = self.buildMemberIndex()
+                    if (listOfMembers == None):
+                        message = "There was an error listing the file contents: %s." % (self.getPathToFile())
+                        logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                        listOfMembers = []
+                    else:
+                        message = "The index was built for %d members in the file: %s." %(len(listOfMembers), self.getPathToFile())
+                        logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                self.__memberIndex = ArchiveMemberIndex(listOfMembers)
+            return self.__memberIndex
+        finally:
+            self.__memberIndexLock.release()
+
+    def setMemberIndex(self, listOfMembers):
+        """
+        Sets the index of the members in the file if the index has not
+        been built. Extractors that list the members while extracting
+        the file can use this so the file is not read again.
+
+        @param listOfMembers: A list of all the members in the file in
+        the order they appear in the file.
+        @type listOfMembers: Array
+        """
+        self.__memberIndexLock.acquire()
+        try:
+            if (self.__memberIndex == None):
+                self.__memberIndex = ArchiveMemberIndex(listOfMembers)
+        finally:
+            self.__memberIndexLock.release()
+
+    def getManifest(self):
+        """
+        Returns the manifest that was built the last time the whole file
+        was extracted. None is returned if the whole file was not
+        extracted or the extractor does not build a manifest.
+
+        @return: Returns the manifest of the file.
+        @rtype: ArchiveManifest
+        """
+        return self.__manifest
+
+    def setManifest(self, manifest):
+        """
+        Sets the manifest that was built while the whole file was
+        extracted.
+
+        @param manifest: The manifest of the file.
+        @type manifest: ArchiveManifest
+        """
+        self.__manifest = manifest
+
+    def isCorrupt(self):
+        """
+        Returns True if the file was found to be truncated or corrupt
+        while it was extracted.
+
+        @return: Returns True if the file is truncated or corrupt.
+        @rtype: Boolean
+        """
+        return self.__isCorrupt
+
+    def setCorrupt(self, isCorrupt):
+        """
+        Sets if the file was found to be truncated or corrupt while it
+        was extracted.
+
+        @param isCorrupt: If True then the file is truncated or corrupt.
+        @type isCorrupt: Boolean
+        """
+        self.__isCorrupt = isCorrupt
+
+    def setExtractedFileFunction(self, extractedFileFunction):
+        """
+        Sets the function that is called with the path to each regular
+        file and the path to the file relative to the extraction
+        directory as soon as the file has been extracted, while the rest
+        of the file is still being extracted. Only the extractors that
+        extract one member at a time call the function(see
+        isExtractedFileFunctionSupported()), so the caller should still
+        look at the extracted files after the extraction.
+
+        @param extractedFileFunction: The function that is called when a
+        file has been extracted. If None then no function is called.
+        @type extractedFileFunction: Function
+        """
+        self.__extractedFileFunction = extractedFileFunction
+
+    def fileExtracted(self, pathToExtractedFile, pathToFileInExtractDir):
+        """
+        Calls the function that was set to be called when a file has been
+        extracted(see setExtractedFileFunction()).
+
+        @param pathToExtractedFile: The path to the file that was
+        extracted.
+        @type pathToExtractedFile: String
+        @param pathToFileInExtractDir: The path to the file relative to
+        the extraction directory.
+        @type pathToFileInExtractDir: String
+        """
+        if (not self.__extractedFileFunction == None):
+            self.__extractedFileFunction(pathToExtractedFile, pathToFileInExtractDir)
+
+    def isExtractedFileFunctionSupported(self):
+        """
+        Returns True if the function that was set to be called when a
+        file has been extracted is called for each regular file that is
+        extracted(see setExtractedFileFunction()). The extractors that
+        run a command to extract the whole file return False.
+
+        @return: Returns True if the function is called for each regular
+        file that is extracted.
+        @rtype: Boolean
+        """
+        return False
+
+    def getExpectedDigest(self):
+        """
+        Returns a tuple of (hash name, digest) from the checksum file
+        that was uploaded with the file, such as the .sha256 or .md5 file
+        that sosreport creates next to the report file. None is returned
+        if there is no checksum file.
+
+        @return: Returns a tuple of (hash name, digest) from the checksum
+        file.
+        @rtype: Tuple
+        """
+        for (suffix, hashName) in Extractor.CHECKSUM_FILE_SUFFIXES:
+            pathToChecksumFile = "%s%s" %(self.getPathToFile(), suffix)
+            if (not os.path.isfile(pathToChecksumFile)):
+                continue
+            try:
+                fin = open(pathToChecksumFile, "r")
+                try:
+                    splitData = fin.read(1024).split()
+                finally:
+                    fin.close()
+            except (IOError, os.error):
+                message = "There was an error reading the file: %s." %(pathToChecksumFile)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                continue
+            if (len(splitData) > 0):
+                return (hashName, splitData[0].lower())
+        return None
+
+    def openDigestReader(self):
+        """
+        Returns a DigestReader for the file that computes the digest for
+        the manifest and the digest in the checksum file(if there is one)
+        while the file is read.
+
+        @return: Returns a DigestReader for the file.
+        @rtype: DigestReader
+        """
+        listOfHashNames = [ArchiveManifest.HASH_NAME]
+        expectedDigest = self.getExpectedDigest()
+        if ((not expectedDigest == None) and (not expectedDigest[0] in listOfHashNames)):
+            listOfHashNames.append(expectedDigest[0])
+        return DigestReader(open(self.getPathToFile(), "rb"), listOfHashNames)
+
+    def verifyDigestReader(self, digestReader):
+        """
+        Returns True if the whole file was read and the digest matches
+        the checksum file that was uploaded with the file. If there is
+        no checksum file then only the size of the file is checked. The
+        file is set as corrupt if it does not match(see isCorrupt()).
+
+        @return: Returns True if the file that was read is not truncated
+        or corrupt.
+        @rtype: Boolean
+
+        @param digestReader: The DigestReader that read the whole file.
+        @type digestReader: DigestReader
+        """
+        try:
+            fileSize = os.path.getsize(self.getPathToFile())
+        except (IOError, os.error):
+            fileSize = -1
+        if (not digestReader.getBytesRead() == fileSize):
+            message = "Only %d of %d bytes were read from the file: %s." %(digestReader.getBytesRead(), fileSize, self.getPathToFile())
             logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
-        elif (not self.isCommandInstalled()):
-            message = "The %s command does not appear to be installed or incorrect version." %(self.getPathToCommand())
+            self.setCorrupt(True)
+            return False
+        expectedDigest = self.getExpectedDigest()
+        if ((not expectedDigest == None) and (not digestReader.getHexDigest(expectedDigest[0]) == expectedDigest[1])):
+            message = "The %s digest of the file does not match the checksum file that was uploaded with it: %s." %(expectedDigest[0], self.getPathToFile())
             logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
-        else:
-            # Run the command to list the files in the files:
-            command = [self.getPathToCommand(), commandOptions, self.getPathToFile()]
-            task = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            (stdout, stderr) = task.communicate()
-            if (not task.returncode  == 0):
-                message = "There was an error listing the file contents: %s." % (self.getPathToFile())
-                logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
-            else:
-                return stdout.split()
-        return []
+            self.setCorrupt(True)
+            return False
+        return True
+
+    def buildMemberIndex(self):
+        """
+        Returns a list of all the members in the file in the order they
+        appear in the file. None is returned if there was an error
+        listing the file. This function will only be called once for
+        each extractor and should be overridden by extractors that can
+        provide the size and offset of the members.
+
+        @return: Returns a list of all the members in the file.
+        @rtype: Array
+        """
+        # Run the command to list the files in the files:
+        command = [self.getPathToCommand(), self.getListArgs(), self.getPathToFile()]
+        task = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        (stdout, stderr) = task.communicate()
+        if (not task.returncode  == 0):
+            return None
+        listOfMembers = []
+        for name in stdout.split():
+            listOfMembers.append(ArchiveMember(name))
+        return listOfMembers
+
+    def list(self) :
+        """
+        Returns a list of the paths to all the members in the file.
+
+        @return: Returns a list of the paths to all the members in the
+        file.
+        @rtype: Array
+        """
+        return self.getMemberIndex().getNames()
 
     def clean() :
         """
@@ -104,6 +1489,54 @@ class Extractor :
     def getDataFromFile(self, pathToFileInExtractor) :
         return []
 
-    def extract(self, extractDir, stripDirectoriesDepth=1) :
+    def getDataFromMember(self, member):
+        """
+        Returns the data for a member in the file. Extractors that can
+        read a member without looking up the path again should override
+        this function.
+
+        @return: Returns an array of Strings, where each newline in
+        file is an item in the array.
+        @rtype: Array
+
+        @param member: A member in the index of the file.
+        @type member: ArchiveMember
+        """
+        return self.getDataFromFile(member.getName())
+
+    def getAppliedStripDirectoriesDepth(self, stripDirectoriesDepth):
+        """
+        Returns the number of leading directories that are actually
+        removed from each member when extracted. Some extractors do not
+        remove directories.
+
+        @return: Returns the number of leading directories that are
+        removed from each member.
+        @rtype: Int
+
+        @param stripDirectoriesDepth: The number of leading directories
+        that were requested to be removed.
+        @type stripDirectoriesDepth: Int
+        """
+        return stripDirectoriesDepth
+
+    def extract(self, extractDir, stripDirectoriesDepth=1, listOfPatterns=None) :
+        """
+        Extracts the file to the directory. If there is a list of
+        patterns then only the members that match the patterns are
+        extracted(see ArchiveMemberIndex.getSelectedMembers()).
+
+        @return: Returns True if the file was extracted.
+        @rtype: Boolean
+
+        @param extractDir: The full path to directory for extraction.
+        @type extractDir: String
+        @param stripDirectoriesDepth: The number of leading directories
+        that are removed from each member.
+        @type stripDirectoriesDepth: Int
+        @param listOfPatterns: A list of patterns for the paths that
+        will be extracted. If None then all the members are extracted.
+        @type listOfPatterns: Array
+        """
         return False
 
@@ -0,0 +1,783 @@
+#!/usr/bin/env python
+"""
+Performs operations on tarballs and zip files with the python tarfile
+and zipfile modules instead of running a command. The file is read
+and decompressed in a single streaming pass so there is no fork and
+exec for each operation.
+
+Tarballs compressed with xz require the lzma module(python 3.3+) or
+the backports.lzma module. If there is no support for the compression
+then this extractor is not valid for the file and the GNU tar
+extractor will be used instead.
+
+@author    :  Shane Bradley
+@contact   :  sbradley@redhat.com
+@version   :  2.17
+@copyright :  GPLv2
+"""
+import os
+import os.path
+import posixpath
+import logging
+import tarfile
+import zipfile
+import copy
+import hashlib
+import stat
+import time
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+import sx
+from sx.logwriter import LogWriter
+from sx.extractors import Extractor
+from sx.extractors import ArchiveMember
+from sx.extractors import DecompressorPipe
+from sx.extractors import DigestReader
+from sx.extractors import ArchiveManifest
+
+class Nativeextractor(Extractor) :
+    """
+    @cvar TARFILE_STREAM_MODES: Map of the compression type to the mode
+    that tarfile will use to stream the file.
+    @type TARFILE_STREAM_MODES: Dictionary
+    """
+    TARFILE_STREAM_MODES = {None:"r|", "gzip":"r|gz", "bzip2":"r|bz2", "xz":"r|", "zstd":"r|", "lz4":"r|"}
+
+    def __init__(self, pathToFile):
+        Extractor.__init__(self, "NATIVEextractor", pathToFile, "")
+
+    def isCommandInstalled(self) :
+        # There is no command that is required.
+        return True
+
+    def isValidMimeType(self):
+        # Returns a tuple of [type, encoding]: (index 0 = type), (index 1 = encoding)
+        mimeType = self.getFileType()
+        if ((mimeType[0] == "application/x-tar") and (mimeType[1] in ["gzip", "bzip2", None])):
+            return True
+        elif ((mimeType[0] == "application/x-tar") and (mimeType[1] == "xz")):
+            # Only valid if there is support for xz compression.
+            return ((not lzma == None) or (not DecompressorPipe.getCommand(mimeType[1]) == None))
+        elif ((mimeType[0] == "application/x-tar") and (mimeType[1] in ["zstd", "lz4"])):
+            # Python cannot decompress these so a command has to be installed.
+            return (not DecompressorPipe.getCommand(mimeType[1]) == None)
+        elif ((mimeType[0] == "application/zip") and (mimeType[1] == None)):
+            return True
+        return False
+
+    def isZipFile(self):
+        """
+        Returns True if the file is a zip file.
+
+        @return: Returns True if the file is a zip file.
+        @rtype: Boolean
+        """
+        return (self.getFileType()[0] == "application/zip")
+
+    def getListArgs(self) :
+        if (not self.isValidMimeType()):
+            return None;
+        if (self.isZipFile()):
+            return "r"
+        return Nativeextractor.TARFILE_STREAM_MODES.get(self.getFileType()[1])
+
+    def getExtractArgs(self) :
+        return self.getListArgs()
+
+    # ###########################################################################
+    # Helper functions for reading the file
+    # ###########################################################################
+    def __openTarFile(self, digestReader=None):
+        """
+        Returns a tuple of (tarfile, file) where the tarfile object will
+        stream the members of the tarball. Both objects should be closed
+        when done.
+
+        Compressions that python cannot decompress are decompressed by a
+        command(see DecompressorPipe).
+
+        @return: Returns a tuple of (tarfile, file).
+        @rtype: Tuple
+
+        @param digestReader: If not None then the file is read with the
+        DigestReader so the file is hashed while it is read.
+        @type digestReader: DigestReader
+        """
+        compressionType = self.getFileType()[1]
+        if ((compressionType in ["zstd", "lz4"]) or ((compressionType == "xz") and (lzma == None))):
+            listOfCommand = DecompressorPipe.getCommand(compressionType)
+            if (listOfCommand == None):
+                raise IOError("There is no command installed to decompress the file: %s" %(self.getPathToFile()))
+            fileobj = DecompressorPipe(self.getPathToFile(), listOfCommand, digestReader)
+        elif (not digestReader == None):
+            fileobj = digestReader
+        else:
+            fileobj = open(self.getPathToFile(), "rb")
+        try:
+            streamobj = fileobj
+            if ((compressionType == "xz") and (not lzma == None)):
+                streamobj = lzma.LZMAFile(fileobj)
+            return (tarfile.open(fileobj=streamobj, mode=self.getListArgs()), fileobj)
+        except:
+            fileobj.close()
+            raise
+
+    def __getMemberType(self, tarinfo):
+        """
+        Returns the type of the member.
+
+        @return: Returns the type of the member.
+        @rtype: String
+
+        @param tarinfo: The member of the tarball.
+        @type tarinfo: TarInfo
+        """
+        if (tarinfo.isfile()):
+            return ArchiveMember.TYPE_FILE
+        elif (tarinfo.isdir()):
+            return ArchiveMember.TYPE_DIR
+        elif (tarinfo.issym()):
+            return ArchiveMember.TYPE_SYMLINK
+        elif (tarinfo.islnk()):
+            return ArchiveMember.TYPE_HARDLINK
+        return ArchiveMember.TYPE_OTHER
+
+    def __getArchiveMember(self, tarinfo):
+        """
+        Returns an ArchiveMember for the member of the tarball.
+
+        @return: Returns an ArchiveMember for the member of the tarball.
+        @rtype: ArchiveMember
+
+        @param tarinfo: The member of the tarball.
+        @type tarinfo: TarInfo
+        """
+        name = tarinfo.name
+        if (tarinfo.isdir()):
+            name = "%s/" %(name)
+        offset = -1
+        if (tarinfo.isfile()):
+            offset = tarinfo.offset_data
+        return ArchiveMember(name, tarinfo.size, offset, self.__getMemberType(tarinfo), tarinfo.linkname)
+
+    def __stripPath(self, path, stripDirectoriesDepth):
+        """
+        Returns the path with the leading directories removed. Empty
+        string is returned if the path is not deep enough or the path
+        is not safe to extract(contains "..").
+
+        @return: Returns the path with the leading directories removed.
+        @rtype: String
+
+        @param path: The path that will have the directories removed.
+        @type path: String
+        @param stripDirectoriesDepth: The number of leading directories
+        that will be removed.
+        @type stripDirectoriesDepth: Int
+        """
+        splitPath = []
+        for item in path.split("/"):
+            if ((len(item) > 0) and (not item == ".")):
+                splitPath.append(item)
+        if ((".." in splitPath) or (not len(splitPath) > stripDirectoriesDepth)):
+            return ""
+        return "/".join(splitPath[stripDirectoriesDepth:])
+
+    def __isPathInDir(self, path, pathToDir):
+        """
+        Returns True if the path is in the directory after all the
+        symbolic links in the path are followed.
+
+        @return: Returns True if the path is in the directory.
+        @rtype: Boolean
+
+        @param path: The full path.
+        @type path: String
+        @param pathToDir: The full path to the directory.
+        @type pathToDir: String
+        """
+        realPathToDir = os.path.realpath(pathToDir)
+        realPath = os.path.realpath(path)
+        return ((realPath == realPathToDir) or (realPath.startswith(realPathToDir.rstrip(os.sep) + os.sep)))
+
+    def __isSafeSymlink(self, name, linkName):
+        """
+        Returns True if the target of the symbolic link is in the
+        extracted tree. A symbolic link that is absolute or leaves the
+        tree with ".." is not safe to create before the other members
+        are extracted, since the members after it could be written
+        through the link to a path outside of the extraction directory.
+
+        @return: Returns True if the target of the symbolic link is in
+        the extracted tree.
+        @rtype: Boolean
+
+        @param name: The path to the symbolic link in the extracted tree.
+        @type name: String
+        @param linkName: The path that the symbolic link points to.
+        @type linkName: String
+        """
+        if ((not len(linkName) > 0) or (linkName.startswith("/"))):
+            return False
+        pathToTarget = posixpath.normpath(posixpath.join(posixpath.dirname(name), linkName))
+        return (not ((pathToTarget == "..") or (pathToTarget.startswith("../"))))
+
+    def __getZipMemberMode(self, zinfo):
+        """
+        Returns the unix mode of the member of the zip file which
+        includes the type of the member. 0 is returned if the zip file
+        was not created on unix and there is no mode.
+
+        @return: Returns the unix mode of the member.
+        @rtype: Int
+
+        @param zinfo: The member of the zip file.
+        @type zinfo: ZipInfo
+        """
+        # The unix mode is in the high 16 bits of the external attributes.
+        if (not zinfo.create_system == 3):
+            return 0
+        return (zinfo.external_attr >> 16) & 0xFFFF
+
+    # ###########################################################################
+    # Extract, list, getDataFromFile functions
+    # ###########################################################################
+    def buildMemberIndex(self):
+        """
+        Returns a list of all the members in the file. A tarball is read
+        in one streaming pass and a zip file is read from the central
+        directory.
+
+        @return: Returns a list of all the members in the file. None is
+        returned if there was an error listing the file.
+        @rtype: Array
+        """
+        listOfMembers = []
+        try:
+            if (self.isZipFile()):
+                zfile = zipfile.ZipFile(self.getPathToFile(), "r")
+                try:
+                    for zinfo in zfile.infolist():
+                        memberType = ArchiveMember.TYPE_FILE
+                        linkName = ""
+                        if (zinfo.filename.endswith("/")):
+                            memberType = ArchiveMember.TYPE_DIR
+                        elif (stat.S_ISLNK(self.__getZipMemberMode(zinfo))):
+                            # The path a symbolic link points to is stored
+                            # as the data of the member.
+                            memberType = ArchiveMember.TYPE_SYMLINK
+                            linkName = zfile.read(zinfo)
+                        listOfMembers.append(ArchiveMember(zinfo.filename, zinfo.file_size, zinfo.header_offset, memberType, linkName))
+                finally:
+                    zfile.close()
+            else:
+                (tfile, fileobj) = self.__openTarFile()
+                try:
+                    for tarinfo in tfile:
+                        listOfMembers.append(self.__getArchiveMember(tarinfo))
+                finally:
+                    tfile.close()
+                    fileobj.close()
+        except (IOError, os.error, EOFError, tarfile.TarError, zipfile.BadZipfile):
+            return None
+        return listOfMembers
+
+    def getDataFromFile(self, pathToFileInExtractor) :
+        if (not self.isValidMimeType()):
+            message =  "This file is unknown type and will not be extracted: %s." %(self.getPathToFile())
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return []
+        if (self.isZipFile()):
+            # No stripping required on zip files.
+            member = self.getMemberIndex().getMember(pathToFileInExtractor)
+        else:
+            member = self.getMemberIndex().findMember(pathToFileInExtractor)
+        if (member == None):
+            message = "The path to the file does not exist: %s" %(pathToFileInExtractor)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return []
+        return self.getDataFromMember(member)
+
+    def getDataFromMember(self, member):
+        # The data for a hard link is stored with the file it links to.
+        member = self.getMemberIndex().getLinkedMember(member)
+        if ((member == None) or (not member.isFile())):
+            return []
+        data = ""
+        try:
+            if (self.isZipFile()):
+                zfile = zipfile.ZipFile(self.getPathToFile(), "r")
+                try:
+                    data = zfile.read(member.getName())
+                finally:
+                    zfile.close()
+            elif ((self.getFileType()[1] == None) and (member.getOffset() >= 0)):
+                # The tarball is not compressed so read the data directly.
+                fin = open(self.getPathToFile(), "rb")
+                try:
+                    fin.seek(member.getOffset())
+                    data = fin.read(member.getSize())
+                finally:
+                    fin.close()
+            else:
+                # Stop reading the tarball once the file is found.
+                (tfile, fileobj) = self.__openTarFile()
+                try:
+                    for tarinfo in tfile:
+                        if (tarinfo.name == member.getName()):
+                            data = tfile.extractfile(tarinfo).read()
+                            break
+                finally:
+                    tfile.close()
+                    fileobj.close()
+        except (IOError, os.error, EOFError, KeyError, tarfile.TarError, zipfile.BadZipfile):
+            message = "There was a problem reading a file from the file: %s" %(self.getPathToFile())
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return []
+        return data.splitlines(True)
+
+    def getAppliedStripDirectoriesDepth(self, stripDirectoriesDepth):
+        # No stripping is done on zip files which is the same as unzip.
+        if (self.isZipFile()):
+            return 0
+        return stripDirectoriesDepth
+
+    def isExtractedFileFunctionSupported(self):
+        # The members of tarballs and zip files are extracted one at a
+        # time.
+        return True
+
+    def extract(self, extractDir, stripDirectoriesDepth=1, listOfPatterns=None) :
+        if (not self.isValidMimeType()):
+            message =  "This file is unknown type and will not be extracted: %s." %(self.getPathToFile())
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return False
+        message = "Extracting the file %s to %s with the directory depth stripped: %d" %(self.getPathToFile(), extractDir, stripDirectoriesDepth)
+        logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+        try:
+            if (self.isZipFile()):
+                self.__extractZipFile(extractDir, listOfPatterns)
+            else:
+                self.__extractTarFile(extractDir, stripDirectoriesDepth, listOfPatterns)
+        except (IOError, os.error, EOFError, tarfile.TarError, zipfile.BadZipfile):
+            message = "There was an error extracting the file: %s." % (self.getPathToFile())
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return False
+        return os.path.isdir(extractDir)
+
+    def __getSelectedNames(self, listOfPatterns, stripDirectoriesDepth):
+        """
+        Returns a dictionary whose keys are the names of the members
+        that match the patterns. None is returned if there are no
+        patterns which means all members are selected.
+
+        @return: Returns a dictionary whose keys are the names of the
+        members that are selected.
+        @rtype: Dictionary
+
+        @param listOfPatterns: A list of patterns for the paths that
+        will be extracted.
+        @type listOfPatterns: Array
+        @param stripDirectoriesDepth: The number of leading directories
+        that are removed from each member.
+        @type stripDirectoriesDepth: Int
+        """
+        if (listOfPatterns == None):
+            return None
+        selectedNamesMap = {}
+        for member in self.getMemberIndex().getSelectedMembers(listOfPatterns, stripDirectoriesDepth):
+            selectedNamesMap[member.getName().rstrip("/")] = member
+        message = "There was %d members selected out of %d members to extract from the file: %s." %(len(selectedNamesMap.keys()),
+                                                                                                 len(self.getMemberIndex()),
+                                                                                                 self.getPathToFile())
+        logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+        return selectedNamesMap
+
+    def __extractZipFile(self, extractDir, listOfPatterns=None):
+        """
+        Extracts all the members of the zip file. The directories are not
+        stripped on zip files which is the same as the unzip command.
+
+        The unix permissions and symbolic links that are stored in the
+        external attributes of the members are restored like unzip does.
+        The symbolic links that point outside of the extracted tree are
+        created after all the other members and the directories
+        permissions are set last, the same as a tarball is extracted.
+
+        @param extractDir: The full path to directory for extraction.
+        @type extractDir: String
+        @param listOfPatterns: A list of patterns for the paths that
+        will be extracted. If None then all the members are extracted.
+        @type listOfPatterns: Array
+        """
+        selectedNamesMap = self.__getSelectedNames(listOfPatterns, 0)
+        # List of tuples of (name, mode) for the directories.
+        listOfDirectories = []
+        # List of tuples of (name, path the link points to) for the
+        # symbolic links that point outside of the extracted tree.
+        listOfDeferredSymlinks = []
+        errorCount = 0
+        zfile = zipfile.ZipFile(self.getPathToFile(), "r")
+        try:
+            for zinfo in zfile.infolist():
+                if ((not selectedNamesMap == None) and (not selectedNamesMap.has_key(zinfo.filename.rstrip("/")))):
+                    continue
+                strippedName = self.__stripPath(zinfo.filename, 0)
+                if (not len(strippedName) > 0):
+                    message = "The file will not be extracted because the path is not valid: %s" %(zinfo.filename)
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                    continue
+                # The members are never written through a symbolic link
+                # to a path outside of the extraction directory.
+                pathToMember = os.path.join(extractDir, strippedName)
+                if (not self.__isPathInDir(os.path.dirname(pathToMember), extractDir)):
+                    message = "The member will not be extracted because the path is outside of the extraction directory: %s" %(zinfo.filename)
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).warning(message)
+                    continue
+                mode = self.__getZipMemberMode(zinfo)
+                isDirectory = (zinfo.filename.endswith("/") or stat.S_ISDIR(mode))
+                try:
+                    if (os.path.islink(pathToMember)):
+                        # A symbolic link that was already extracted is
+                        # replaced so that nothing is written through it.
+                        if (isDirectory):
+                            if (not self.__isPathInDir(pathToMember, extractDir)):
+                                continue
+                        else:
+                            os.unlink(pathToMember)
+                    if (isDirectory):
+                        if (not os.path.isdir(pathToMember)):
+                            os.makedirs(pathToMember)
+                        listOfDirectories.append((strippedName, mode))
+                    elif (stat.S_ISLNK(mode)):
+                        linkName = zfile.read(zinfo)
+                        if (not self.__isSafeSymlink(strippedName, linkName)):
+                            listOfDeferredSymlinks.append((strippedName, linkName))
+                            continue
+                        self.__makeSymlink(linkName, pathToMember)
+                    else:
+                        self.__extractZipRegularFile(zfile, zinfo, mode, pathToMember)
+                        self.fileExtracted(pathToMember, strippedName)
+                except (IOError, os.error):
+                    errorCount += 1
+                    message = "There was an error extracting the member %s from the file: %s." %(zinfo.filename, self.getPathToFile())
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            for (strippedName, linkName) in listOfDeferredSymlinks:
+                pathToLink = os.path.join(extractDir, strippedName)
+                try:
+                    if (not self.__isPathInDir(os.path.dirname(pathToLink), extractDir)):
+                        raise IOError("The path is outside of the extraction directory.")
+                    self.__makeSymlink(linkName, pathToLink)
+                except (IOError, os.error):
+                    errorCount += 1
+                    message = "There was an error extracting the member %s from the file: %s." %(strippedName, self.getPathToFile())
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            # Set the permissions on the directories, with the deepest
+            # directories first.
+            listOfDirectories.sort(lambda x, y: cmp(y[0], x[0]))
+            for (strippedName, mode) in listOfDirectories:
+                pathToDir = os.path.join(extractDir, strippedName)
+                try:
+                    if (mode > 0):
+                        os.chmod(pathToDir, stat.S_IMODE(mode))
+                except os.error:
+                    message = "There was an error setting the permissions on the directory: %s." %(pathToDir)
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+        finally:
+            zfile.close()
+        if (errorCount > 0):
+            message = "There was %d members that could not be extracted from the file: %s." %(errorCount, self.getPathToFile())
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+
+    def __extractZipRegularFile(self, zfile, zinfo, mode, pathToFile):
+        """
+        Extracts a regular file from the zip file and sets its
+        permissions and modification time.
+
+        @param zfile: The zip file that is being extracted.
+        @type zfile: ZipFile
+        @param zinfo: The member of the zip file.
+        @type zinfo: ZipInfo
+        @param mode: The unix mode of the member. 0 means there is no
+        mode and the permissions are not changed.
+        @type mode: Int
+        @param pathToFile: The path to the file that is extracted.
+        @type pathToFile: String
+        """
+        if (not os.path.isdir(os.path.dirname(pathToFile))):
+            os.makedirs(os.path.dirname(pathToFile))
+        source = zfile.open(zinfo)
+        try:
+            fout = open(pathToFile, "wb")
+            try:
+                data = source.read(DigestReader.BLOCK_SIZE)
+                while (len(data) > 0):
+                    fout.write(data)
+                    data = source.read(DigestReader.BLOCK_SIZE)
+            finally:
+                fout.close()
+        finally:
+            source.close()
+        if (mode > 0):
+            os.chmod(pathToFile, stat.S_IMODE(mode))
+        try:
+            modifiedTime = time.mktime(zinfo.date_time + (0, 0, -1))
+            os.utime(pathToFile, (modifiedTime, modifiedTime))
+        except (OverflowError, ValueError):
+            pass
+
+    def __makeSymlink(self, linkName, pathToLink):
+        """
+        Creates the symbolic link and replaces any file that is at the
+        path to the link.
+
+        @param linkName: The path that the symbolic link points to.
+        @type linkName: String
+        @param pathToLink: The full path to the symbolic link.
+        @type pathToLink: String
+        """
+        if (not os.path.isdir(os.path.dirname(pathToLink))):
+            os.makedirs(os.path.dirname(pathToLink))
+        if ((os.path.islink(pathToLink)) or ((os.path.exists(pathToLink)) and (not os.path.isdir(pathToLink)))):
+            os.unlink(pathToLink)
+        os.symlink(linkName, pathToLink)
+
+    def __makeHardLink(self, tarinfo, extractDir):
+        """
+        Creates a hard link for the member to a file that was already
+        extracted.
+
+        @param tarinfo: The member of the tarball that is a hard link.
+        @type tarinfo: TarInfo
+        @param extractDir: The full path to directory for extraction.
+        @type extractDir: String
+        """
+        pathToLink = os.path.join(extractDir, tarinfo.name)
+        pathToTarget = os.path.join(extractDir, tarinfo.linkname)
+        if (not os.path.lexists(pathToTarget)):
+            raise tarfile.ExtractError("The target of the hard link was not extracted: %s" %(tarinfo.linkname))
+        if (not os.path.isdir(os.path.dirname(pathToLink))):
+            os.makedirs(os.path.dirname(pathToLink))
+        if (os.path.lexists(pathToLink)):
+            os.unlink(pathToLink)
+        os.link(pathToTarget, pathToLink)
+
+    def __extractRegularFile(self, tfile, tarinfo, strippedTarinfo, extractDir):
+        """
+        Extracts a regular file from the tarball and returns the digest
+        of the data that was written, so the file does not have to be
+        read again to hash it.
+
+        @return: Returns the digest of the file.
+        @rtype: String
+
+        @param tfile: The tarball that is being streamed.
+        @type tfile: TarFile
+        @param tarinfo: The member of the tarball.
+        @type tarinfo: TarInfo
+        @param strippedTarinfo: The member of the tarball with the leading
+        directories removed.
+        @type strippedTarinfo: TarInfo
+        @param extractDir: The full path to directory for extraction.
+        @type extractDir: String
+        """
+        pathToFile = os.path.join(extractDir, strippedTarinfo.name)
+        if (not os.path.isdir(os.path.dirname(pathToFile))):
+            os.makedirs(os.path.dirname(pathToFile))
+        if (os.path.islink(pathToFile)):
+            # Do not write the data to the file a symlink points to.
+            os.unlink(pathToFile)
+        digest = hashlib.new(ArchiveManifest.HASH_NAME)
+        bytesCopied = 0
+        source = tfile.extractfile(tarinfo)
+        fout = open(pathToFile, "wb")
+        try:
+            data = source.read(DigestReader.BLOCK_SIZE)
+            while (len(data) > 0):
+                digest.update(data)
+                fout.write(data)
+                bytesCopied += len(data)
+                data = source.read(DigestReader.BLOCK_SIZE)
+        finally:
+            fout.close()
+        if (not bytesCopied == tarinfo.size):
+            raise tarfile.ReadError("Only %d of %d bytes were in the file for the member: %s" %(bytesCopied, tarinfo.size, tarinfo.name))
+        tfile.chown(strippedTarinfo, pathToFile)
+        tfile.chmod(strippedTarinfo, pathToFile)
+        tfile.utime(strippedTarinfo, pathToFile)
+        return digest.hexdigest()
+
+    def __extractTarFile(self, extractDir, stripDirectoriesDepth, listOfPatterns=None):
+        """
+        Extracts all the members of the tarball in one streaming pass
+        and builds the index of the members if it was not built.
+
+        The directories permissions and times are set after all the
+        members are extracted, like GNU tar does, so that read-only
+        directories can be extracted.
+
+        When the whole tarball is extracted the tarball and each file are
+        hashed in the same pass and the manifest is built(see
+        ArchiveManifest). An error is raised if the tarball is truncated
+        or does not match the checksum file that was uploaded with it.
+
+        @param extractDir: The full path to directory for extraction.
+        @type extractDir: String
+        @param stripDirectoriesDepth: The number of leading directories
+        that will be removed from each member.
+        @type stripDirectoriesDepth: Int
+        @param listOfPatterns: A list of patterns for the paths that
+        will be extracted. If None then all the members are extracted.
+        @type listOfPatterns: Array
+        """
+        selectedNamesMap = self.__getSelectedNames(listOfPatterns, stripDirectoriesDepth)
+        listOfMembers = []
+        listOfDirectories = []
+        listOfDeferredSymlinks = []
+        errorCount = 0
+        truncatedCount = 0
+        digestReader = None
+        # Map of the name of each regular file in the tarball to its
+        # digest, so hard links can use the digest of their target.
+        digestsMap = {}
+        if (listOfPatterns == None):
+            digestReader = self.openDigestReader()
+        try:
+            (tfile, fileobj) = self.__openTarFile(digestReader)
+        except:
+            if (not digestReader == None):
+                digestReader.close()
+            raise
+        try:
+            for tarinfo in tfile:
+                listOfMembers.append(self.__getArchiveMember(tarinfo))
+                if ((not selectedNamesMap == None) and (not selectedNamesMap.has_key(tarinfo.name.rstrip("/")))):
+                    continue
+                strippedName = self.__stripPath(tarinfo.name, stripDirectoriesDepth)
+                if (not len(strippedName) > 0):
+                    continue
+                # Make a copy so that the original names are not changed.
+                strippedTarinfo = copy.copy(tarinfo)
+                strippedTarinfo.name = strippedName
+                # The members are never written through a symbolic link
+                # to a path outside of the extraction directory.
+                pathToMember = os.path.join(extractDir, strippedName)
+                if (not self.__isPathInDir(os.path.dirname(pathToMember), extractDir)):
+                    message = "The member will not be extracted because the path is outside of the extraction directory: %s" %(tarinfo.name)
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).warning(message)
+                    continue
+                if (os.path.islink(pathToMember)):
+                    # A symbolic link that was already extracted is replaced
+                    # so that nothing is written through it.
+                    if (tarinfo.isdir()):
+                        if (not self.__isPathInDir(pathToMember, extractDir)):
+                            continue
+                    else:
+                        try:
+                            os.unlink(pathToMember)
+                        except (IOError, os.error):
+                            continue
+                if (tarinfo.islnk()):
+                    strippedTarinfo.linkname = self.__stripPath(tarinfo.linkname, stripDirectoriesDepth)
+                    if ((not len(strippedTarinfo.linkname) > 0) or
+                        (not self.__isPathInDir(os.path.join(extractDir, strippedTarinfo.linkname), extractDir))):
+                        continue
+                elif ((tarinfo.issym()) and (not self.__isSafeSymlink(strippedTarinfo.name, strippedTarinfo.linkname))):
+                    # The symbolic links that point outside of the report
+                    # are created after all the other members like GNU
+                    # tar does.
+                    listOfDeferredSymlinks.append(strippedTarinfo)
+                    continue
+                elif (tarinfo.isdir()):
+                    listOfDirectories.append(strippedTarinfo)
+                    # Extract the directory with permissions that will allow
+                    # files to be added to it.
+                    strippedTarinfo = copy.copy(strippedTarinfo)
+                    strippedTarinfo.mode = 0700
+                try:
+                    if (tarinfo.islnk()):
+                        # The hard links are created here because tarfile
+                        # cannot find the target of a hard link when the
+                        # tarball is streamed.
+                        self.__makeHardLink(strippedTarinfo, extractDir)
+                        if (digestsMap.has_key(tarinfo.linkname)):
+                            digestsMap[tarinfo.name] = digestsMap.get(tarinfo.linkname)
+                    elif ((not digestReader == None) and (tarinfo.isfile()) and (not tarinfo.issparse())):
+                        digestsMap[tarinfo.name] = self.__extractRegularFile(tfile, tarinfo, strippedTarinfo, extractDir)
+                    else:
+                        tfile.extract(strippedTarinfo, extractDir)
+                    if (tarinfo.isfile()):
+                        self.fileExtracted(os.path.join(extractDir, strippedName), strippedName)
+                except (EOFError, tarfile.ReadError):
+                    errorCount += 1
+                    truncatedCount += 1
+                    message = "The data for the member %s is truncated in the file: %s." %(tarinfo.name, self.getPathToFile())
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                except (IOError, os.error, tarfile.TarError):
+                    errorCount += 1
+                    message = "There was an error extracting the member %s from the file: %s." %(tarinfo.name, self.getPathToFile())
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            for strippedTarinfo in listOfDeferredSymlinks:
+                pathToLink = os.path.join(extractDir, strippedTarinfo.name)
+                try:
+                    if (not self.__isPathInDir(os.path.dirname(pathToLink), extractDir)):
+                        raise tarfile.ExtractError("The path is outside of the extraction directory.")
+                    tfile.extract(strippedTarinfo, extractDir)
+                except (IOError, os.error, tarfile.TarError):
+                    errorCount += 1
+                    message = "There was an error extracting the member %s from the file: %s." %(strippedTarinfo.name, self.getPathToFile())
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            # Set the permissions and times on the directories, with the
+            # deepest directories first.
+            listOfDirectories.sort(lambda x, y: cmp(y.name, x.name))
+            for tarinfo in listOfDirectories:
+                pathToDir = os.path.join(extractDir, tarinfo.name)
+                try:
+                    tfile.chown(tarinfo, pathToDir)
+                    tfile.utime(tarinfo, pathToDir)
+                    tfile.chmod(tarinfo, pathToDir)
+                except tarfile.ExtractError:
+                    message = "There was an error setting the permissions on the directory: %s." %(pathToDir)
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            if (not digestReader == None):
+                # Read the rest of the file so the digest is for the whole
+                # file and the end of the compressed data is checked.
+                if (isinstance(fileobj, DecompressorPipe)):
+                    while (len(fileobj.read(DigestReader.BLOCK_SIZE)) > 0):
+                        pass
+                else:
+                    digestReader.drain()
+        finally:
+            tfile.close()
+            fileobj.close()
+            if ((not digestReader == None) and (not digestReader == fileobj)):
+                digestReader.close()
+        if (errorCount > 0):
+            message = "There was %d members that could not be extracted from the file: %s." %(errorCount, self.getPathToFile())
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+        # The members were listed while extracting so there is no reason to
+        # read the file again to build the index.
+        self.setMemberIndex(listOfMembers)
+        if (not digestReader == None):
+            isComplete = self.verifyDigestReader(digestReader)
+            if ((isinstance(fileobj, DecompressorPipe)) and (not fileobj.isComplete())):
+                message = "The compressed data is truncated or corrupt in the file: %s." %(self.getPathToFile())
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                isComplete = False
+            if ((not isComplete) or (truncatedCount > 0)):
+                self.setCorrupt(True)
+                raise tarfile.ReadError("The file is truncated or corrupt: %s" %(self.getPathToFile()))
+            manifest = ArchiveManifest(os.path.basename(self.getPathToFile()),
+                                       digestReader.getHexDigest(ArchiveManifest.HASH_NAME),
+                                       digestReader.getBytesRead())
+            for member in listOfMembers:
+                if (digestsMap.has_key(member.getName())):
+                    manifest.addMember(self.__stripPath(member.getName(), stripDirectoriesDepth), digestsMap.get(member.getName()))
+            self.setManifest(manifest)
@@ -6,110 +6,366 @@
 @version   :  2.17
 @copyright :  GPLv2
 """
+import os
 import os.path
 import logging
-import mimetypes
 import subprocess
 import shutil
+import re
 
 import sx
 from sx.logwriter import LogWriter
 from sx.extractors import Extractor
+from sx.extractors import ArchiveMember
+from sx.extractors import CommandCapabilities
+from sx.extractors import DecompressorPipe
+from sx.extractors import DigestReader
+from sx.extractors import ArchiveManifest
 
 class Tarextractor(Extractor) :
+    """
+    @cvar BLOCK_SIZE: The size of a block in a tar file.
+    @type BLOCK_SIZE: Int
+    @cvar ESCAPED_CHARS_MAP: Map of the character after a backslash in
+    a name that is quoted like a C string to the character it stands
+    for.
+    @type ESCAPED_CHARS_MAP: Dictionary
+    """
+    BLOCK_SIZE = 512
+    ESCAPED_CHARS_MAP = {"a":"\a", "b":"\b", "f":"\f", "n":"\n", "r":"\r", "t":"\t", "v":"\v"}
+
     def __init__(self, pathToFile):
         Extractor.__init__(self, "TARextractor", pathToFile, "/bin/tar")
 
     def isCommandInstalled(self) :
-        command = [self.getPathToCommand(), "--version"]
-        try :
-            tarTask = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            (stdout, stderr) = tarTask.communicate()
-            if ((stdout.find("GNU") >= 0) or (tarTask.returncode  == 0)):
-                return True
-            else:
-                return False
-        except OSError:
-            message = "There was an error checking if the binary tar is installed."
-            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
-            return False
+        # The version is only checked once for all the tar files.
+        (isRan, stdout) = CommandCapabilities.getVersion(self.getPathToCommand(), ["--version"])
+        return ((stdout.find("GNU") >= 0) or (isRan))
 
     def isValidMimeType(self):
-        mimetypes.init()
-        mimetypes.encodings_map[".xz"] = "xz"
-
         # Returns a tuple of [type, encoding]: (index 0 = type), (index 1 = encoding)
-        mimeType = mimetypes.guess_type(self.getPathToFile())
+        mimeType = self.getFileType()
         if ((mimeType[0] == "application/x-tar") and ((mimeType[1] == "gzip") or (mimeType[1] == "bzip2"))):
             # For now will assume that it is a tar.gz or tar.bz2 file. Will not use "tarfile" checker.
             return True
         elif ((mimeType[0] == "application/x-tar") and (mimeType[1] == "xz")):
             # For now will assume that it is a tar.xz file
             return True
+        elif ((mimeType[0] == "application/x-tar") and (mimeType[1] in ["zstd", "lz4"])):
+            # Only valid if there is a command to decompress the file.
+            return (not DecompressorPipe.getCommand(mimeType[1]) == None)
         elif ((mimeType[0] == "application/x-tar") and (mimeType[1] == None)):
             # For now will assume that it is a tar file with no compression
             return True
         return False
 
+    def __getDecompressArgs(self):
+        """
+        Returns the list of arguments for tar to use the command that
+        decompresses the file, the commands that decompress with more
+        than one thread are used when installed(see
+        DecompressorPipe). Empty list is returned if the file is not
+        compressed or there is no command, then tar will pick the
+        command.
+
+        @return: Returns the list of arguments for tar to use the command
+        that decompresses the file.
+        @rtype: Array
+        """
+        compressionType = self.getFileType()[1]
+        if (compressionType == None):
+            return []
+        listOfCommand = DecompressorPipe.getCommand(compressionType)
+        if (listOfCommand == None):
+            return []
+        return ["--use-compress-program=%s" %(" ".join(listOfCommand))]
+
     def getListArgs(self) :
         if (not self.isValidMimeType()):
             return None;
-        compressionType = mimetypes.guess_type(self.getPathToFile())[1]
-        if (compressionType in ["gzip", "bzip2", "xz"]):
-            return "atf"
-        elif (compressionType == None):
+        compressionType = self.getFileType()[1]
+        if (compressionType == None):
+            return "tf"
+        elif (len(self.__getDecompressArgs()) > 0):
             return "tf"
+        elif (compressionType in ["gzip", "bzip2", "xz"]):
+            return "atf"
         return None
 
     def getExtractArgs(self) :
         if (not self.isValidMimeType()):
             return None;
-        compressionType = mimetypes.guess_type(self.getPathToFile())[1]
-        if (compressionType in ["gzip", "bzip2", "xz"]):
-            return "axpf"
-        elif (compressionType == None):
+        compressionType = self.getFileType()[1]
+        if (compressionType == None):
             return "xpf"
+        elif (len(self.__getDecompressArgs()) > 0):
+            return "xpf"
+        elif (compressionType in ["gzip", "bzip2", "xz"]):
+            return "axpf"
         return None
 
     # ###########################################################################
     # Extract, list, getDataFromFile functions
     # ###########################################################################
+    def buildMemberIndex(self):
+        """
+        Returns a list of all the members in the tar file. The verbose
+        listing with block numbers is used so that the size and offset
+        of each member is found with only one pass over the file.
+
+        A member can have more than one header(long names, PAX
+        extended headers) and the block number that is printed is not
+        always the block of the first header for the member. GNU long
+        name headers are printed with the block of the first header and
+        PAX extended headers are printed with the block of the ustar
+        header. The offset of the data is taken from the member's own
+        header block or from the block number of the next member and is
+        only used if the ustar header right before the data matches the
+        member. If neither header matches then the offset is -1 and the
+        member is read with tar.
+
+        The names are listed quoted like C strings and then unquoted, so
+        names with leading spaces, newlines or the text that separates a
+        link from its target are kept unchanged.
+
+        @return: Returns a list of all the members in the tar file. None
+        is returned if there was an error listing the file.
+        @rtype: Array
+        """
+        command = [self.getPathToCommand(), "%sv" %(self.getListArgs()), self.getPathToFile(),
+                   "--block-number", "--numeric-owner", "--quoting-style=c"] + self.__getDecompressArgs()
+        task = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        (stdout, stderr) = task.communicate()
+        if (not task.returncode  == 0):
+            return None
+        remBlock = re.compile("^block (?P<block>\d+): (?P<info>.*)$")
+        # List of tuples (block number, member) in the order they were listed.
+        listOfBlocks = []
+        for line in stdout.split("\n"):
+            mo = remBlock.match(line)
+            if (not mo):
+                continue
+            block = long(mo.group("block"))
+            # The names are quoted like C strings so that a name with
+            # spaces, newlines or the link separators is not ambiguous.
+            # Example: -rw-r--r-- 0/0    3 2014-05-05 10:00 "path/to/file"
+            info = mo.group("info")
+            nameIndex = info.find("\"")
+            splitInfo = info[:max(nameIndex, 0)].split()
+            quotedName = self.__unquoteName(info, nameIndex)
+            if ((info.startswith("**")) or (len(splitInfo) < 5) or (quotedName == None)):
+                # The end of the archive such as "** Block of NULs **".
+                listOfBlocks.append((block, None))
+                continue
+            (name, linkIndex) = quotedName
+            memberType = ArchiveMember.TYPE_OTHER
+            linkName = ""
+            if (splitInfo[0].startswith("-")):
+                memberType = ArchiveMember.TYPE_FILE
+            elif (splitInfo[0].startswith("d")):
+                memberType = ArchiveMember.TYPE_DIR
+            elif (splitInfo[0].startswith("l")):
+                memberType = ArchiveMember.TYPE_SYMLINK
+            elif (splitInfo[0].startswith("h")):
+                memberType = ArchiveMember.TYPE_HARDLINK
+            if (memberType in [ArchiveMember.TYPE_SYMLINK, ArchiveMember.TYPE_HARDLINK]):
+                # Example: "path/to/link" -> "target" or
+                # "path/to/link" link to "target"
+                quotedLinkName = self.__unquoteName(info, info.find("\"", linkIndex))
+                if (not quotedLinkName == None):
+                    linkName = quotedLinkName[0]
+            try:
+                size = long(splitInfo[2])
+            except ValueError:
+                # Device files will have major and minor numbers.
+                size = 0
+            listOfBlocks.append((block, (name, size, memberType, linkName)))
+        # The data can only be read directly from tar files that are not
+        # compressed so the offsets are only validated for those files.
+        fin = None
+        if (self.getFileType()[1] == None):
+            try:
+                fin = open(self.getPathToFile(), "rb")
+            except (IOError, os.error):
+                fin = None
+        listOfMembers = []
+        try:
+            for i in range(0, len(listOfBlocks)):
+                (block, memberInfo) = listOfBlocks[i]
+                if (memberInfo == None):
+                    continue
+                (name, size, memberType, linkName) = memberInfo
+                offset = -1
+                if ((memberType == ArchiveMember.TYPE_FILE) and (not fin == None)):
+                    listOfOffsets = [(block + 1) * Tarextractor.BLOCK_SIZE]
+                    if ((i + 1) < len(listOfBlocks)):
+                        dataBlocks = (size + Tarextractor.BLOCK_SIZE - 1) / Tarextractor.BLOCK_SIZE
+                        listOfOffsets.append((listOfBlocks[i + 1][0] - dataBlocks) * Tarextractor.BLOCK_SIZE)
+                    for currentOffset in listOfOffsets:
+                        if (self.__isMemberHeader(fin, currentOffset - Tarextractor.BLOCK_SIZE, size)):
+                            offset = currentOffset
+                            break
+                listOfMembers.append(ArchiveMember(name, size, offset, memberType, linkName))
+        finally:
+            if (not fin == None):
+                fin.close()
+        return listOfMembers
+
+    def __unquoteName(self, info, startIndex):
+        """
+        Returns a tuple of (name, index after the name) for the name that
+        is quoted like a C string at the index in the listing of a
+        member. None is returned if there is no quoted name at the index.
+
+        @return: Returns a tuple of (name, index after the name).
+        @rtype: Tuple
+
+        @param info: The listing of the member.
+        @type info: String
+        @param startIndex: The index of the opening double quote.
+        @type startIndex: Int
+        """
+        if ((startIndex < 0) or (not info[startIndex:startIndex + 1] == "\"")):
+            return None
+        listOfChars = []
+        i = startIndex + 1
+        while (i < len(info)):
+            c = info[i]
+            if (c == "\""):
+                return ("".join(listOfChars), i + 1)
+            elif (not c == "\\"):
+                listOfChars.append(c)
+                i += 1
+                continue
+            # An escaped character is either a C escape or 1 to 3 octal
+            # digits for a byte.
+            i += 1
+            octalDigits = ""
+            while ((len(octalDigits) < 3) and (i < len(info)) and (info[i] in "01234567")):
+                octalDigits += info[i]
+                i += 1
+            if (len(octalDigits) > 0):
+                listOfChars.append(chr(int(octalDigits, 8) & 0xFF))
+            elif (i < len(info)):
+                listOfChars.append(Tarextractor.ESCAPED_CHARS_MAP.get(info[i], info[i]))
+                i += 1
+        return None
+
+    def __isMemberHeader(self, fin, headerOffset, size):
+        """
+        Returns True if the block at the offset is a valid ustar header
+        for a regular file of the given size. The checksum of the header
+        is verified so that extended headers(PAX or GNU) or data are not
+        mistaken for the header of the member.
+
+        @return: Returns True if the block at the offset is a valid
+        ustar header for a regular file of the given size.
+        @rtype: Boolean
+
+        @param fin: The opened tar file.
+        @type fin: File
+        @param headerOffset: The offset of the header in the tar file.
+        @type headerOffset: Long
+        @param size: The size of the member.
+        @type size: Long
+        """
+        if (headerOffset < 0):
+            return False
+        try:
+            fin.seek(headerOffset)
+            header = fin.read(Tarextractor.BLOCK_SIZE)
+        except (IOError, os.error):
+            return False
+        if (not len(header) == Tarextractor.BLOCK_SIZE):
+            return False
+        # Regular files(and contiguous files) are the only members with data.
+        if (not header[156] in ["0", "\0", "7"]):
+            return False
+        try:
+            checksum = int(header[148:156].replace("\0", " ").strip(), 8)
+        except ValueError:
+            return False
+        # The checksum is calculated with the checksum field set to spaces.
+        if (not checksum == sum(map(ord, header[:148] + (" " * 8) + header[156:]))):
+            return False
+        sizeField = header[124:136]
+        if (ord(sizeField[0]) & 0x80):
+            # GNU base-256 encoding that is used for large files.
+            headerSize = 0L
+            for c in sizeField[1:]:
+                headerSize = (headerSize << 8) + ord(c)
+        else:
+            try:
+                headerSize = long(sizeField.replace("\0", " ").strip() or "0", 8)
+            except ValueError:
+                return False
+        return (headerSize == size)
+
+    def __readMember(self, member):
+        """
+        Returns the contents of a member by reading it directly from
+        the tar file. This can only be done on tar files that are not
+        compressed. None is returned if the member could not be read.
+
+        @return: Returns an array of Strings, where each newline in
+        file is an item in the array.
+        @rtype: Array
+
+        @param member: The member that will be read.
+        @type member: ArchiveMember
+        """
+        if ((not member.isFile()) or (member.getOffset() < 0) or
+            (not self.getFileType()[1] == None)):
+            return None
+        try:
+            fin = open(self.getPathToFile(), "rb")
+            try:
+                fin.seek(member.getOffset())
+                data = fin.read(member.getSize())
+            finally:
+                fin.close()
+        except (IOError, os.error):
+            message = "There was a problem reading a file from the tarfile: %s" %(member.getName())
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return None
+        if (not len(data) == member.getSize()):
+            return None
+        return data.splitlines(True)
+
     def getDataFromFile(self, pathToFileInExtractor) :
         # Get the path that is contained in the tarball, since path
         # that is passed to function is relative path.
-        fileList =  self.list()
-        fullPathToFile = ""
-        for item in fileList:
-            splitItem = item.split("/", 1)
-            # Strip any leading slashes because the result will not
-            # contain one.
-            if (len(splitItem) == 1):
-                if (splitItem[0] == pathToFileInExtractor.strip("/")):
-                    fullPathToFile = item
-                    break;
-            elif (len(splitItem) >= 2):
-                if (splitItem[1] == pathToFileInExtractor.strip("/")):
-                    fullPathToFile = item
-                    break;
+        member = self.getMemberIndex().findMember(pathToFileInExtractor)
+        if (member == None):
+            message = "The path to the file does not exist: %s" %(pathToFileInExtractor)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return []
+        return self.getDataFromMember(member)
+
+    def getDataFromMember(self, member):
+        # The data for a hard link is stored with the file it links to.
+        member = self.getMemberIndex().getLinkedMember(member)
+        if ((member == None) or (not member.isFile())):
+            return []
+        fullPathToFile = member.getName()
+        # If the tarball is not compressed then no need to run tar.
+        fileExtractedContents = self.__readMember(member)
+        if (not fileExtractedContents == None):
+            return fileExtractedContents
         # Get the options to extract
         commandOptions = self.getExtractArgs()
         if (commandOptions == None) :
             message =  "This file is unknown type and will not be extracted: %s." %(self.getPathToFile())
             logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
-        elif (not len(fullPathToFile) > 0):
-            message = "The path to the file does not exist: %s" %(pathToFileInExtractor)
-            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
         else:
             # ###################################################################
             # Create a tmp directory to extract the file
             # ###################################################################
-            if (not os.access(Extractor.PATH_TO_TEMP_DIR, os.F_OK)):
-                try:
-                    os.makedirs(Extractor.PATH_TO_TEMP_DIR)
-                except (IOError, os.error):
-                    message = "Could not create the directory to extract file to: %s" % (Extractor.PATH_TO_TEMP_DIR)
-                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
-            command = [self.getPathToCommand(), commandOptions, self.getPathToFile(), "-C", Extractor.PATH_TO_TEMP_DIR, "--strip-components", "0", fullPathToFile]
+            pathToTempDir = self.getPathToTempDir()
+            # The --occurrence option will stop reading the tarball once the
+            # file is found.
+            command = [self.getPathToCommand(), commandOptions, self.getPathToFile(), "-C", pathToTempDir,
+                       "--strip-components", "0", "--no-wildcards", "--no-unquote", "--occurrence", fullPathToFile] + self.__getDecompressArgs()
             task = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             (stdout, stderr) = task.communicate()
             if (not task.returncode  == 0):
@@ -117,7 +373,7 @@ class Tarextractor(Extractor) :
                 logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
             else:
                 fileExtractedContents = []
-                pathToExtractedFile = os.path.join(Extractor.PATH_TO_TEMP_DIR, fullPathToFile)
+                pathToExtractedFile = os.path.join(pathToTempDir, fullPathToFile)
                 # Extract the contents of the file to an array
                 if (os.path.isfile(pathToExtractedFile)):
                     try:
@@ -130,7 +386,7 @@ class Tarextractor(Extractor) :
                 return fileExtractedContents
         return []
 
-    def extract(self, extractDir, stripDirectoriesDepth=1) :
+    def extract(self, extractDir, stripDirectoriesDepth=1, listOfPatterns=None) :
         commandOptions = self.getExtractArgs()
         if (commandOptions == None) :
             message =  "This file is unknown type and will not be extracted: %s." %(self.getPathToFile())
@@ -139,22 +395,69 @@ class Tarextractor(Extractor) :
             message = "The %s command does not appear to be installed or incorrect version." %(self.getPathToCommand())
             logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
         else:
-            # Add in all files that should be excluded. Add exclude string so
-            # that certain large files are skipped like /var/account. An option
-            # will need to be added to sx, report classes, and extractors. Will
-            # need to build up the string if multiples. Need to test cause it
-            # did not work before but appears to be good idea.
-            excludedFiles = ""
-            #excludedFiles = " --exclude=\"var/account/p*\""
-            message = "%s %s %s -C %s --strip-components %s %s" %(self.getPathToCommand(), commandOptions, self.getPathToFile(), extractDir, str(stripDirectoriesDepth), excludedFiles)
+            # When the whole file is extracted and tar does not have to guess
+            # the compression from the filename, the file is given to tar on
+            # stdin so that it is hashed in the same pass(see DigestReader).
+            digestReader = None
+            pathToFile = self.getPathToFile()
+            if ((listOfPatterns == None) and ((self.getFileType()[1] == None) or (len(self.__getDecompressArgs()) > 0))):
+                digestReader = self.openDigestReader()
+                pathToFile = "-"
+            command = [self.getPathToCommand(), commandOptions, pathToFile, "-C", extractDir,
+                       "--strip-components", str(stripDirectoriesDepth)] + self.__getDecompressArgs()
+            if (not listOfPatterns == None):
+                # Only extract the members that match the patterns. The
+                # names of the members are written to a file that tar will
+                # read the list of members from.
+                listOfSelectedMembers = self.getMemberIndex().getSelectedMembers(listOfPatterns, stripDirectoriesDepth)
+                pathToMembersFile = os.path.join(self.getPathToTempDir(), "selected_members")
+                try:
+                    fout = open(pathToMembersFile, "w")
+                    for member in listOfSelectedMembers:
+                        fout.write("%s\0" %(member.getName()))
+                    fout.close()
+                except (IOError, os.error):
+                    message = "There was an error writing the list of members to extract to the file: %s." % (pathToMembersFile)
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                    return False
+                message = "There was %d members selected out of %d members to extract from the file: %s." %(len(listOfSelectedMembers),
+                                                                                                         len(self.getMemberIndex()),
+                                                                                                         self.getPathToFile())
+                logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                if (not len(listOfSelectedMembers) > 0):
+                    return os.path.isdir(extractDir)
+                command += ["--no-recursion", "--null", "--no-wildcards", "--no-unquote", "-T", pathToMembersFile]
+            message = " ".join(command)
             logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
-            command = [self.getPathToCommand(), commandOptions, self.getPathToFile(), "-C", extractDir, "--strip-components", str(stripDirectoriesDepth), excludedFiles]
-            task = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            (stdout, stderr) = task.communicate()
+            if (digestReader == None):
+                task = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                (stdout, stderr) = task.communicate()
+            else:
+                (stdin, feedFD) = DigestReader.createPipe()
+                try:
+                    task = subprocess.Popen(command, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE, close_fds=True)
+                except OSError:
+                    os.close(stdin)
+                    os.close(feedFD)
+                    digestReader.close()
+                    raise
+                os.close(stdin)
+                digestReader.startFeeding(feedFD)
+                (stdout, stderr) = task.communicate()
+                digestReader.waitForFeeding()
+                digestReader.close()
             if (not task.returncode  == 0):
                 message = "There was an error extracting the file: %s." % (self.getPathToFile())
                 logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            elif ((not digestReader == None) and (not self.verifyDigestReader(digestReader))):
+                message = "The file is truncated or corrupt: %s." % (self.getPathToFile())
+                logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
             else:
+                if (not digestReader == None):
+                    # Only the digest of the whole file is known since tar
+                    # extracted the files.
+                    self.setManifest(ArchiveManifest(os.path.basename(self.getPathToFile()),
+                                                     digestReader.getHexDigest(ArchiveManifest.HASH_NAME),
+                                                     digestReader.getBytesRead()))
                 return os.path.isdir(extractDir)
         return False
-
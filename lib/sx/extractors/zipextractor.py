@@ -8,13 +8,15 @@
 """
 import os.path
 import logging
-import mimetypes
 import subprocess
 import shutil
+import zipfile
 
 import sx
 from sx.logwriter import LogWriter
 from sx.extractors import Extractor
+from sx.extractors import ArchiveMember
+from sx.extractors import CommandCapabilities
 
 
 class Zipextractor(Extractor) :
@@ -22,25 +24,14 @@ class Zipextractor(Extractor) :
         Extractor.__init__(self, "ZIPextractor", pathToFile, "/usr/bin/unzip")
 
     def isCommandInstalled(self) :
-        command = [self.getPathToCommand(), "-v"]
-        try: 
-            unzipTask = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            (stdout, stderr) = unzipTask.communicate()
-            if ((stdout.find("Info-ZIP") >= 0) or (unzipTask.returncode  == 0)):
-                return True
-            return False
-        except OSError:
-            message = "There was an error checking if the binary zip is installed."
-            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
-            return False
+        # The version is only checked once for all the zip files.
+        (isRan, stdout) = CommandCapabilities.getVersion(self.getPathToCommand(), ["-v"])
+        return ((stdout.find("Info-ZIP") >= 0) or (isRan))
 
 
     def isValidMimeType(self):
-        mimetypes.init()
-        mimetypes.encodings_map[".xz"] = "xz"
-
         # Returns a tuple of [type, encoding]: (index 0 = type), (index 1 = encoding)
-        mimeType = mimetypes.guess_type(self.getPathToFile())
+        mimeType = self.getFileType()
         if ((mimeType[0] == "application/zip") and (mimeType[1] == None)):
             return True
         return False
@@ -60,39 +51,60 @@ class Zipextractor(Extractor) :
             return None;
         return "-qo"
 
+    def buildMemberIndex(self):
+        """
+        Returns a list of all the members in the zip file. The list is
+        built from the central directory of the zip file so the file
+        does not need to be decompressed.
+
+        @return: Returns a list of all the members in the zip file. None
+        is returned if there was an error listing the file.
+        @rtype: Array
+        """
+        listOfMembers = []
+        try:
+            zfile = zipfile.ZipFile(self.getPathToFile(), "r")
+            try:
+                for zinfo in zfile.infolist():
+                    memberType = ArchiveMember.TYPE_FILE
+                    if (zinfo.filename.endswith("/")):
+                        memberType = ArchiveMember.TYPE_DIR
+                    listOfMembers.append(ArchiveMember(zinfo.filename, zinfo.file_size, zinfo.header_offset, memberType))
+            finally:
+                zfile.close()
+        except (IOError, os.error, zipfile.BadZipfile):
+            return None
+        return listOfMembers
+
     # ###########################################################################
     # Extract, getDataFromFile functions
     # ###########################################################################
     def getDataFromFile(self, pathToFileInExtractor) :
+        # No stripping required on zip files.
+        member = self.getMemberIndex().getMember(pathToFileInExtractor)
+        if (member == None):
+            message = "The path to the file does not exist: %s" %(pathToFileInExtractor)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return []
+        return self.getDataFromMember(member)
+
+    def getDataFromMember(self, member):
         # unzip RHEV-log.zip RhevManager.exe.config -d test/
-        fullPathToFile = pathToFileInExtractor
-        fileList =  self.list()
-        fullPathToFile = ""
-        for item in fileList:
-            # No stripping required on zip files.
-            if (item == pathToFileInExtractor):
-                fullPathToFile = item
-                break;
+        if (not member.isFile()):
+            return []
+        fullPathToFile = member.getName()
         # Get the options to extract
         commandOptions = self.getExtactArgs()
         if (commandOptions == None) :
             message =  "This file is unknown type and will not be extracted: %s." %(self.getPathToFile())
             logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
-        elif (not len(fullPathToFile) > 0):
-            message = "The path to the file does not exist: %s" %(pathToFileInExtractor)
-            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
         else:
             # ###################################################################
             # Create a tmp directory to extract the file
             # ###################################################################
-            if (not os.access(Extractor.PATH_TO_TEMP_DIR, os.F_OK)):
-                try:
-                    os.makedirs(Extractor.PATH_TO_TEMP_DIR)
-                except (IOError, os.error):
-                    message = "Could not create the directory to extract file to: %s" % (Extractor.PATH_TO_TEMP_DIR)
-                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
-
-            command = [self.getPathToCommand(), commandOptions, self.getPathToFile(), fullPathToFile, "-d", Extractor.PATH_TO_TEMP_DIR]
+            pathToTempDir = self.getPathToTempDir()
+
+            command = [self.getPathToCommand(), commandOptions, self.getPathToFile(), fullPathToFile, "-d", pathToTempDir]
             task = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             (stdout, stderr) = task.communicate()
             if (not task.returncode  == 0):
@@ -100,7 +112,7 @@ class Zipextractor(Extractor) :
                 logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
             else:
                 fileExtractedContents = []
-                pathToExtractedFile = os.path.join(Extractor.PATH_TO_TEMP_DIR, fullPathToFile)
+                pathToExtractedFile = os.path.join(pathToTempDir, fullPathToFile)
                 # Extract the contents of the file to an array
                 if (os.path.isfile(pathToExtractedFile)):
                     try:
@@ -113,7 +125,13 @@ class Zipextractor(Extractor) :
                 return fileExtractedContents
         return []
 
-    def extract(self, extractDir, stripDirectoriesDepth=1) :
+    def getAppliedStripDirectoriesDepth(self, stripDirectoriesDepth):
+        # No stripping is done on zip files.
+        return 0
+
+    def extract(self, extractDir, stripDirectoriesDepth=1, listOfPatterns=None) :
+        # The list of patterns is ignored and all the files are extracted
+        # since zip files are not stripped.
         commandOptions = self.getExtactArgs()
         if (commandOptions == None) :
             message =  "This file is unknown type and will not be extracted: %s." %(self.getPathToFile())
@@ -1,9 +1,10 @@
 #!/usr/bin/env python
 """
-This file contains 4 classes. ModulesLoader is default loader for all
+This file contains 5 classes. ModulesLoader is default loader for all
 modules: reports, plugins, and extractors.
 
 ReportsLoader is a child of the ModulesLoader class that loads report modules.
+ReportSignatureIndex finds the report type for a list of paths.
 PluginsLoader is a child of the ModulesLoader class that loads plugin modules.
 
 @author    :  Shane Bradley
@@ -16,15 +17,28 @@ import os.path
 import logging
 import sys
 import re
+import threading
 
 import sx
 from sx.logwriter import LogWriter
+from sx.extractors import FileTypeSniffer
 
 class ModulesLoader :
     """
     This is the base loader for loading reports, plugins, and
     extractors.
+
+    @cvar CLASSES_CACHE: Map of the path to a directory of modules to a
+    tuple of (modification time of the directory, list of classes), so
+    that a process that loads the modules more than once only looks for
+    them again when the directory changes.
+    @type CLASSES_CACHE: Dictionary
+    @cvar CLASSES_CACHE_LOCK: The lock for the cache of classes.
+    @type CLASSES_CACHE_LOCK: Lock
     """
+    CLASSES_CACHE = {}
+    CLASSES_CACHE_LOCK = threading.Lock()
+
     def __init__(self):
         pass
 
@@ -101,6 +115,19 @@ class ModulesLoader :
         if (not (pathToModuleBaseDir in sys.path)) :
             sys.path.append(pathToModuleBaseDir)
 
+        # Return the classes that were found before if the directory has not
+        # changed.
+        cacheKey = (pathToClassesDir, moduleImportBase)
+        modifiedTime = os.stat(pathToClassesDir).st_mtime
+        ModulesLoader.CLASSES_CACHE_LOCK.acquire()
+        try:
+            if (ModulesLoader.CLASSES_CACHE.has_key(cacheKey)):
+                (cachedModifiedTime, cachedModuleClasses) = ModulesLoader.CLASSES_CACHE.get(cacheKey)
+                if (cachedModifiedTime == modifiedTime):
+                    return list(cachedModuleClasses)
+        finally:
+            ModulesLoader.CLASSES_CACHE_LOCK.release()
+
         # Get list of files and load the classes into an array if they
         # are valid modules
         filenames = os.listdir(pathToClassesDir)
@@ -123,6 +150,11 @@ class ModulesLoader :
                 message = ("Module %s does not validate, skipping.") % (filename)
                 logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
                 continue
+        ModulesLoader.CLASSES_CACHE_LOCK.acquire()
+        try:
+            ModulesLoader.CLASSES_CACHE[cacheKey] = (modifiedTime, list(loadedModuleClasses))
+        finally:
+            ModulesLoader.CLASSES_CACHE_LOCK.release()
         return loadedModuleClasses
 
     def load(self, pathToModuleBaseDir, moduleImportBase):
@@ -149,6 +181,110 @@ class ModulesLoader :
                 loadedModules.append(moduleInstance)
         return loadedModules
 
+class ReportSignatureIndex :
+    """
+    This class is an index of the type detection files of the report
+    classes which is used to find the report type for a list of
+    paths. The type detection file is split into its path components
+    and indexed by its last component, so each path is matched with a
+    lookup of the filename of the path instead of matching every type
+    detection file against the path.
+
+    A path matches a type detection file if the path ends with all the
+    path components of the type detection file.
+    """
+    def __init__(self, reportClasses):
+        """
+        @param reportClasses: The list of report classes. If more than
+        one report class matches a path then the first report class in
+        the list is used.
+        @type reportClasses: Array
+        """
+        # A map of the last path component of each type detection file
+        # to a list of tuples of the position of the report class, the
+        # path components of the type detection file and the report
+        # class.
+        self.__signaturesMap = {}
+        for index in range(0, len(reportClasses)):
+            reportClass = reportClasses[index]
+            if (reportClass == None):
+                continue
+            signature = ReportSignatureIndex.splitPath(reportClass.TYPE_DETECTION_FILE)
+            if (not len(signature) > 0):
+                continue
+            # The report classes for each filename are kept in the same
+            # order as the list of report classes.
+            if (not self.__signaturesMap.has_key(signature[-1])):
+                self.__signaturesMap[signature[-1]] = []
+            self.__signaturesMap.get(signature[-1]).append((index, signature, reportClass))
+        # The filenames of the type detection files which are used to skip
+        # the paths that cannot match without splitting the path.
+        self.__filenames = tuple(self.__signaturesMap.keys())
+
+    def splitPath(pathToFile):
+        """
+        Returns the list of the components of the path. Empty components
+        and "." components are not included.
+
+        @return: Returns the list of the components of the path.
+        @rtype: Array
+
+        @param pathToFile: The path.
+        @type pathToFile: String
+        """
+        listOfComponents = []
+        for component in pathToFile.strip().split("/"):
+            if ((len(component) > 0) and (not component == ".")):
+                listOfComponents.append(component)
+        return listOfComponents
+    splitPath = staticmethod(splitPath)
+
+    def match(self, pathToFile):
+        """
+        Returns the report class whose type detection file is in the
+        path. None is returned if the path does not match any report
+        class.
+
+        @return: Returns the report class whose type detection file is in
+        the path.
+        @rtype: Class
+
+        @param pathToFile: The path.
+        @type pathToFile: String
+        """
+        pathToFile = pathToFile.strip().rstrip("/")
+        listOfSignatures = self.__signaturesMap.get(pathToFile[pathToFile.rfind("/") + 1:])
+        if (listOfSignatures == None):
+            return None
+        listOfComponents = ReportSignatureIndex.splitPath(pathToFile)
+        for (index, signature, reportClass) in listOfSignatures:
+            if ((len(listOfComponents) >= len(signature)) and
+                (listOfComponents[len(listOfComponents) - len(signature):] == signature)):
+                return reportClass
+        return None
+
+    def find(self, listOfFilenames):
+        """
+        Returns the report class for the first path that matches a report
+        class. The paths are read one at a time and no more paths are
+        read after the first match, so a generator of paths can be used.
+
+        @return: Returns the report class for the first path that
+        matches a report class. None is returned if no path matches.
+        @rtype: Class
+
+        @param listOfFilenames: A list(or any iterable) of paths.
+        @type listOfFilenames: Array
+        """
+        filenames = self.__filenames
+        for pathToFile in listOfFilenames:
+            if (not pathToFile.rstrip().rstrip("/").endswith(filenames)):
+                continue
+            reportClass = self.match(pathToFile)
+            if (not reportClass == None):
+                return reportClass
+        return None
+
 class ReportsLoader(ModulesLoader) :
     """
     This class will load or perform various operations on report
@@ -162,82 +298,73 @@ class ReportsLoader(ModulesLoader) :
         self.__coreClasses = self.getClasses(self.__pathToBaseDir, sx.REPORT_CORE_IMPORT)
         self.__userClasses = self.getClasses(sx.SXConfigurationFiles.CONFIGURATION_DIR,
                                              sx.SXConfigurationFiles.REPORT_USER_IMPORT)
-        # Build the regex for searching.
-        self.__findRegexCore =self. __buildFindReportRegex(self.__coreClasses)
-        self.__findRegexUser =self. __buildFindReportRegex(self.__userClasses)
+        # Build the indexes of the type detection files for searching.
+        self.__signatureIndexCore = ReportSignatureIndex(self.__coreClasses)
+        self.__signatureIndexAll = ReportSignatureIndex(self.__coreClasses + self.__userClasses)
 
         # Load up extractors
         self.__extractorsLoader = ExtractorsLoader()
 
-    def __buildFindReportRegex(self, reportClasses) :
+    def __getReportClasses(self, includeUserReports=True):
         """
-        Returns a regex string based on type detection file
-        in report classes.
-
-        Do note that certain characters are not allowed in filename
-        because of re rules. All whitespaces will be turned to
-        underscores.
+        Returns a new list of the report classes.
 
-        @return: Returns a regex string based on type detection file
-        in report classes.
-        @rtype: Class
+        @return: Returns a new list of the report classes.
+        @rtype: Array
 
+        @param includeUserReports: If enable the user modules(reports) will
+        be included. Default is True
+        @type includeUserReports: Boolean
         """
-        # Build the expression for all the different signature
-        # files inside that report file.
-        regex = ""
-        for reportClass in reportClasses:
-            # Escape out . with \.
-            if (len(regex) > 0) :
-                regex += "|"
-            if (not reportClass == None) :
-                regex += "(?P<%s>.*%s.*)" %(reportClass.REPORT_NAME.replace(" ", "_"), reportClass.TYPE_DETECTION_FILE.replace(".", "\."))
-        return regex
+        if (includeUserReports):
+            return self.__coreClasses + self.__userClasses
+        return list(self.__coreClasses)
 
     def __findReport(self, listOfFilenames, includeUserReports=True) :
         """
-        Returns the class that matches the report file. None is
+        Returns the report that matches the report file. None is
         returned if no report type is found. This function is for
         matching a file in list of filenames to a unique file that
         identiifes the that this list of files is a certain report.
 
-        @return: Returns the class for that matches the report.
-        @rtype: Class
+        @return: Returns the report for that matches the report.
+        @rtype: Report
 
-        @param listOfFilenames: A list of filenames that will be
-        searched.
+        @param listOfFilenames: A list(or any iterable) of filenames
+        that will be searched. No more filenames are read after the
+        first match.
         @type listOfFilenames: Array
         @param includeUserReports: If enable the user modules(reports) will
         be searched. Default is True
         @type includeUserReports: Boolean
         """
-
-        if (len(listOfFilenames) > 0) :
-            regex = self.__findRegexCore
-            reportClasses = self.__coreClasses
-            if (includeUserReports):
-                regex = "%s|%s" %(self.__findRegexCore, self.__findRegexUser)
-                reportClasses += self.__userClasses
-            detectionFileMap = {}
-            for reportClass in reportClasses:
-                detectionFileMap[reportClass.REPORT_NAME.replace(" ", "_")] = reportClass
-            #message = "The regular expression used for searching for report types:\n\t  %s." %(regex)
-            #logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
-            rem = re.compile(regex)
-            for line in listOfFilenames:
-                mo = rem.match(line)
-                if mo:
-                    if (detectionFileMap.has_key(mo.lastgroup)):
-                        reportClass = detectionFileMap.get(mo.lastgroup)
-                        report = reportClass()
-                        return report
+        signatureIndex = self.__signatureIndexCore
+        if (includeUserReports):
+            signatureIndex = self.__signatureIndexAll
+        reportClass = signatureIndex.find(listOfFilenames)
+        if (not reportClass == None):
+            return reportClass()
         return None
 
+    def __walkFilenames(self, pathToDir):
+        """
+        Returns a generator of the paths to all the files under the
+        directory, so the directory is only walked until a match is
+        found.
+
+        @return: Returns a generator of the paths to all the files under
+        the directory.
+        @rtype: Generator
+
+        @param pathToDir: The path to the directory.
+        @type pathToDir: String
+        """
+        for root, dirs, files in os.walk(pathToDir):
+            for currentFilename in files:
+                yield os.path.join(root, currentFilename)
+
     def getReportByName(self, reportName, includeUserReports=True):
-        reportClasses = self.__coreClasses
-        if (includeUserReports):
-            reportClasses += self.__userClasses
-        for reportClass in reportClasses:
+        for reportClass in self.__getReportClasses(includeUserReports):
             if (reportClass.REPORT_NAME == reportName):
                 report = reportClass()
                 return report
@@ -261,10 +388,8 @@ class ReportsLoader(ModulesLoader) :
                 listOfFilenames = extractor.list()
         elif (os.path.isdir(pathToFilename)):
             # If dir i dont need to extract anything just search the dir
-            listOfFilenames = []
-            for root, dirs, files in os.walk(pathToFilename):
-                for currentFilename in files:
-                    listOfFilenames.append(os.path.join(root, currentFilename))
+            # and stop walking it at the first match.
+            listOfFilenames = self.__walkFilenames(pathToFilename)
         report = self.__findReport(listOfFilenames, includeUserReports)
         if (report == None) :
             message = "The report type could not be determined for the filepath: %s." %(pathToFilename)
@@ -342,7 +467,30 @@ class PluginsLoader(ModulesLoader) :
 class ExtractorsLoader(ModulesLoader) :
     """
     This class returns Extractor objects.
+
+    The extractors are cached so that the same extractor(and the index
+    of the members in the file) is returned for a file until the file is
+    changed or moved.
+
+    @cvar EXTRACTORS_CACHE: Map of the file's path, size, and modification
+    time to the extractor for the file.
+    @type EXTRACTORS_CACHE: Dictionary
+    @cvar EXTRACTORS_CACHE_LOCK: Lock that protects the cache of extractors.
+    @type EXTRACTORS_CACHE_LOCK: Lock
+    @cvar DEFAULT_EXTRACTOR_NAME: The name of the extractor that will be
+    tried first when there is no preferred extractor. The other
+    extractors are tried in the order they are loaded.
+    @type DEFAULT_EXTRACTOR_NAME: String
+    @cvar PREFERRED_EXTRACTOR_NAME: The name of the extractor that will be
+    tried first. If empty string then the default extractor is tried
+    first.
+    @type PREFERRED_EXTRACTOR_NAME: String
     """
+    EXTRACTORS_CACHE = {}
+    EXTRACTORS_CACHE_LOCK = threading.Lock()
+    DEFAULT_EXTRACTOR_NAME = "NATIVEextractor"
+    PREFERRED_EXTRACTOR_NAME = ""
+
     def __init__(self):
         ModulesLoader.__init__(self)
         self.__pathToBaseDir = sx.SXImportPath.generateBaseImportPath()
@@ -366,14 +514,69 @@ class ExtractorsLoader(ModulesLoader) :
         written extractors.
         @type includeUserExtractors: Boolean
         """
-        # Currently there are no user extractors, but code will eventually.
-        for extractorClass in self.__classes:
-            extractor = extractorClass(pathToFilename)
-            if (extractor.isValidMimeType()):
-                return extractor
+        cacheKey = None
+        try:
+            fileStat = os.stat(pathToFilename)
+            cacheKey = (os.path.abspath(pathToFilename), fileStat.st_size, fileStat.st_mtime)
+        except (IOError, os.error):
+            pass
+        ExtractorsLoader.EXTRACTORS_CACHE_LOCK.acquire()
+        try:
+            if ((not cacheKey == None) and (ExtractorsLoader.EXTRACTORS_CACHE.has_key(cacheKey))):
+                return ExtractorsLoader.EXTRACTORS_CACHE.get(cacheKey)
+            # The type of the file is found once from the first bytes of the
+            # file and given to each extractor that is checked.
+            fileType = FileTypeSniffer.sniff(pathToFilename)
+            # Currently there are no user extractors, but code will eventually.
+            # The preferred extractor is tried first, then the default
+            # extractor and then the rest in the order they were loaded.
+            listOfFirstNames = [ExtractorsLoader.PREFERRED_EXTRACTOR_NAME.lower(), ExtractorsLoader.DEFAULT_EXTRACTOR_NAME.lower()]
+            listOfExtractors = []
+            for extractorClass in self.__classes:
+                extractor = extractorClass(pathToFilename)
+                extractor.setFileType(fileType)
+                listOfExtractors.append(extractor)
+            def getExtractorOrder(extractor):
+                if (extractor.getName().lower() in listOfFirstNames):
+                    return listOfFirstNames.index(extractor.getName().lower())
+                return len(listOfFirstNames)
+            # The sort is stable so the order they were loaded is kept.
+            listOfExtractors.sort(key=getExtractorOrder)
+            for extractor in listOfExtractors:
+                if (extractor.isValidMimeType()):
+                    if (not cacheKey == None):
+                        ExtractorsLoader.EXTRACTORS_CACHE[cacheKey] = extractor
+                    return extractor
+        finally:
+            ExtractorsLoader.EXTRACTORS_CACHE_LOCK.release()
         # If no extractor is found then return None.
         return None
 
+    def setPreferredExtractor(extractorName):
+        """
+        Sets the name of the extractor that will be tried first when
+        finding an extractor for a file. If the preferred extractor
+        cannot handle the file then the other extractors are tried.
+
+        @param extractorName: The name of the extractor(for example:
+        TARextractor). Empty string means no preference.
+        @type extractorName: String
+        """
+        ExtractorsLoader.PREFERRED_EXTRACTOR_NAME = extractorName
+        ExtractorsLoader.clearCache()
+    setPreferredExtractor = staticmethod(setPreferredExtractor)
+
+    def clearCache():
+        """
+        Removes all the extractors from the cache.
+        """
+        ExtractorsLoader.EXTRACTORS_CACHE_LOCK.acquire()
+        try:
+            ExtractorsLoader.EXTRACTORS_CACHE.clear()
+        finally:
+            ExtractorsLoader.EXTRACTORS_CACHE_LOCK.release()
+    clearCache = staticmethod(clearCache)
+
     def getExtractors(self, listOfFilenames, includeUserExtractors=True) :
         """
         This function will return a list of Extractor objects that
@@ -12,11 +12,16 @@ import time
 import os
 import os.path
 import logging
+import sys
+import threading
+import Queue
 
 import sx
 from sx.logwriter import LogWriter
 from sx.modulesloader import PluginsLoader
 from sx.tools import ConsoleUtil
+from sx.tools import WorkerPool
+from sx.tools import ThreadLogBuffer
 
 from sx.analysisreport import AnalysisReport
 from sx.analysisreport import ARSection
@@ -113,27 +118,256 @@ class PluginsHelper:
         # Return the list of enabled plugins.
         return enabledPlugins
 
-    def generatePluginReports(self, listOfReports, listOfEnabledPlugins):
-        # Setup: gather files needed from each report
-        for plugin in listOfEnabledPlugins:
-            if ((plugin.isReportsRequired()) and (len(listOfReports) > 0)):
-                plugin.setup(listOfReports)
+    def getRequiredPaths(self, listOfEnabledPlugins):
+        """
+        Returns a list of all the paths in the reports that the enabled
+        plugins read. None is returned if any of the plugins requires
+        the whole report.
 
-        # Execute: run some intense operation that could be used in report/action
-        for plugin in listOfEnabledPlugins:
-            if ((plugin.isReportsRequired()) and (len(listOfReports) > 0)):
-                plugin.execute()
+        @return: Returns a list of all the paths in the reports that the
+        enabled plugins read.
+        @rtype: Array
 
-        # Reports: write a report to console or file for each plugin
+        @param listOfEnabledPlugins: The list of enabled plugins.
+        @type listOfEnabledPlugins: Array
+        """
+        listOfPaths = []
+        for plugin in listOfEnabledPlugins:
+            requiredPaths = plugin.getRequiredPaths()
+            if (requiredPaths == None):
+                message = "The plugin %s requires the whole report to be extracted." %(plugin.getName())
+                logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                return None
+            for path in requiredPaths:
+                if (not path in listOfPaths):
+                    listOfPaths.append(path)
+        return listOfPaths
+
+    def generatePluginReports(self, listOfReports, listOfEnabledPlugins, workerCount=1, listOfChangedReports=None):
+        """
+        Runs the enabled plugins on the reports.
+
+        Each plugin is started as soon as the plugins it depends on and
+        the plugins that produce the artifacts it consumes have
+        finished(see PluginScheduler). A plugin writes its report as
+        soon as it has finished, so a slow plugin does not hold up the
+        other plugins. The action functions are ran one plugin after
+        another once all the plugins have finished.
+
+        If the list of changed reports is not None then only the
+        plugins that have a changed report of a valid report type are
+        ran, and the plugins only regenerate the files for the changed
+        reports if they support it(see PluginBase.setChangedReports()).
+
+        @param listOfReports: The list of reports.
+        @type listOfReports: Array
+        @param listOfEnabledPlugins: The list of enabled plugins.
+        @type listOfEnabledPlugins: Array
+        @param workerCount: The maximum number of plugins(or reports
+        for plugins that process reports at the same time) that are
+        ran at the same time.
+        @type workerCount: Int
+        @param listOfChangedReports: The list of reports that were added
+        or changed since the plugins last ran. If None then all the
+        reports have changed.
+        @type listOfChangedReports: Array
+        """
+        listOfPlugins = []
         for plugin in listOfEnabledPlugins:
-            if ((plugin.isReportsRequired()) and (len(listOfReports) > 0)):
-                plugin.report()
+            plugin.setWorkerCount(workerCount)
+            plugin.setChangedReports(listOfChangedReports)
+            if ((not plugin.isReportsRequired()) or (not len(listOfReports) > 0)):
+                continue
+            elif ((not listOfChangedReports == None) and (not plugin.hasChangedReports(listOfReports))):
+                # Plugins are only skipped on incremental runs.
+                message = "The plugin %s will be skipped since none of its reports have changed." %(plugin.getName())
+                logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
+                continue
+            listOfPlugins.append(plugin)
+        # Setup, Execute and Report: ran for each plugin once its inputs
+        # are ready.
+        PluginScheduler(listOfPlugins, workerCount).run(listOfReports)
 
         # Actions: does something that is outside of sx such as opening a
         # browser, filemanager, etc.
-        for plugin in listOfEnabledPlugins:
-            if ((plugin.isReportsRequired()) and (len(listOfReports) > 0)):
-                plugin.action()
+        for plugin in listOfPlugins:
+            plugin.action()
+
+class PluginScheduler:
+    """
+    This class runs a list of plugins as a graph. A plugin is started as
+    soon as all the plugins that it depends on and all the plugins that
+    produce an artifact it consumes have finished. Artifacts that are
+    consumed but not produced by any of the plugins are generated when
+    they are first requested(see ReportArtifacts), so they do not hold
+    up a plugin.
+
+    The messages that are logged by a plugin are held until the plugin
+    has finished, then all of them are written together so that the
+    messages of plugins that are ran at the same time are not mixed.
+    """
+    def __init__(self, listOfPlugins, workerCount=1):
+        """
+        @param listOfPlugins: The list of plugins that will be ran.
+        @type listOfPlugins: Array
+        @param workerCount: The maximum number of plugins that are ran at
+        the same time. If less than 1 then 1 will be used.
+        @type workerCount: Int
+        """
+        self.__listOfPlugins = listOfPlugins
+        self.__workerCount = workerCount
+        if (not self.__workerCount > 0):
+            self.__workerCount = 1
+        # A map of each plugin to the list of plugins that have to finish
+        # before it can be started.
+        self.__requiredPluginsMap = {}
+        for plugin in self.__listOfPlugins:
+            self.__requiredPluginsMap[plugin] = self.__getRequiredPlugins(plugin)
+
+    def __getRequiredPlugins(self, plugin):
+        """
+        Returns the list of plugins that have to finish before the plugin
+        can be started.
+
+        @return: Returns the list of plugins that have to finish before
+        the plugin can be started.
+        @rtype: Array
+
+        @param plugin: The plugin.
+        @type plugin: PluginBase
+        """
+        requiredPlugins = []
+        for name in plugin.getDependencies():
+            found = False
+            for requiredPlugin in self.__listOfPlugins:
+                if ((requiredPlugin.isNamed(name)) and (not requiredPlugin == plugin)):
+                    found = True
+                    if (not requiredPlugin in requiredPlugins):
+                        requiredPlugins.append(requiredPlugin)
+            if (not found):
+                message = "The plugin %s depends on the plugin %s which is not enabled." %(plugin.getName(), name)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+        for artifactName in plugin.getConsumes():
+            for requiredPlugin in self.__listOfPlugins:
+                if ((artifactName in requiredPlugin.getProduces()) and (not requiredPlugin == plugin) and
+                    (not requiredPlugin in requiredPlugins)):
+                    requiredPlugins.append(requiredPlugin)
+        return requiredPlugins
+
+    def __getReadyPlugins(self, pendingPlugins, finishedPlugins):
+        """
+        Returns the list of pending plugins whose required plugins have
+        all finished. The plugins are in the same order as the pending
+        plugins.
+
+        @return: Returns the list of pending plugins that can be started.
+        @rtype: Array
+
+        @param pendingPlugins: The list of plugins that have not been
+        started.
+        @type pendingPlugins: Array
+        @param finishedPlugins: The list of plugins that have finished.
+        @type finishedPlugins: Array
+        """
+        readyPlugins = []
+        for plugin in pendingPlugins:
+            isReady = True
+            for requiredPlugin in self.__requiredPluginsMap.get(plugin):
+                if (not requiredPlugin in finishedPlugins):
+                    isReady = False
+                    break
+            if (isReady):
+                readyPlugins.append(plugin)
+        return readyPlugins
+
+    def __runPlugin(self, plugin, listOfReports, finishedQueue, threadLogBuffer):
+        """
+        Runs the plugin in a worker thread and puts a tuple of the plugin,
+        the log records held for the plugin and the exception
+        information(None if no exception was raised) on the queue when
+        the plugin has finished.
+        """
+        threadLogBuffer.startBuffering()
+        excInfo = None
+        try:
+            try:
+                plugin.run(listOfReports)
+            except:
+                excInfo = sys.exc_info()
+        finally:
+            finishedQueue.put((plugin, threadLogBuffer.stopBuffering(), excInfo))
+
+    def run(self, listOfReports):
+        """
+        Runs all the plugins on the reports. If a plugin raises an
+        exception then no more plugins are started and the exception is
+        raised again once the plugins that are running have finished.
+
+        @param listOfReports: The list of reports.
+        @type listOfReports: Array
+        """
+        pendingPlugins = list(self.__listOfPlugins)
+        finishedPlugins = []
+        if (self.__workerCount == 1):
+            # No reason to create threads when only 1 worker.
+            while (len(pendingPlugins) > 0):
+                readyPlugins = self.__getReadyPlugins(pendingPlugins, finishedPlugins)
+                if (not len(readyPlugins) > 0):
+                    readyPlugins = [self.__breakCycle(pendingPlugins)]
+                pendingPlugins.remove(readyPlugins[0])
+                readyPlugins[0].run(listOfReports)
+                finishedPlugins.append(readyPlugins[0])
+            return
+        message = "The plugins will be ran with %d workers." %(self.__workerCount)
+        logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+        threadLogBuffer = ThreadLogBuffer.getThreadLogBuffer(sx.MAIN_LOGGER_NAME)
+        finishedQueue = Queue.Queue()
+        runningPlugins = []
+        errors = []
+        while ((len(runningPlugins) > 0) or ((len(pendingPlugins) > 0) and (not len(errors) > 0))):
+            if (not len(errors) > 0):
+                readyPlugins = self.__getReadyPlugins(pendingPlugins, finishedPlugins)
+                if ((not len(readyPlugins) > 0) and (not len(runningPlugins) > 0)):
+                    readyPlugins = [self.__breakCycle(pendingPlugins)]
+                for plugin in readyPlugins[:self.__workerCount - len(runningPlugins)]:
+                    pendingPlugins.remove(plugin)
+                    runningPlugins.append(plugin)
+                    worker = threading.Thread(target=self.__runPlugin, args=(plugin, listOfReports, finishedQueue, threadLogBuffer))
+                    worker.setDaemon(True)
+                    worker.start()
+            # A timeout is used on get so that a control-c is not blocked
+            # while waiting on the plugins.
+            try:
+                (plugin, listOfLogRecords, excInfo) = finishedQueue.get(True, 1)
+            except Queue.Empty:
+                continue
+            # Write all the messages of the plugin now that it has
+            # finished.
+            threadLogBuffer.handle(listOfLogRecords)
+            runningPlugins.remove(plugin)
+            finishedPlugins.append(plugin)
+            if (not excInfo == None):
+                errors.append(excInfo)
+        if (len(errors) > 0):
+            (excType, excValue, excTraceback) = errors[0]
+            raise excType, excValue, excTraceback
+
+    def __breakCycle(self, pendingPlugins):
+        """
+        Returns the first pending plugin when none of the pending plugins
+        can be started because the plugins depend on each other.
+
+        @return: Returns the first pending plugin.
+        @rtype: PluginBase
+
+        @param pendingPlugins: The list of plugins that have not been
+        started.
+        @type pendingPlugins: Array
+        """
+        plugin = pendingPlugins[0]
+        message = "The plugin %s is part of a cycle of plugins that depend on each other and will be ran now." %(plugin.getName())
+        logging.getLogger(sx.MAIN_LOGGER_NAME).warning(message)
+        return plugin
 
 class PluginBase:
     """
@@ -146,7 +380,12 @@ class PluginBase:
                  enabled,
                  requireReports,
                  options,
-                 pathToPluginReportDir="") :
+                 pathToPluginReportDir="",
+                 requiredPaths=None,
+                 reportsParallel=False,
+                 consumes=None,
+                 produces=None,
+                 dependencies=None) :
         """
         This is the default initialized function for a plugin. The
         options dictionary will contain keys and values. The keys is
@@ -176,6 +415,23 @@ class PluginBase:
         @param pathToPluginReportDir: Path to location where the reports
         will be written.
         @type pathToPluginReportDir: String
+        @param requiredPaths: A list of paths(wildcards are allowed) in
+        the reports that the plugin reads. If None then the plugin
+        requires the whole report.
+        @type requiredPaths: Array
+        @param reportsParallel: If True then the plugin processes the
+        reports at the same time when the function mapReports() is used.
+        @type reportsParallel: Boolean
+        @param consumes: A list of the names of the artifacts(see
+        ReportArtifacts) that the plugin uses. The plugin is not started
+        until the plugins that produce the artifacts have finished.
+        @type consumes: Array
+        @param produces: A list of the names of the artifacts that the
+        plugin generates for the reports.
+        @type produces: Array
+        @param dependencies: A list of the names of the plugins that
+        have to finish before the plugin is started.
+        @type dependencies: Array
         """
         self.__name = name
         self.__description = description
@@ -214,6 +470,30 @@ class PluginBase:
 
         self.__analysisReports = []
 
+        # The paths in the reports that the plugin reads.
+        self.__requiredPaths = requiredPaths
+
+        # The number of reports that can be processed at the same time if
+        # the plugin supports it.
+        self.__reportsParallel = reportsParallel
+        self.__workerCount = 1
+
+        # The artifacts that are used and generated by the plugin and the
+        # plugins that have to finish before this plugin is started.
+        self.__consumes = consumes
+        if (self.__consumes == None):
+            self.__consumes = []
+        self.__produces = produces
+        if (self.__produces == None):
+            self.__produces = []
+        self.__dependencies = dependencies
+        if (self.__dependencies == None):
+            self.__dependencies = []
+
+        # The reports that changed since the plugin last ran, if None then
+        # all the reports have changed.
+        self.__listOfChangedReports = None
+
     def __str__(self) :
         """
         Returns a string that is composed of the name and description.
@@ -276,6 +556,165 @@ class PluginBase:
         """
         return self.__pathToPluginReportDir
 
+    def getRequiredPaths(self) :
+        """
+        Returns a list of paths(wildcards are allowed) in the reports
+        that the plugin reads. None is returned if the plugin requires
+        the whole report.
+
+        @return: Returns a list of paths in the reports that the plugin
+        reads.
+        @rtype: Array
+        """
+        return self.__requiredPaths
+
+    def getConsumes(self) :
+        """
+        Returns the list of the names of the artifacts that the plugin
+        uses.
+
+        @return: Returns the list of the names of the artifacts that the
+        plugin uses.
+        @rtype: Array
+        """
+        return self.__consumes
+
+    def getProduces(self) :
+        """
+        Returns the list of the names of the artifacts that the plugin
+        generates.
+
+        @return: Returns the list of the names of the artifacts that the
+        plugin generates.
+        @rtype: Array
+        """
+        return self.__produces
+
+    def getDependencies(self) :
+        """
+        Returns the list of the names of the plugins that have to finish
+        before the plugin is started.
+
+        @return: Returns the list of the names of the plugins that have
+        to finish before the plugin is started.
+        @rtype: Array
+        """
+        return self.__dependencies
+
+    def isReportsParallel(self) :
+        """
+        Returns True if the plugin processes the reports at the same time
+        when the function mapReports() is used.
+
+        @return: Returns True if the plugin processes the reports at the
+        same time.
+        @rtype: Boolean
+        """
+        return self.__reportsParallel
+
+    def getWorkerCount(self) :
+        """
+        Returns the maximum number of reports that are processed at the
+        same time by mapReports().
+
+        @return: Returns the maximum number of reports that are
+        processed at the same time.
+        @rtype: Int
+        """
+        if (not self.isReportsParallel()):
+            return 1
+        return self.__workerCount
+
+    def setWorkerCount(self, workerCount) :
+        """
+        Sets the maximum number of reports that are processed at the same
+        time by mapReports() if the plugin processes the reports at the
+        same time.
+
+        @param workerCount: The maximum number of reports that are
+        processed at the same time.
+        @type workerCount: Int
+        """
+        self.__workerCount = workerCount
+
+    def mapReports(self, function, reports) :
+        """
+        Returns a list of the results of calling the function on each
+        report, the results are in the same order as the reports. If the
+        plugin processes the reports at the same time then more than 1
+        report is processed at the same time and the messages that are
+        logged are written in the same order as the reports.
+
+        The function should only use the report it is given and should
+        not change any data of the plugin.
+
+        @return: Returns a list of the results of calling the function
+        on each report.
+        @rtype: Array
+
+        @param function: The function that is called with each report.
+        @type function: Function
+        @param reports: This is the list of Report Objects.
+        @type reports: Array
+        """
+        return WorkerPool(self.getWorkerCount(), sx.MAIN_LOGGER_NAME).map(function, reports)
+
+    def setChangedReports(self, listOfChangedReports) :
+        """
+        Sets the list of reports that were added or changed since the
+        plugin last ran on the reports. If None then all the reports
+        have changed, which is the default.
+
+        A plugin that writes files for each report(or group of reports)
+        can use isReportChanged() to only regenerate the files for the
+        changed reports and keep the files that were written before for
+        the other reports(see clean()).
+
+        @param listOfChangedReports: The list of reports that were added
+        or changed.
+        @type listOfChangedReports: Array
+        """
+        self.__listOfChangedReports = listOfChangedReports
+
+    def isIncremental(self) :
+        """
+        Returns True if only some of the reports have changed since the
+        plugin last ran.
+
+        @return: Returns True if only some of the reports have changed.
+        @rtype: Boolean
+        """
+        return (not self.__listOfChangedReports == None)
+
+    def isReportChanged(self, report) :
+        """
+        Returns True if the report was added or changed since the plugin
+        last ran.
+
+        @return: Returns True if the report was added or changed.
+        @rtype: Boolean
+
+        @param report: The report that will be checked.
+        @type report: Report
+        """
+        return ((self.__listOfChangedReports == None) or (report in self.__listOfChangedReports))
+
+    def hasChangedReports(self, reports) :
+        """
+        Returns True if any of the reports that are a valid report type
+        for the plugin have changed.
+
+        @return: Returns True if any of the valid reports have changed.
+        @rtype: Boolean
+
+        @param reports: This is the list of Report Objects.
+        @type reports: Array
+        """
+        for report in reports:
+            if ((self.isValidReportType(report)) and (self.isReportChanged(report))):
+                return True
+        return False
+
     def getReportTypes(self) :
         """
         Returns an array of valid report types.
@@ -420,13 +859,22 @@ class PluginBase:
         listOfFiles.sort()
         return listOfFiles
 
-    def clean(self):
+    def clean(self, listOfFilenames=None):
         """
         This command will remove all the files that are in the plugins
         report directory where all the files for this plugin are
         written.
+
+        @param listOfFilenames: If not None then only the files with
+        these filenames(relative to the plugin report directory) are
+        removed.
+        @type listOfFilenames: Array
         """
         listOfFiles = self.getFileList()
+        if (not listOfFilenames == None):
+            listOfFiles = []
+            for filename in listOfFilenames:
+                listOfFiles.append(os.path.join(self.getPathToPluginReportDir(), filename))
         for pathToFile in listOfFiles:
             if (os.path.isfile(pathToFile)) :
                 try:
@@ -583,6 +1031,20 @@ class PluginBase:
     # #######################################################################
     # Functions that should be overwritten in the plugin
     # #######################################################################
+    def run(self, reports) :
+        """
+        This function is called when the plugin is started and by
+        default will call setup(), execute() and then report(). The
+        child can override this function instead of the other functions
+        if it does not need them.
+
+        @param reports: This is the list of Report Objects.
+        @type reports: Array
+        """
+        self.setup(reports)
+        self.execute()
+        self.report()
+
     def setup(self, reports) :
         """
         This function should be overridden by the child. The child
@@ -159,22 +159,14 @@ class Checksysreport(sx.plugins.PluginBase):
         """
         message = "Running setup for plugin: %s" %(self.getName())
         logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
-        pathToInstalledRPMSList = ["sos_commands/rpm/rpm_-qa_--qf_NAME_-_VERSION_-_RELEASE_-_ARCH_INSTALLTIME_date_.b",
-                                   "sos_commands/rpm/rpm_-qa_--qf_NAME_-_VERSION_-_RELEASE_._ARCH_INSTALLTIME_date_.b",
-                                   "sos_commands/rpm/rpm_-qa_--qf_NAME_-_VERSION_-_RELEASE_-_ARCH" ,
-                                   "installed-rpms"]
-
         for report in reports:
             if (self.isValidReportType(report)) :
                 (head, tail) = os.path.split(report.getPathToExtractedReport())
                 self.__chksysData[report.getPathToExtractedReport()] =  ""
                 # Find the installed rpm file that is required.
-                for path in pathToInstalledRPMSList:
-                    currentPath = report.getPathForFile(path)
-                    if (len(currentPath) > 0):
-                        self.__installedRPMSPath[report.getPathToExtractedReport()] =  currentPath
-                        # Break since path was found.
-                        break;
+                currentPath = report.getPathForFile(report.resolveFileAlias("installed_rpms"))
+                if (len(currentPath) > 0):
+                    self.__installedRPMSPath[report.getPathToExtractedReport()] =  currentPath
     def execute(self) :
         """
         This function will run checksysreport on all the
@@ -33,6 +33,7 @@ from sx.plugins.lib.clusterha.clusterevaluator import ClusterEvaluator
 from sx.plugins.lib.clusterha.clusterhastretchevaluator import ClusterHAStretchEvaluator
 from sx.plugins.lib.clusterha.clusternodecompare import ClusternodeCompare
 from sx.plugins.lib.clusterha.clusterhastorage import ClusterHAStorage
+from sx.plugins.lib.general.reportartifacts import ReportArtifacts
 
 from sx.reports.sosreport import Sosreport
 from sx.reports.sysreport import Sysreport
@@ -54,7 +55,11 @@ class Clusterha(sx.plugins.PluginBase):
         """
         sx.plugins.PluginBase.__init__(self, "Cluster",
                                        "This plugin will analyze the configuration of the High Availability and Resilient Storage cluster from the information gathered in the sosreports.",
-                                       ["Sosreport", "Sysreport"], True, True, {"isStretchCluster":"If the option is set 1 then the plugin will analyze the reports as a stretch cluster."}, pathToPluginReportDir)
+                                       ["Sosreport", "Sysreport"], True, True, {"isStretchCluster":"If the option is set 1 then the plugin will analyze the reports as a stretch cluster."}, pathToPluginReportDir,
+                                       requiredPaths=ClusterNodes.REQUIRED_PATHS,
+                                       consumes=[ReportArtifacts.DISTRO_RELEASE, ReportArtifacts.NETWORK_MAPS,
+                                                 ReportArtifacts.CHKCONFIG_LIST, ReportArtifacts.UNAME_A,
+                                                 ReportArtifacts.STORAGE_DATA])
 
         # Set the default options for the plugin
         self.setOptionValue("isStretchCluster", "0");
@@ -63,6 +68,9 @@ class Clusterha(sx.plugins.PluginBase):
         self.__clusterMap = {}
         # Map of the clusternodes to StorageData
         self.__storageDataMap = {}
+        # The names of the clusters that have a report that changed since
+        # the plugin last ran.
+        self.__listOfChangedClusterNames = []
     # #######################################################################
     # Functions that should be overwritten in the plugin
     # #######################################################################
@@ -81,17 +89,18 @@ class Clusterha(sx.plugins.PluginBase):
                 # Verify that cluster.conf exists because we need to sort the
                 # reports into the correct bin in case there are multiple
                 # clusters uploaded.
-                pathToClusterConfFile = report.getPathForFile("etc/cluster/cluster.conf")
-                if ((not len(pathToClusterConfFile) > 0) or (not os.path.exists(pathToClusterConfFile))) :
+                cca = ReportArtifacts.getClusterHAConfAnalyzer(report)
+                if (cca == None) :
                     message = "The cluster.conf file could not be located for this report."
                     logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
                     return False
-                cca = ClusterHAConfAnalyzer(pathToClusterConfFile)
                 clusterName = cca.getClusterName()
                 if (len(clusterName) > 0):
                     if (not self.__clusterMap.has_key(clusterName)):
                         self.__clusterMap[clusterName] = ClusterNodes()
                     result = self.__clusterMap.get(clusterName).add(report)
+                    if ((self.isReportChanged(report)) and (not clusterName in self.__listOfChangedClusterNames)):
+                        self.__listOfChangedClusterNames.append(clusterName)
 
     def report(self) :
         """
@@ -109,10 +118,21 @@ class Clusterha(sx.plugins.PluginBase):
 
             # Since we are going to run the plugin and create files in
             # the plugins report directory then we will first remove
-            # all the existing files.
-            self.clean()
-
+            # all the existing files. If only some of the reports changed
+            # then only the files for the clusters with a changed report
+            # are removed and written again.
+            if (not self.isIncremental()):
+                self.clean()
             for clusterName in self.__clusterMap.keys():
+                if (self.isIncremental()):
+                    if (not clusterName in self.__listOfChangedClusterNames):
+                        message = "The report for the cluster %s will not be written again since none of its reports have changed." %(clusterName)
+                        logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                        continue
+                    listOfFilenames = []
+                    for suffix in ["summary", "evaluator", "stretch_evaluator", "clusternode_compare"]:
+                        listOfFilenames.append("%s-%s.txt" %(clusterName, suffix))
+                    self.clean(listOfFilenames)
                 message = "Analyzing and writing the report for the cluster: %s" %(clusterName)
                 logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
                 cnc = self.__clusterMap.get(clusterName)
@@ -29,13 +29,16 @@ from sx.reports.sosreport import Sosreport
 
 from sx.plugins.lib.gluster.glusterpeernodes import GlusterPeerNodes
 from sx.plugins.lib.gluster.glusterpeernode import GlusterPeerNode
+from sx.plugins.lib.general.reportartifacts import ReportArtifacts
 
 class Gluster(sx.plugins.PluginBase):
     def __init__(self, pathToPluginReportDir="") :
         sx.plugins.PluginBase.__init__(self, "Gluster",
                                        "This plugin will analyze sosreports that are using gluster.",
                                        ["Sosreport"], True, True, {},
-                                       pathToPluginReportDir)
+                                       pathToPluginReportDir, requiredPaths=GlusterPeerNodes.REQUIRED_PATHS,
+                                       consumes=[ReportArtifacts.DISTRO_RELEASE, ReportArtifacts.NETWORK_MAPS,
+                                                 ReportArtifacts.CHKCONFIG_LIST])
 
         self.__glusterPeerNodes = GlusterPeerNodes()
 
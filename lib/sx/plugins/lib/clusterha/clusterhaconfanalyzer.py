@@ -17,7 +17,7 @@ from xml.etree.ElementTree import ElementTree
 from xml.etree.ElementTree import Element
 
 import sx
-from sx.tools import FileUtil
+from sx.tools import FileDigestTable
 from sx.tools import StringUtil
 from sx.plugins.lib.storage.filesysparser import FilesysMount
 
@@ -749,9 +749,22 @@ class ClusterHAConfAnalyzer :
             return False
 
     def isClusterConfFilesIdentical(self, listOfFiles) :
+        """
+        Returns True if all the cluster.conf files are identical. The
+        whitespace at the end of the files is ignored. The digests of the
+        files are shared in the process, so comparing the same files
+        again does not read the files again(see FileDigestTable).
+
+        @return: Returns True if all the cluster.conf files are
+        identical.
+        @rtype: Boolean
+
+        @param listOfFiles: The list of paths to the cluster.conf files.
+        @type listOfFiles: Array
+        """
         if (not len(listOfFiles) > 1):
             return False
-        return  FileUtil.isFilesIdentical(listOfFiles)
+        return FileDigestTable.getFileDigestTable().isFilesIdentical(listOfFiles, FileDigestTable.IGNORE_TRAILING_WHITESPACE)
 
     def isQDiskEnabledWithHeurtistics(self):
         """
@@ -21,16 +21,11 @@ from sx.plugins.lib.clusterha.clusternode import ClusterNodeNetworkMap
 from sx.plugins.lib.clusterha.clusternode import ClusterStorageFilesystem
 from sx.plugins.lib.clusterha.clustercommandsparser import ClusterCommandsParser
 
-from sx.plugins.lib.networking.networkdeviceparser import NetworkDeviceParser
 from sx.plugins.lib.networking.networkdeviceparser import NetworkMap
 from sx.plugins.lib.networking.networkdeviceparser import NetworkMaps
-from sx.plugins.lib.general.distroreleaseparser import DistroReleaseParser
 from sx.plugins.lib.general.distroreleaseparser import DistroRelease
-from sx.plugins.lib.general.runlevelserviceparser import RunLevelParser
 from sx.plugins.lib.general.runlevelserviceparser import ChkConfigServiceStatus
 from sx.plugins.lib.general.dmidecodeparser import DmiDecodeParser
-from sx.plugins.lib.kernel.modulesparser import ModulesParser
-from sx.plugins.lib.kernel import KernelParser
 
 from sx.plugins.lib.storage.filesysparser import FilesysParser
 from sx.plugins.lib.storage.filesysparser import FilesysMount
@@ -39,8 +34,22 @@ from sx.plugins.lib.storage.procparser import ProcFilesystems
 
 from sx.plugins.lib.storage import StorageData
 from sx.plugins.lib.storage import StorageDataGenerator
+from sx.plugins.lib.general.reportartifacts import ReportArtifacts
 
 class ClusterNodes:
+    """
+    @cvar REQUIRED_PATHS: The paths in a report that are read when a
+    report is added.
+    @type REQUIRED_PATHS: Array
+    """
+    REQUIRED_PATHS = ["etc/cluster/cluster.conf", "etc/redhat-release", "sos_commands/cluster/*",
+                      "sos_commands/networking/*", "ifconfig", "etc/hosts", "etc/modprobe.conf",
+                      "etc/sysconfig/network-scripts/*", "proc/net/*", "chkconfig",
+                      "sos_commands/startup/chkconfig_--list", "proc/filesystems", "mount",
+                      "sos_commands/filesys/mount_-l", "etc/fstab", "etc/exports", "etc/samba/smb.conf",
+                      "etc/cluster/samba/*", "uname", "sos_commands/kernel/uname_-a",
+                      "dmidecode"] + StorageDataGenerator.REQUIRED_PATHS
+
     def __init__(self) :
         """
         This function will init a single private variable for list of
@@ -377,8 +386,8 @@ class ClusterNodes:
             logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
             return False
         # cca will verify that cluster.conf is valid xml
-        cca = ClusterHAConfAnalyzer(pathToClusterConfFile)
-        distroRelease = DistroReleaseParser.parseEtcRedHatReleaseRedhatReleaseData(report.getDataFromFile("etc/redhat-release"))
+        cca = ReportArtifacts.getClusterHAConfAnalyzer(report)
+        distroRelease = ReportArtifacts.getDistroRelease(report)
         # ###############################################################
         # If distro release is not supported or cluster.conf
         # does not validate to be true then the node will not
@@ -404,43 +413,8 @@ class ClusterNodes:
         # name can be found then add the node to the list of cluster nodes.
         # ###############################################################
         clusterCommandsMap = report.getDataFromDir("sos_commands/cluster")
-        # Create the network maps
-        ifconfigData = report.getDataFromFile("sos_commands/networking/ifconfig_-a")
-        if (ifconfigData == None):
-            ifconfigData = report.getDataFromFile("ifconfig")
-        networkInterfaces = NetworkDeviceParser.parseIfconfigData(ifconfigData)
-
-        # ###############################################################
-        # Get more network interfaces might need to add this at some point for
-        # cases where ifconfig fails. Not sure how to combine the data yet
-        # ###############################################################
-        if (not len(networkInterfaces) > 0):
-            ip_addressData = report.getDataFromFile("sos_commands/networking/ip_address")
-            networkInterfaces = NetworkDeviceParser.parseIPAddressData(ip_addressData)
-        # ###############################################################
-
-        etcHostsMap = NetworkDeviceParser.parseEtcHostsData(report.getDataFromFile("etc/hosts"))
-        modprobeConfCommands = ModulesParser.parseEtcModprobeConf(report.getDataFromFile("etc/modprobe.conf"))
-        # Appears this is not collect on rhel6, so collecting all the
-        # files will not work. Need to ask sosreport why that is?
-        # modprobeConfdList = report.getDataFromDir("etc/modprobe.conf.d")
-
-        # Read in all the /etc/sysconfig/network-scripts/ifcfg* files
-        # that have known interface.
-        networkScriptsDataMap = {}
-        for networkInterface in networkInterfaces:
-            networkScriptData = report.getDataFromFile("etc/sysconfig/network-scripts/ifcfg-%s" %(networkInterface.getInterface()))
-            if (networkScriptData == None):
-                networkScriptData = None
-            networkScriptsDataMap[networkInterface.getInterface()] = networkScriptData
-        # Get all the data from proc/net including the bonding data.
-        procNetMap = report.getDataFromDir("proc/net")
-        bondingMap = report.getDataFromDir("proc/net/bonding")
-        procNetMap = dict(procNetMap.items() + bondingMap.items())
-        # Get all the data in the sos_commands/networking directory.
-        networkingCommandsMap = report.getDataFromDir("sos_commands/networking")
-        # Build networkmaps from all the network related information.
-        networkMaps = NetworkMaps(networkInterfaces, etcHostsMap, networkScriptsDataMap, modprobeConfCommands, procNetMap, networkingCommandsMap)
+        # Get the network maps that are shared with the other plugins.
+        networkMaps = ReportArtifacts.getNetworkMaps(report)
         # ###############################################################
         #clusternodeName = ""
         #etcSysConfigCluster = report.getDataFromFile("etc/sysconfig/cluster")
@@ -459,31 +433,29 @@ class ClusterNodes:
             logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
             return False
 
+        # The files that are parsed for the node are read at the same
+        # time.
+        filesDataMap = report.getDataFromFiles(["proc/filesystems", "mount_list",
+                                                "etc/fstab", "etc/exports", "etc/samba/smb.conf"])
         # ###############################################################
         # Check the services
         # ###############################################################
-        chkConfigData = report.getDataFromFile("chkconfig")
-        if (chkConfigData == None):
-            chkConfigData = report.getDataFromFile("sos_commands/startup/chkconfig_--list")
-        chkConfigList = RunLevelParser.parseChkConfigData(chkConfigData)
+        chkConfigList = ReportArtifacts.getChkConfigList(report)
 
         # ###############################################################
         # Find any GFS1/GFS2 filesystems
         # ###############################################################
         fsTypes = []
-        for procFilesystem in ProcParser.parseProcFilesystemsData(report.getDataFromFile("proc/filesystems")):
+        for procFilesystem in ProcParser.parseProcFilesystemsData(filesDataMap.get("proc/filesystems")):
             fsTypes.append(procFilesystem.getFSType())
 
-        mountData = report.getDataFromFile("mount")
-        if (mountData == None):
-            mountData = report.getDataFromFile("sos_commands/filesys/mount_-l")
-        filesysMountsList = FilesysParser.parseFilesysMountData(mountData, fsTypes)
-        etcFstabList = FilesysParser.parseEtcFstabData(report.getDataFromFile("etc/fstab"))
+        filesysMountsList = FilesysParser.parseFilesysMountData(filesDataMap.get("mount_list"), fsTypes)
+        etcFstabList = FilesysParser.parseEtcFstabData(filesDataMap.get("etc/fstab"))
         # ###############################################################
         # Get Storage Related Configuration Files
         # ###############################################################
-        etcExportsList = FilesysParser.parseEtcExportsbData(report.getDataFromFile("etc/exports"))
-        etcSambaSectionsList = FilesysParser.parseEtcSambaSmbConfData(report.getDataFromFile("etc/samba/smb.conf"))
+        etcExportsList = FilesysParser.parseEtcExportsbData(filesDataMap.get("etc/exports"))
+        etcSambaSectionsList = FilesysParser.parseEtcSambaSmbConfData(filesDataMap.get("etc/samba/smb.conf"))
         etcClusterSambaDataMap = report.getDataFromDir("etc/cluster/samba/*")
         etcClusterSambaSectionsListMap = {}
         for key in etcClusterSambaDataMap.keys():
@@ -495,13 +467,18 @@ class ClusterNodes:
                                                                               etcClusterSambaSectionsListMap)
 
 
-        unameAData = report.getDataFromFile("uname")
-        if (unameAData == None):
-            unameAData = report.getDataFromFile("sos_commands/kernel/uname_-a")
-        unameA = KernelParser.parseUnameAData(unameAData)
+        unameA = ReportArtifacts.getUnameA(report)
 
         # Maybe I should return a map of stanza or dmidecode object just maps them. Need to code for NODE.
-        dmidecodeStanzas = DmiDecodeParser.parseDmiDecodeData(report.getDataFromFile("dmidecode"))
+        # Only the "System Information" stanzas(DMI type 1) are used, so
+        # only those stanzas are read from the dmidecode file.
+        dmidecodeStanzas = []
+        dmidecodeFileView = report.getFileView("dmidecode")
+        if (not dmidecodeFileView == None):
+            try:
+                dmidecodeStanzas = DmiDecodeParser.parseDmiDecodeFileView(dmidecodeFileView, [1])
+            finally:
+                dmidecodeFileView.close()
 
         # ###############################################################
         # Create the node since it is valid then append to collection
@@ -516,7 +493,7 @@ class ClusterNodes:
                                   heartbeatNetworkMap,
                                   chkConfigList,
                                   clusterCommandsMap,
-                                  report.getInstalledRPMSData(),
+                                  ReportArtifacts.getInstalledRPMSData(report),
                                   clusterStorageFilesystemList,
                                   dmidecodeStanzas)
         # ###############################################################
@@ -525,7 +502,7 @@ class ClusterNodes:
         # ###############################################################
         self.__clusterNodes.append(clusterNode)
         self.__clusterNodes.sort(key=lambda c: int(c.getClusterNodeProperties().getNodeID()))
-        storageData = StorageDataGenerator().generate(report)
+        storageData = ReportArtifacts.getStorageData(report)
         if (not storageData == None):
             self.__clusternodesStorageDataMap[clusterNode.getClusterNodeName()] = storageData
 
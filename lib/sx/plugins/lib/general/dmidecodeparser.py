@@ -26,6 +26,25 @@ class DmiDecodeParser:
         return stanzas
     parseDmiDecodeData = staticmethod(parseDmiDecodeData)
 
+    def parseDmiDecodeFileView(fileView, listOfTypes=None):
+        # The handles are found in the mapped file and only the lines of
+        # the stanzas with one of the types are copied.
+        stanzas = []
+        if (fileView == None):
+            return stanzas
+        listOfOffsets = []
+        for match in fileView.finditer("^Handle [^\n]*DMI type (\d+)"):
+            if ((listOfTypes == None) or (int(match.group(1)) in listOfTypes)):
+                listOfOffsets.append(match.start())
+        for offset in listOfOffsets:
+            # The stanza ends at the next handle or the end of the file.
+            end = fileView.find("\nHandle ", offset)
+            if (end >= 0):
+                end += 1
+            stanzas += DmiDecodeParser.parseDmiDecodeData(fileView.getLines(offset, end))
+        return stanzas
+    parseDmiDecodeFileView = staticmethod(parseDmiDecodeFileView)
+
 class DMIDecodeStanzaAttribute:
     def __init__(self, name, value):
         self.__name = name
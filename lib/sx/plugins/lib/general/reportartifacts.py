@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""
+This is a collection of functions that return the objects that are
+parsed from the data in a report and shared by all the plugins. Each
+object is only generated once for each report(see
+Report.getArtifact()), so the objects should not be changed.
+
+@author    :  Shane Bradley
+@contact   :  sbradley@redhat.com
+@version   :  2.17
+@copyright :  GPLv2
+"""
+import os.path
+
+from sx.plugins.lib.general.distroreleaseparser import DistroReleaseParser
+from sx.plugins.lib.general.runlevelserviceparser import RunLevelParser
+from sx.plugins.lib.kernel import KernelParser
+from sx.plugins.lib.kernel.modulesparser import ModulesParser
+from sx.plugins.lib.networking.networkdeviceparser import NetworkDeviceParser
+from sx.plugins.lib.networking.networkdeviceparser import NetworkMaps
+from sx.plugins.lib.storage import StorageDataGenerator
+from sx.plugins.lib.clusterha.clusterhaconfanalyzer import ClusterHAConfAnalyzer
+
+class ReportArtifacts:
+    """
+    @cvar DISTRO_RELEASE: The name of the DistroRelease artifact.
+    @type DISTRO_RELEASE: String
+    @cvar UNAME_A: The name of the UnameA artifact.
+    @type UNAME_A: String
+    @cvar CHKCONFIG_LIST: The name of the ChkConfigServiceStatus list
+    artifact.
+    @type CHKCONFIG_LIST: String
+    @cvar NETWORK_MAPS: The name of the NetworkMaps artifact.
+    @type NETWORK_MAPS: String
+    @cvar STORAGE_DATA: The name of the StorageData artifact.
+    @type STORAGE_DATA: String
+    @cvar INSTALLED_RPMS_DATA: The name of the installed rpms data
+    artifact.
+    @type INSTALLED_RPMS_DATA: String
+    @cvar CLUSTER_HA_CONF_ANALYZER: The name of the
+    ClusterHAConfAnalyzer artifact.
+    @type CLUSTER_HA_CONF_ANALYZER: String
+    """
+    DISTRO_RELEASE = "DistroRelease"
+    UNAME_A = "UnameA"
+    CHKCONFIG_LIST = "ChkConfigList"
+    NETWORK_MAPS = "NetworkMaps"
+    STORAGE_DATA = "StorageData"
+    INSTALLED_RPMS_DATA = "InstalledRPMSData"
+    CLUSTER_HA_CONF_ANALYZER = "ClusterHAConfAnalyzer"
+
+    # #######################################################################
+    # Functions that return the shared objects
+    # #######################################################################
+    def getDistroRelease(report):
+        """
+        Returns the DistroRelease for the report. None is returned if
+        the release file is not valid or unknown type.
+
+        @return: Returns the DistroRelease for the report.
+        @rtype: DistroRelease
+
+        @param report: The report that the object is generated from.
+        @type report: Report
+        """
+        return report.getArtifact(ReportArtifacts.DISTRO_RELEASE, ReportArtifacts.__generateDistroRelease)
+    getDistroRelease = staticmethod(getDistroRelease)
+
+    def getUnameA(report):
+        """
+        Returns the UnameA for the report.
+
+        @return: Returns the UnameA for the report.
+        @rtype: UnameA
+
+        @param report: The report that the object is generated from.
+        @type report: Report
+        """
+        return report.getArtifact(ReportArtifacts.UNAME_A, ReportArtifacts.__generateUnameA)
+    getUnameA = staticmethod(getUnameA)
+
+    def getChkConfigList(report):
+        """
+        Returns the list of ChkConfigServiceStatus for the services in
+        the report.
+
+        @return: Returns the list of ChkConfigServiceStatus for the
+        services in the report.
+        @rtype: Array
+
+        @param report: The report that the object is generated from.
+        @type report: Report
+        """
+        return report.getArtifact(ReportArtifacts.CHKCONFIG_LIST, ReportArtifacts.__generateChkConfigList)
+    getChkConfigList = staticmethod(getChkConfigList)
+
+    def getNetworkMaps(report):
+        """
+        Returns the NetworkMaps that is built from all the network
+        related information in the report.
+
+        @return: Returns the NetworkMaps for the report.
+        @rtype: NetworkMaps
+
+        @param report: The report that the object is generated from.
+        @type report: Report
+        """
+        return report.getArtifact(ReportArtifacts.NETWORK_MAPS, ReportArtifacts.__generateNetworkMaps)
+    getNetworkMaps = staticmethod(getNetworkMaps)
+
+    def getStorageData(report):
+        """
+        Returns the StorageData for the report.
+
+        @return: Returns the StorageData for the report.
+        @rtype: StorageData
+
+        @param report: The report that the object is generated from.
+        @type report: Report
+        """
+        return report.getArtifact(ReportArtifacts.STORAGE_DATA, ReportArtifacts.__generateStorageData)
+    getStorageData = staticmethod(getStorageData)
+
+    def getInstalledRPMSData(report):
+        """
+        Returns the data from the file that contains the list of
+        installed rpms.
+
+        @return: Returns the data from the file that contains the list
+        of installed rpms.
+        @rtype: Array
+
+        @param report: The report that the object is generated from.
+        @type report: Report
+        """
+        return report.getArtifact(ReportArtifacts.INSTALLED_RPMS_DATA, ReportArtifacts.__generateInstalledRPMSData)
+    getInstalledRPMSData = staticmethod(getInstalledRPMSData)
+
+    def getClusterHAConfAnalyzer(report):
+        """
+        Returns the ClusterHAConfAnalyzer for the cluster.conf file in
+        the report. None is returned if there is no cluster.conf file.
+
+        @return: Returns the ClusterHAConfAnalyzer for the cluster.conf
+        file in the report.
+        @rtype: ClusterHAConfAnalyzer
+
+        @param report: The report that the object is generated from.
+        @type report: Report
+        """
+        return report.getArtifact(ReportArtifacts.CLUSTER_HA_CONF_ANALYZER, ReportArtifacts.__generateClusterHAConfAnalyzer)
+    getClusterHAConfAnalyzer = staticmethod(getClusterHAConfAnalyzer)
+
+    # #######################################################################
+    # Functions that generate the shared objects
+    # #######################################################################
+    def __generateDistroRelease(report):
+        return DistroReleaseParser.parseEtcRedHatReleaseRedhatReleaseData(report.getDataFromFile("etc/redhat-release"))
+    __generateDistroRelease = staticmethod(__generateDistroRelease)
+
+    def __generateUnameA(report):
+        unameAData = report.getDataFromFileAlias("uname_a")
+        return KernelParser.parseUnameAData(unameAData)
+    __generateUnameA = staticmethod(__generateUnameA)
+
+    def __generateChkConfigList(report):
+        chkConfigData = report.getDataFromFileAlias("chkconfig_list")
+        return RunLevelParser.parseChkConfigData(chkConfigData)
+    __generateChkConfigList = staticmethod(__generateChkConfigList)
+
+    def __generateNetworkMaps(report):
+        ifconfigData = report.getDataFromFileAlias("ifconfig_a")
+        networkInterfaces = NetworkDeviceParser.parseIfconfigData(ifconfigData)
+        # Use the ip address data for cases where ifconfig fails.
+        if (not len(networkInterfaces) > 0):
+            ip_addressData = report.getDataFromFile("sos_commands/networking/ip_address")
+            networkInterfaces = NetworkDeviceParser.parseIPAddressData(ip_addressData)
+        etcHostsMap = NetworkDeviceParser.parseEtcHostsData(report.getDataFromFile("etc/hosts"))
+        # Appears this is not collect on rhel6, so collecting all the
+        # files will not work.
+        # modprobeConfdList = report.getDataFromDir("etc/modprobe.conf.d")
+        modprobeConfCommands = ModulesParser.parseEtcModprobeConf(report.getDataFromFile("etc/modprobe.conf"))
+        # Read in all the /etc/sysconfig/network-scripts/ifcfg* files
+        # that have known interface.
+        networkScriptsDataMap = {}
+        for networkInterface in networkInterfaces:
+            networkScriptData = report.getDataFromFile("etc/sysconfig/network-scripts/ifcfg-%s" %(networkInterface.getInterface()))
+            networkScriptsDataMap[networkInterface.getInterface()] = networkScriptData
+        # Get all the data from proc/net including the bonding data.
+        procNetMap = report.getDataFromDir("proc/net")
+        bondingMap = report.getDataFromDir("proc/net/bonding")
+        procNetMap = dict(procNetMap.items() + bondingMap.items())
+        # Get all the data in the sos_commands/networking directory.
+        networkingCommandsMap = report.getDataFromDir("sos_commands/networking")
+        return NetworkMaps(networkInterfaces, etcHostsMap, networkScriptsDataMap, modprobeConfCommands, procNetMap, networkingCommandsMap)
+    __generateNetworkMaps = staticmethod(__generateNetworkMaps)
+
+    def __generateStorageData(report):
+        return StorageDataGenerator().generate(report)
+    __generateStorageData = staticmethod(__generateStorageData)
+
+    def __generateInstalledRPMSData(report):
+        return report.getInstalledRPMSData()
+    __generateInstalledRPMSData = staticmethod(__generateInstalledRPMSData)
+
+    def __generateClusterHAConfAnalyzer(report):
+        pathToClusterConfFile = report.getPathForFile("etc/cluster/cluster.conf")
+        if ((not len(pathToClusterConfFile) > 0) or (not os.path.exists(pathToClusterConfFile))) :
+            return None
+        return ClusterHAConfAnalyzer(pathToClusterConfFile)
+    __generateClusterHAConfAnalyzer = staticmethod(__generateClusterHAConfAnalyzer)
@@ -12,14 +12,10 @@ import sx
 from sx.logwriter import LogWriter
 from sx.tools import ConfigurationFileParser
 from sx.plugins.lib.gluster.glusterpeernode import GlusterPeerNode
-from sx.plugins.lib.networking.networkdeviceparser import NetworkDeviceParser
 from sx.plugins.lib.networking.networkdeviceparser import NetworkMap
 from sx.plugins.lib.networking.networkdeviceparser import NetworkMaps
-from sx.plugins.lib.general.distroreleaseparser import DistroReleaseParser
 from sx.plugins.lib.general.distroreleaseparser import DistroRelease
-from sx.plugins.lib.general.runlevelserviceparser import RunLevelParser
 from sx.plugins.lib.general.runlevelserviceparser import ChkConfigServiceStatus
-from sx.plugins.lib.kernel.modulesparser import ModulesParser
 
 from sx.plugins.lib.storage.filesysparser import FilesysParser
 from sx.plugins.lib.storage.filesysparser import FilesysMount
@@ -27,8 +23,20 @@ from sx.plugins.lib.storage.procparser import ProcParser
 from sx.plugins.lib.storage.procparser import ProcFilesystems
 
 from sx.plugins.lib.general.processparser import ProcessParser
+from sx.plugins.lib.general.reportartifacts import ReportArtifacts
 
 class GlusterPeerNodes:
+    """
+    @cvar REQUIRED_PATHS: The paths in a report that are read when a
+    report is added.
+    @type REQUIRED_PATHS: Array
+    """
+    REQUIRED_PATHS = ["etc/redhat-release", "sos_commands/networking/*", "ifconfig", "etc/hosts",
+                      "etc/modprobe.conf", "etc/sysconfig/network-scripts/*", "proc/net/*", "chkconfig",
+                      "sos_commands/startup/chkconfig_--list", "proc/filesystems", "mount",
+                      "sos_commands/filesys/mount_-l", "etc/fstab", "ps", "sos_commands/process/ps_auxwww",
+                      "var/lib/glusterd/glusterd.info", "var/lib/glusterd/peers/*", "etc/glusterd.info", "etc/peers/*"]
+
     def __init__(self):
         self.__glusterPeerNodes = []
 
@@ -36,7 +44,7 @@ class GlusterPeerNodes:
         return self.__glusterPeerNodes
 
     def add(self, report) :
-        distroRelease = DistroReleaseParser.parseEtcRedHatReleaseRedhatReleaseData(report.getDataFromFile("etc/redhat-release"))
+        distroRelease = ReportArtifacts.getDistroRelease(report)
         # ###############################################################
         # If distro release is not supported or cluster.conf
         # does not validate to be true then the node will not
@@ -51,62 +59,34 @@ class GlusterPeerNodes:
             message = "This distribution release is not supported: %s." %(distroRelease)
             logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
             return False
-        # Create the network maps
-        ifconfigData = report.getDataFromFile("sos_commands/networking/ifconfig_-a")
-        if (ifconfigData == None):
-            ifconfigData = report.getDataFromFile("ifconfig")
-        networkInterfaces = NetworkDeviceParser.parseIfconfigData(ifconfigData)
-
-        etcHostsMap = NetworkDeviceParser.parseEtcHostsData(report.getDataFromFile("etc/hosts"))
-        modprobeConfCommands = ModulesParser.parseEtcModprobeConf(report.getDataFromFile("etc/modprobe.conf"))
-        # Appears this is not collect on rhel6, so collecting all the
-        # files will not work. Need to ask sosreport why that is?
-        # modprobeConfdList = report.getDataFromDir("etc/modprobe.conf.d")
-
-        # Read in all the /etc/sysconfig/network-scripts/ifcfg* files
-        # that have known interface.
-        networkScriptsDataMap = {}
-        for networkInterface in networkInterfaces:
-            networkScriptData = report.getDataFromFile("etc/sysconfig/network-scripts/ifcfg-%s" %(networkInterface.getInterface()))
-            if (networkScriptData == None):
-                networkScriptData = None
-            networkScriptsDataMap[networkInterface.getInterface()] = networkScriptData
-        # Get all the data from proc/net including the bonding data.
-        procNetMap = report.getDataFromDir("proc/net")
-        bondingMap = report.getDataFromDir("proc/net/bonding")
-        procNetMap = dict(procNetMap.items() + bondingMap.items())
-        # Get all the data in the sos_commands/networking directory.
-        networkingCommandsMap = report.getDataFromDir("sos_commands/networking")
-        # Build networkmaps from all the network related information.
-        networkMaps = NetworkMaps(networkInterfaces, etcHostsMap, networkScriptsDataMap, modprobeConfCommands, procNetMap, networkingCommandsMap)
+        # The files that are parsed for the node are read at the same
+        # time.
+        filesDataMap = report.getDataFromFiles(["proc/filesystems", "mount_list", "etc/fstab",
+                                                "var/lib/glusterd/glusterd.info", "etc/glusterd.info"])
+        # Get the network maps that are shared with the other plugins.
+        networkMaps = ReportArtifacts.getNetworkMaps(report)
 
         # ###############################################################
         # Check the services
         # ###############################################################
-        chkConfigData = report.getDataFromFile("chkconfig")
-        if (chkConfigData == None):
-            chkConfigData = report.getDataFromFile("sos_commands/startup/chkconfig_--list")
-        chkConfigList = RunLevelParser.parseChkConfigData(chkConfigData)
+        chkConfigList = ReportArtifacts.getChkConfigList(report)
 
         # ###############################################################
         # Find Filesystems
         # ###############################################################
         fsTypes = []
-        for procFilesystem in ProcParser.parseProcFilesystemsData(report.getDataFromFile("proc/filesystems")):
+        for procFilesystem in ProcParser.parseProcFilesystemsData(filesDataMap.get("proc/filesystems")):
             fsTypes.append(procFilesystem.getFSType())
 
-        mountData = report.getDataFromFile("mount")
-        if (mountData == None):
-            mountData = report.getDataFromFile("sos_commands/filesys/mount_-l")
-        filesysMountsList = FilesysParser.parseFilesysMountData(mountData, fsTypes)
-        etcFstabList = FilesysParser.parseEtcFstabData(report.getDataFromFile("etc/fstab"))
+        filesysMountsList = FilesysParser.parseFilesysMountData(filesDataMap.get("mount_list"), fsTypes)
+        etcFstabList = FilesysParser.parseEtcFstabData(filesDataMap.get("etc/fstab"))
 
         # ###############################################################
         # Get Processes
         # ###############################################################
-        psData = report.getDataFromFile("ps")
-        if (psData == None):
-            psData = report.getDataFromFile("sos_commands/process/ps_auxwww")
+        # The process list is parsed a line at a time, so a large process
+        # list is not read into memory.
+        psData = report.getLineIterator(report.resolveFileAlias("ps_list"))
         psList = ProcessParser.parsePSData(psData)
 
         # ###############################################################
@@ -118,10 +98,10 @@ class GlusterPeerNodes:
         # replaced by /var/lib/glusterd. /etc/glusterd is used in RHSSA-3.2,
         # /var/lib/glusterd in RHS-2.0.
         glusterRootDir = "var/lib/glusterd"
-        glusterdInfoData = report.getDataFromFile("%s/glusterd.info" %(glusterRootDir))
+        glusterdInfoData = filesDataMap.get("%s/glusterd.info" %(glusterRootDir))
         if (glusterdInfoData == None):
             glusterRootDir = "etc"
-            glusterdInfoData = report.getDataFromFile("%s/glusterd.info" %(glusterRootDir))
+            glusterdInfoData = filesDataMap.get("%s/glusterd.info" %(glusterRootDir))
         # If there was no glusterd.info file found then return False.
         if (glusterdInfoData == None):
             return False
@@ -150,7 +130,7 @@ class GlusterPeerNodes:
                                           report.getUptime(),
                                           networkMaps,
                                           chkConfigList,
-                                          report.getInstalledRPMSData(),
+                                          ReportArtifacts.getInstalledRPMSData(report),
                                           filesysMountsList,
                                           etcFstabList,
                                           psList,
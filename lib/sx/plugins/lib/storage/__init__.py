@@ -183,6 +183,15 @@ class StorageData:
         return summary
 
 class StorageDataGenerator:
+    """
+    @cvar REQUIRED_PATHS: The paths in a report that are read to
+    generate the storage data.
+    @type REQUIRED_PATHS: Array
+    """
+    REQUIRED_PATHS = ["etc/redhat-release", "proc/filesystems", "mount", "sos_commands/filesys/mount_-l",
+                      "sos_commands/devicemapper/*", "proc/partitions", "proc/devices", "proc/scsi/scsi",
+                      "etc/lvm/lvm.conf", "sos_commands/kernel/lsmod", "etc/multipath.conf"]
+
     def __init__(self):
         # The max size of the /var/log/messages file that can be
         # parsed in megabytes. If the file is to large then it will
@@ -204,9 +213,7 @@ class StorageDataGenerator:
         fsTypes = []
         for procFilesystem in procFilesystemsList:
             fsTypes.append(procFilesystem.getFSType())
-        mountData = report.getDataFromFile("mount")
-        if (mountData == None):
-            mountData = report.getDataFromFile("sos_commands/filesys/mount_-l")
+        mountData = report.getDataFromFileAlias("mount_list")
         filesysMountsList = FilesysParser.parseFilesysMountData(mountData, fsTypes)
 
         dmCommandsMap = report.getDataFromDir("sos_commands/devicemapper")
@@ -19,12 +19,10 @@ from sx.reports.sosreport import Sosreport
 from sx.reports.sysreport import Sysreport
 from sx.tools import StringUtil
 
-from sx.plugins.lib.general.distroreleaseparser import DistroReleaseParser
+from sx.plugins.lib.general.reportartifacts import ReportArtifacts
 from sx.plugins.lib.general.distroreleaseparser import DistroRelease
-from sx.plugins.lib.networking.networkdeviceparser import NetworkDeviceParser
 from sx.plugins.lib.networking.networkdeviceparser import NetworkMap
 from sx.plugins.lib.networking.networkdeviceparser import NetworkMaps
-from sx.plugins.lib.kernel.modulesparser import ModulesParser
 
 from sx.analysisreport import AnalysisReport
 from sx.analysisreport import ARSection
@@ -125,7 +123,12 @@ class Networking(sx.plugins.PluginBase):
         """
         sx.plugins.PluginBase.__init__(self, "Networking",
                                        "This plugin analyzes the networking data colleted from sosreports/sysreports.",
-                                       ["Sosreport"], True, True, {}, pathToPluginReportDir)
+                                       ["Sosreport"], True, True, {}, pathToPluginReportDir,
+                                       requiredPaths=["etc/redhat-release", "sos_commands/networking/*", "ifconfig", "etc/hosts",
+                                                      "etc/modprobe.conf", "etc/sysconfig/network-scripts/*", "proc/net/*"],
+                                       reportsParallel=True,
+                                       consumes=[ReportArtifacts.DISTRO_RELEASE],
+                                       produces=[ReportArtifacts.NETWORK_MAPS])
 
         # This will contain a list of NetworkingData objects that
         # contains information found in sosreports.
@@ -144,44 +147,27 @@ class Networking(sx.plugins.PluginBase):
         """
         message = "Running setup for plugin: %s" %(self.getName())
         logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
-        for report in reports:
+        def getNetworkingData(report):
             message = "Getting the files for the report for report with  hostname of: %s." %(report.getHostname())
             logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
 
             if (self.isValidReportType(report)) :
-                distroRelease = DistroReleaseParser.parseEtcRedHatReleaseRedhatReleaseData(report.getDataFromFile("etc/redhat-release"))
-                # Create the network maps
-
-                ifconfigData = report.getDataFromFile("sos_commands/networking/ifconfig_-a")
-                if (ifconfigData == None):
-                    ifconfigData = report.getDataFromFile("ifconfig")
-                networkInterfaces = NetworkDeviceParser.parseIfconfigData(ifconfigData)
-                etcHostsMap = NetworkDeviceParser.parseEtcHostsData(report.getDataFromFile("etc/hosts"))
-                # Appears this is not collect on rhel6
-                # modprobeConfdList = report.getDataFromDir("etc/modprobe.conf.d")
-                modprobeConfCommands = ModulesParser.parseEtcModprobeConf(report.getDataFromFile("etc/modprobe.conf"))
-
-                # Build networkmaps from all the network related information.
-                networkScriptsDataMap = {}
-                for networkInterface in networkInterfaces:
-                    networkScriptData = report.getDataFromFile("etc/sysconfig/network-scripts/ifcfg-%s" %(networkInterface.getInterface()))
-                    if (networkScriptData == None):
-                        networkScriptData = None
-                    networkScriptsDataMap[networkInterface.getInterface()] = networkScriptData
-
-                # Get all the data from proc/net including the bonding data.
-                procNetMap = report.getDataFromDir("proc/net")
-                bondingMap = report.getDataFromDir("proc/net/bonding")
-                procNetMap = dict(procNetMap.items() + bondingMap.items())
-
-                # Get all the data in the sos_commands/networking directory.
-                networkingCommandsMap = report.getDataFromDir("sos_commands/networking")
-                networkMaps = NetworkMaps(networkInterfaces, etcHostsMap, networkScriptsDataMap, modprobeConfCommands, procNetMap, networkingCommandsMap)
-                networkingData = NetworkingData(report.getHostname(),
-                                                report.getUptime(),
-                                                distroRelease,
-                                                report.getUname(),
-                                                networkMaps)
+                distroRelease = ReportArtifacts.getDistroRelease(report)
+                # Get the network maps that are shared with the other plugins.
+                networkMaps = ReportArtifacts.getNetworkMaps(report)
+                return NetworkingData(report.getHostname(),
+                                      report.getUptime(),
+                                      distroRelease,
+                                      report.getUname(),
+                                      networkMaps)
+            return None
+        # The reports are processed at the same time and the results are
+        # returned in the same order as the reports.
+        # Only the reports that changed are processed, the files for the
+        # other reports were written the last time the plugin ran.
+        reports = filter(self.isReportChanged, reports)
+        for networkingData in self.mapReports(getNetworkingData, reports):
+            if (not networkingData == None):
                 # Add network data for this report to the list
                 self.__listOfNetworkingData.append(networkingData)
 
@@ -193,11 +179,15 @@ class Networking(sx.plugins.PluginBase):
         logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
 
         stringUtil = StringUtil()
-        if (len(self.__listOfNetworkingData) > 0):
+        if ((len(self.__listOfNetworkingData) > 0) and (not self.isIncremental())):
             # Since we are going to run the plugin and create files in
             # the plugins report directory then we will first remove
             # all the existing files.
             self.clean()
+        elif (len(self.__listOfNetworkingData) > 0):
+            # Only the files for the reports that changed are removed.
+            self.clean(map(lambda networkingData: "networking_summary-%s.txt" %(networkingData.getHostname()),
+                           self.__listOfNetworkingData))
 
         for networkingData in self.__listOfNetworkingData:
             message = "Writing the network report for: %s." %(networkingData.getHostname())
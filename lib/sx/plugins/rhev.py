@@ -31,9 +31,11 @@ class Rhev(sx.plugins.PluginBase):
         sx.plugins.PluginBase.__init__(self, "RHEV",
                                        "This plugin will run on report on RHEV log collector report files.",
                                        ["Rhevlogcollector", "sosreport", "sysreport"], True, True, {},
-                                       pathToPluginReportDir)
+                                       pathToPluginReportDir, requiredPaths=["ps", "sos_commands/process/ps_alxwww"])
 
-        self.__psDataMap = {}
+        # Map of the hostname to the number of spmprotect processes that
+        # were found in the process list.
+        self.__spmProcessCountsMap = {}
     # #######################################################################
     # Functions that should be overwritten in the plugin
     # #######################################################################
@@ -50,11 +52,17 @@ class Rhev(sx.plugins.PluginBase):
         for report in reports:
             if ((self.isValidReportType(report))  and
                 ((report.getName().lower() == "sosreport") or (report.getName().lower() == "sysreport"))):
-                psData = report.getDataFromFile("ps")
+                # The process list is searched a line at a time, so a large
+                # process list is not read into memory.
+                psData = report.getLineIterator("ps")
                 if (psData == None):
-                    psData = report.getDataFromFile("sos_commands/process/ps_alxwww")
+                    psData = report.getLineIterator("sos_commands/process/ps_alxwww")
                 if (not psData == None):
-                    self.__psDataMap[report.getHostname()] = psData
+                    spmProcessCount = 0
+                    for line in psData:
+                        if (line.find("/usr/libexec/vdsm/spmprotect.sh") >= 0):
+                            spmProcessCount += 1
+                    self.__spmProcessCountsMap[report.getHostname()] = spmProcessCount
 
     def action(self) :
         """
@@ -63,19 +71,17 @@ class Rhev(sx.plugins.PluginBase):
         message = "Performing action for plugin: %s" %(self.getName())
         logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
 
-        if (len(self.__psDataMap.keys()) > 0):
+        if (len(self.__spmProcessCountsMap.keys()) > 0):
             # Since we are going to run the plugin and create files in
             # the plugins report directory then we will first remove
             # all the existing files.
             self.clean()
 
         summaryFilename = "summary.txt"
-        for key in self.__psDataMap.keys():
-            psData = self.__psDataMap.get(key)
-            for line in psData:
-                if (line.find("/usr/libexec/vdsm/spmprotect.sh") >= 0):
-                    # If there is more than one spm server found then that is problem.
-                    dataout = "%s is a SPM server." %(key)
-                    self.write(summaryFilename, dataout)
+        for key in self.__spmProcessCountsMap.keys():
+            for i in range(0, self.__spmProcessCountsMap.get(key)):
+                # If there is more than one spm server found then that is problem.
+                dataout = "%s is a SPM server." %(key)
+                self.write(summaryFilename, dataout)
 
 
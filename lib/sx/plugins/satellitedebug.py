@@ -34,7 +34,7 @@ class Satellitedebug(sx.plugins.PluginBase):
         sx.plugins.PluginBase.__init__(self, "SatelliteDebug",
                                        "This plugin verifies an rhn satellite server debug file that is created.",
                                        ["Satellitedebug"], False, True, {},
-                                       pathToPluginReportDir)
+                                       pathToPluginReportDir, requiredPaths=["timestamp", "rpm-manifest"])
 
         self.__rhnSatDebugReports = []
 
@@ -20,6 +20,7 @@ from sx.reports.sysreport import Sysreport
 from sx.tools import StringUtil
 from sx.plugins.lib.storage import StorageData
 from sx.plugins.lib.storage import StorageDataGenerator
+from sx.plugins.lib.general.reportartifacts import ReportArtifacts
 from sx.plugins.lib.storage.storageevaluator import StorageEvaluator
 
 from sx.analysisreport import AnalysisReport
@@ -44,7 +45,10 @@ class Storage(sx.plugins.PluginBase):
         """
         sx.plugins.PluginBase.__init__(self, "Storage",
                                        "This plugin analyzes the storage data colleted from sosreports.",
-                                       ["Sosreport"], True, True, {}, pathToPluginReportDir)
+                                       ["Sosreport"], True, True, {}, pathToPluginReportDir,
+                                       requiredPaths=StorageDataGenerator.REQUIRED_PATHS,
+                                       reportsParallel=True,
+                                       produces=[ReportArtifacts.STORAGE_DATA])
 
         # This will contain a list of StorageData objects that
         # contains information found in sosreports.
@@ -63,13 +67,20 @@ class Storage(sx.plugins.PluginBase):
         """
         message = "Running setup for plugin: %s" %(self.getName())
         logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
-        for report in reports:
+        def getStorageData(report):
             message = "Getting the files for the report for report with  hostname of: %s." %(report.getHostname())
             logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
             if (self.isValidReportType(report)) :
-                storageData = StorageDataGenerator().generate(report)
-                if (not storageData == None):
-                    self.__listOfStorageData.append(storageData)
+                return ReportArtifacts.getStorageData(report)
+            return None
+        # The reports are processed at the same time and the results are
+        # returned in the same order as the reports.
+        # Only the reports that changed are processed, the files for the
+        # other reports were written the last time the plugin ran.
+        reports = filter(self.isReportChanged, reports)
+        for storageData in self.mapReports(getStorageData, reports):
+            if (not storageData == None):
+                self.__listOfStorageData.append(storageData)
 
     def report(self) :
         """
@@ -78,11 +89,18 @@ class Storage(sx.plugins.PluginBase):
         message = "Generating report for plugin: %s" %(self.getName())
         logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
 
-        if (len(self.__listOfStorageData) > 0):
+        if ((len(self.__listOfStorageData) > 0) and (not self.isIncremental())):
             # Since we are going to run the plugin and create files in
             # the plugins report directory then we will first remove
             # all the existing files.
             self.clean()
+        elif (len(self.__listOfStorageData) > 0):
+            # Only the files for the reports that changed are removed.
+            listOfFilenames = []
+            for storageData in self.__listOfStorageData:
+                listOfFilenames.append("storage_summary-%s.txt" %(storageData.getHostname()))
+                listOfFilenames.append("storage_block_device_tree-%s.txt" %(storageData.getHostname()))
+            self.clean(listOfFilenames)
         stringUtil = StringUtil()
         for storageData in self.__listOfStorageData:
             message = "Writing the storage report for: %s." %(storageData.getHostname())
@@ -13,11 +13,27 @@ import os.path
 import shutil
 import re
 import logging
+import threading
+import bisect
+import posixpath
+import stat
+import cPickle
+import itertools
+import mmap
 
 import sx
 from sx.logwriter import LogWriter
 from sx.tools import ConsoleUtil
+from sx.tools import LRUCache
+from sx.tools import FileUtil
+from sx.tools import FileDigestTable
+from sx.tools import ExtractionBudget
+from sx.tools import WorkerPool
 from sx.modulesloader import ReportsLoader
+from sx.modulesloader import ExtractorsLoader
+from sx.extractors import ArchiveMember
+from sx.extractors import ArchiveMemberIndex
+from sx.extractors import ArchiveManifest
 
 class ReportsHelper:
     def printReportsList(self, includeUserReports=True):
@@ -44,86 +60,1884 @@ class ReportsHelper:
                                       report.getDescription())
 
 
+class ReportsFileComparator:
+    """
+    This class finds which reports have identical files. The files for
+    all the paths are compared in one pass and the reports are grouped
+    into the reports that have identical files for each path. The digests
+    in the manifests of the reports and the FileDigestTable that is shared
+    in the process are used, so a file is read at most once for each
+    compare mode.
+    """
+    def __init__(self, listOfReports):
+        """
+        @param listOfReports: The list of reports that will be compared.
+        @type listOfReports: Array
+        """
+        self.__listOfReports = listOfReports
+
+    def compare(self, listOfPaths, compareMode=FileDigestTable.COMPARE_EXACT):
+        """
+        Returns a map of the paths to the reports grouped into the lists
+        of reports that have identical files for the path. The largest
+        group is first and the reports in each group are in the same order
+        as the list of reports. The reports that do not have the file are
+        not in any group.
+
+        @return: Returns a map of the paths to the list of groups of
+        reports that have identical files.
+        @rtype: Dictionary
+
+        @param listOfPaths: The list of paths to the files, which are
+        relative to the root report directory.
+        @type listOfPaths: Array
+        @param compareMode: The compare mode for the files(see
+        FileDigestTable).
+        @type compareMode: Int
+        """
+        fileDigestTable = FileDigestTable.getFileDigestTable()
+        # The manifests are added to the table when they are read.
+        for report in self.__listOfReports:
+            report.getManifest()
+        groupsMap = {}
+        for pathToFile in listOfPaths:
+            reportsMap = {}
+            listOfFiles = []
+            for report in self.__listOfReports:
+                pathToReportFile = report.getPathForFile(pathToFile)
+                if ((len(pathToReportFile) > 0) and (os.path.isfile(pathToReportFile))):
+                    if (not reportsMap.has_key(pathToReportFile)):
+                        reportsMap[pathToReportFile] = []
+                        listOfFiles.append(pathToReportFile)
+                    reportsMap.get(pathToReportFile).append(report)
+            groupsMap[pathToFile] = []
+            for listOfGroupFiles in fileDigestTable.groupFiles(listOfFiles, compareMode):
+                listOfGroupReports = []
+                for pathToReportFile in listOfGroupFiles:
+                    listOfGroupReports += reportsMap.get(pathToReportFile)
+                groupsMap[pathToFile].append(listOfGroupReports)
+        return groupsMap
+
+    def isIdentical(self, pathToFile, compareMode=FileDigestTable.COMPARE_EXACT):
+        """
+        Returns True if all the reports have the file and the files are
+        identical. False is returned if there are less than 2 reports.
+
+        @return: Returns True if all the reports have identical files.
+        @rtype: Boolean
+
+        @param pathToFile: The path to the file, which is relative to the
+        root report directory.
+        @type pathToFile: String
+        @param compareMode: The compare mode for the files(see
+        FileDigestTable).
+        @type compareMode: Int
+        """
+        listOfGroups = self.compare([pathToFile], compareMode).get(pathToFile)
+        return ((len(self.__listOfReports) > 1) and (len(listOfGroups) == 1) and
+                (len(listOfGroups[0]) == len(self.__listOfReports)))
+
+class ReportPathMatcher:
+    """
+    This class matches glob patterns against the paths in a report. A
+    "*" matches any characters in a name, "?" matches one character in
+    a name, "[...]" matches one of the characters in a name and "**"
+    matches any number of directories(including none). For example:
+    "sos_commands/**/dmsetup*".
+    """
+    def compilePattern(pattern):
+        """
+        Returns the regular expression for the glob pattern.
+
+        @return: Returns the regular expression for the glob pattern.
+        @rtype: re.RegexObject
+
+        @param pattern: The glob pattern, which is relative to the root
+        report directory.
+        @type pattern: String
+        """
+        regex = ""
+        listOfNames = pattern.strip().strip("/").split("/")
+        for index in range(0, len(listOfNames)):
+            name = listOfNames[index]
+            isLastName = (index == len(listOfNames) - 1)
+            if (name == "**"):
+                if (isLastName):
+                    regex += ".*"
+                else:
+                    regex += "(?:[^/]+/)*"
+                continue
+            position = 0
+            while (position < len(name)):
+                character = name[position]
+                position += 1
+                if (character == "*"):
+                    regex += "[^/]*"
+                elif (character == "?"):
+                    regex += "[^/]"
+                elif ((character == "[") and (name.find("]", position + 1) > 0)):
+                    end = name.find("]", position + 1)
+                    characters = name[position:end].replace("\\", "\\\\")
+                    if (characters.startswith("!")):
+                        characters = "^%s" %(characters[1:])
+                    regex += "[%s]" %(characters)
+                    position = end + 1
+                else:
+                    regex += re.escape(character)
+            if (not isLastName):
+                regex += "/"
+        return re.compile("^%s$" %(regex))
+    compilePattern = staticmethod(compilePattern)
+
+    def getLiteralPrefix(pattern):
+        """
+        Returns the leading directories of the pattern that do not have
+        any wildcards. All the paths that match the pattern start with
+        the prefix.
+
+        @return: Returns the leading directories of the pattern that do
+        not have any wildcards.
+        @rtype: String
+
+        @param pattern: The glob pattern, which is relative to the root
+        report directory.
+        @type pattern: String
+        """
+        listOfNames = pattern.strip().strip("/").split("/")
+        listOfLiteralNames = []
+        for name in listOfNames[:-1]:
+            if (re.search("[\\*?\\[]", name)):
+                break
+            listOfLiteralNames.append(name)
+        if (not len(listOfLiteralNames) > 0):
+            return ""
+        return "%s/" %("/".join(listOfLiteralNames))
+    getLiteralPrefix = staticmethod(getLiteralPrefix)
+
+    def match(listOfPaths, pattern):
+        """
+        Returns the paths that match the pattern. Only the paths that
+        start with the leading directories of the pattern are checked.
+
+        @return: Returns a sorted list of the paths that match the
+        pattern.
+        @rtype: Array
+
+        @param listOfPaths: A sorted list of the paths, which are relative
+        to the root report directory.
+        @type listOfPaths: Array
+        @param pattern: The glob pattern, which is relative to the root
+        report directory.
+        @type pattern: String
+        """
+        regex = ReportPathMatcher.compilePattern(pattern)
+        prefix = ReportPathMatcher.getLiteralPrefix(pattern)
+        listOfMatchedPaths = []
+        index = bisect.bisect_left(listOfPaths, prefix)
+        while (index < len(listOfPaths)):
+            if (not listOfPaths[index].startswith(prefix)):
+                break
+            elif ((len(listOfPaths[index]) > 0) and (regex.match(listOfPaths[index]))):
+                listOfMatchedPaths.append(listOfPaths[index])
+            index += 1
+        return listOfMatchedPaths
+    match = staticmethod(match)
+
+class ReportPathIndex:
+    """
+    This class is an index of all the paths in an extracted report. The
+    extracted report is walked once when the index is created, so
+    checking a path in the report does not stat the file again. The
+    paths are relative to the root report directory like the paths used
+    by the Report functions and the symbolic links are followed like
+    os.stat() does.
+
+    The symbolic links to directories are not walked, so the paths under
+    them are not in the index(see isIndexed()).
+    """
+    TYPE_DIR = 1
+    TYPE_FILE = 2
+    TYPE_OTHER = 3
+
+    def __init__(self, pathToExtractedReport):
+        """
+        @param pathToExtractedReport: The path to the extracted report.
+        @type pathToExtractedReport: String
+        """
+        # Map of the paths to the type and size of the file the path
+        # points to. The paths of broken symbolic links are not in the
+        # map.
+        self.__pathsMap = {"":(ReportPathIndex.TYPE_DIR, 0)}
+        # Map of the paths to the directories to the sorted list of names
+        # in the directory.
+        self.__dirsMap = {}
+        # The paths to the symbolic links to directories.
+        self.__linkedDirsMap = {}
+        for (pathToDir, listOfDirs, listOfFiles) in os.walk(pathToExtractedReport):
+            relativePathToDir = os.path.relpath(pathToDir, pathToExtractedReport)
+            if (relativePathToDir == "."):
+                relativePathToDir = ""
+            self.__dirsMap[relativePathToDir] = sorted(listOfDirs + listOfFiles)
+            for name in listOfDirs + listOfFiles:
+                pathToFile = os.path.join(pathToDir, name)
+                try:
+                    fileStat = os.stat(pathToFile)
+                except (IOError, os.error):
+                    continue
+                relativePathToFile = posixpath.join(relativePathToDir, name)
+                if (stat.S_ISDIR(fileStat.st_mode)):
+                    self.__pathsMap[relativePathToFile] = (ReportPathIndex.TYPE_DIR, fileStat.st_size)
+                    if (os.path.islink(pathToFile)):
+                        self.__linkedDirsMap[relativePathToFile] = True
+                elif (stat.S_ISREG(fileStat.st_mode)):
+                    self.__pathsMap[relativePathToFile] = (ReportPathIndex.TYPE_FILE, fileStat.st_size)
+                else:
+                    self.__pathsMap[relativePathToFile] = (ReportPathIndex.TYPE_OTHER, fileStat.st_size)
+        self.__listOfPaths = sorted(self.__pathsMap.keys())
+
+    def __len__(self):
+        """
+        Returns the number of paths in the index.
+
+        @return: Returns the number of paths in the index.
+        @rtype: Int
+        """
+        return len(self.__listOfPaths)
+
+    def normalizePath(pathToFile):
+        """
+        Returns the path in the form that is used for the keys of the
+        index.
+
+        @return: Returns the path in the form that is used for the keys
+        of the index.
+        @rtype: String
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        pathToFile = posixpath.normpath(pathToFile.strip().strip("/"))
+        if (pathToFile == "."):
+            return ""
+        return pathToFile
+    normalizePath = staticmethod(normalizePath)
+
+    def isIndexed(self, pathToFile):
+        """
+        Returns True if the index can answer for the path. The paths
+        that are outside of the report or under a symbolic link to a
+        directory are not in the index.
+
+        @return: Returns True if the index can answer for the path.
+        @rtype: Boolean
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        pathToFile = ReportPathIndex.normalizePath(pathToFile)
+        if ((pathToFile == "..") or (pathToFile.startswith("../"))):
+            return False
+        if (len(self.__linkedDirsMap) > 0):
+            (head, tail) = posixpath.split(pathToFile)
+            while (len(head) > 0):
+                if (self.__linkedDirsMap.has_key(head)):
+                    return False
+                (head, tail) = posixpath.split(head)
+        return True
+
+    def exists(self, pathToFile):
+        """
+        Returns True if the path exists in the extracted report.
+
+        @return: Returns True if the path exists in the extracted
+        report.
+        @rtype: Boolean
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        return self.__pathsMap.has_key(ReportPathIndex.normalizePath(pathToFile))
+
+    def isDir(self, pathToDir):
+        """
+        Returns True if the path is a directory in the extracted report.
+
+        @return: Returns True if the path is a directory in the
+        extracted report.
+        @rtype: Boolean
+
+        @param pathToDir: The path to the directory, which is relative
+        to the root report directory.
+        @type pathToDir: String
+        """
+        entry = self.__pathsMap.get(ReportPathIndex.normalizePath(pathToDir))
+        return ((not entry == None) and (entry[0] == ReportPathIndex.TYPE_DIR))
+
+    def isFile(self, pathToFile):
+        """
+        Returns True if the path is a regular file in the extracted
+        report.
+
+        @return: Returns True if the path is a regular file in the
+        extracted report.
+        @rtype: Boolean
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        entry = self.__pathsMap.get(ReportPathIndex.normalizePath(pathToFile))
+        return ((not entry == None) and (entry[0] == ReportPathIndex.TYPE_FILE))
+
+    def listDir(self, pathToDir):
+        """
+        Returns a sorted list of the names of the files in the
+        directory. Empty list is returned if the path is not a
+        directory.
+
+        @return: Returns a sorted list of the names of the files in the
+        directory.
+        @rtype: Array
+
+        @param pathToDir: The path to the directory, which is relative
+        to the root report directory.
+        @type pathToDir: String
+        """
+        return list(self.__dirsMap.get(ReportPathIndex.normalizePath(pathToDir), []))
+
+    def getFileSize(self, pathToFile):
+        """
+        Returns the size of the file in bytes. -1 is returned if the
+        file does not exist.
+
+        @return: Returns the size of the file in bytes.
+        @rtype: Long
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        entry = self.__pathsMap.get(ReportPathIndex.normalizePath(pathToFile))
+        if (entry == None):
+            return -1
+        return entry[1]
+
+    def glob(self, pattern):
+        """
+        Returns the paths in the extracted report that match the glob
+        pattern(see ReportPathMatcher).
+
+        @return: Returns a sorted list of the paths that match the
+        pattern.
+        @rtype: Array
+
+        @param pattern: The glob pattern, which is relative to the root
+        report directory.
+        @type pattern: String
+        """
+        return ReportPathMatcher.match(self.__listOfPaths, pattern)
+
+class ReportFileView:
+    """
+    This class is a read only view of a file in an extracted report. The
+    file is mapped into memory, so the data is not copied into strings
+    until it is needed. The lines are found by searching for newlines in
+    the mapped file and only the lines that are asked for are copied, so
+    a parser can find a section of a large file by its offset and only
+    copy the lines in the section.
+
+    The view should be closed when it is no longer used(see close()).
+    """
+    def __init__(self, pathToFile):
+        """
+        An IOError is raised if the file cannot be opened or mapped.
+
+        @param pathToFile: The full path to the file.
+        @type pathToFile: String
+        """
+        self.__pathToFile = pathToFile
+        fin = open(pathToFile, "rb")
+        try:
+            if (os.fstat(fin.fileno()).st_size > 0):
+                try:
+                    self.__data = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+                except (ValueError, mmap.error), e:
+                    raise IOError(str(e))
+            else:
+                # An empty file cannot be mapped.
+                self.__data = ""
+        finally:
+            fin.close()
+
+    def __len__(self):
+        """
+        Returns the size of the file in bytes.
+
+        @return: Returns the size of the file in bytes.
+        @rtype: Int
+        """
+        return len(self.__data)
+
+    def getPathToFile(self):
+        """
+        Returns the full path to the file.
+
+        @return: Returns the full path to the file.
+        @rtype: String
+        """
+        return self.__pathToFile
+
+    def close(self):
+        """
+        Unmaps the file. The view cannot be used after it is closed.
+        """
+        if (isinstance(self.__data, mmap.mmap)):
+            self.__data.close()
+        self.__data = ""
+
+    def __getEnd(self, end):
+        """
+        Returns the end offset, where a negative offset is the end of
+        the file.
+
+        @return: Returns the end offset.
+        @rtype: Int
+
+        @param end: The end offset.
+        @type end: Int
+        """
+        if ((end < 0) or (end > len(self.__data))):
+            return len(self.__data)
+        return end
+
+    def find(self, data, start=0, end=-1):
+        """
+        Returns the offset of the first place the data is found between
+        the start and end offsets. -1 is returned if the data is not
+        found.
+
+        @return: Returns the offset of the data.
+        @rtype: Int
+
+        @param data: The data that is searched for.
+        @type data: String
+        @param start: The offset the search starts at.
+        @type start: Int
+        @param end: The offset the search ends at. If negative then the
+        search ends at the end of the file.
+        @type end: Int
+        """
+        return self.__data.find(data, start, self.__getEnd(end))
+
+    def getLineStart(self, offset):
+        """
+        Returns the offset of the start of the line that contains the
+        offset.
+
+        @return: Returns the offset of the start of the line.
+        @rtype: Int
+
+        @param offset: An offset in the line.
+        @type offset: Int
+        """
+        return self.__data.rfind("\n", 0, max(offset, 0)) + 1
+
+    def getLineEnd(self, offset):
+        """
+        Returns the offset after the newline of the line that contains
+        the offset or the size of the file if the line does not end
+        with a newline.
+
+        @return: Returns the offset after the end of the line.
+        @rtype: Int
+
+        @param offset: An offset in the line.
+        @type offset: Int
+        """
+        newlineOffset = self.__data.find("\n", offset)
+        if (newlineOffset < 0):
+            return len(self.__data)
+        return newlineOffset + 1
+
+    def getLine(self, offset):
+        """
+        Returns the line that contains the offset including the newline.
+
+        @return: Returns the line that contains the offset.
+        @rtype: String
+
+        @param offset: An offset in the line.
+        @type offset: Int
+        """
+        return self.__data[self.getLineStart(offset):self.getLineEnd(offset)]
+
+    def iterateLines(self, start=0, end=-1):
+        """
+        Yields a tuple of the offset of the line and the line(including
+        the newline) for each line that starts between the start and end
+        offsets.
+
+        @param start: The offset of the first line.
+        @type start: Int
+        @param end: The offset that the lines end at. If negative then
+        the lines end at the end of the file.
+        @type end: Int
+        """
+        end = self.__getEnd(end)
+        offset = start
+        while (offset < end):
+            lineEnd = self.getLineEnd(offset)
+            yield (offset, self.__data[offset:lineEnd])
+            offset = lineEnd
+
+    def getLines(self, start=0, end=-1):
+        """
+        Returns the lines that start between the start and end offsets.
+
+        @return: Returns an array of Strings, where each newline in the
+        section is an item in the array.
+        @rtype: Array
+
+        @param start: The offset of the first line.
+        @type start: Int
+        @param end: The offset that the lines end at. If negative then
+        the lines end at the end of the file.
+        @type end: Int
+        """
+        return [line for (offset, line) in self.iterateLines(start, end)]
+
+    def search(self, pattern, start=0, end=-1):
+        """
+        Returns the match for the first place the regular expression
+        matches between the start and end offsets. None is returned if
+        there is no match. The offsets of the match are offsets in the
+        file.
+
+        @return: Returns the match for the regular expression.
+        @rtype: re.MatchObject
+
+        @param pattern: The regular expression.
+        @type pattern: String or re.RegexObject
+        @param start: The offset the search starts at.
+        @type start: Int
+        @param end: The offset the search ends at. If negative then the
+        search ends at the end of the file.
+        @type end: Int
+        """
+        if (isinstance(pattern, basestring)):
+            pattern = re.compile(pattern, re.MULTILINE)
+        return pattern.search(self.__data, start, self.__getEnd(end))
+
+    def finditer(self, pattern, start=0, end=-1):
+        """
+        Returns an iterator over the matches of the regular expression
+        between the start and end offsets. The offsets of the matches
+        are offsets in the file.
+
+        @return: Returns an iterator over the matches of the regular
+        expression.
+        @rtype: Iterator
+
+        @param pattern: The regular expression.
+        @type pattern: String or re.RegexObject
+        @param start: The offset the search starts at.
+        @type start: Int
+        @param end: The offset the search ends at. If negative then the
+        search ends at the end of the file.
+        @type end: Int
+        """
+        if (isinstance(pattern, basestring)):
+            pattern = re.compile(pattern, re.MULTILINE)
+        return pattern.finditer(self.__data, start, self.__getEnd(end))
+
+    def getSlice(self, start, end=-1):
+        """
+        Returns the data between the start and end offsets without
+        copying the data. The slice is only valid until the view is
+        closed.
+
+        @return: Returns the data between the start and end offsets.
+        @rtype: buffer
+
+        @param start: The offset of the start of the slice.
+        @type start: Int
+        @param end: The offset of the end of the slice. If negative then
+        the slice ends at the end of the file.
+        @type end: Int
+        """
+        end = self.__getEnd(end)
+        return buffer(self.__data, start, max(end - start, 0))
+
+class ReportArchive:
+    """
+    This class is a read only view of the files of a report that are
+    in the report file. The paths are relative to the root report
+    directory like the paths used by the Report functions and the
+    symbolic links in the report file are followed. The data for a
+    file is read straight out of the report file by the extractor.
+
+    @cvar MAX_SYMBOLIC_LINKS: The maximum number of symbolic links that
+    are followed when resolving a path.
+    @type MAX_SYMBOLIC_LINKS: Int
+    """
+    MAX_SYMBOLIC_LINKS = 32
+
+    def __init__(self, extractor, stripDirectoriesDepth=1):
+        """
+        @param extractor: The extractor for the report file.
+        @type extractor: Extractor
+        @param stripDirectoriesDepth: The number of root directories of
+        the report file that are removed from the paths.
+        @type stripDirectoriesDepth: Int
+        """
+        self.__extractor = extractor
+        # Map of the paths to the members of the report file.
+        self.__membersMap = {}
+        # Map of the paths to the directories to the names of the files
+        # in the directory. Directories that do not have a member are
+        # added for the members under them.
+        self.__dirsMap = {"":{}}
+        depth = extractor.getAppliedStripDirectoriesDepth(stripDirectoriesDepth)
+        for member in extractor.getMemberIndex().getMembers():
+            strippedName = ArchiveMemberIndex.getStrippedName(member, depth)
+            if (not len(strippedName) > 0):
+                continue
+            self.__membersMap[strippedName] = member
+            if (member.getMemberType() == ArchiveMember.TYPE_DIR):
+                self.__addDir(strippedName)
+            (head, tail) = posixpath.split(strippedName)
+            self.__addDir(head)[tail] = True
+        # Sorted list of all the paths so that all the paths under a
+        # directory can be found.
+        self.__listOfPaths = self.__dirsMap.keys() + self.__membersMap.keys()
+        self.__listOfPaths = sorted(set(self.__listOfPaths))
+
+    def __addDir(self, pathToDir):
+        """
+        Adds the directory and its parent directories and returns the
+        map of the files in the directory.
+
+        @return: Returns the map of the names of the files in the
+        directory.
+        @rtype: Dictionary
+
+        @param pathToDir: The path to the directory.
+        @type pathToDir: String
+        """
+        if (not self.__dirsMap.has_key(pathToDir)):
+            self.__dirsMap[pathToDir] = {}
+            (head, tail) = posixpath.split(pathToDir)
+            self.__addDir(head)[tail] = True
+        return self.__dirsMap.get(pathToDir)
+
+    def escapePath(pathToFile):
+        """
+        Returns the path with the wildcard characters escaped, so that
+        the path can be used as a pattern that only matches the path.
+
+        @return: Returns the path with the wildcard characters escaped.
+        @rtype: String
+
+        @param pathToFile: The path to the file.
+        @type pathToFile: String
+        """
+        return re.sub("([\\*?\\[])", "[\\1]", pathToFile)
+    escapePath = staticmethod(escapePath)
+
+    def getExtractor(self):
+        """
+        Returns the extractor for the report file.
+
+        @return: Returns the extractor for the report file.
+        @rtype: Extractor
+        """
+        return self.__extractor
+
+    def resolvePath(self, pathToFile):
+        """
+        Returns the path with all the symbolic links in the path
+        followed. None is returned if the path is outside of the report
+        or there are too many symbolic links. The path that is returned
+        does not have to exist.
+
+        @return: Returns the path with all the symbolic links followed.
+        @rtype: String
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        listOfNames = pathToFile.strip().split("/")
+        listOfResolvedNames = []
+        linkCount = 0
+        while (len(listOfNames) > 0):
+            name = listOfNames.pop(0)
+            if ((not len(name) > 0) or (name == ".")):
+                continue
+            elif (name == ".."):
+                if (not len(listOfResolvedNames) > 0):
+                    return None
+                listOfResolvedNames.pop()
+                continue
+            member = self.__membersMap.get("/".join(listOfResolvedNames + [name]))
+            if ((not member == None) and (member.getMemberType() == ArchiveMember.TYPE_SYMLINK)):
+                linkCount += 1
+                # Absolute links point to files that are not in the report.
+                if ((linkCount > ReportArchive.MAX_SYMBOLIC_LINKS) or (member.getLinkName().startswith("/"))):
+                    return None
+                listOfNames = member.getLinkName().split("/") + listOfNames
+            else:
+                listOfResolvedNames.append(name)
+        return "/".join(listOfResolvedNames)
+
+    def getMember(self, pathToFile):
+        """
+        Returns the member for the path after the symbolic links are
+        followed. The member for a hard link is the member that holds
+        the data. None is returned if there is no member for the path.
+
+        @return: Returns the member for the path.
+        @rtype: ArchiveMember
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        resolvedPath = self.resolvePath(pathToFile)
+        if (resolvedPath == None):
+            return None
+        return self.__extractor.getMemberIndex().getLinkedMember(self.__membersMap.get(resolvedPath))
+
+    def exists(self, pathToFile):
+        """
+        Returns True if the path is in the report file.
+
+        @return: Returns True if the path is in the report file.
+        @rtype: Boolean
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        resolvedPath = self.resolvePath(pathToFile)
+        if (resolvedPath == None):
+            return False
+        return ((self.__dirsMap.has_key(resolvedPath)) or (not self.getMember(resolvedPath) == None))
+
+    def isDir(self, pathToDir):
+        """
+        Returns True if the path is a directory in the report file.
+
+        @return: Returns True if the path is a directory in the report
+        file.
+        @rtype: Boolean
+
+        @param pathToDir: The path to the directory, which is relative
+        to the root report directory.
+        @type pathToDir: String
+        """
+        resolvedPath = self.resolvePath(pathToDir)
+        return ((not resolvedPath == None) and (self.__dirsMap.has_key(resolvedPath)))
+
+    def isFile(self, pathToFile):
+        """
+        Returns True if the path is a regular file in the report file.
+
+        @return: Returns True if the path is a regular file in the
+        report file.
+        @rtype: Boolean
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        member = self.getMember(pathToFile)
+        return ((not member == None) and (member.isFile()))
+
+    def listDir(self, pathToDir):
+        """
+        Returns a sorted list of the names of the files in the
+        directory. Empty list is returned if the path is not a
+        directory.
+
+        @return: Returns a sorted list of the names of the files in the
+        directory.
+        @rtype: Array
+
+        @param pathToDir: The path to the directory, which is relative
+        to the root report directory.
+        @type pathToDir: String
+        """
+        resolvedPath = self.resolvePath(pathToDir)
+        if ((resolvedPath == None) or (not self.__dirsMap.has_key(resolvedPath))):
+            return []
+        return sorted(self.__dirsMap.get(resolvedPath).keys())
+
+    def getPathsUnder(self, pathToDir):
+        """
+        Returns a sorted list of all the paths under the directory. The
+        symbolic links are not followed.
+
+        @return: Returns a sorted list of all the paths under the
+        directory.
+        @rtype: Array
+
+        @param pathToDir: The path to the directory, which is relative
+        to the root report directory.
+        @type pathToDir: String
+        """
+        prefix = "%s/" %(pathToDir.strip().strip("/"))
+        if (prefix == "/"):
+            prefix = ""
+        listOfPaths = []
+        index = bisect.bisect_left(self.__listOfPaths, prefix)
+        while (index < len(self.__listOfPaths)):
+            if (not self.__listOfPaths[index].startswith(prefix)):
+                break
+            elif (len(self.__listOfPaths[index]) > 0):
+                listOfPaths.append(self.__listOfPaths[index])
+            index += 1
+        return listOfPaths
+
+    def glob(self, pattern):
+        """
+        Returns the paths in the report file that match the glob
+        pattern(see ReportPathMatcher). The symbolic links are not
+        followed.
+
+        @return: Returns a sorted list of the paths that match the
+        pattern.
+        @rtype: Array
+
+        @param pattern: The glob pattern, which is relative to the root
+        report directory.
+        @type pattern: String
+        """
+        return ReportPathMatcher.match(self.__listOfPaths, pattern)
+
+    def getFileSize(self, pathToFile):
+        """
+        Returns the size of the file in bytes. The size of a directory
+        is 0. -1 is returned if the file does not exist or the size is
+        not known.
+
+        @return: Returns the size of the file in bytes.
+        @rtype: Long
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        member = self.getMember(pathToFile)
+        if ((not member == None) and (member.isFile())):
+            return member.getSize()
+        elif (self.isDir(pathToFile)):
+            return 0
+        return -1
+
+    def getDataFromFile(self, pathToFile):
+        """
+        Returns the data in an array, where each newline in the file is
+        a separate item in the array. None is returned if the path is
+        not a file in the report file.
+
+        @return: Returns an array of Strings, where each newline in
+        file is an item in the array.
+        @rtype: Array
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        member = self.getMember(pathToFile)
+        if ((member == None) or (not member.isFile())):
+            return None
+        return self.__extractor.getDataFromMember(member)
+
+class ReportCache:
+    """
+    This class is the file next to an extracted report that stores the
+    objects that were generated from the data in the report(see
+    Report.getArtifact()) so that they do not have to be generated again
+    when the extracted report is loaded again. Each object is stored
+    with the size, modification time and type of the paths that were
+    read to generate it and the object is only used if none of the paths
+    have changed.
+
+    The file is versioned so that a file that was written in a format
+    that is not known is ignored.
+
+    @cvar CACHE_FORMAT_VERSION: The version of the format of the file.
+    @type CACHE_FORMAT_VERSION: Int
+    """
+    CACHE_FORMAT_VERSION = 1
+
+    def __init__(self, pathToExtractedReport):
+        """
+        @param pathToExtractedReport: Path to the extracted report.
+        @type pathToExtractedReport: String
+        """
+        self.__pathToExtractedReport = pathToExtractedReport
+        self.__reportName = ""
+        # A map of the name of the object to a tuple of the map of paths
+        # to their signatures and the pickled object.
+        self.__artifactsMap = {}
+        self.__isChanged = False
+        self.__lock = threading.Lock()
+        self.__load()
+
+    def getPathToCacheFile(pathToExtractedReport):
+        """
+        Returns the path to the file that stores the objects for the
+        extracted report. The file is next to the extracted report
+        directory.
+
+        @return: Returns the path to the file that stores the objects for
+        the extracted report.
+        @rtype: String
+
+        @param pathToExtractedReport: Path to the extracted report.
+        @type pathToExtractedReport: String
+        """
+        (head, tail) = os.path.split(pathToExtractedReport)
+        return os.path.join(head, ".%s.cache" %(tail))
+    getPathToCacheFile = staticmethod(getPathToCacheFile)
+
+    def getPathSignature(pathToExtractedReport, pathToFile):
+        """
+        Returns a tuple of the type, size and modification time of the
+        path. None is returned if the path does not exist.
+
+        @return: Returns a tuple of the type, size and modification time
+        of the path.
+        @rtype: Tuple
+
+        @param pathToExtractedReport: Path to the extracted report.
+        @type pathToExtractedReport: String
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        try:
+            fileStat = os.stat(os.path.join(pathToExtractedReport, pathToFile))
+        except OSError:
+            return None
+        return (stat.S_IFMT(fileStat.st_mode), fileStat.st_size, int(fileStat.st_mtime))
+    getPathSignature = staticmethod(getPathSignature)
+
+    def __load(self):
+        """
+        Reads the file that stores the objects if the file exists and
+        the format of the file is known.
+        """
+        pathToCacheFile = ReportCache.getPathToCacheFile(self.__pathToExtractedReport)
+        if (not os.path.isfile(pathToCacheFile)):
+            return
+        try:
+            fin = open(pathToCacheFile, "rb")
+            try:
+                cacheMap = cPickle.load(fin)
+            finally:
+                fin.close()
+        except (IOError, os.error, EOFError, cPickle.UnpicklingError, ValueError, TypeError, KeyError, IndexError,
+                AttributeError, ImportError):
+            message = "There was an error reading the cache file, the file will be ignored: %s." %(pathToCacheFile)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return
+        if ((not type(cacheMap) == dict) or (not cacheMap.get("version") == ReportCache.CACHE_FORMAT_VERSION)):
+            message = "The cache file has a different format version and will be ignored: %s." %(pathToCacheFile)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return
+        self.__reportName = cacheMap.get("reportName", "")
+        self.__artifactsMap = cacheMap.get("artifacts", {})
+
+    def getReportName(self):
+        """
+        Returns the name of the type of the report that was stored. Empty
+        string is returned if not known.
+
+        @return: Returns the name of the type of the report.
+        @rtype: String
+        """
+        return self.__reportName
+
+    def setReportName(self, reportName):
+        """
+        Sets the name of the type of the report.
+
+        @param reportName: The name of the type of the report.
+        @type reportName: String
+        """
+        self.__lock.acquire()
+        try:
+            if (not self.__reportName == reportName):
+                self.__reportName = reportName
+                self.__isChanged = True
+        finally:
+            self.__lock.release()
+
+    def getArtifact(self, name):
+        """
+        Returns a tuple of the object that was stored for the name and
+        the list of paths that were read to generate the object. None is
+        returned if there is no object stored for the name or the paths
+        have changed.
+
+        @return: Returns a tuple of the object and the list of paths that
+        were read to generate the object.
+        @rtype: Tuple
+
+        @param name: The unique name of the object.
+        @type name: String
+        """
+        self.__lock.acquire()
+        try:
+            artifactEntry = self.__artifactsMap.get(name)
+        finally:
+            self.__lock.release()
+        if (artifactEntry == None):
+            return None
+        (signaturesMap, pickledArtifact) = artifactEntry
+        for pathToFile in signaturesMap.keys():
+            if (not ReportCache.getPathSignature(self.__pathToExtractedReport, pathToFile) == signaturesMap.get(pathToFile)):
+                message = "The path has changed since the %s was stored in the cache: %s" %(name, pathToFile)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                return None
+        try:
+            return (cPickle.loads(pickledArtifact), signaturesMap.keys())
+        except (cPickle.UnpicklingError, EOFError, ValueError, TypeError, KeyError, IndexError,
+                AttributeError, ImportError):
+            message = "There was an error loading the %s from the cache: %s" %(name, ReportCache.getPathToCacheFile(self.__pathToExtractedReport))
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+        return None
+
+    def setArtifact(self, name, artifact, listOfPaths):
+        """
+        Stores the object for the name with the signatures of the paths
+        that were read to generate the object. Objects that cannot be
+        pickled are not stored.
+
+        @param name: The unique name of the object.
+        @type name: String
+        @param artifact: The object that was generated.
+        @type artifact: Object
+        @param listOfPaths: The list of paths that were read to generate
+        the object, which are relative to the root report directory.
+        @type listOfPaths: Array
+        """
+        signaturesMap = {}
+        for pathToFile in listOfPaths:
+            signaturesMap[pathToFile] = ReportCache.getPathSignature(self.__pathToExtractedReport, pathToFile)
+        try:
+            pickledArtifact = cPickle.dumps(artifact, cPickle.HIGHEST_PROTOCOL)
+        except (cPickle.PicklingError, TypeError, AttributeError):
+            message = "The %s cannot be stored in the cache: %s" %(name, ReportCache.getPathToCacheFile(self.__pathToExtractedReport))
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return
+        self.__lock.acquire()
+        try:
+            self.__artifactsMap[name] = (signaturesMap, pickledArtifact)
+            self.__isChanged = True
+        finally:
+            self.__lock.release()
+
+    def save(self):
+        """
+        Writes the stored objects to the file if anything has changed.
+
+        @return: Returns True if the file was written or nothing had
+        changed.
+        @rtype: Boolean
+        """
+        self.__lock.acquire()
+        try:
+            if (not self.__isChanged):
+                return True
+            pathToCacheFile = ReportCache.getPathToCacheFile(self.__pathToExtractedReport)
+            cacheMap = {"version":ReportCache.CACHE_FORMAT_VERSION,
+                        "reportName":self.__reportName,
+                        "artifacts":self.__artifactsMap}
+            # Write to a temporary file first so that a file that is
+            # partially written is never read.
+            pathToTmpCacheFile = "%s.tmp" %(pathToCacheFile)
+            try:
+                fout = open(pathToTmpCacheFile, "wb")
+                try:
+                    cPickle.dump(cacheMap, fout, cPickle.HIGHEST_PROTOCOL)
+                finally:
+                    fout.close()
+                os.rename(pathToTmpCacheFile, pathToCacheFile)
+            except (IOError, os.error):
+                message = "There was an error writing the cache file: %s." %(pathToCacheFile)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                return False
+            self.__isChanged = False
+            return True
+        finally:
+            self.__lock.release()
+
 class Report:
     """
     This class is a container for different kind of reports. This is
     the base class that all report types should inherit.
+
+    @cvar FILE_DATA_CACHE_SIZE: The default maximum number of bytes of
+    file data that is cached for each report.
+    @type FILE_DATA_CACHE_SIZE: Int
+    @cvar READ_AHEAD_WORKER_COUNT: The maximum number of files that are
+    read at the same time by getDataFromFiles().
+    @type READ_AHEAD_WORKER_COUNT: Int
+    @cvar FILE_ALIASES: Map of the logical names of files to the list of
+    paths(in the order they are tried) that the file can be found at in
+    the report(see resolveFileAlias()). Report types that lay out the
+    files differently should override the map.
+    @type FILE_ALIASES: Dictionary
     """
-    def __init__(self, name, description, stripDirectoriesDepth=1) :
+    FILE_DATA_CACHE_SIZE = 32 * 1024 * 1024
+    READ_AHEAD_WORKER_COUNT = 8
+    FILE_ALIASES = {"installed_rpms":["sos_commands/rpm/rpm_-qa_--qf_NAME_-_VERSION_-_RELEASE_-_ARCH_INSTALLTIME_date_.b",
+                                      "sos_commands/rpm/rpm_-qa_--qf_NAME_-_VERSION_-_RELEASE_._ARCH_INSTALLTIME_date_.b",
+                                      "sos_commands/rpm/rpm_-qa_--qf_NAME_-_VERSION_-_RELEASE_-_ARCH",
+                                      "installed-rpms"],
+                    "uname_a":["uname", "sos_commands/kernel/uname_-a"],
+                    "chkconfig_list":["chkconfig", "sos_commands/startup/chkconfig_--list"],
+                    "mount_list":["mount", "sos_commands/filesys/mount_-l"],
+                    "ps_list":["ps", "sos_commands/process/ps_auxwww"],
+                    "ifconfig_a":["sos_commands/networking/ifconfig_-a", "ifconfig"],
+                    "report_date":["sos_commands/general/date", "date"],
+                    "system_uptime":["sos_commands/general/uptime", "uptime"]}
+
+    def __init__(self, name, description, stripDirectoriesDepth=1, requiredPaths=None) :
+        """
+        @param name: The name of the report.
+        @type name: String
+        @param description: A description of the report.
+        @type description: String
+        @param stripDirectoriesDepth: This value will strip the root
+        directories of the report to a depth that is given. Default is 1.
+        @type stripDirectoriesDepth: Int
+        @param requiredPaths: A list of paths(wildcards are allowed) that
+        the functions of the report read. These paths are always
+        extracted when only part of the report is extracted.
+        @type requiredPaths: Array
+        """
+        self.__name = name
+        self.__description = description
+        # The Default is 1 for how many directories need to be
+        # removed.
+        self.__stripDirectoriesDepth = stripDirectoriesDepth
+
+        self.__pathToExtractedReport = ""
+        self.__pathToTmpExtractedReport = ""
+
+        # When reports are extracted at the same time the turnstile makes
+        # sure the extraction directories are chosen in the same order as
+        # the reports were given.
+        self.__extractionTurnstile = None
+        self.__extractionIndex = 0
+
+        # The paths that the report functions read.
+        self.__requiredPaths = []
+        if (not requiredPaths == None):
+            self.__requiredPaths = requiredPaths
+        # If not None then only the paths(and required paths) will be
+        # extracted from the report. The rest of the report will be
+        # extracted when a file that was not extracted is requested.
+        self.__extractionPaths = None
+        self.__isPartiallyExtracted = False
+        self.__extractor = None
+        self.__extractionLock = threading.Lock()
+        # If True then only the required paths are extracted and the
+        # files are read straight from the report file until the whole
+        # report is extracted.
+        self.__isVirtual = False
+        self.__isReadFromArchive = False
+        self.__backgroundExtractionThread = None
+        # The view of the files in the report file which is created the
+        # first time it is needed.
+        self.__reportArchive = None
+        self.__reportArchiveLock = threading.Lock()
+        # The data of the files that were read, the key is the path
+        # relative to the root report directory.
+        self.__fileDataCache = LRUCache(Report.FILE_DATA_CACHE_SIZE)
+        # The objects that were generated from the data in the report that
+        # are shared by all the plugins. Each entry is a list of [lock,
+        # isGenerated, object] so that an object is only generated once.
+        self.__artifactsMap = {}
+        self.__artifactsLock = threading.Lock()
+        # The objects are stored in the cache file next to the extracted
+        # report when enabled, so they are not generated again when the
+        # extracted report is loaded again.
+        self.__isReportCacheEnabled = False
+        self.__reportCache = None
+        # The maps of the paths that are read while each object is
+        # generated by the current thread.
+        self.__pathsReadRecorder = threading.local()
+        # The manifest of the report file which is read from the manifest
+        # file the first time it is needed.
+        self.__manifest = None
+        self.__manifestLock = threading.Lock()
+        # The index of the paths in the extracted report which is built
+        # the first time a path is checked after the report is extracted.
+        self.__pathIndex = None
+        self.__pathIndexLock = threading.Lock()
+        # Map of the logical names of files to the path that was found for
+        # the name in the report.
+        self.__resolvedFileAliasesMap = {}
+
+    def __str__(self) :
+        """
+        Returns a formatted string of this object.
+
+        @return: Returns a formatted string of this object.
+        @rtype: String
+        """
+        return "%s: %s" %(self.getName(), self.getDescription())
+
+    def getName(self) :
+        """
+        Returns name of the report.
+
+        @return: Returns name of the report.
+        @rtype: String
+        """
+        return self.__name
+
+    def getDescription(self) :
+        """
+        Returns description of the report.
+
+        @return: Returns description of the report.
+        @rtype: String
+        """
+        return self.__description
+
+    def getPathToExtractedReport(self) :
+        """
+        This function returns the path to the extracted report.
+
+        @return: Returns the path to the extracted report.
+        @rtype: String
+        """
+        return self.__pathToExtractedReport
+
+    def getType(self) :
+        """
+        This function returns the class name of this report.
+
+        @return: The class name of the report.
+        @rtype: String
+        """
+        return self.__class__.__name__
+
+    def setPathToExtractedReport(self, pathToExtractedReport):
+        """
+        This is helper function that will set the paths for
+        extracted report path and temp extracted report path.
+
+        @param pathToExtractedReport: Path to the extracted report.
+        @type pathToExtractedReport: String
+        """
+        self.__pathToExtractedReport = pathToExtractedReport
+        (head, tail) = os.path.split(self.__pathToExtractedReport)
+        self.__pathToTmpExtractedReport = os.path.join(head, ".%s" %(tail))
+        self.__resetPathIndex()
+
+    def setExtractionTurnstile(self, extractionTurnstile, extractionIndex):
+        """
+        Sets the turnstile that serializes the selection of the
+        extraction directory when more than one report is extracted at
+        the same time. The extraction directory is chosen when it is
+        this report's turn(extractionIndex) and the turnstile is
+        released for the next report after the directory is chosen or
+        the extraction fails.
+
+        @param extractionTurnstile: The turnstile that is shared with
+        all the reports that are extracted at the same time.
+        @type extractionTurnstile: OrderedTurnstile
+        @param extractionIndex: The position of this report in the list
+        of reports that are being extracted.
+        @type extractionIndex: Int
+        """
+        self.__extractionTurnstile = extractionTurnstile
+        self.__extractionIndex = extractionIndex
+
+    def releaseExtractionTurnstile(self):
+        """
+        Releases the turnstile so the next report can choose its
+        extraction directory. It is safe to call this function more
+        than once or if there is no turnstile.
+        """
+        if (not self.__extractionTurnstile == None):
+            self.__extractionTurnstile.release(self.__extractionIndex)
+
+    def reserveExtractDir(self, extractDir):
+        """
+        This function will set the path to extracted report and create
+        the directory. If the directory already exists then the
+        directory will be renamed with the suffix "-duplicate_<n>".
+
+        @return: Returns True if the directory was created.
+        @rtype: Boolean
+
+        @param extractDir: The full path to directory for extraction.
+        @type extractDir: String
+        """
+        if (not self.__extractionTurnstile == None):
+            self.__extractionTurnstile.wait(self.__extractionIndex)
+        try:
+            # Check for duplicate extraction point and rename if it exists.
+            if os.path.exists(extractDir) :
+                for i in range(1, 100) :
+                    (head, tail) = os.path.split(extractDir)
+                    duplicatePath = os.path.join(head, "%s-duplicate_%s" %(tail, str(i)))
+                    if (not os.path.exists(duplicatePath)) :
+                        # Directory does not exist so we can extract to this path
+                        extractDir = duplicatePath
+                        break;
+            # Set path to extraction point and temporary directory
+            self.setPathToExtractedReport(extractDir)
+            try:
+                if not os.access(self.__pathToExtractedReport, os.F_OK):
+                    os.makedirs(self.__pathToExtractedReport)
+            except (IOError, os.error):
+                message =  "IO error occured on creating the directory: %s." %(self.__pathToExtractedReport)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                return False
+            return True
+        finally:
+            self.releaseExtractionTurnstile()
+
+    def getRequiredPaths(self):
+        """
+        Returns a list of paths that the functions of this report read,
+        which includes the type detection file.
+
+        @return: Returns a list of paths that the functions of this
+        report read.
+        @rtype: Array
+        """
+        listOfPaths = list(self.__requiredPaths)
+        typeDetectionFile = getattr(self, "TYPE_DETECTION_FILE", "")
+        if (len(typeDetectionFile) > 0):
+            listOfPaths.append(typeDetectionFile)
+        return listOfPaths
+
+    def setExtractionPaths(self, listOfPaths):
+        """
+        Sets the list of paths that will be extracted when the report is
+        extracted. The required paths of the report are always
+        extracted. If None then the whole report is extracted.
+
+        Reports that include other reports are always fully extracted.
+
+        @param listOfPaths: A list of paths(wildcards are allowed) that
+        will be extracted.
+        @type listOfPaths: Array
+        """
+        self.__extractionPaths = listOfPaths
+
+    def setVirtual(self, isVirtual):
+        """
+        If True then only the required paths are extracted when the
+        report is extracted and the files are read straight from the
+        report file, until the rest of the report is extracted. A
+        file is only written to the extracted report when a path to the
+        file is requested.
+
+        Reports that include other reports are always fully extracted.
+
+        @param isVirtual: If True then the files are read straight from
+        the report file.
+        @type isVirtual: Boolean
+        """
+        self.__isVirtual = isVirtual
+
+    def setFileDataCacheSize(self, maxSize):
+        """
+        Sets the maximum number of bytes of file data that is cached for
+        the report. The least recently read files are removed from the
+        cache when the cache is full. If 0 then no file data is cached.
+
+        @param maxSize: The maximum number of bytes of file data that is
+        cached.
+        @type maxSize: Int
+        """
+        self.__fileDataCache.setMaxSize(maxSize)
+
+    def setReportCacheEnabled(self, isReportCacheEnabled):
+        """
+        If True then the objects that are generated from the data in the
+        report are stored in a cache file next to the extracted report
+        and are loaded from the file the next time the extracted report is
+        used if the files they were generated from have not changed. The
+        cache file is not used when the files are read straight from the
+        report file.
+
+        @param isReportCacheEnabled: If True then the cache file is used.
+        @type isReportCacheEnabled: Boolean
+        """
+        self.__isReportCacheEnabled = isReportCacheEnabled
+
+    def isVirtual(self):
+        """
+        Returns True if the files are read straight from the report file
+        when the report is not fully extracted.
+
+        @return: Returns True if the files are read straight from the
+        report file when the report is not fully extracted.
+        @rtype: Boolean
+        """
+        return self.__isVirtual
+
+    def isPartiallyExtracted(self):
+        """
+        Returns True if only part of the report was extracted.
+
+        @return: Returns True if only part of the report was extracted.
+        @rtype: Boolean
+        """
+        return self.__isPartiallyExtracted
+
+    def getExtractor(self):
+        """
+        Returns the extractor for the file that the report was extracted
+        from. None is returned if not known.
+
+        @return: Returns the extractor for the report file.
+        @rtype: Extractor
+        """
+        return self.__extractor
+
+    def setExtractor(self, extractor):
+        """
+        Sets the extractor for the file the report was extracted from,
+        which is used if the rest of the report needs to be extracted.
+        This should be called if the report file is moved.
+
+        @param extractor: The extractor for the report file.
+        @type extractor: Extractor
+        """
+        self.__reportArchiveLock.acquire()
+        try:
+            self.__extractor = extractor
+            self.__reportArchive = None
+        finally:
+            self.__reportArchiveLock.release()
+        if (self.isPartiallyExtracted()):
+            self.__writePartialExtractionFile()
+
+    def __getReportArchive(self):
+        """
+        Returns the view of the files in the report file. The view is
+        created the first time it is requested.
+
+        @return: Returns the view of the files in the report file.
+        @rtype: ReportArchive
+        """
+        self.__reportArchiveLock.acquire()
+        try:
+            if (self.__reportArchive == None):
+                self.__reportArchive = ReportArchive(self.__extractor, self.__stripDirectoriesDepth)
+            return self.__reportArchive
+        finally:
+            self.__reportArchiveLock.release()
+
+    def __getPathToPartialExtractionFile(self):
+        """
+        Returns the path to the file that records that the report was
+        partially extracted. The file is next to the extracted report
+        directory and contains the path to the report file.
+
+        @return: Returns the path to the file that records that the
+        report was partially extracted.
+        @rtype: String
+        """
+        (head, tail) = os.path.split(self.__pathToExtractedReport)
+        return os.path.join(head, ".%s.partial" %(tail))
+
+    def __writePartialExtractionFile(self):
+        """
+        Writes the path to the report file to the file that records that
+        the report was partially extracted.
+        """
+        pathToPartialExtractionFile = self.__getPathToPartialExtractionFile()
+        try:
+            fout = open(pathToPartialExtractionFile, "w")
+            fout.write("%s\n" %(self.__extractor.getPathToFile()))
+            fout.close()
+        except (IOError, os.error):
+            message = "There was an error writing the file: %s." %(pathToPartialExtractionFile)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+
+    def loadPartialExtraction(self, includeUserExtractors=True):
+        """
+        If the report that was previously extracted was only partially
+        extracted then the extractor for the report file is loaded, so
+        that the rest of the report can be extracted if needed.
+
+        @return: Returns True if the report was partially extracted.
+        @rtype: Boolean
+
+        @param includeUserExtractors: This will enable user written
+        extractors to be used.
+        @type includeUserExtractors: Boolean
+        """
+        pathToPartialExtractionFile = self.__getPathToPartialExtractionFile()
+        if (not os.path.isfile(pathToPartialExtractionFile)):
+            return False
+        try:
+            fin = open(pathToPartialExtractionFile, "r")
+            pathToFile = fin.read().strip()
+            fin.close()
+        except (IOError, os.error):
+            message = "There was an error reading the file: %s." %(pathToPartialExtractionFile)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+            return False
+        extractor = ExtractorsLoader().getExtractor(pathToFile, includeUserExtractors)
+        if (extractor == None):
+            message = "The rest of the report cannot be extracted because the report file does not exist: %s." %(pathToFile)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).warning(message)
+            return False
+        self.__extractor = extractor
+        self.__isPartiallyExtracted = True
+        self.__isReadFromArchive = self.__isVirtual
+        return True
+
+    def __writeManifest(self, extractor):
+        """
+        Writes the manifest that the extractor built while the whole
+        report file was extracted to the manifest file next to the
+        extracted report(see ArchiveManifest).
+
+        @param extractor: The extractor that extracted the whole report
+        file.
+        @type extractor: Extractor
+        """
+        manifest = extractor.getManifest()
+        if (manifest == None):
+            return
+        message = "The manifest for the %s has %d files and the %s digest of the report file is: %s" %(self.getName(), len(manifest.getPaths()),
+                                                                                                    ArchiveManifest.HASH_NAME,
+                                                                                                    manifest.getArchiveDigest())
+        logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+        if (manifest.write(ArchiveManifest.getPathToManifestFile(self.__pathToExtractedReport))):
+            self.__manifestLock.acquire()
+            try:
+                self.__manifest = manifest
+            finally:
+                self.__manifestLock.release()
+            FileDigestTable.getFileDigestTable().addManifest(self.__pathToExtractedReport, manifest)
+
+    def getManifest(self):
+        """
+        Returns the manifest of the report file that contains the digest
+        of the report file and each file that was extracted. The
+        manifest is read from the file next to the extracted report the
+        first time it is requested and added to the FileDigestTable that
+        is shared in the process. None is returned if there is no
+        manifest.
+
+        @return: Returns the manifest of the report file.
+        @rtype: ArchiveManifest
+        """
+        self.__manifestLock.acquire()
+        try:
+            if ((self.__manifest == None) and (len(self.__pathToExtractedReport) > 0)):
+                self.__manifest = ArchiveManifest.read(ArchiveManifest.getPathToManifestFile(self.__pathToExtractedReport))
+                if (not self.__manifest == None):
+                    FileDigestTable.getFileDigestTable().addManifest(self.__pathToExtractedReport, self.__manifest)
+            return self.__manifest
+        finally:
+            self.__manifestLock.release()
+
+    def extractAll(self):
+        """
+        Extracts the rest of the report if only part of the report was
+        extracted.
+
+        @return: Returns True if the whole report is extracted.
+        @rtype: Boolean
+        """
+        self.__extractionLock.acquire()
+        try:
+            if (self.__isPartiallyExtracted):
+                message = "Extracting the rest of the %s: %s" %(self.getName(), self.__extractor.getPathToFile())
+                logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
+                isExtracted = self.__extractor.extract(self.__pathToExtractedReport, self.__stripDirectoriesDepth)
+                # Only try once so that a report that cannot be extracted
+                # is not extracted for each file that is requested.
+                self.__isPartiallyExtracted = False
+                self.__resetPathIndex()
+                if (isExtracted):
+                    # The files that were extracted can be read now.
+                    self.__isReadFromArchive = False
+                    self.__writeManifest(self.__extractor)
+                    try:
+                        os.remove(self.__getPathToPartialExtractionFile())
+                    except (IOError, os.error):
+                        pass
+                else:
+                    message = "There was an error extracting the rest of the report: %s." %(self.__extractor.getPathToFile())
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                    return False
+            return True
+        finally:
+            self.__extractionLock.release()
+
+    def startBackgroundExtraction(self):
+        """
+        Starts extracting the rest of the report in the background if
+        only part of the report was extracted.
+
+        @return: Returns True if the extraction was started.
+        @rtype: Boolean
+        """
+        if ((not self.__isPartiallyExtracted) or (not self.__backgroundExtractionThread == None)):
+            return False
+        self.__backgroundExtractionThread = threading.Thread(target=self.extractAll)
+        self.__backgroundExtractionThread.start()
+        return True
+
+    def waitForBackgroundExtraction(self):
+        """
+        Waits for the extraction that was started in the background to
+        finish. It is safe to call this function if there is no
+        extraction in the background.
+        """
+        if (not self.__backgroundExtractionThread == None):
+            self.__backgroundExtractionThread.join()
+            self.__backgroundExtractionThread = None
+
+    def __materializePath(self, pathToFile):
         """
-        @param name: The name of the report.
-        @type name: String
-        @param description: A description of the report.
-        @type description: String
-        @param stripDirectoriesDepth: This value will strip the root
-        directories of the report to a depth that is given. Default is 1.
-        @type stripDirectoriesDepth: Int
+        Extracts the path(and all the paths under it if a directory)
+        from the report file if the path has not been extracted and the
+        files are read straight from the report file. If the rest of
+        the report is being extracted then this function waits for the
+        extraction to finish.
+
+        @param pathToFile: The path to the file or directory, which is
+        relative to the root report directory.
+        @type pathToFile: String
         """
-        self.__name = name
-        self.__description = description
-        # The Default is 1 for how many directories need to be
-        # removed.
-        self.__stripDirectoriesDepth = stripDirectoriesDepth
+        self.__extractionLock.acquire()
+        try:
+            if ((not self.__isPartiallyExtracted) or
+                (os.path.lexists(os.path.join(self.__pathToExtractedReport, pathToFile)))):
+                return
+            reportArchive = self.__getReportArchive()
+            resolvedPath = reportArchive.resolvePath(pathToFile)
+            if ((resolvedPath == None) or (not reportArchive.exists(resolvedPath))):
+                return
+            message = "Extracting the path from the %s: %s" %(self.getName(), pathToFile)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            listOfPatterns = [ReportArchive.escapePath(pathToFile.strip().strip("/")),
+                              ReportArchive.escapePath(resolvedPath)]
+            if (not self.__extractor.extract(self.__pathToExtractedReport, self.__stripDirectoriesDepth, listOfPatterns)):
+                message = "There was an error extracting the path from the report: %s." %(pathToFile)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+        finally:
+            self.__extractionLock.release()
 
-        self.__pathToExtractedReport = ""
-        self.__pathToTmpExtractedReport = ""
+    def __ensureExtracted(self, pathToFile, isDir=False):
+        """
+        If only part of the report was extracted and the path was not
+        extracted(or a file in the directory was not extracted) but
+        the path is in the report file, then the rest of the report is
+        extracted.
 
-    def __str__(self) :
+        @param pathToFile: The path to the file or directory, which is
+        relative to the root report directory.
+        @type pathToFile: String
+        @param isDir: If True then all the files in the directory have to
+        be extracted.
+        @type isDir: Boolean
         """
-        Returns a formatted string of this object.
+        if ((not self.__isPartiallyExtracted) or (self.__isReadFromArchive)):
+            return
+        pathToFile = pathToFile.strip().strip("/")
+        reportArchive = self.__getReportArchive()
+        isExtractionRequired = False
+        if (not os.path.lexists(os.path.join(self.__pathToExtractedReport, pathToFile))):
+            # Check if the path is in the report file.
+            isExtractionRequired = reportArchive.exists(pathToFile)
+        elif (isDir):
+            # Check that all the paths under the directory were extracted.
+            for archivedPath in reportArchive.getPathsUnder(pathToFile):
+                if (not os.path.lexists(os.path.join(self.__pathToExtractedReport, archivedPath))):
+                    isExtractionRequired = True
+                    break
+        if (isExtractionRequired):
+            message = "The path was not extracted from the report: %s" %(pathToFile)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            self.extractAll()
 
-        @return: Returns a formatted string of this object.
-        @rtype: String
+    def __getPathIndex(self):
         """
-        return "%s: %s" %(self.getName(), self.getDescription())
+        Returns the index of the paths in the extracted report. The index
+        is built the first time it is needed. None is returned if only
+        part of the report is extracted, since the files in the extracted
+        report change as the rest of the report is extracted.
 
-    def getName(self) :
+        @return: Returns the index of the paths in the extracted report.
+        @rtype: ReportPathIndex
         """
-        Returns name of the report.
+        if ((self.__isPartiallyExtracted) or (self.__isReadFromArchive) or
+            (not len(self.__pathToExtractedReport) > 0)):
+            return None
+        self.__pathIndexLock.acquire()
+        try:
+            if ((self.__pathIndex == None) and (os.path.isdir(self.__pathToExtractedReport))):
+                self.__pathIndex = ReportPathIndex(self.__pathToExtractedReport)
+                message = "The index of the %d paths in the %s was built: %s" %(len(self.__pathIndex), self.getName(), self.__pathToExtractedReport)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return self.__pathIndex
+        finally:
+            self.__pathIndexLock.release()
 
-        @return: Returns name of the report.
-        @rtype: String
+    def __getPathIndexFor(self, pathToFile):
         """
-        return self.__name
+        Returns the index of the paths in the extracted report if the
+        index can answer for the path, else None is returned and the
+        path is checked on the filesystem.
 
-    def getDescription(self) :
+        @return: Returns the index of the paths in the extracted report
+        if the index can answer for the path.
+        @rtype: ReportPathIndex
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
         """
-        Returns description of the report.
+        pathIndex = self.__getPathIndex()
+        if ((not pathIndex == None) and (pathIndex.isIndexed(pathToFile))):
+            return pathIndex
+        return None
 
-        @return: Returns description of the report.
-        @rtype: String
+    def __resetPathIndex(self):
         """
-        return self.__description
+        Removes the index of the paths in the extracted report, so the
+        index is built again the next time it is needed.
+        """
+        self.__pathIndexLock.acquire()
+        try:
+            self.__pathIndex = None
+            self.__resolvedFileAliasesMap = {}
+        finally:
+            self.__pathIndexLock.release()
 
-    def getPathToExtractedReport(self) :
+    def __getReportCache(self):
         """
-        This function returns the path to the extracted report.
+        Returns the cache file for the extracted report. None is returned
+        if the cache file is not enabled or the files are read straight
+        from the report file.
 
-        @return: Returns the path to the extracted report.
-        @rtype: String
+        @return: Returns the cache file for the extracted report.
+        @rtype: ReportCache
         """
-        return self.__pathToExtractedReport
+        if ((not self.__isReportCacheEnabled) or (self.__isReadFromArchive) or
+            (not len(self.__pathToExtractedReport) > 0)):
+            return None
+        self.__artifactsLock.acquire()
+        try:
+            if (self.__reportCache == None):
+                self.__reportCache = ReportCache(self.__pathToExtractedReport)
+            return self.__reportCache
+        finally:
+            self.__artifactsLock.release()
 
-    def getType(self) :
+    def __recordPathsRead(self, listOfPaths):
         """
-        This function returns the class name of this report.
+        Adds the paths to the paths that were read for each object that
+        is being generated by the current thread.
 
-        @return: The class name of the report.
-        @rtype: String
+        @param listOfPaths: The list of paths, which are relative to the
+        root report directory.
+        @type listOfPaths: Array
         """
-        return self.__class__.__name__
+        pathsReadMaps = getattr(self.__pathsReadRecorder, "pathsReadMaps", None)
+        if (not pathsReadMaps):
+            return
+        for pathToFile in listOfPaths:
+            pathToFile = posixpath.normpath(pathToFile.strip().strip("/"))
+            for pathsReadMap in pathsReadMaps:
+                pathsReadMap[pathToFile] = True
 
-    def setPathToExtractedReport(self, pathToExtractedReport):
+    def getArtifact(self, name, generateFunction):
         """
-        This is helper function that will set the paths for
-        extracted report path and temp extracted report path.
+        Returns the object that was generated from the data in this
+        report for the name. The object is generated by calling
+        generateFunction with this report the first time the name is
+        requested and then the same object is returned to every caller
+        after that, so the data is only parsed once no matter how many
+        plugins use it. The objects should not be changed by the
+        callers.
 
-        @param pathToExtractedReport: Path to the extracted report.
-        @type pathToExtractedReport: String
+        If the cache file is enabled then the object is loaded from the
+        cache file if none of the paths that were read to generate it
+        have changed, otherwise the object is generated and stored in the
+        cache file.
+
+        If generateFunction raises an exception then nothing is stored
+        for the name.
+
+        @return: Returns the object that was generated from the data in
+        this report for the name.
+        @rtype: Object
+
+        @param name: The unique name of the object.
+        @type name: String
+        @param generateFunction: The function that is called with this
+        report to generate the object.
+        @type generateFunction: Function
         """
-        self.__pathToExtractedReport = pathToExtractedReport
-        (head, tail) = os.path.split(self.__pathToExtractedReport)
-        self.__pathToTmpExtractedReport = os.path.join(head, ".%s" %(tail))
+        self.__artifactsLock.acquire()
+        try:
+            if (not self.__artifactsMap.has_key(name)):
+                self.__artifactsMap[name] = [threading.Lock(), False, None, []]
+            artifactEntry = self.__artifactsMap.get(name)
+        finally:
+            self.__artifactsLock.release()
+        artifactEntry[0].acquire()
+        try:
+            if (not artifactEntry[1]):
+                reportCache = self.__getReportCache()
+                cachedArtifact = None
+                if (not reportCache == None):
+                    cachedArtifact = reportCache.getArtifact(name)
+                if (not cachedArtifact == None):
+                    message = "Loaded the %s for the %s from the cache: %s" %(name, self.getName(), self.__pathToExtractedReport)
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                    (artifactEntry[2], artifactEntry[3]) = cachedArtifact
+                else:
+                    message = "Generating the %s for the %s: %s" %(name, self.getName(), self.__pathToExtractedReport)
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                    # Record the paths that are read while the object is
+                    # generated.
+                    pathsReadMap = {}
+                    if (not hasattr(self.__pathsReadRecorder, "pathsReadMaps")):
+                        self.__pathsReadRecorder.pathsReadMaps = []
+                    self.__pathsReadRecorder.pathsReadMaps.append(pathsReadMap)
+                    try:
+                        artifactEntry[2] = generateFunction(self)
+                    finally:
+                        self.__pathsReadRecorder.pathsReadMaps.remove(pathsReadMap)
+                    artifactEntry[3] = pathsReadMap.keys()
+                    # The paths have to be checked on disk so the object is
+                    # not stored if the files were read from the report file.
+                    if ((not reportCache == None) and (not self.__isReadFromArchive)):
+                        reportCache.setArtifact(name, artifactEntry[2], artifactEntry[3])
+                artifactEntry[1] = True
+            # If this object is used to generate another object then the
+            # other object depends on the same paths.
+            self.__recordPathsRead(artifactEntry[3])
+            return artifactEntry[2]
+        finally:
+            artifactEntry[0].release()
 
     def includesOtherReports(self):
         """
@@ -146,6 +1960,24 @@ class Report:
         Remove the temporary location of files that were copied from
         extracted report.
         """
+        if (self.__fileDataCache.getHits() + self.__fileDataCache.getMisses() > 0):
+            message = "The file data cache for the %s had %d hits and %d misses(%d files removed) and saved reading %d bytes: %s" %(self.getName(),
+                                                                                                                               self.__fileDataCache.getHits(),
+                                                                                                                               self.__fileDataCache.getMisses(),
+                                                                                                                               self.__fileDataCache.getEvictions(),
+                                                                                                                               self.__fileDataCache.getSizeSaved(),
+                                                                                                                               self.__pathToExtractedReport)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+        self.__fileDataCache.clear()
+        self.__artifactsLock.acquire()
+        try:
+            if (not self.__reportCache == None):
+                self.__reportCache.setReportName(self.getName())
+                self.__reportCache.save()
+                self.__reportCache = None
+            self.__artifactsMap.clear()
+        finally:
+            self.__artifactsLock.release()
         if os.path.exists(self.__pathToTmpExtractedReport):
             try:
                 shutil.rmtree(self.__pathToTmpExtractedReport)
@@ -156,19 +1988,168 @@ class Report:
     # ##########################################################################
     # Extract File/Data from extracted sreports functions
     # ##########################################################################
+    def __exists(self, pathToFile):
+        """
+        Returns True if the path exists in the report.
+
+        @return: Returns True if the path exists in the report.
+        @rtype: Boolean
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        self.__recordPathsRead([pathToFile])
+        if (self.__isReadFromArchive):
+            return self.__getReportArchive().exists(pathToFile)
+        pathIndex = self.__getPathIndexFor(pathToFile)
+        if (not pathIndex == None):
+            return pathIndex.exists(pathToFile)
+        return os.path.exists(os.path.join(self.__pathToExtractedReport, pathToFile))
+
+    def __isDir(self, pathToDir):
+        """
+        Returns True if the path is a directory in the report.
+
+        @return: Returns True if the path is a directory in the report.
+        @rtype: Boolean
+
+        @param pathToDir: The path to the directory, which is relative to
+        the root report directory.
+        @type pathToDir: String
+        """
+        self.__recordPathsRead([pathToDir])
+        if (self.__isReadFromArchive):
+            return self.__getReportArchive().isDir(pathToDir)
+        pathIndex = self.__getPathIndexFor(pathToDir)
+        if (not pathIndex == None):
+            return pathIndex.isDir(pathToDir)
+        return os.path.isdir(os.path.join(self.__pathToExtractedReport, pathToDir))
+
+    def __isFile(self, pathToFile):
+        """
+        Returns True if the path is a regular file in the report.
+
+        @return: Returns True if the path is a regular file in the
+        report.
+        @rtype: Boolean
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        self.__recordPathsRead([pathToFile])
+        if (self.__isReadFromArchive):
+            return self.__getReportArchive().isFile(pathToFile)
+        pathIndex = self.__getPathIndexFor(pathToFile)
+        if (not pathIndex == None):
+            return pathIndex.isFile(pathToFile)
+        return os.path.isfile(os.path.join(self.__pathToExtractedReport, pathToFile))
+
+    def __listDir(self, pathToDir):
+        """
+        Returns a list of the names of the files in the directory. Empty
+        list is returned if the path is not a directory.
+
+        @return: Returns a list of the names of the files in the
+        directory.
+        @rtype: Array
+
+        @param pathToDir: The path to the directory, which is relative to
+        the root report directory.
+        @type pathToDir: String
+        """
+        self.__recordPathsRead([pathToDir])
+        if (self.__isReadFromArchive):
+            return self.__getReportArchive().listDir(pathToDir)
+        pathIndex = self.__getPathIndexFor(pathToDir)
+        if ((not pathIndex == None) and (pathIndex.isDir(pathToDir))):
+            return pathIndex.listDir(pathToDir)
+        fullPathToDir = os.path.join(self.__pathToExtractedReport, pathToDir)
+        try:
+            return os.listdir(fullPathToDir)
+        except OSError:
+            message = "There was an error getting a directory list for reports: %s." %(fullPathToDir)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).warn(message)
+        return []
+
     def getFileListing(self, pathToDir):
         """
         Returns a list of file path for all the files in the directory. If no
         files are found in directory or is a file then empty list is
         returned. Hidden files are not returned in the listing.
+
+        If the files are read straight from the report file then the
+        files might not have been extracted to the paths yet.
         """
         listOfFiles = []
-        fullPathToDir = self.getPathForFile(pathToDir)
-        if ((os.path.isdir(fullPathToDir)) and (len(fullPathToDir) > 0)):
-            for filename in os.listdir(fullPathToDir):
+        self.__ensureExtracted(pathToDir, True)
+        if ((len(pathToDir) > 0) and (self.__isDir(pathToDir))):
+            fullPathToDir = os.path.join(self.__pathToExtractedReport, pathToDir).strip()
+            for filename in self.__listDir(pathToDir):
                 listOfFiles.append(os.path.join(fullPathToDir, filename))
         return listOfFiles
 
+    def glob(self, pattern):
+        """
+        Returns the paths in the report that match the glob pattern. A
+        "*" matches any characters in a name and "**" matches any number
+        of directories, for example:
+        report.glob("sos_commands/**/dmsetup*")
+
+        The paths are found in the index of the paths in the report, so
+        the files are not checked on the filesystem. If only part of the
+        report was extracted then the paths in the report file are
+        matched, so paths that were not extracted yet can be returned.
+        The paths under symbolic links to directories are not matched.
+
+        @return: Returns a sorted list of the paths that match the
+        pattern, which are relative to the root report directory.
+        @rtype: Array
+
+        @param pattern: The glob pattern, which is relative to the root
+        report directory.
+        @type pattern: String
+        """
+        if (not len(pattern.strip().strip("/")) > 0):
+            return []
+        if ((self.__isPartiallyExtracted) or (self.__isReadFromArchive)):
+            listOfPaths = self.__getReportArchive().glob(pattern)
+        else:
+            pathIndex = self.__getPathIndex()
+            if (pathIndex == None):
+                return []
+            listOfPaths = pathIndex.glob(pattern)
+        self.__recordPathsRead([ReportPathMatcher.getLiteralPrefix(pattern)] + listOfPaths)
+        return listOfPaths
+
+    def getDataFromGlob(self, pattern):
+        """
+        Returns a dictionary that contains the data for every file in the
+        report that matches the glob pattern(see glob()). The
+        directories are searched recursively when the pattern has "**".
+        Example:
+        dmsetupDataMap = report.getDataFromGlob("sos_commands/**/dmsetup*")
+
+        @return: Returns a dictionary that contains the data for all the
+        files that match the pattern. The path to the file that is
+        relative to the root report directory is the key and the data in
+        the file is the value.
+        @rtype: Dictionary
+
+        @param pattern: The glob pattern, which is relative to the root
+        report directory.
+        @type pattern: String
+        """
+        fileDataMap = {}
+        for pathToFile in self.glob(pattern):
+            self.__ensureExtracted(pathToFile)
+            if (self.__isFile(pathToFile)):
+                currentData = self.getDataFromFile(pathToFile)
+                if (not currentData == None):
+                    fileDataMap[pathToFile] = currentData
+        return fileDataMap
+
     def getDataFromFile(self, pathToFile) :
         """
         This function will return the data in an array. Where each
@@ -177,6 +2158,176 @@ class Report:
 
         None is returned if no file is found.
 
+        The data is cached so a file is only read once unless the file
+        was removed from the cache to make room for other files.
+
+        @return: Returns an array of Strings, where each newline in
+        file is an item in the array.
+        @rtype: Array
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        if (not len(pathToFile) > 0):
+            return None
+        key = posixpath.normpath(pathToFile.strip().strip("/"))
+        self.__recordPathsRead([key])
+        data = self.__fileDataCache.get(key)
+        if (data == None):
+            data = self.__readDataFromFile(pathToFile)
+            if (data == None):
+                return None
+            size = 0
+            for line in data:
+                size += len(line)
+            self.__fileDataCache.put(key, data, size)
+        # A copy is returned so that the cached data is not changed.
+        return list(data)
+
+    def getFileAliases(self):
+        """
+        Returns the map of the logical names of files to the list of
+        paths that the file can be found at in this type of report.
+
+        @return: Returns the map of the logical names of files to the
+        list of paths that the file can be found at.
+        @rtype: Dictionary
+        """
+        return self.FILE_ALIASES
+
+    def resolveFileAlias(self, aliasName):
+        """
+        Returns the path to the file for the logical name of the
+        file(see getFileAliases()), so the plugins do not have to try
+        each path the file could be at. The first path that is a file
+        that is not empty is used, else the first path that is a file is
+        used. The path is only found once for each report and then the
+        same path is returned. Empty string is returned if the name is
+        not known or no file was found.
+
+        @return: Returns the path to the file, which is relative to the
+        root report directory.
+        @rtype: String
+
+        @param aliasName: The logical name of the file, for example:
+        "installed_rpms".
+        @type aliasName: String
+        """
+        pathToFile = self.__resolvedFileAliasesMap.get(aliasName)
+        if (not pathToFile == None):
+            self.__recordPathsRead([pathToFile])
+            return pathToFile
+        listOfPaths = self.getFileAliases().get(aliasName)
+        if (listOfPaths == None):
+            message = "The %s does not have a file with the name: %s" %(self.getName(), aliasName)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+            return ""
+        pathToFile = ""
+        for currentPath in listOfPaths:
+            self.__ensureExtracted(currentPath)
+            if (self.__isFile(currentPath)):
+                if (self.getFileSize(currentPath) > 0):
+                    pathToFile = currentPath
+                    break
+                elif (not len(pathToFile) > 0):
+                    pathToFile = currentPath
+        self.__resolvedFileAliasesMap[aliasName] = pathToFile
+        return pathToFile
+
+    def getDataFromFileAlias(self, aliasName):
+        """
+        Returns the data in the file for the logical name of the
+        file(see resolveFileAlias()). None is returned if no file was
+        found.
+
+        @return: Returns an array of Strings, where each newline in
+        file is an item in the array.
+        @rtype: Array
+
+        @param aliasName: The logical name of the file, for example:
+        "installed_rpms".
+        @type aliasName: String
+        """
+        pathToFile = self.resolveFileAlias(aliasName)
+        if (not len(pathToFile) > 0):
+            return None
+        return self.getDataFromFile(pathToFile)
+
+    def getDataFromFiles(self, listOfPaths):
+        """
+        Returns a dictionary that contains the data for a list of files.
+        The files are read at the same time, so the reads are not done
+        one after another when the report is on a slow filesystem.
+
+        Each item in the list is either a path, the logical name of a
+        file(see resolveFileAlias()) or a list of paths that are tried in
+        order until a file is found. The first path(or the logical name)
+        of each item is the key in the dictionary and the value is the
+        data in the first file that was found for the item or None if no
+        file was found. Example:
+        filesDataMap = report.getDataFromFiles(["etc/fstab", "mount_list", ["chkconfig", "sos_commands/startup/chkconfig_--list"]])
+        mountData = filesDataMap.get("mount_list")
+
+        @return: Returns a dictionary that contains the data for each
+        item, where the first path of the item is the key and the value
+        is an array of Strings, where each newline in file is an item in
+        the array.
+        @rtype: Dictionary
+
+        @param listOfPaths: The list of paths(or lists of paths that are
+        tried in order), which are relative to the root report
+        directory.
+        @type listOfPaths: Array
+        """
+        fileDataMap = {}
+        # Map of the key of each item to the paths that have not been tried.
+        alternativePathsMap = {}
+        for paths in listOfPaths:
+            if ((isinstance(paths, basestring)) and (self.getFileAliases().has_key(paths))):
+                fileDataMap[paths] = None
+                pathToFile = self.resolveFileAlias(paths)
+                if (len(pathToFile) > 0):
+                    alternativePathsMap[paths] = [pathToFile]
+                continue
+            elif (isinstance(paths, basestring)):
+                paths = [paths]
+            if ((len(paths) > 0) and (not fileDataMap.has_key(paths[0]))):
+                fileDataMap[paths[0]] = None
+                alternativePathsMap[paths[0]] = list(paths)
+        listOfPathsRead = []
+        # The next path of each item that was not found is read on each
+        # pass, so a path is only read if the paths before it were not
+        # found.
+        while (len(alternativePathsMap) > 0):
+            currentPathsMap = {}
+            listOfPathsToRead = []
+            for key in alternativePathsMap.keys():
+                pathToFile = alternativePathsMap.get(key).pop(0)
+                currentPathsMap[key] = pathToFile
+                if (not pathToFile in listOfPathsToRead):
+                    listOfPathsToRead.append(pathToFile)
+            workerPool = WorkerPool(min(Report.READ_AHEAD_WORKER_COUNT, len(listOfPathsToRead)))
+            dataMap = dict(zip(listOfPathsToRead, workerPool.map(self.getDataFromFile, listOfPathsToRead)))
+            listOfPathsRead += listOfPathsToRead
+            for key in currentPathsMap.keys():
+                data = dataMap.get(currentPathsMap.get(key))
+                if (not data == None):
+                    fileDataMap[key] = data
+                if ((not data == None) or (not len(alternativePathsMap.get(key)) > 0)):
+                    del alternativePathsMap[key]
+        # The paths are read by the worker threads, so the paths are
+        # recorded for the objects that are being generated by this
+        # thread.
+        self.__recordPathsRead(listOfPathsRead)
+        return fileDataMap
+
+    def __readDataFromFile(self, pathToFile) :
+        """
+        Returns the data in the file in an array, where each newline in
+        file is a seperate item in the array. None is returned if no
+        file is found.
+
         @return: Returns an array of Strings, where each newline in
         file is an item in the array.
         @rtype: Array
@@ -185,6 +2336,10 @@ class Report:
         the root report directory.
         @type pathToFile: String
         """
+        if (self.__isReadFromArchive):
+            if (not len(pathToFile) > 0):
+                return None
+            return self.__getReportArchive().getDataFromFile(pathToFile)
         pathToFile = self.getPathForFile(pathToFile)
         if (len(pathToFile) > 0) :
             try:
@@ -199,27 +2354,146 @@ class Report:
                 fin.close()
         return None
 
-    def __getPathForDir(self, pathToDir):
+    def __iterateLines(self, fin):
+        """
+        Yields each line in the file and closes the file when all the
+        lines were read or the iterator is closed.
+
+        @param fin: The open file that the lines are read from.
+        @type fin: File
+        """
+        try:
+            for line in fin:
+                yield line
+        finally:
+            fin.close()
+
+    def getLineIterator(self, pathToFile):
         """
-        This function will return the path to the directory. If
-        the directory does not exist then empty string is returned.
+        Returns an iterator over the lines in the file. The lines are
+        read from the file as the iterator is used, so only one line is
+        in memory at a time no matter how large the file is. This should
+        be used instead of getDataFromFile() on files that could be large
+        like log files, so the file is not read into memory.
+
+        None is returned if no file is found.
 
-        This function will not make a copy of the directory. Will only
-        return a path to the orginal dir.
+        If the data of the file is in the cache then the iterator is
+        over the cached data.
 
-        @return: Returns the path to the directory. Empty string
-        is returned if no directory is found.
+        @return: Returns an iterator over the lines in the file.
+        @rtype: Iterator
 
-        @param pathToDir: The path to the file, which is relative to
+        @param pathToFile: The path to the file, which is relative to
         the root report directory.
-        @type pathToDir: String
+        @type pathToFile: String
         """
-        if (len(pathToDir) > 0):
-            src = os.path.join(self.__pathToExtractedReport, pathToDir).strip()
-            if (os.path.isdir(src)):
-                return src
-        # This function will not make a copy of the directory.
-        return ""
+        if (not len(pathToFile) > 0):
+            return None
+        key = posixpath.normpath(pathToFile.strip().strip("/"))
+        data = self.__fileDataCache.get(key)
+        if (not data == None):
+            self.__recordPathsRead([key])
+            return iter(data)
+        # If the files are read straight from the report file then only
+        # the file is extracted so that it can be read a line at a time.
+        pathToFile = self.getPathForFile(pathToFile)
+        if ((len(pathToFile) > 0) and (os.path.isfile(pathToFile))):
+            try:
+                return self.__iterateLines(open(pathToFile, "r"))
+            except (IOError, os.error):
+                message = "An error occured reading the file: %s." %(pathToFile)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+        return None
+
+    def getHeadOfFile(self, pathToFile, lineCount=10):
+        """
+        Returns the first lines in the file. Only the lines that are
+        returned are read from the file.
+
+        None is returned if no file is found.
+
+        @return: Returns an array of Strings that are the first lines in
+        the file.
+        @rtype: Array
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        @param lineCount: The maximum number of lines that are returned.
+        @type lineCount: Int
+        """
+        lineIterator = self.getLineIterator(pathToFile)
+        if (lineIterator == None):
+            return None
+        data = list(itertools.islice(lineIterator, max(lineCount, 0)))
+        if (hasattr(lineIterator, "close")):
+            lineIterator.close()
+        return data
+
+    def getTailOfFile(self, pathToFile, lineCount=10):
+        """
+        Returns the last lines in the file. The file is read backwards
+        from the end of the file until there are enough lines, so the
+        rest of the file is not read.
+
+        None is returned if no file is found.
+
+        @return: Returns an array of Strings that are the last lines in
+        the file.
+        @rtype: Array
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        @param lineCount: The maximum number of lines that are returned.
+        @type lineCount: Int
+        """
+        if (not len(pathToFile) > 0):
+            return None
+        key = posixpath.normpath(pathToFile.strip().strip("/"))
+        data = self.__fileDataCache.get(key)
+        if (not data == None):
+            self.__recordPathsRead([key])
+        else:
+            pathToFile = self.getPathForFile(pathToFile)
+            if ((not len(pathToFile) > 0) or (not os.path.isfile(pathToFile))):
+                return None
+            elif ((not lineCount > 0) or (not os.path.getsize(pathToFile) > 0)):
+                return []
+            data = FileUtil.tail(pathToFile, lineCount, 64 * 1024)
+        if (not lineCount > 0):
+            return []
+        return list(data[-lineCount:])
+
+    def getFileView(self, pathToFile):
+        """
+        Returns a read only view of the file that is mapped into memory,
+        so a large file can be searched and only the lines that are
+        needed are copied(see ReportFileView). The view should be closed
+        when it is no longer used.
+
+        None is returned if no file is found.
+
+        @return: Returns a read only view of the file.
+        @rtype: ReportFileView
+
+        @param pathToFile: The path to the file, which is relative to
+        the root report directory.
+        @type pathToFile: String
+        """
+        if (not len(pathToFile) > 0):
+            return None
+        # If the files are read straight from the report file then only
+        # the file is extracted so that it can be mapped.
+        pathToFile = self.getPathForFile(pathToFile)
+        if ((len(pathToFile) > 0) and (os.path.isfile(pathToFile))):
+            try:
+                return ReportFileView(pathToFile)
+            except (IOError, os.error):
+                message = "An error occured reading the file: %s." %(pathToFile)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+        return None
 
     def getDataFromDir(self, pathToDir):
         """
@@ -243,7 +2517,7 @@ class Report:
         @type pathToDir: String
         """
         fileDataMap = {}
-        fullPathToDir = self.getPathForFile(pathToDir)
+        self.__ensureExtracted(pathToDir.rstrip('/*'), True)
         # If a directory is requested with ending astericks then get all the
         # files in its subdirectories and root directory.
         if (pathToDir.endswith('/*')):
@@ -251,40 +2525,28 @@ class Report:
             # can go 1 sub directory deep to get any files that exists in root
             # of the directory and in its sub directories.
             pathToDirMod = pathToDir.rstrip('/*')
-            fullPathToDir = self.__getPathForDir(pathToDirMod)
-            if (os.path.exists(fullPathToDir)):
-                dirList = os.listdir(fullPathToDir)
-                for currentFilename in dirList:
-                    fullPathToCurrentFilename = os.path.join(fullPathToDir, currentFilename)
-                    if (os.path.isdir(fullPathToCurrentFilename)):
-                        subDirList = os.listdir(fullPathToCurrentFilename)
-                        for subFilename in subDirList:
-                            fullPathToSubFilename = os.path.join(fullPathToCurrentFilename, subFilename)
-                            if (os.path.isfile(fullPathToSubFilename)):
-                                splitPath = fullPathToSubFilename.split("%s/" %(self.__pathToExtractedReport))
-                                if (len(splitPath) == 2):
-                                    currentData = self.getDataFromFile(splitPath[1])
-                                    if (not currentData == None):
-                                        fileDataMap[splitPath[1]] = currentData
-                    elif (os.path.exists(fullPathToCurrentFilename)):
-                        splitPath = fullPathToCurrentFilename.split("%s/" %(self.__pathToExtractedReport))
-                        if (len(splitPath) == 2):
-                            currentData = self.getDataFromFile(splitPath[1])
-                            if (not currentData == None):
-                                fileDataMap[splitPath[1]] = currentData
-        elif (os.path.isdir(fullPathToDir)):
-            try:
-                # Add all files in this directory to the list and sort later.
-                dirList = os.listdir(fullPathToDir)
-                for currentFilename in dirList:
-                    # Skip directories
-                    if (not os.path.isdir(os.path.join(fullPathToDir, currentFilename))):
-                        currentData = self.getDataFromFile("%s/%s" %(pathToDir, currentFilename))
+            if ((len(pathToDirMod) > 0) and (self.__isDir(pathToDirMod))):
+                for currentFilename in self.__listDir(pathToDirMod):
+                    pathToCurrentFilename = os.path.join(pathToDirMod, currentFilename)
+                    if (self.__isDir(pathToCurrentFilename)):
+                        for subFilename in self.__listDir(pathToCurrentFilename):
+                            pathToSubFilename = os.path.join(pathToCurrentFilename, subFilename)
+                            if (self.__isFile(pathToSubFilename)):
+                                currentData = self.getDataFromFile(pathToSubFilename)
+                                if (not currentData == None):
+                                    fileDataMap[pathToSubFilename] = currentData
+                    elif (self.__exists(pathToCurrentFilename)):
+                        currentData = self.getDataFromFile(pathToCurrentFilename)
                         if (not currentData == None):
-                            fileDataMap[currentFilename] = currentData
-            except OSError:
-                message = "There was an error getting a directory list for reports: %s." %(fullPathToDir)
-                logging.getLogger(sx.MAIN_LOGGER_NAME).warn(message)
+                            fileDataMap[pathToCurrentFilename] = currentData
+        elif ((len(pathToDir) > 0) and (self.__isDir(pathToDir))):
+            # Add all files in this directory to the list and sort later.
+            for currentFilename in self.__listDir(pathToDir):
+                # Skip directories
+                if (not self.__isDir(os.path.join(pathToDir, currentFilename))):
+                    currentData = self.getDataFromFile("%s/%s" %(pathToDir, currentFilename))
+                    if (not currentData == None):
+                        fileDataMap[currentFilename] = currentData
         return fileDataMap
 
     def getFileSize(self, pathToFile):
@@ -303,6 +2565,13 @@ class Report:
         # -1 means file does not exist.
         fileSize = -1
         if (len(pathToFile) > 0):
+            self.__recordPathsRead([pathToFile])
+            if (self.__isReadFromArchive):
+                return self.__getReportArchive().getFileSize(pathToFile)
+            pathIndex = self.__getPathIndexFor(pathToFile)
+            if (not pathIndex == None):
+                return pathIndex.getFileSize(pathToFile)
+            self.__ensureExtracted(pathToFile)
             src = os.path.join(self.__pathToExtractedReport, pathToFile)
             if (os.path.exists(src)):
                 fileSize = os.path.getsize(src)
@@ -314,6 +2583,10 @@ class Report:
         This function will return the path to the temporary file. If
         file does not exist then empty string is returned.
 
+        If the files are read straight from the report file then the
+        path is extracted from the report file before the path is
+        returned.
+
         @return: Returns the path to the temporary file. Empty string
         is returned if no file is found.
 
@@ -322,12 +2595,83 @@ class Report:
         @type pathToFile: String
         """
         if (len(pathToFile) > 0):
+            self.__recordPathsRead([pathToFile])
+            if (self.__isReadFromArchive):
+                self.__materializePath(pathToFile)
+            else:
+                pathIndex = self.__getPathIndexFor(pathToFile)
+                if (not pathIndex == None):
+                    if (pathIndex.exists(pathToFile)):
+                        return os.path.join(self.__pathToExtractedReport, pathToFile).strip()
+                    return ""
+                self.__ensureExtracted(pathToFile)
             src = os.path.join(self.__pathToExtractedReport, pathToFile).strip()
             # Cannot check if file cause we have symlinks in report
             if (os.path.exists(src)):
                     return src
         return ""
 
+    def __getExtractionPatterns(self):
+        """
+        Returns the list of patterns for the paths that are extracted
+        when the report is extracted. None is returned if the whole report
+        is extracted.
+
+        @return: Returns the list of patterns for the paths that are
+        extracted.
+        @rtype: Array
+        """
+        # Only part of the report is extracted if the paths were set and
+        # the report does not contain other reports.
+        # If the files are read straight from the report file then only
+        # the required paths are extracted.
+        if (not self.includesOtherReports()):
+            if (self.__isVirtual):
+                return self.getRequiredPaths()
+            elif (not self.__extractionPaths == None):
+                return self.__extractionPaths + self.getRequiredPaths()
+        return None
+
+    def getEstimatedDiskUsage(self, extractor):
+        """
+        Returns the estimated disk usage in bytes of the files that will
+        be extracted from the report file. The sizes of the files are
+        read from the index of the members in the report file, so the
+        report file is not read again if it was listed.
+
+        @return: Returns the estimated disk usage in bytes of the files
+        that will be extracted.
+        @rtype: Long
+
+        @param extractor: An extractor object that contains the path to the
+        file that will be extracted.
+        @type extractor: Extractor
+        """
+        memberIndex = extractor.getMemberIndex()
+        listOfPatterns = self.__getExtractionPatterns()
+        if (listOfPatterns == None):
+            listOfMembers = memberIndex.getMembers()
+        else:
+            listOfMembers = memberIndex.getSelectedMembers(listOfPatterns, extractor.getAppliedStripDirectoriesDepth(self.__stripDirectoriesDepth))
+        return ExtractionBudget.estimateDiskUsage(map(lambda member: member.getSize(), listOfMembers))
+
+    def getTopLevelFileNames(self, extractor):
+        """
+        Returns the names of the regular files that will be at the top
+        of the extracted report, in the order they appear in the report
+        file. The names are read from the index of the members in the
+        report file.
+
+        @return: Returns the names of the regular files that will be at
+        the top of the extracted report.
+        @rtype: Array
+
+        @param extractor: An extractor object that contains the path to the
+        file that will be extracted.
+        @type extractor: Extractor
+        """
+        return extractor.getMemberIndex().getTopLevelFileNames(extractor.getAppliedStripDirectoriesDepth(self.__stripDirectoriesDepth))
+
     def extract(self, extractor, extractDir):
         """
         This function will extract the report to the extract
@@ -357,23 +2701,25 @@ class Report:
         logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
         if (not len(extractDir) > 0):
             return False
-        # Check for duplicate extraction point and rename if it exists.
-        if os.path.exists(extractDir) :
-            for i in range(1, 100) :
-                (head, tail) = os.path.split(extractDir)
-                duplicatePath = os.path.join(head, "%s-duplicate_%s" %(tail, str(i)))
-                if (not os.path.exists(duplicatePath)) :
-                    # Directory does not exist so we can extract to this path
-                    extractDir = duplicatePath
-                    break;
-        # Set path to extraction point and temporary directory
-        self.setPathToExtractedReport(extractDir)
+        # Set path to extraction point and create the directory.
+        if (not self.reserveExtractDir(extractDir)):
+            return False
+        self.__extractor = extractor
+        listOfPatterns = self.__getExtractionPatterns()
         # Do the extraction of the file
-        try:
-            if not os.access(self.__pathToExtractedReport, os.F_OK):
-                os.makedirs(self.__pathToExtractedReport)
-        except (IOError, os.error):
-            message =  "IO error occured on creating the directory: %s." %(self.__pathToExtractedReport)
-            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+        if (not extractor.extract(self.__pathToExtractedReport, self.__stripDirectoriesDepth, listOfPatterns)):
+            if (extractor.isCorrupt()):
+                # The files from a truncated or corrupt report file are not
+                # kept, so the report is not used.
+                message = "The %s will not be used because the report file is truncated or corrupt: %s" %(self.getName(), extractor.getPathToFile())
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                shutil.rmtree(self.__pathToExtractedReport, True)
             return False
-        return extractor.extract(self.__pathToExtractedReport, self.__stripDirectoriesDepth)
+        self.__resetPathIndex()
+        if (not listOfPatterns == None):
+            self.__isPartiallyExtracted = True
+            self.__isReadFromArchive = self.__isVirtual
+            self.__writePartialExtractionFile()
+        else:
+            self.__writeManifest(extractor)
+        return True
@@ -34,7 +34,10 @@ class Sosreport(sx.reports.Report) :
     def __init__(self) :
         sx.reports.Report.__init__(self,
                                    Sosreport.REPORT_NAME,
-                                   "A container for sosreport files", stripDirectoriesDepth=1)
+                                   "A container for sosreport files", stripDirectoriesDepth=1,
+                                   requiredPaths=["sos_commands/kernel/uname_-a", "sos_commands/general/date", "date",
+                                                  "sos_commands/general/uptime", "uptime", "sos_commands/general/hostname",
+                                                  "sos_commands/rpm/rpm_-qa_--qf_NAME_*", "installed-rpms"])
         self.__hostname = ""
 
     def getUname(self) :
@@ -59,9 +62,7 @@ class Sosreport(sx.reports.Report) :
         the report was generated.
         @rtype: String
         """
-        dateData = self.getDataFromFile("sos_commands/general/date")
-        if (dateData == None):
-            dateData = self.getDataFromFile("date")
+        dateData = self.getDataFromFileAlias("report_date")
         # Return empty string if data object was not found.
         date = ""
         if (not dateData == None):
@@ -76,9 +77,7 @@ class Sosreport(sx.reports.Report) :
         @return: Returns a string of the "uptime" data.
         @rtype String
         """
-        uptime = self.getDataFromFile("sos_commands/general/uptime")
-        if (uptime == None) :
-            uptime = self.getDataFromFile("uptime")
+        uptime = self.getDataFromFileAlias("system_uptime")
         if (uptime == None) :
             return ""
         elif (len(uptime) > 0):
@@ -139,18 +138,9 @@ class Sosreport(sx.reports.Report) :
         list of installed rpms.
         @rtype: Array
         """
-        pathToInstalledRPMSList = ["sos_commands/rpm/rpm_-qa_--qf_NAME_-_VERSION_-_RELEASE_-_ARCH_INSTALLTIME_date_.b",
-                                   "sos_commands/rpm/rpm_-qa_--qf_NAME_-_VERSION_-_RELEASE_._ARCH_INSTALLTIME_date_.b",
-                                   "sos_commands/rpm/rpm_-qa_--qf_NAME_-_VERSION_-_RELEASE_-_ARCH" ,
-                                   "installed-rpms"]
-        installedRPMSData = []
-        for pathToInstalledRPMS in pathToInstalledRPMSList:
-            installedRPMSData = self.getDataFromFile(pathToInstalledRPMS)
-            if (installedRPMSData == None):
-                installedRPMSData = []
-                continue
-            elif (len(installedRPMSData) > 0):
-                break;
+        installedRPMSData = self.getDataFromFileAlias("installed_rpms")
+        if (installedRPMSData == None):
+            return []
         return installedRPMSData
 
     def extract(self, extractor, extractDir):
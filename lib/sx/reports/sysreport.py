@@ -27,13 +27,21 @@ class Sysreport(sx.reports.Report) :
     @type TYPE_DETECTION_FILE: String
     @cvar REPORT_NAME: The name of the report.
     @type REPORT_NAME: String
+    @cvar FILE_ALIASES: Map of the logical names of files to the paths
+    of the files in a sysreport.
+    @type FILE_ALIASES: Dictionary
     """
     TYPE_DETECTION_FILE = "sysreport.log"
     REPORT_NAME = "sysreport"
+    FILE_ALIASES = {"installed_rpms":["installed-rpms"], "uname_a":["uname"],
+                    "chkconfig_list":["chkconfig"], "mount_list":["mount"],
+                    "ps_list":["ps"], "ifconfig_a":["ifconfig"],
+                    "report_date":["date"], "system_uptime":["uptime"]}
     def __init__(self) :
         sx.reports.Report.__init__(self,
                                    Sysreport.REPORT_NAME,
-                                   "A container for sysreport files")
+                                   "A container for sysreport files",
+                                   requiredPaths=["date", "uname", "uptime", "installed-rpms"])
         self.__hostname = ""
 
     # ##########################################################################
@@ -129,7 +137,7 @@ class Sysreport(sx.reports.Report) :
         list of installed rpms.
         @rtype: Array
         """
-        return self.getDataFromFile("installed-rpms")
+        return self.getDataFromFileAlias("installed_rpms")
 
     def extract(self, extractor, extractDir):
         """
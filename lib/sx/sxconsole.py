@@ -20,14 +20,22 @@ import logging
 import sx
 from sx.logwriter import LogWriter
 from sx.tools import FileUtil
+from sx.tools import WorkerPool
+from sx.tools import WorkerQueue
+from sx.tools import OrderedTurnstile
+from sx.tools import FileDigestTable
+from sx.tools import ExtractionBudget
 from sx import SXConfigurationFiles
 
 from sx import ArchiveLayout
 from sx import ArchivedLayout
 from sx import ModifiedArchiveLayout
 from sx import ModifiedArchivedLayout
+from sx import ContentStore
 from sx.extractors import Extractor
+from sx.extractors import ArchiveManifest
 from sx.reports import Report
+from sx.reports import ReportCache
 from sx.plugins import PluginsHelper
 from sx.modulesloader import ReportsLoader
 from sx.modulesloader import ExtractorsLoader
@@ -40,10 +48,13 @@ class SXConsole:
     def __init__(self, optionsMap, uid):
         self.__optionsMap = optionsMap
         self.__uid = uid
-        lwObjSXC = LogWriter(sx.MAIN_LOGGER_NAME,
-                             logging.INFO,
-                             sx.MAIN_LOGGER_FORMAT,
-                             disableConsoleLog=False)
+        # The logger is only created once when more than one SXConsole is
+        # ran in the same process(see SXDaemon).
+        if (not sx.MAIN_LOGGER_NAME in logging.getLogger().manager.loggerDict.keys()):
+            lwObjSXC = LogWriter(sx.MAIN_LOGGER_NAME,
+                                 logging.INFO,
+                                 sx.MAIN_LOGGER_FORMAT,
+                                 disableConsoleLog=False)
 
         if (self.__optionsMap.get("enableDebugLogging")) :
             logging.getLogger(sx.MAIN_LOGGER_NAME).setLevel(logging.DEBUG)
@@ -71,7 +82,14 @@ class SXConsole:
             message = "There was an error creating the user configuration directory. sxconsole will proceed without it."
             logging.getLogger(sx.MAIN_LOGGER_NAME).warning(message)
 
+        # Set the extractor that will be tried first on the reports.
+        ExtractorsLoader.setPreferredExtractor(self.__optionsMap.get("extractorName", ""))
+
         self.__al = None
+        # The reports that were added to the existing extracted reports when
+        # the reports are added incrementally. If None then all the reports
+        # are new.
+        self.__listOfChangedReports = None
         # Archive Layout
         if (self.__validateOptions(self.getUID(), self.__optionsMap.get("pathToExtractedReports"))):
             try:
@@ -127,6 +145,18 @@ class SXConsole:
                 message = "Only numeric ticket numbers  are valid."
                 logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
                 return False
+        if ((self.__optionsMap.get("incremental", False)) and (not len(pathToExtractedReports) > 0)):
+            message = "Adding reports incrementally (-I option) requires a path to extracted reports (-p option)."
+            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+            return False
+        if (self.__optionsMap.get("jobs", 1) < 1):
+            message = "The number of jobs (-j option) has to be greater than zero."
+            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+            return False
+        if (self.__optionsMap.get("fileDataCacheSize", 32) < 0):
+            message = "The size of the file cache (-C option) cannot be less than zero."
+            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+            return False
         # Since we did not exit then can proceed to run.
         return True
 
@@ -220,7 +250,8 @@ class SXConsole:
         return True
 
     def __extractReports(self, al, pathToExtractedReports, listOfReports,
-                         pathToReportsDirectory, includeUserDefinedModules) :
+                         pathToReportsDirectory, includeUserDefinedModules,
+                         listOfExtractionPaths=None) :
 
         # Create the reporter object based on layout of the paths
         if (al == None):
@@ -236,7 +267,26 @@ class SXConsole:
         # #######################################################################
         # Extract or load the reports
         # #######################################################################
-        if (len(pathToExtractedReports) > 0) :
+        if ((len(pathToExtractedReports) > 0) and (self.__optionsMap.get("incremental", False))):
+            # Load the reports that were already extracted then extract only
+            # the new reports into the same directories. The reports that
+            # were loaded use their cache files(see ReportCache) so their
+            # data does not have to be parsed again.
+            reportsLoaded = self.__load(pathToExtractedReports, includeUserDefinedModules)
+            message = "There was %d reports found and loaded." %(len(reportsLoaded))
+            logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
+            message = "The list of new reports are being analyzed to verify that they are known report types."
+            logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
+            listOfReports = self.__getListOfReports(listOfReports, pathToReportsDirectory)
+            message = "Extracting %d new reports to the existing directory: %s" %(len(listOfReports), al.getPathToExtractedReports())
+            logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
+            self.__listOfChangedReports = self.__extract(listOfReports, al.getPathToCompressedReports(),
+                                                         al.getPathToExtractedReports(), includeUserDefinedModules,
+                                                         listOfExtractionPaths)
+            message = "There was %d new reports extracted to the directory: %s" %(len(self.__listOfChangedReports), al.getPathToExtractedReports())
+            logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
+            reportsExtracted = reportsLoaded + self.__listOfChangedReports
+        elif (len(pathToExtractedReports) > 0) :
             # Load reports that were already extracted.
             reportsExtracted = self.__load(pathToExtractedReports, includeUserDefinedModules)
             message = "There was %d reports found and loaded." %(len(reportsExtracted))
@@ -253,21 +303,24 @@ class SXConsole:
             message = "This process could take a while on large reports."
             logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
             reportsExtracted = self.__extract(listOfReports, al.getPathToCompressedReports(),
-                                              al.getPathToExtractedReports(), includeUserDefinedModules)
+                                              al.getPathToExtractedReports(), includeUserDefinedModules,
+                                              listOfExtractionPaths)
             message = "There was %d reports extracted to the directory: %s" %(len(reportsExtracted), al.getPathToExtractedReports())
             logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
         return reportsExtracted
 
     def __extract(self, listOfUnextractedReports, pathToCompressedReports,
-                  pathToExtractedReports, includeUserDefinedModules) :
+                  pathToExtractedReports, includeUserDefinedModules,
+                  listOfExtractionPaths=None) :
         """
         This function will extract all the reports in the array if
         they are a known type. It will return a list of report objects.
 
-        This function also uses recursion in case a report contains
-        other reports. For example a RHEV report contains
-        sosreports. The sosreports that are in the RHEV report will be
-        extracted as well.
+        If a report contains other reports, for example a RHEV report
+        contains sosreports, then the files at the top of the report are
+        searched for reports as soon as each file is extracted. The
+        reports within the report are extracted while the rest of the
+        report is still being extracted and the files are never copied.
 
         @return: Returns a list of all the report objects that were
         successfully extracted.
@@ -280,60 +333,342 @@ class SXConsole:
         @param includeUserDefinedModules: If True then user defined
         reports/plugins are enabled.
         @type includeUserDefinedModules: Boolean
+        @param listOfExtractionPaths: If not None then only these paths
+        are extracted from the reports and the rest of a report is
+        extracted when it is needed.
+        @type listOfExtractionPaths: Array
         """
-        # Zero out the list because this is new load of reports
-        listOfReports = []
-        # If the report contains reports then they need to be analyzed like a
-        # RHEV report.
-        reportsWithinReportList = []
-        # Various loaders that are required.
-        extractorsLoader = ExtractorsLoader()
-        reportsLoader = ReportsLoader()
+        # The reports are extracted by a pool of workers. The turnstile makes
+        # sure that the extraction directories(and duplicate names) are chosen
+        # in the same order as the reports in the list. The reports within
+        # reports are given the indexes after the reports in the list, so
+        # they choose their extraction directories after all the reports in
+        # the list.
+        extractionTurnstile = OrderedTurnstile()
+        # Each report that contains reports is given a block of indexes for
+        # the files at the top of the report before it is extracted. The
+        # blocks are given in the same order as the reports, so the indexes
+        # do not depend on the order the files are extracted in.
+        nestedTurnstile = OrderedTurnstile()
+        # The reports are admitted to the extraction budget in the same
+        # order, so a report never waits on the extraction turnstile for a
+        # report that is waiting on the budget.
+        admissionTurnstile = OrderedTurnstile()
+        extractionBudget = ExtractionBudget.getExtractionBudget(pathToExtractedReports)
+        extractionBudget.setLimits(self.__optionsMap.get("maxExtractionSize", 0) * 1024L * 1024L,
+                                   self.__optionsMap.get("maxFilesPerSecond", 0),
+                                   self.__optionsMap.get("reservedSpace", 256) * 1024L * 1024L)
+        listOfSkippedReports = []
+        nextNestedIndex = [len(listOfUnextractedReports)]
+        workerPool = WorkerPool(self.__optionsMap.get("jobs", 1))
+        if (workerPool.getWorkerCount() > 1):
+            message = "The reports will be extracted with %d workers." %(workerPool.getWorkerCount())
+            logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
 
-        for pathToFilename in listOfUnextractedReports:
-            report = reportsLoader.getReport(pathToFilename, includeUserDefinedModules)
-            if (not report == None):
-                # The reason I have to find extractor again is because I moved
-                # the file from orginal location so I dont want an extractor in
-                # object if the file it extracts no longer exists.
-                extractor = extractorsLoader.getExtractor(pathToFilename, includeUserDefinedModules)
-                if (report.extract(extractor, pathToExtractedReports)):
+        # The report files and extracted reports are shared with the other
+        # archive layouts in the archive path when the store is enabled.
+        contentStore = None
+        blobSizesMap = {}
+        if (self.__optionsMap.get("enableContentStore", False)):
+            contentStore = ContentStore(self.__al.getPathToArchiveRoot())
+            blobSizesMap = contentStore.getBlobSizes()
+
+        def reserveNestedIndexes(index, listOfNames):
+            # Returns a map of the names of the files to the indexes that
+            # are reserved for them.
+            nestedTurnstile.wait(index)
+            try:
+                nestedIndexesMap = {}
+                for name in listOfNames:
+                    nestedIndexesMap[name] = nextNestedIndex[0]
+                    nextNestedIndex[0] += 1
+                return nestedIndexesMap
+            finally:
+                nestedTurnstile.release(index)
+
+        def extractReport(item):
+            (index, pathToFilename) = item
+            # The map of the names of the files at the top of the report to
+            # their reserved indexes and the map of the names of the files
+            # that were searched for reports.
+            nestedIndexesMap = {}
+            submittedNamesMap = {}
+            try:
+                return extractIndexedReport(index, pathToFilename, nestedIndexesMap, submittedNamesMap)
+            finally:
+                # Let the next report reserve its indexes whether or not this
+                # report contained any reports. The indexes of the files that
+                # were never searched are passed through all the turnstiles so
+                # the reports after them are not blocked.
+                nestedTurnstile.release(index)
+                for (name, nestedIndex) in nestedIndexesMap.items():
+                    if (not submittedNamesMap.has_key(name)):
+                        extractionTurnstile.release(nestedIndex)
+                        admissionTurnstile.release(nestedIndex)
+                        nestedTurnstile.release(nestedIndex)
+
+        def extractIndexedReport(index, pathToFilename, nestedIndexesMap, submittedNamesMap):
+            report = None
+            extractor = None
+            isExtracted = False
+            isSkipped = False
+            digest = ""
+            treeInfo = None
+            # The queue that extracts the reports within the report and the
+            # list of files in the report that were added to it.
+            nestedQueue = None
+            listOfNestedFiles = []
+            isReserved = False
+            def submitNestedFile(pathToExtractedFile, pathToFileInReport):
+                # Only the files at the top of the report are searched for
+                # reports.
+                name = pathToFileInReport.strip("/")
+                if ((nestedIndexesMap.has_key(name)) and (not submittedNamesMap.has_key(name))):
+                    submittedNamesMap[name] = True
+                    listOfNestedFiles.append(pathToExtractedFile)
+                    nestedQueue.submit((nestedIndexesMap.get(name), pathToExtractedFile))
+            try:
+                if (not contentStore == None):
+                    # The report file is only hashed before it is extracted
+                    # when it could be in the store(see __getStoreDigest()).
+                    # Otherwise the digest is taken from the manifest that
+                    # is built while the report file is extracted.
+                    storeDigest = self.__getStoreDigest(pathToFilename, blobSizesMap, includeUserDefinedModules)
+                    if (len(storeDigest) > 0):
+                        treeInfo = contentStore.getTreeInfo(storeDigest)
+                    if (not treeInfo == None):
+                        digest = storeDigest
+                    if (not treeInfo == None):
+                        report = ReportsLoader().getReportByName(treeInfo[0], includeUserDefinedModules)
+                        if (report == None):
+                            treeInfo = None
+                if (report == None):
+                    report = ReportsLoader().getReport(pathToFilename, includeUserDefinedModules)
+                if (not report == None):
+                    report.setExtractionTurnstile(extractionTurnstile, index)
+                    report.setExtractionPaths(listOfExtractionPaths)
+                    report.setVirtual(self.__optionsMap.get("virtualExtraction", False))
+                    report.setFileDataCacheSize(self.__optionsMap.get("fileDataCacheSize", 32) * 1024 * 1024)
+                    report.setReportCacheEnabled(not self.__optionsMap.get("disableReportCache", False))
+                    if (report.includesOtherReports()):
+                        nestedQueue = WorkerQueue(extractReport, workerPool.getWorkerCount())
+                    if (not treeInfo == None):
+                        # The report was already extracted so the extracted
+                        # report in the store is linked.
+                        isExtracted = self.__linkStoredReport(report, pathToFilename, contentStore, digest,
+                                                              treeInfo[1], pathToExtractedReports)
+                    else:
+                        # The extractor that was used to find the report type
+                        # is cached, so the index of the members in the file
+                        # is not built again.
+                        extractor = ExtractorsLoader().getExtractor(pathToFilename, includeUserDefinedModules)
+                        if (extractor == None):
+                            isExtracted = report.extract(extractor, pathToExtractedReports)
+                            if ((not contentStore == None) and (isExtracted)):
+                                digest = ContentStore.hashFile(pathToFilename)
+                            return (pathToFilename, report, extractor, isExtracted, isSkipped, digest, False, nestedQueue, listOfNestedFiles)
+                        # The report is only extracted if the extracted files
+                        # will fit on the filesystem, so the filesystem is
+                        # not filled in the middle of the extraction.
+                        estimatedBytes = report.getEstimatedDiskUsage(extractor)
+                        admissionTurnstile.wait(index)
+                        try:
+                            isSkipped = (not extractionBudget.admit(estimatedBytes, pathToFilename))
+                        finally:
+                            admissionTurnstile.release(index)
+                        if (isSkipped):
+                            message =  "The %s will not be extracted because it needs about %s and " %(report.getName(), FileUtil.convertBytesToString(estimatedBytes))
+                            message += "only %s is free(%s is reserved) in the directory %s: %s" %(FileUtil.convertBytesToString(extractionBudget.getFreeBytes()),
+                                                                                                  FileUtil.convertBytesToString(extractionBudget.getReservedBytes()),
+                                                                                                  pathToExtractedReports, pathToFilename)
+                            logging.getLogger(sx.MAIN_LOGGER_NAME).warning(message)
+                        else:
+                            if (not nestedQueue == None):
+                                # The reports within the report are extracted
+                                # as soon as each file is extracted.
+                                nestedIndexesMap.update(reserveNestedIndexes(index, report.getTopLevelFileNames(extractor)))
+                                isReserved = True
+                            if ((self.__optionsMap.get("maxFilesPerSecond", 0) > 0) and
+                                (not extractor.isExtractedFileFunctionSupported())):
+                                message =  "The maximum number of files extracted each second will not be applied to the %s " %(report.getName())
+                                message += "because the %s extracts the whole file at once: %s" %(extractor.getName(), pathToFilename)
+                                logging.getLogger(sx.MAIN_LOGGER_NAME).warning(message)
+                            def fileExtracted(pathToExtractedFile, pathToFileInReport):
+                                extractionBudget.throttle()
+                                if (not nestedQueue == None):
+                                    submitNestedFile(pathToExtractedFile, pathToFileInReport)
+                            extractor.setExtractedFileFunction(fileExtracted)
+                            try:
+                                isExtracted = report.extract(extractor, pathToExtractedReports)
+                            finally:
+                                extractor.setExtractedFileFunction(None)
+                                extractionBudget.release(estimatedBytes)
+                            if ((not contentStore == None) and (isExtracted)):
+                                # The report file was hashed while it was
+                                # extracted unless only some of the files
+                                # were extracted.
+                                if (not extractor.getManifest() == None):
+                                    digest = extractor.getManifest().getArchiveDigest()
+                                else:
+                                    digest = ContentStore.hashFile(pathToFilename)
+            finally:
+                # Let the next report choose its extraction directory
+                # whether or not this report was extracted.
+                extractionTurnstile.release(index)
+                admissionTurnstile.release(index)
+            if ((not nestedQueue == None) and (isExtracted)):
+                pathToExtractedReport = report.getPathToExtractedReport()
+                if (not isReserved):
+                    # The files were not listed from the report file, for
+                    # example when the report was linked from the store.
+                    listOfNames = []
+                    for currentFilename in sorted(os.listdir(pathToExtractedReport)):
+                        if (os.path.isfile(os.path.join(pathToExtractedReport, currentFilename))):
+                            listOfNames.append(currentFilename)
+                    nestedIndexesMap.update(reserveNestedIndexes(index, listOfNames))
+                # The files that were not found while the report was
+                # extracted, for example when the report was extracted by an
+                # external command.
+                for (name, nestedIndex) in sorted(nestedIndexesMap.items(), key=lambda item: item[1]):
+                    pathToCurrentFile = os.path.join(pathToExtractedReport, name)
+                    if (os.path.isfile(pathToCurrentFile)):
+                        submitNestedFile(pathToCurrentFile, name)
+            return (pathToFilename, report, extractor, isExtracted, isSkipped, digest, (not treeInfo == None), nestedQueue, listOfNestedFiles)
+
+        def addExtractedReports(listOfResults):
+            # Zero out the list because this is new load of reports
+            listOfReports = []
+            # If the report contains reports then they need to be analyzed
+            # like a RHEV report.
+            reportsWithinReportList = []
+            for (pathToFilename, report, extractor, isExtracted, isSkipped, digest, isStored, nestedQueue, listOfNestedFiles) in listOfResults:
+                if (report == None):
+                    continue
+                # The reports within the report that were extracted while the
+                # report was extracted.
+                listOfNestedResults = []
+                if (not nestedQueue == None):
+                    listOfNestedResults = nestedQueue.join()
+                if (isExtracted):
                     # Add the report to the list of valid reports that were found.
                     listOfReports.append(report)
                     # Move the file if it was extracted correctly.
                     pathToNewFilename = os.path.join(pathToCompressedReports, os.path.basename(pathToFilename))
-                    if (not self.__moveReport(pathToFilename, pathToNewFilename)):
+                    if ((not contentStore == None) and (len(digest) > 0)):
+                        if (not self.__moveReportToStore(contentStore, digest, pathToFilename, pathToNewFilename)):
+                            message = "There was an error moving the file: %s\n\t  to %s." %(pathToFilename, pathToNewFilename)
+                            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                        elif ((not isStored) and (not report.isPartiallyExtracted())):
+                            # Only whole extracted reports are added to the store.
+                            contentStore.addTree(digest, report.getPathToExtractedReport(), report.getName(),
+                                                 ArchiveManifest.getPathToManifestFile(report.getPathToExtractedReport()))
+                    elif (not self.__moveReport(pathToFilename, pathToNewFilename)):
                         message = "There was an error moving the file: %s\n\t  to %s." %(pathToFilename, pathToNewFilename)
                         logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
-                        # If the report contains or could contain other known
-                        # report types then we will see if any of the files
-                        # within that report can be added to the list of reports
-                        # that need to be extracted.
-                    if (report.includesOtherReports()):
-                        pathToExtractedReport = report.getPathToExtractedReport()
-                        # List of full path to files within the report that was
-                        # extracted. Just top dir for now, will not goto deep it
-                        # for now. I also moving these out which might be
-                        # desired.
-                        listOfFilesInExtractedReports = []
-                        for currentFilename in os.listdir(pathToExtractedReport):
-                            listOfFilesInExtractedReports.append(os.path.join(pathToExtractedReport, currentFilename))
-                        if (len(listOfFilesInExtractedReports) > 0):
-                            message =  "The %s report contains %d files and the %s report will be analyzed " %(report.getName(),
-                                                                                                               len(listOfUnextractedReports),
-                                                                                                               report.getName())
-                            message += "to see if contain any other known report types."
-                            logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
-                            # Now do a little recursion
-                            reportsWithinReportList += self.__extract(listOfFilesInExtractedReports, pathToCompressedReports,
-                                                                      pathToExtractedReports, includeUserDefinedModules)
+                    elif ((report.isPartiallyExtracted()) and (not pathToFilename == pathToNewFilename)):
+                        # The rest of the report will be extracted from the
+                        # moved file if needed. The index of the members is the
+                        # same since it is the same file.
+                        movedExtractor = ExtractorsLoader().getExtractor(pathToNewFilename, includeUserDefinedModules)
+                        if (not movedExtractor == None):
+                            movedExtractor.setMemberIndex(extractor.getMemberIndex().getMembers())
+                            report.setExtractor(movedExtractor)
+                    if (len(listOfNestedFiles) > 0):
+                        message =  "The %s report contains %d files and the %s report was analyzed " %(report.getName(),
+                                                                                                       len(listOfNestedFiles),
+                                                                                                       report.getName())
+                        message += "to see if contain any other known report types."
+                        logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
+                elif (isSkipped):
+                    listOfSkippedReports.append(pathToFilename)
                 else:
                     message = "There was an error extracting the report: %s." %(str(extractor))
                     logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
-        # Add reports extracted that were in other reports
-        listOfReports += reportsWithinReportList
+                # The reports within the report are added even if the rest
+                # of the report could not be extracted since their files
+                # were extracted whole.
+                reportsWithinReportList += addExtractedReports(listOfNestedResults)
+            # Add reports extracted that were in other reports
+            return listOfReports + reportsWithinReportList
+
+        listOfItems = []
+        for index in range(0, len(listOfUnextractedReports)):
+            listOfItems.append((index, listOfUnextractedReports[index]))
+        # The results are in the same order as the list of reports so the
+        # files are moved and the reports within reports are found in order.
+        listOfReports = addExtractedReports(workerPool.map(extractReport, listOfItems))
+        if (len(listOfSkippedReports) > 0):
+            message =  "There was %d reports that were not extracted because there was not enough free space. " %(len(listOfSkippedReports))
+            message += "The report files were not moved and can be extracted when there is more free space."
+            logging.getLogger(sx.MAIN_LOGGER_NAME).warning(message)
         return listOfReports
 
+    def __getStoreDigest(self, pathToFilename, blobSizesMap, includeUserDefinedModules):
+        """
+        Returns the SHA-256 digest that is used to find the report file in
+        the store before the report file is extracted. The digest in the
+        checksum file that was uploaded with the report file is used if
+        there is one. If not, then the report file is only hashed when
+        there is a report file of the same size in the store. Empty string
+        is returned if the report file cannot be in the store.
+
+        @return: Returns the SHA-256 digest that is used to find the
+        report file in the store.
+        @rtype: String
+
+        @param pathToFilename: The path to the report file.
+        @type pathToFilename: String
+        @param blobSizesMap: The map of the sizes of the report files in
+        the store.
+        @type blobSizesMap: Dictionary
+        @param includeUserDefinedModules: If True then user defined
+        extractors are enabled.
+        @type includeUserDefinedModules: Boolean
+        """
+        extractor = ExtractorsLoader().getExtractor(pathToFilename, includeUserDefinedModules)
+        if (not extractor == None):
+            expectedDigest = extractor.getExpectedDigest()
+            if ((not expectedDigest == None) and (expectedDigest[0] == ArchiveManifest.HASH_NAME)):
+                return expectedDigest[1]
+        try:
+            if (not blobSizesMap.has_key(os.path.getsize(pathToFilename))):
+                return ""
+        except (IOError, os.error):
+            return ""
+        return ContentStore.hashFile(pathToFilename)
+
+    def __linkStoredReport(self, report, pathToFilename, contentStore, digest, dirName, pathToExtractedReports):
+        """
+        Links the extracted report in the store to the extraction
+        directory instead of extracting the report file again.
+
+        @return: Returns True if the extracted report was linked.
+        @rtype: Boolean
+
+        @param report: The report that will use the extracted report.
+        @type report: Report
+        @param pathToFilename: The path to the report file.
+        @type pathToFilename: String
+        @param contentStore: The store that contains the extracted report.
+        @type contentStore: ContentStore
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        @param dirName: The name of the directory the report is
+        extracted to.
+        @type dirName: String
+        @param pathToExtractedReports: The path to the extracted reports
+        directory.
+        @type pathToExtractedReports: String
+        """
+        message = "The %s was already extracted and will be linked from the store: %s" %(report.getName(), pathToFilename)
+        logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
+        if (not report.reserveExtractDir(os.path.join(pathToExtractedReports, dirName))):
+            return False
+        if (os.path.isfile(contentStore.getPathToTreeManifest(digest))):
+            ContentStore.linkFile(contentStore.getPathToTreeManifest(digest),
+                                  ArchiveManifest.getPathToManifestFile(report.getPathToExtractedReport()))
+        return ContentStore.linkTree(os.path.join(contentStore.getPathToTree(digest), "tree"), report.getPathToExtractedReport())
+
     def __load(self, pathToExtractedReports, includeUserDefinedModules):
         """
         Returns the list of report paths that have already been
@@ -361,9 +696,23 @@ class SXConsole:
                 continue
             else:
                 pathToFilename = os.path.join(pathToExtractedReports, filename)
-                report = reportsLoader.getReport(pathToFilename, includeUserDefinedModules)
+                report = None
+                if (not self.__optionsMap.get("disableReportCache", False)):
+                    # The report type is stored in the cache file, so the
+                    # extracted report does not have to be searched.
+                    reportName = ReportCache(pathToFilename).getReportName()
+                    if (len(reportName) > 0):
+                        report = reportsLoader.getReportByName(reportName, includeUserDefinedModules)
+                if (report == None):
+                    report = reportsLoader.getReport(pathToFilename, includeUserDefinedModules)
                 if (not report == None) :
                     report.setPathToExtractedReport(pathToFilename)
+                    report.setVirtual(self.__optionsMap.get("virtualExtraction", False))
+                    report.setFileDataCacheSize(self.__optionsMap.get("fileDataCacheSize", 32) * 1024 * 1024)
+                    report.setReportCacheEnabled(not self.__optionsMap.get("disableReportCache", False))
+                    # If the report was partially extracted then the rest
+                    # of the report can be extracted if needed.
+                    report.loadPartialExtraction(includeUserDefinedModules)
                     listOfReports.append(report)
         return listOfReports
 
@@ -404,6 +753,43 @@ class SXConsole:
             return True
         return False
 
+    def __moveReportToStore(self, contentStore, digest, src, dst):
+        """
+        This function will add the report file to the store and then
+        move the report file to the new location. If the report file
+        was already in the store then the file in the store is linked to
+        the new location and the report file is removed, so the same
+        report file is only stored once.
+
+        @return: Returns True if a file exists for the provided dst
+        path. Returns False if file does not exist.
+        @rtype: String
+
+        @param contentStore: The store that the report file is added to.
+        @type contentStore: ContentStore
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        @param src: Path to the report file.
+        @type src: String
+        @param dst: Path to location where the report file will be
+        moved to.
+        @type dst: String
+        """
+        if ((not contentStore.hasBlob(digest)) or (os.path.exists(dst))):
+            isStored = contentStore.addBlob(digest, src)
+            isMoved = self.__moveReport(src, dst)
+            if ((isStored) and (isMoved)):
+                contentStore.addReference(digest, dst)
+            return isMoved
+        elif (ContentStore.linkFile(contentStore.getPathToBlob(digest), dst)):
+            contentStore.addReference(digest, dst)
+            try:
+                os.remove(src)
+            except (IOError, os.error):
+                message = "There was an error removing the file: %s." %(src)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+        return os.path.isfile(dst)
+
     def __getListOfReports(self, cmdLineListOfReports, cmdLineReportPath):
         """
         This function returns a list of paths to reports based on
@@ -488,9 +874,14 @@ class SXConsole:
         # #######################################################################
         # Remove all the temporary files created by the extraction. The
         # temporary directory created by Extraction classes, usually directory
-        # /tmp/sx-*. All tarballs extract to here.
+        # /tmp/sx-*. All tarballs extract to here. If other SXConsoles are
+        # running in the same process then the process removes them when no
+        # SXConsole is running(see SXDaemon).
         # #######################################################################
-        Extractor.clean()
+        if (not self.__optionsMap.get("sharedProcess", False)):
+            Extractor.clean()
+            ExtractorsLoader.clearCache()
+            FileDigestTable.getFileDigestTable().clear()
         # #######################################################################
         # The plugins are done running and post-sxconsole action is done.
         # Remove tmp files since we are done with reportExtractor object
@@ -514,38 +905,63 @@ class SXConsole:
         listOfEnabledPlugins = []
         if (not self.__al == None):
             # #######################################################################
+            # Get list of enabled plugins. The plugins are needed before the
+            # extraction so that only the paths the plugins read can be
+            # extracted.
+            # #######################################################################
+            pluginsHelper = PluginsHelper()
+            # For now this map is empty
+            listOfEnabledPlugins = pluginsHelper.getEnabledPluginsList(self.__al.getPathToExtractedReports(),
+                                                                       self.__optionsMap.get("enableAllPlugins"),
+                                                                       self.__optionsMap.get("disableAllPlugins"),
+                                                                       self.__optionsMap.get("enablePlugins"),
+                                                                       self.__optionsMap.get("disablePlugins"),
+                                                                       self.__getPluginOptions(self.__optionsMap.get("pluginOptions")),
+                                                                       (not self.__optionsMap.get("disableUserDefinedModules")))
+            listOfExtractionPaths = None
+            if (self.__optionsMap.get("selectiveExtraction", False)):
+                listOfExtractionPaths = pluginsHelper.getRequiredPaths(listOfEnabledPlugins)
+                if (listOfExtractionPaths == None):
+                    message = "The whole reports will be extracted because an enabled plugin requires the whole report."
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
+            # #######################################################################
             # Get the list of extracted reports that were extracted or loaded.
             # #######################################################################
             listOfReportsExtracted = self.__extractReports(self.__al,
                                                            self.__optionsMap.get("pathToExtractedReports"),
                                                            self.__optionsMap.get("listOfReports"),
                                                            self.__optionsMap.get("reportPath"),
-                                                           (not self.__optionsMap.get("disableUserDefinedModules")))
+                                                           (not self.__optionsMap.get("disableUserDefinedModules")),
+                                                           listOfExtractionPaths)
 
+            # #######################################################################
+            # Extract the rest of the reports in the background while the
+            # plugins read the files straight from the report files.
+            # #######################################################################
+            if ((self.__optionsMap.get("virtualExtraction", False)) and
+                (not self.__optionsMap.get("skipBackgroundExtraction", False))):
+                for report in listOfReportsExtracted:
+                    report.startBackgroundExtraction()
             # Set archive location if there was reports load/extracted.
             if (len(listOfReportsExtracted) > 0):
                 # #######################################################################
                 # Run the plugins on the extracted reports
                 # #######################################################################
-                # Get list of enabled plugins.
-                pluginsHelper = PluginsHelper()
-                # For now this map is empty
-                listOfEnabledPlugins = pluginsHelper.getEnabledPluginsList(self.__al.getPathToExtractedReports(),
-                                                                           self.__optionsMap.get("enableAllPlugins"),
-                                                                           self.__optionsMap.get("disableAllPlugins"),
-                                                                           self.__optionsMap.get("enablePlugins"),
-                                                                           self.__optionsMap.get("disablePlugins"),
-                                                                           self.__getPluginOptions(self.__optionsMap.get("pluginOptions")),
-                                                                           (not self.__optionsMap.get("disableUserDefinedModules")))
                 # Print a list of enabled plugins.
                 if (len(listOfEnabledPlugins) > 0) :
                     message = "There was %d plugins enabled." %(len(listOfEnabledPlugins))
                     logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
                     # Generate map of all plugins reports that were created after they run.
-                    pluginsHelper.generatePluginReports(listOfReportsExtracted, listOfEnabledPlugins)
+                    pluginsHelper.generatePluginReports(listOfReportsExtracted, listOfEnabledPlugins, self.__optionsMap.get("jobs", 1),
+                                                        self.__listOfChangedReports)
                 else:
                     logging.getLogger(sx.MAIN_LOGGER_NAME).info("Skipping plugins since there was no plugins enabled.")
-
+            else:
+                listOfEnabledPlugins = []
+            # The extraction has to finish before the temporary files are
+            # removed.
+            for report in listOfReportsExtracted:
+                report.waitForBackgroundExtraction()
             self.__cleanup(listOfReportsExtracted)
             return listOfEnabledPlugins
 
@@ -0,0 +1,961 @@
+#!/usr/bin/env python
+"""
+This is the resident service that watches an inbox directory for
+reports, queues the reports for each uid and extracts and analyzes
+them with a pool of workers in one process. The jobs can be submitted,
+listed and cancelled with a local unix socket.
+
+The inbox directory has a directory for each uid that the reports are
+copied into:
+Inbox Path:                ~/sxinbox/15555553/sosreport-node1.tar.xz
+Queued Reports Path:       ~/sxinbox/.queued/15555553/sosreport-node1.tar.xz
+
+@author    :  Shane Bradley
+@contact   :  sbradley@redhat.com
+@version   :  2.17
+@copyright :  GPLv2
+"""
+import os
+import os.path
+import shutil
+import logging
+import threading
+import time
+import socket
+import SocketServer
+import copy
+try:
+    import json
+except ImportError:
+    json = None
+
+import sx
+from sx.logwriter import LogWriter
+from sx.sxconsole import SXConsole
+from sx.extractors import Extractor
+from sx.modulesloader import ExtractorsLoader
+from sx.tools import FileDigestTable
+
+class SXJob:
+    """
+    This class is a container for a list of reports for a uid that will
+    be extracted and analyzed.
+
+    @cvar STATE_QUEUED: The job is waiting to be ran.
+    @type STATE_QUEUED: String
+    @cvar STATE_RUNNING: The job is running.
+    @type STATE_RUNNING: String
+    @cvar STATE_DONE: The job has finished.
+    @type STATE_DONE: String
+    @cvar STATE_FAILED: The job has finished with an error.
+    @type STATE_FAILED: String
+    @cvar STATE_CANCELLED: The job was cancelled before it was ran.
+    @type STATE_CANCELLED: String
+    """
+    STATE_QUEUED = "queued"
+    STATE_RUNNING = "running"
+    STATE_DONE = "done"
+    STATE_FAILED = "failed"
+    STATE_CANCELLED = "cancelled"
+
+    def __init__(self, jobID, uid, listOfReports):
+        """
+        @param jobID: The unique id of the job.
+        @type jobID: Int
+        @param uid: The unique identifer for the collection of reports.
+        @type uid: String
+        @param listOfReports: The list of paths to the reports.
+        @type listOfReports: Array
+        """
+        self.__jobID = jobID
+        self.__uid = uid
+        self.__listOfReports = list(listOfReports)
+        self.__state = SXJob.STATE_QUEUED
+        self.__message = ""
+        self.__pathToExtractedReports = ""
+        self.__submitTime = time.time()
+        self.__startTime = 0
+        self.__finishTime = 0
+
+    def __str__(self):
+        """
+        Returns a string that is the id, uid and state of the job.
+
+        @return: Returns a string that is the id, uid and state of the
+        job.
+        @rtype: String
+        """
+        return "%d(%s): %s" %(self.getJobID(), self.getUID(), self.getState())
+
+    def getJobID(self):
+        """
+        Returns the unique id of the job.
+
+        @return: Returns the unique id of the job.
+        @rtype: Int
+        """
+        return self.__jobID
+
+    def getUID(self):
+        """
+        Returns the unique identifer for the collection of reports.
+
+        @return: Returns the unique identifer for the collection of
+        reports.
+        @rtype: String
+        """
+        return self.__uid
+
+    def getListOfReports(self):
+        """
+        Returns the list of paths to the reports.
+
+        @return: Returns the list of paths to the reports.
+        @rtype: Array
+        """
+        return self.__listOfReports
+
+    def addReports(self, listOfReports):
+        """
+        Adds the reports to the job if they are not already in the job.
+
+        @param listOfReports: The list of paths to the reports.
+        @type listOfReports: Array
+        """
+        for pathToReport in listOfReports:
+            if (not pathToReport in self.__listOfReports):
+                self.__listOfReports.append(pathToReport)
+
+    def getState(self):
+        """
+        Returns the state of the job.
+
+        @return: Returns the state of the job.
+        @rtype: String
+        """
+        return self.__state
+
+    def setState(self, state, message=""):
+        """
+        Sets the state of the job and records the time the job was
+        started or finished.
+
+        @param state: The state of the job.
+        @type state: String
+        @param message: A message that describes the state.
+        @type message: String
+        """
+        self.__state = state
+        self.__message = message
+        if (state == SXJob.STATE_RUNNING):
+            self.__startTime = time.time()
+        elif (not state == SXJob.STATE_QUEUED):
+            self.__finishTime = time.time()
+
+    def isFinished(self):
+        """
+        Returns True if the job will not be ran again.
+
+        @return: Returns True if the job will not be ran again.
+        @rtype: Boolean
+        """
+        return (self.__state in [SXJob.STATE_DONE, SXJob.STATE_FAILED, SXJob.STATE_CANCELLED])
+
+    def getPathToExtractedReports(self):
+        """
+        Returns the path to the extracted reports directory that the
+        results were published to.
+
+        @return: Returns the path to the extracted reports directory.
+        @rtype: String
+        """
+        return self.__pathToExtractedReports
+
+    def setPathToExtractedReports(self, pathToExtractedReports):
+        """
+        Sets the path to the extracted reports directory that the results
+        were published to.
+
+        @param pathToExtractedReports: The path to the extracted reports
+        directory.
+        @type pathToExtractedReports: String
+        """
+        self.__pathToExtractedReports = pathToExtractedReports
+
+    def toMap(self):
+        """
+        Returns a map of the attributes of the job.
+
+        @return: Returns a map of the attributes of the job.
+        @rtype: Dictionary
+        """
+        return {"id":self.__jobID, "uid":self.__uid, "reports":list(self.__listOfReports),
+                "state":self.__state, "message":self.__message,
+                "path_extracted_reports":self.__pathToExtractedReports,
+                "submit_time":self.__submitTime, "start_time":self.__startTime,
+                "finish_time":self.__finishTime}
+
+class SXJobQueue:
+    """
+    This class is a queue of jobs for each uid that are ran by a pool of
+    workers. The jobs for a uid are ran one after another in the order
+    they were submitted and the jobs for different uids are ran at the
+    same time. The reports that are submitted for a uid that already has
+    a job waiting are added to the waiting job.
+
+    @cvar MAX_FINISHED_JOBS: The number of finished jobs that are kept
+    for listing.
+    @type MAX_FINISHED_JOBS: Int
+    """
+    MAX_FINISHED_JOBS = 1000
+
+    def __init__(self, workerCount, runFunction, idleFunction=None):
+        """
+        @param workerCount: The maximum number of jobs that are ran at the
+        same time. If less than 1 then 1 will be used.
+        @type workerCount: Int
+        @param runFunction: The function that is called with a job to run
+        the job. The function sets the state of the job when done.
+        @type runFunction: Function
+        @param idleFunction: The function that is called when no jobs are
+        running. No jobs are started while it is called.
+        @type idleFunction: Function
+        """
+        self.__workerCount = max(1, workerCount)
+        self.__runFunction = runFunction
+        self.__idleFunction = idleFunction
+        self.__condition = threading.Condition()
+        # All the jobs in the order they were submitted.
+        self.__listOfJobs = []
+        self.__nextJobID = 1
+        # The uids that have a job running.
+        self.__runningUIDs = []
+        self.__isStopped = False
+        self.__workers = []
+
+    def start(self):
+        """
+        Starts the workers that run the jobs.
+        """
+        for i in range(0, self.__workerCount):
+            worker = threading.Thread(target=self.__work, name="sx-worker-%d" %(i + 1))
+            worker.setDaemon(True)
+            worker.start()
+            self.__workers.append(worker)
+
+    def stop(self):
+        """
+        Stops the workers after the running jobs have finished. The jobs
+        that are waiting are not ran.
+        """
+        self.__condition.acquire()
+        try:
+            self.__isStopped = True
+            self.__condition.notifyAll()
+        finally:
+            self.__condition.release()
+        for worker in self.__workers:
+            worker.join()
+        self.__workers = []
+
+    def __getNextJob(self):
+        """
+        Returns the first job that is waiting for a uid that does not have
+        a job running. None is returned if there is no job that can be
+        ran. The lock should be held when called.
+
+        @return: Returns the next job that can be ran.
+        @rtype: SXJob
+        """
+        for job in self.__listOfJobs:
+            if ((job.getState() == SXJob.STATE_QUEUED) and (not job.getUID() in self.__runningUIDs)):
+                return job
+        return None
+
+    def __removeFinishedJobs(self):
+        """
+        Removes the oldest finished jobs when there are more than
+        MAX_FINISHED_JOBS. The lock should be held when called.
+        """
+        listOfFinishedJobs = filter(lambda job: job.isFinished(), self.__listOfJobs)
+        for job in listOfFinishedJobs[:max(0, len(listOfFinishedJobs) - SXJobQueue.MAX_FINISHED_JOBS)]:
+            self.__listOfJobs.remove(job)
+
+    def __work(self):
+        """
+        Runs the jobs until the queue is stopped.
+        """
+        while (True):
+            self.__condition.acquire()
+            try:
+                job = self.__getNextJob()
+                while ((job == None) and (not self.__isStopped)):
+                    self.__condition.wait(1)
+                    job = self.__getNextJob()
+                if (self.__isStopped):
+                    return
+                job.setState(SXJob.STATE_RUNNING)
+                self.__runningUIDs.append(job.getUID())
+            finally:
+                self.__condition.release()
+            try:
+                self.__runFunction(job)
+            except Exception, e:
+                job.setState(SXJob.STATE_FAILED, "There was an error running the job: %s" %(str(e)))
+                message = "There was an error running the job %s: %s" %(str(job), str(e))
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+            self.__condition.acquire()
+            try:
+                if (job.getState() == SXJob.STATE_RUNNING):
+                    job.setState(SXJob.STATE_DONE)
+                self.__runningUIDs.remove(job.getUID())
+                self.__removeFinishedJobs()
+                if ((not len(self.__runningUIDs) > 0) and (not self.__idleFunction == None)):
+                    self.__idleFunction()
+                self.__condition.notifyAll()
+            finally:
+                self.__condition.release()
+
+    def submit(self, uid, listOfReports):
+        """
+        Adds the reports for the uid to the queue. If there is a job
+        waiting for the uid then the reports are added to that job, else
+        a new job is created.
+
+        @return: Returns the job the reports were added to.
+        @rtype: SXJob
+
+        @param uid: The unique identifer for the collection of reports.
+        @type uid: String
+        @param listOfReports: The list of paths to the reports.
+        @type listOfReports: Array
+        """
+        self.__condition.acquire()
+        try:
+            for job in self.__listOfJobs:
+                if ((job.getUID() == uid) and (job.getState() == SXJob.STATE_QUEUED)):
+                    job.addReports(listOfReports)
+                    return job
+            job = SXJob(self.__nextJobID, uid, listOfReports)
+            self.__nextJobID += 1
+            self.__listOfJobs.append(job)
+            self.__condition.notifyAll()
+            return job
+        finally:
+            self.__condition.release()
+
+    def cancel(self, jobID):
+        """
+        Cancels the job if it has not started. Returns a tuple of (result,
+        message) where result is True if the job was cancelled.
+
+        @return: Returns a tuple of (result, message).
+        @rtype: Tuple
+
+        @param jobID: The unique id of the job.
+        @type jobID: Int
+        """
+        self.__condition.acquire()
+        try:
+            for job in self.__listOfJobs:
+                if (job.getJobID() == jobID):
+                    if (job.getState() == SXJob.STATE_QUEUED):
+                        job.setState(SXJob.STATE_CANCELLED, "The job was cancelled.")
+                        return (True, "The job was cancelled: %s" %(str(job)))
+                    return (False, "Only jobs that are queued can be cancelled: %s" %(str(job)))
+            return (False, "There is no job with the id: %s" %(str(jobID)))
+        finally:
+            self.__condition.release()
+
+    def getJob(self, jobID):
+        """
+        Returns the job with the id. None is returned if there is no job
+        with the id.
+
+        @return: Returns the job with the id.
+        @rtype: SXJob
+
+        @param jobID: The unique id of the job.
+        @type jobID: Int
+        """
+        self.__condition.acquire()
+        try:
+            for job in self.__listOfJobs:
+                if (job.getJobID() == jobID):
+                    return job
+            return None
+        finally:
+            self.__condition.release()
+
+    def getJobs(self):
+        """
+        Returns a list of the jobs in the order they were submitted.
+
+        @return: Returns a list of the jobs.
+        @rtype: Array
+        """
+        self.__condition.acquire()
+        try:
+            return list(self.__listOfJobs)
+        finally:
+            self.__condition.release()
+
+class SXInboxWatcher:
+    """
+    This class watches an inbox directory for reports. The reports are
+    copied into a directory for each uid in the inbox directory. A report
+    is submitted once its size and modification time have not changed
+    since the last time the inbox was checked, then the report is moved
+    to the queued reports directory so it is only submitted once. Files
+    that start with a "." are ignored so they can be renamed once they
+    are copied.
+
+    @cvar QUEUED_DIR: The name of the directory in the inbox that the
+    reports are moved to when they are submitted.
+    @type QUEUED_DIR: String
+    """
+    QUEUED_DIR = ".queued"
+
+    def __init__(self, pathToInbox, submitFunction, pollInterval=2):
+        """
+        @param pathToInbox: The path to the inbox directory.
+        @type pathToInbox: String
+        @param submitFunction: The function that is called with the uid
+        and list of reports when reports are found.
+        @type submitFunction: Function
+        @param pollInterval: The number of seconds between checks of the
+        inbox.
+        @type pollInterval: Int
+        """
+        self.__pathToInbox = pathToInbox
+        self.__submitFunction = submitFunction
+        self.__pollInterval = pollInterval
+        # Map of the path to a report to the (size, modification time)
+        # that was seen the last time the inbox was checked.
+        self.__pendingFilesMap = {}
+        self.__stopEvent = threading.Event()
+        self.__thread = None
+
+    def getPathToInbox(self):
+        """
+        Returns the path to the inbox directory.
+
+        @return: Returns the path to the inbox directory.
+        @rtype: String
+        """
+        return self.__pathToInbox
+
+    def getPathToQueuedReports(self, uid):
+        """
+        Returns the path to the directory the reports for the uid are
+        moved to when they are submitted.
+
+        @return: Returns the path to the queued reports directory.
+        @rtype: String
+
+        @param uid: The unique identifer for the collection of reports.
+        @type uid: String
+        """
+        return os.path.join(os.path.join(self.__pathToInbox, SXInboxWatcher.QUEUED_DIR), uid)
+
+    def start(self):
+        """
+        Starts watching the inbox directory. The reports that were queued
+        but not ran before the service was stopped are submitted again.
+        """
+        pathToQueued = os.path.join(self.__pathToInbox, SXInboxWatcher.QUEUED_DIR)
+        if (os.path.isdir(pathToQueued)):
+            for uid in sorted(os.listdir(pathToQueued)):
+                pathToQueuedReports = self.getPathToQueuedReports(uid)
+                listOfReports = []
+                for filename in sorted(os.listdir(pathToQueuedReports)):
+                    if (os.path.isfile(os.path.join(pathToQueuedReports, filename))):
+                        listOfReports.append(os.path.join(pathToQueuedReports, filename))
+                if (len(listOfReports) > 0):
+                    message = "Submitting the %d reports that were queued for the uid: %s" %(len(listOfReports), uid)
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
+                    self.__submitFunction(uid, listOfReports)
+        self.__thread = threading.Thread(target=self.__watch, name="sx-inbox")
+        self.__thread.setDaemon(True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stops watching the inbox directory.
+        """
+        self.__stopEvent.set()
+        if (not self.__thread == None):
+            self.__thread.join()
+            self.__thread = None
+
+    def __watch(self):
+        """
+        Checks the inbox directory until stopped.
+        """
+        while (not self.__stopEvent.isSet()):
+            try:
+                self.check()
+            except (IOError, os.error), e:
+                message = "There was an error checking the inbox directory %s: %s" %(self.__pathToInbox, str(e))
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+            self.__stopEvent.wait(self.__pollInterval)
+
+    def check(self):
+        """
+        Checks the inbox directory once and submits the reports that have
+        not changed since the last check.
+        """
+        if (not os.path.isdir(self.__pathToInbox)):
+            return
+        listOfPathsFound = []
+        for uid in sorted(os.listdir(self.__pathToInbox)):
+            pathToUIDDir = os.path.join(self.__pathToInbox, uid)
+            if ((uid.startswith(".")) or (not os.path.isdir(pathToUIDDir))):
+                continue
+            elif (not uid.isalnum()):
+                message = "The directory in the inbox is not a valid uid and will be skipped: %s" %(pathToUIDDir)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).debug(message)
+                continue
+            listOfReports = []
+            for filename in sorted(os.listdir(pathToUIDDir)):
+                pathToFilename = os.path.join(pathToUIDDir, filename)
+                if ((filename.startswith(".")) or (not os.path.isfile(pathToFilename))):
+                    continue
+                listOfPathsFound.append(pathToFilename)
+                fileStat = os.stat(pathToFilename)
+                signature = (fileStat.st_size, fileStat.st_mtime)
+                if (not self.__pendingFilesMap.get(pathToFilename) == signature):
+                    # Wait for the next check in case the file is still
+                    # being copied.
+                    self.__pendingFilesMap[pathToFilename] = signature
+                    continue
+                pathToQueuedReport = self.__moveToQueued(uid, pathToFilename)
+                if (len(pathToQueuedReport) > 0):
+                    listOfReports.append(pathToQueuedReport)
+            if (len(listOfReports) > 0):
+                message = "Submitting %d reports from the inbox for the uid: %s" %(len(listOfReports), uid)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
+                self.__submitFunction(uid, listOfReports)
+        # Forget the files that are no longer in the inbox.
+        for pathToFilename in self.__pendingFilesMap.keys():
+            if (not pathToFilename in listOfPathsFound):
+                del self.__pendingFilesMap[pathToFilename]
+
+    def __moveToQueued(self, uid, pathToFilename):
+        """
+        Moves the report to the queued reports directory for the
+        uid. Returns the new path to the report or empty string if the
+        report could not be moved.
+
+        @return: Returns the new path to the report.
+        @rtype: String
+
+        @param uid: The unique identifer for the collection of reports.
+        @type uid: String
+        @param pathToFilename: The path to the report.
+        @type pathToFilename: String
+        """
+        pathToQueuedReports = self.getPathToQueuedReports(uid)
+        try:
+            if (not os.path.isdir(pathToQueuedReports)):
+                os.makedirs(pathToQueuedReports)
+            filename = os.path.basename(pathToFilename)
+            pathToQueuedReport = os.path.join(pathToQueuedReports, filename)
+            for i in range(1, 100):
+                if (not os.path.exists(pathToQueuedReport)):
+                    break
+                pathToQueuedReport = os.path.join(pathToQueuedReports, "%d-%s" %(i, filename))
+            shutil.move(pathToFilename, pathToQueuedReport)
+            return pathToQueuedReport
+        except (IOError, os.error):
+            message = "Cannot move the file %s to %s." %(pathToFilename, pathToQueuedReports)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+        return ""
+
+class SXDaemonRequestHandler(SocketServer.StreamRequestHandler):
+    """
+    This class handles a request on the unix socket. Each request and
+    response is a line of JSON.
+    """
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            requestMap = json.loads(line)
+            if (not isinstance(requestMap, dict)):
+                raise ValueError("The request is not a map.")
+            responseMap = self.server.getDaemon().handleRequest(requestMap)
+        except ValueError, e:
+            responseMap = {"result":False, "message":"The request is not valid: %s" %(str(e))}
+        self.wfile.write("%s\n" %(json.dumps(responseMap)))
+
+class SXDaemonServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    """
+    This class is the unix socket server for the service.
+    """
+    daemon_threads = True
+
+    def __init__(self, pathToSocket, sxDaemon):
+        """
+        @param pathToSocket: The path to the unix socket.
+        @type pathToSocket: String
+        @param sxDaemon: The service that handles the requests.
+        @type sxDaemon: SXDaemon
+        """
+        self.__sxDaemon = sxDaemon
+        SocketServer.UnixStreamServer.__init__(self, pathToSocket, SXDaemonRequestHandler)
+
+    def getDaemon(self):
+        """
+        Returns the service that handles the requests.
+
+        @return: Returns the service that handles the requests.
+        @rtype: SXDaemon
+        """
+        return self.__sxDaemon
+
+class SXDaemon:
+    """
+    This class is the resident service that runs the jobs for the reports
+    that are found in the inbox directory or submitted with the unix
+    socket. The reports for a uid are extracted to a new archive layout
+    the first time the uid is seen, then the reports that are submitted
+    later for the uid are added to that archive layout and only the
+    plugins for what changed are ran(see SXConsole).
+
+    The requests on the unix socket are maps with a "command" key:
+    {"command":"submit", "uid":"15555553", "reports":["/path/to/report"]}
+    {"command":"list"}
+    {"command":"cancel", "id":1}
+    """
+    def __init__(self, optionsMap, pathToInbox, pathToSocket, workerCount=1, pollInterval=2):
+        """
+        @param optionsMap: The options that are used for each job(see
+        SXConsole). The uid and list of reports are set for each job.
+        @type optionsMap: Dictionary
+        @param pathToInbox: The path to the inbox directory. If empty
+        string then no inbox directory is watched.
+        @type pathToInbox: String
+        @param pathToSocket: The path to the unix socket.
+        @type pathToSocket: String
+        @param workerCount: The maximum number of jobs that are ran at the
+        same time.
+        @type workerCount: Int
+        @param pollInterval: The number of seconds between checks of the
+        inbox.
+        @type pollInterval: Int
+        """
+        self.__optionsMap = optionsMap
+        self.__pathToSocket = pathToSocket
+        self.__jobQueue = SXJobQueue(workerCount, self.__runJob, self.__cleanup)
+        self.__inboxWatcher = None
+        if (len(pathToInbox) > 0):
+            self.__inboxWatcher = SXInboxWatcher(pathToInbox, self.submit, pollInterval)
+        self.__server = None
+        self.__serverThread = None
+        # Map of the uid to the path to the extracted reports directory that
+        # the reports for the uid were last published to.
+        self.__archivedLayoutsMap = {}
+        self.__archivedLayoutsLock = threading.Lock()
+
+    def getJobQueue(self):
+        """
+        Returns the queue of jobs.
+
+        @return: Returns the queue of jobs.
+        @rtype: SXJobQueue
+        """
+        return self.__jobQueue
+
+    def start(self):
+        """
+        Starts the workers, the unix socket server and watching the inbox
+        directory.
+
+        @return: Returns True if the service was started.
+        @rtype: Boolean
+        """
+        if (json == None):
+            message = "The json python module is required for the unix socket."
+            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+            return False
+        if (os.path.exists(self.__pathToSocket)):
+            # Only remove the socket if no other service is using it.
+            if (SXDaemonClient(self.__pathToSocket).isRunning()):
+                message = "There is already a service running on the unix socket: %s" %(self.__pathToSocket)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                return False
+            try:
+                os.remove(self.__pathToSocket)
+            except (IOError, os.error):
+                message = "There was an error removing the file: %s." %(self.__pathToSocket)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+                return False
+        try:
+            self.__server = SXDaemonServer(self.__pathToSocket, self)
+            # Only the user that is running the service can use the socket.
+            os.chmod(self.__pathToSocket, 0600)
+        except (IOError, os.error, socket.error), e:
+            message = "There was an error creating the unix socket %s: %s" %(self.__pathToSocket, str(e))
+            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+            return False
+        self.__jobQueue.start()
+        self.__serverThread = threading.Thread(target=self.__server.serve_forever, name="sx-server")
+        self.__serverThread.setDaemon(True)
+        self.__serverThread.start()
+        if (not self.__inboxWatcher == None):
+            message = "Watching the inbox directory for reports: %s" %(self.__inboxWatcher.getPathToInbox())
+            logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
+            self.__inboxWatcher.start()
+        message = "The service is listening on the unix socket: %s" %(self.__pathToSocket)
+        logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
+        return True
+
+    def stop(self):
+        """
+        Stops watching the inbox directory and the unix socket server,
+        then waits for the running jobs to finish. The reports for the
+        jobs that are queued are left in the queued reports directory and
+        are submitted again when the service is started.
+        """
+        if (not self.__inboxWatcher == None):
+            self.__inboxWatcher.stop()
+        if (not self.__server == None):
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+            try:
+                os.remove(self.__pathToSocket)
+            except (IOError, os.error):
+                pass
+        message = "Waiting for the running jobs to finish."
+        logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
+        self.__jobQueue.stop()
+
+    def submit(self, uid, listOfReports):
+        """
+        Adds the reports for the uid to the queue of jobs.
+
+        @return: Returns the job the reports were added to.
+        @rtype: SXJob
+
+        @param uid: The unique identifer for the collection of reports.
+        @type uid: String
+        @param listOfReports: The list of paths to the reports.
+        @type listOfReports: Array
+        """
+        job = self.__jobQueue.submit(uid, listOfReports)
+        message = "The reports were added to the job: %s" %(str(job))
+        logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
+        return job
+
+    def handleRequest(self, requestMap):
+        """
+        Returns the response map for a request from the unix socket. The
+        response always has a "result" key.
+
+        @return: Returns the response map.
+        @rtype: Dictionary
+
+        @param requestMap: The request.
+        @type requestMap: Dictionary
+        """
+        command = requestMap.get("command", "")
+        if (command == "submit"):
+            uid = str(requestMap.get("uid", ""))
+            listOfReports = []
+            for pathToReport in requestMap.get("reports", []):
+                listOfReports.append(str(pathToReport))
+            if (not uid.isalnum()):
+                return {"result":False, "message":"Only alphanumeric uids are valid: %s" %(uid)}
+            for pathToReport in listOfReports:
+                if ((not os.path.isabs(pathToReport)) or (not os.path.isfile(pathToReport))):
+                    return {"result":False, "message":"The path to the report is not a full path to a file: %s" %(pathToReport)}
+            if (not len(listOfReports) > 0):
+                return {"result":False, "message":"No reports were given."}
+            job = self.submit(uid, listOfReports)
+            return {"result":True, "message":"The reports were added to the job: %s" %(str(job)), "job":job.toMap()}
+        elif (command == "list"):
+            listOfJobMaps = []
+            for job in self.__jobQueue.getJobs():
+                listOfJobMaps.append(job.toMap())
+            return {"result":True, "message":"There are %d jobs." %(len(listOfJobMaps)), "jobs":listOfJobMaps}
+        elif (command == "cancel"):
+            try:
+                jobID = int(requestMap.get("id", ""))
+            except ValueError:
+                return {"result":False, "message":"The job id is not valid: %s" %(str(requestMap.get("id", "")))}
+            (result, message) = self.__jobQueue.cancel(jobID)
+            if (result):
+                self.__returnCancelledReports(self.__jobQueue.getJob(jobID))
+            return {"result":result, "message":message}
+        elif (command == "ping"):
+            return {"result":True, "message":"The service is running."}
+        return {"result":False, "message":"The command is not valid: %s" %(command)}
+
+    def __returnCancelledReports(self, job):
+        """
+        Moves the reports of a cancelled job that were found in the inbox
+        directory back to the inbox directory with a "." prefix, so they
+        are not submitted again.
+
+        @param job: The job that was cancelled.
+        @type job: SXJob
+        """
+        if ((job == None) or (self.__inboxWatcher == None)):
+            return
+        pathToQueuedReports = self.__inboxWatcher.getPathToQueuedReports(job.getUID())
+        for pathToReport in job.getListOfReports():
+            if (not os.path.dirname(pathToReport) == pathToQueuedReports):
+                continue
+            pathToCancelledReport = os.path.join(os.path.join(self.__inboxWatcher.getPathToInbox(), job.getUID()),
+                                                 ".%s" %(os.path.basename(pathToReport)))
+            try:
+                shutil.move(pathToReport, pathToCancelledReport)
+            except (IOError, os.error):
+                message = "Cannot move the file %s to %s." %(pathToReport, pathToCancelledReport)
+                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+
+    def __runJob(self, job):
+        """
+        Extracts the reports of the job and runs the enabled plugins on
+        them. If the reports for the uid were published before then the
+        reports are added to those extracted reports.
+
+        @param job: The job that will be ran.
+        @type job: SXJob
+        """
+        message = "Running the job: %s" %(str(job))
+        logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
+        optionsMap = copy.deepcopy(self.__optionsMap)
+        optionsMap["listOfReports"] = list(job.getListOfReports())
+        # The reports are only read from the list of reports.
+        optionsMap["reportPath"] = ""
+        # The service runs more than one job in the same process so the
+        # temporary files are removed when no jobs are running.
+        optionsMap["sharedProcess"] = True
+        uid = job.getUID()
+        self.__archivedLayoutsLock.acquire()
+        try:
+            pathToExtractedReports = self.__archivedLayoutsMap.get(uid, "")
+        finally:
+            self.__archivedLayoutsLock.release()
+        if ((len(pathToExtractedReports) > 0) and (os.path.isdir(pathToExtractedReports))):
+            optionsMap["pathToExtractedReports"] = pathToExtractedReports
+            optionsMap["incremental"] = True
+            uid = ""
+        try:
+            sxConsole = SXConsole(optionsMap, uid)
+            al = sxConsole.getArchiveLayout()
+            if (al == None):
+                job.setState(SXJob.STATE_FAILED, "The options for the job are not valid.")
+                return
+            listOfEnabledPlugins = sxConsole.run()
+        except SystemExit:
+            job.setState(SXJob.STATE_FAILED, "There was an error extracting the reports.")
+            return
+        job.setPathToExtractedReports(al.getPathToExtractedReports())
+        if (os.path.isdir(al.getPathToExtractedReports())):
+            self.__archivedLayoutsLock.acquire()
+            try:
+                self.__archivedLayoutsMap[job.getUID()] = al.getPathToExtractedReports()
+            finally:
+                self.__archivedLayoutsLock.release()
+            job.setState(SXJob.STATE_DONE, "The results were published to: %s" %(al.getPathToExtractedReports()))
+        else:
+            job.setState(SXJob.STATE_FAILED, "There were no reports extracted.")
+        message = "The job has finished: %s" %(str(job))
+        logging.getLogger(sx.MAIN_LOGGER_NAME).info(message)
+
+    def __cleanup(self):
+        """
+        Removes the temporary files that were created by the extractors
+        and clears the caches that are shared in the process when no jobs
+        are running.
+        """
+        Extractor.clean()
+        ExtractorsLoader.clearCache()
+        FileDigestTable.getFileDigestTable().clear()
+
+class SXDaemonClient:
+    """
+    This class sends requests to the service on the unix socket.
+    """
+    def __init__(self, pathToSocket):
+        """
+        @param pathToSocket: The path to the unix socket.
+        @type pathToSocket: String
+        """
+        self.__pathToSocket = pathToSocket
+
+    def request(self, requestMap):
+        """
+        Sends the request and returns the response map. None is returned
+        if the service could not be reached.
+
+        @return: Returns the response map.
+        @rtype: Dictionary
+
+        @param requestMap: The request.
+        @type requestMap: Dictionary
+        """
+        if (json == None):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            try:
+                sock.connect(self.__pathToSocket)
+                sock.sendall("%s\n" %(json.dumps(requestMap)))
+                fin = sock.makefile("r")
+                try:
+                    line = fin.readline()
+                finally:
+                    fin.close()
+                return json.loads(line)
+            except (socket.error, ValueError):
+                return None
+        finally:
+            sock.close()
+
+    def isRunning(self):
+        """
+        Returns True if the service is running on the unix socket.
+
+        @return: Returns True if the service is running.
+        @rtype: Boolean
+        """
+        return (not self.request({"command":"ping"}) == None)
+
+    def submit(self, uid, listOfReports):
+        """
+        Submits the reports for the uid and returns the response map.
+
+        @return: Returns the response map.
+        @rtype: Dictionary
+
+        @param uid: The unique identifer for the collection of reports.
+        @type uid: String
+        @param listOfReports: The list of full paths to the reports.
+        @type listOfReports: Array
+        """
+        return self.request({"command":"submit", "uid":uid, "reports":listOfReports})
+
+    def list(self):
+        """
+        Returns the response map that contains the list of jobs.
+
+        @return: Returns the response map.
+        @rtype: Dictionary
+        """
+        return self.request({"command":"list"})
+
+    def cancel(self, jobID):
+        """
+        Cancels the job and returns the response map.
+
+        @return: Returns the response map.
+        @rtype: Dictionary
+
+        @param jobID: The unique id of the job.
+        @type jobID: Int
+        """
+        return self.request({"command":"cancel", "id":jobID})
@@ -18,6 +18,9 @@ import shutil
 import hashlib
 import datetime
 import textwrap
+import threading
+import time
+import Queue
 
 # Import sx first so we can spit out message
 import sx
@@ -463,9 +466,10 @@ class FileUtil:
 
     def isFilesIdentical(pathToFilesList) :
         """
-        This function uses md5sum to verify that all files in array
-        have same md5sum as the base file. If all files have same
-        md5sum then True is returned.
+        This function verifies that all files in array have the same
+        contents. The whitespace at the end of the files is
+        ignored. If all files have the same contents then True is
+        returned(see FileDigestTable).
 
         If the file list does not contain 2 or more files then False
         is returned.
@@ -481,39 +485,7 @@ class FileUtil:
             message = "There are not enough files to compare mdsum's. There must be 2 or more files."
             logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
             return False
-        # This is the base value that all files compared against. This
-        # will be set to the last item added.
-        baseMD5Sum = ""
-        # This is map of file paths to md5sum of the contents
-        md5sumMap = dict.fromkeys(pathToFilesList)
-        for key in md5sumMap.keys():
-            # Read the file into a string
-            fileContents  = ""
-            try:
-                f = open(key, "r")
-                fileContents = string.rstrip(f.read())
-                f.close()
-            except (IOError, os.error):
-                message = "An error occured reading the file: %s." %(key)
-                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
-                return False
-            # Generate the md5sum
-            try:
-                md5sum = hashlib.md5()
-                md5sum.update(fileContents)
-                currentMD5Sum = md5sum.digest()
-                md5sumMap[key] = currentMD5Sum
-                # Just grab the last item that was set.
-                baseMD5Sum = currentMD5Sum
-            except (IOError, os.error):
-                message = "There was an error generating the md5sum for file: %s." %(key)
-                logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
-                return False
-
-        for key in md5sumMap.keys():
-            if (not md5sumMap.get(key) == baseMD5Sum):
-                return False
-        return True
+        return FileDigestTable.getFileDigestTable().isFilesIdentical(pathToFilesList, FileDigestTable.IGNORE_TRAILING_WHITESPACE)
     isFilesIdentical = staticmethod(isFilesIdentical)
 
     def mkdirs(pathToDSTDir):
@@ -653,6 +625,337 @@ class FileUtil:
             logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
     touch = staticmethod(touch)
 
+class FileDigestTable:
+    """
+    This class is a table of the digests of files that is used to find the
+    files that have the same contents. The digest of a file is only
+    generated once for each compare mode and is generated again only if
+    the size or modification time of the file changes.
+
+    The digests in the manifest of an extracted report are used for the
+    files in the report instead of reading the files(see
+    addManifest()). A file that only has to be compared exactly is never
+    read if it is in a manifest. The files that are compared with a
+    normalized compare mode are grouped by their manifest digest first, so
+    only one file from each group has to be read.
+
+    @cvar COMPARE_EXACT: The compare mode where the files must have the
+    same contents.
+    @type COMPARE_EXACT: Int
+    @cvar IGNORE_TRAILING_WHITESPACE: The compare mode flag that ignores
+    the whitespace at the end of the files.
+    @type IGNORE_TRAILING_WHITESPACE: Int
+    @cvar IGNORE_WHITESPACE: The compare mode flag that ignores all the
+    whitespace in each line and the empty lines.
+    @type IGNORE_WHITESPACE: Int
+    @cvar IGNORE_COMMENTS: The compare mode flag that ignores the lines
+    that are comments(see COMMENT_PREFIXES).
+    @type IGNORE_COMMENTS: Int
+    @cvar COMMENT_PREFIXES: The prefixes of the lines that are comments.
+    @type COMMENT_PREFIXES: Array
+    @cvar HASH_NAME: The name of the hash that is used for the digests.
+    @type HASH_NAME: String
+    @cvar BLOCK_SIZE: The size of the blocks that are read from the files.
+    @type BLOCK_SIZE: Int
+    @cvar MAX_ENTRIES: The maximum number of digests in the table.
+    @type MAX_ENTRIES: Int
+    @cvar FILE_DIGEST_TABLE: The table that is shared in the process(see
+    getFileDigestTable()).
+    @type FILE_DIGEST_TABLE: FileDigestTable
+    @cvar FILE_DIGEST_TABLE_LOCK: The lock that protects the shared table.
+    @type FILE_DIGEST_TABLE_LOCK: Lock
+    """
+    COMPARE_EXACT = 0
+    IGNORE_TRAILING_WHITESPACE = 1
+    IGNORE_WHITESPACE = 2
+    IGNORE_COMMENTS = 4
+    COMMENT_PREFIXES = ["#", ";"]
+    HASH_NAME = "sha256"
+    BLOCK_SIZE = 1024 * 1024
+    MAX_ENTRIES = 65536
+    FILE_DIGEST_TABLE = None
+    FILE_DIGEST_TABLE_LOCK = threading.Lock()
+
+    def __init__(self, maxEntries=MAX_ENTRIES):
+        """
+        @param maxEntries: The maximum number of digests in the table.
+        @type maxEntries: Int
+        """
+        # The key is the path to the file and compare mode. The value is
+        # the size, modification time and digest of the file.
+        self.__digestsCache = LRUCache(maxEntries)
+        # Map of the paths to the extracted reports to their manifests.
+        self.__manifestsMap = {}
+        self.__lock = threading.Lock()
+
+    def getFileDigestTable():
+        """
+        Returns the FileDigestTable that is shared in the process. The
+        table is created the first time it is requested.
+
+        @return: Returns the FileDigestTable that is shared in the
+        process.
+        @rtype: FileDigestTable
+        """
+        FileDigestTable.FILE_DIGEST_TABLE_LOCK.acquire()
+        try:
+            if (FileDigestTable.FILE_DIGEST_TABLE == None):
+                FileDigestTable.FILE_DIGEST_TABLE = FileDigestTable()
+            return FileDigestTable.FILE_DIGEST_TABLE
+        finally:
+            FileDigestTable.FILE_DIGEST_TABLE_LOCK.release()
+    getFileDigestTable = staticmethod(getFileDigestTable)
+
+    # #######################################################################
+    # Private helper functions
+    # #######################################################################
+    def __getManifestDigest(self, pathToFile):
+        """
+        Returns the digest of the file from the manifest of the extracted
+        report that contains the file. Empty string is returned if the file
+        is not in a manifest.
+
+        @return: Returns the digest of the file from a manifest.
+        @rtype: String
+
+        @param pathToFile: The absolute path to the file.
+        @type pathToFile: String
+        """
+        self.__lock.acquire()
+        try:
+            if (not len(self.__manifestsMap) > 0):
+                return ""
+            # Find the extracted report that contains the file.
+            (head, tail) = os.path.split(pathToFile)
+            listOfNames = [tail]
+            while ((len(tail) > 0) and (not self.__manifestsMap.has_key(head))):
+                (head, tail) = os.path.split(head)
+                listOfNames.insert(0, tail)
+            manifest = self.__manifestsMap.get(head)
+        finally:
+            self.__lock.release()
+        # The manifest only has the digests of regular files.
+        if ((manifest == None) or (os.path.islink(pathToFile))):
+            return ""
+        return manifest.getMemberDigest("/".join(listOfNames))
+
+    def __getCachedDigest(self, pathToFile, compareMode):
+        """
+        Returns the digest of the file that is in the table or the
+        manifest of the extracted report. Empty string is returned if the
+        digest is not known without reading the file.
+
+        @return: Returns the digest of the file that is known.
+        @rtype: String
+
+        @param pathToFile: The absolute path to the file.
+        @type pathToFile: String
+        @param compareMode: The compare mode for the digest.
+        @type compareMode: Int
+        """
+        if (compareMode == FileDigestTable.COMPARE_EXACT):
+            digest = self.__getManifestDigest(pathToFile)
+            if (len(digest) > 0):
+                return digest
+        entry = self.__digestsCache.get((pathToFile, compareMode))
+        if (not entry == None):
+            try:
+                fileStat = os.stat(pathToFile)
+                if ((fileStat.st_size == entry[0]) and (fileStat.st_mtime == entry[1])):
+                    return entry[2]
+            except (IOError, os.error):
+                pass
+        return ""
+
+    def __readNormalizedLines(self, fileobj, compareMode):
+        """
+        Returns a generator for the lines in the file with the lines
+        changed or skipped for the compare mode.
+
+        @return: Returns a generator for the normalized lines.
+        @rtype: Generator
+
+        @param fileobj: The file that is read.
+        @type fileobj: File
+        @param compareMode: The compare mode for the lines.
+        @type compareMode: Int
+        """
+        for line in fileobj:
+            if (compareMode & FileDigestTable.IGNORE_COMMENTS):
+                strippedLine = line.strip()
+                isComment = False
+                for commentPrefix in FileDigestTable.COMMENT_PREFIXES:
+                    if (strippedLine.startswith(commentPrefix)):
+                        isComment = True
+                        break
+                if (isComment):
+                    continue
+            if (compareMode & FileDigestTable.IGNORE_WHITESPACE):
+                line = "".join(line.split())
+                if (not len(line) > 0):
+                    continue
+                line += "\n"
+            yield line
+
+    def __generateDigest(self, pathToFile, compareMode):
+        """
+        Reads the file and returns the digest of the contents for the
+        compare mode. The digest is added to the table. None is returned if
+        the file could not be read.
+
+        @return: Returns the digest of the file.
+        @rtype: String
+
+        @param pathToFile: The absolute path to the file.
+        @type pathToFile: String
+        @param compareMode: The compare mode for the digest.
+        @type compareMode: Int
+        """
+        digest = hashlib.new(FileDigestTable.HASH_NAME)
+        try:
+            fileStat = os.stat(pathToFile)
+            fileobj = open(pathToFile, "rb")
+            try:
+                if (compareMode & (FileDigestTable.IGNORE_WHITESPACE | FileDigestTable.IGNORE_COMMENTS)):
+                    chunks = self.__readNormalizedLines(fileobj, compareMode)
+                else:
+                    chunks = iter(lambda: fileobj.read(FileDigestTable.BLOCK_SIZE), "")
+                # The whitespace at the end of the chunks is held until
+                # there is more data so that the whitespace at the end of the
+                # file is never added to the digest.
+                pendingWhitespace = ""
+                for chunk in chunks:
+                    if (compareMode & FileDigestTable.IGNORE_TRAILING_WHITESPACE):
+                        chunk = pendingWhitespace + chunk
+                        strippedChunk = chunk.rstrip()
+                        pendingWhitespace = chunk[len(strippedChunk):]
+                        chunk = strippedChunk
+                    digest.update(chunk)
+            finally:
+                fileobj.close()
+        except (IOError, os.error):
+            message = "An error occured reading the file: %s." %(pathToFile)
+            logging.getLogger(sx.MAIN_LOGGER_NAME).error(message)
+            return None
+        hexDigest = digest.hexdigest()
+        self.__digestsCache.put((pathToFile, compareMode), (fileStat.st_size, fileStat.st_mtime, hexDigest), 1)
+        return hexDigest
+
+    # #######################################################################
+    # Public functions
+    # #######################################################################
+    def addManifest(self, pathToExtractedReport, manifest):
+        """
+        Adds the manifest of the extracted report so that the digests in
+        the manifest are used for the files in the extracted report. The
+        manifest must use the same hash as the table(see HASH_NAME).
+
+        @param pathToExtractedReport: The path to the extracted report.
+        @type pathToExtractedReport: String
+        @param manifest: The manifest of the extracted report.
+        @type manifest: ArchiveManifest
+        """
+        self.__lock.acquire()
+        try:
+            self.__manifestsMap[os.path.abspath(pathToExtractedReport)] = manifest
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        """
+        Removes all the digests and manifests from the table.
+        """
+        self.__lock.acquire()
+        try:
+            self.__manifestsMap.clear()
+        finally:
+            self.__lock.release()
+        self.__digestsCache.clear()
+
+    def getDigest(self, pathToFile, compareMode=COMPARE_EXACT):
+        """
+        Returns the digest of the contents of the file for the compare
+        mode. The files that have the same digest for a compare mode are
+        identical for that compare mode. None is returned if the file could
+        not be read.
+
+        @return: Returns the digest of the file.
+        @rtype: String
+
+        @param pathToFile: The path to the file.
+        @type pathToFile: String
+        @param compareMode: The compare mode for the digest which is
+        COMPARE_EXACT or the sum of the IGNORE_* flags.
+        @type compareMode: Int
+        """
+        pathToFile = os.path.abspath(pathToFile)
+        digest = self.__getCachedDigest(pathToFile, compareMode)
+        if (len(digest) > 0):
+            return digest
+        return self.__generateDigest(pathToFile, compareMode)
+
+    def groupFiles(self, listOfPaths, compareMode=COMPARE_EXACT):
+        """
+        Returns the files grouped into the lists of files that are
+        identical for the compare mode. The largest group is first and
+        the files in each group are in the same order as the list of
+        files. The files that could not be read are not in any group.
+
+        @return: Returns a list of the groups of files that are identical.
+        @rtype: Array
+
+        @param listOfPaths: The list of paths to the files that will be
+        compared.
+        @type listOfPaths: Array
+        @param compareMode: The compare mode for the files which is
+        COMPARE_EXACT or the sum of the IGNORE_* flags.
+        @type compareMode: Int
+        """
+        # The files that have the same exact digest are identical for all
+        # compare modes, so only one of them is read for the digest of the
+        # compare mode.
+        exactDigestsMap = {}
+        groupsMap = {}
+        listOfDigests = []
+        for pathToFile in listOfPaths:
+            exactDigest = self.__getCachedDigest(os.path.abspath(pathToFile), FileDigestTable.COMPARE_EXACT)
+            if (exactDigestsMap.has_key(exactDigest)):
+                digest = exactDigestsMap.get(exactDigest)
+            else:
+                digest = self.getDigest(pathToFile, compareMode)
+                if (len(exactDigest) > 0):
+                    exactDigestsMap[exactDigest] = digest
+            if (digest == None):
+                continue
+            if (not groupsMap.has_key(digest)):
+                groupsMap[digest] = []
+                listOfDigests.append(digest)
+            if (not pathToFile in groupsMap.get(digest)):
+                groupsMap.get(digest).append(pathToFile)
+        listOfGroups = map(groupsMap.get, listOfDigests)
+        listOfGroups.sort(key=len, reverse=True)
+        return listOfGroups
+
+    def isFilesIdentical(self, listOfPaths, compareMode=COMPARE_EXACT):
+        """
+        Returns True if all the files are identical for the compare
+        mode. False is returned if there are less than 2 files or a file
+        could not be read.
+
+        @return: Returns True if all the files are identical.
+        @rtype: Boolean
+
+        @param listOfPaths: The list of paths to the files that will be
+        compared.
+        @type listOfPaths: Array
+        @param compareMode: The compare mode for the files which is
+        COMPARE_EXACT or the sum of the IGNORE_* flags.
+        @type compareMode: Int
+        """
+        listOfGroups = self.groupFiles(listOfPaths, compareMode)
+        return ((len(listOfPaths) > 1) and (len(listOfGroups) == 1) and
+                (len(listOfGroups[0]) == len(dict.fromkeys(listOfPaths))))
+
 class StringUtil:
 
     def wrapParagraph(s, width=98, newline=True):
@@ -921,3 +1224,860 @@ class StringUtil:
                     continue
             tableStringsList.append(tableStrings)
         return tableStringsList
+
+# ###############################################################################
+# Thread utilities classes
+# ###############################################################################
+class WorkerPool:
+    """
+    This class runs a function against a list of items with a fixed number of
+    worker threads. Most of the work that is ran in the pool are calls to
+    external commands like tar, so threads are used instead of processes.
+
+    If the name of a logger is given then the messages that are logged to the
+    logger while an item is processed are held and then written in the same
+    order as the items, so the output is the same as if the items were
+    processed one after another.
+    """
+    def __init__(self, workerCount=1, bufferedLoggerName=""):
+        """
+        @param workerCount: The maximum number of items that will be
+        processed at the same time. If less than 1 then 1 will be used.
+        @type workerCount: Int
+        @param bufferedLoggerName: The name of the logger whose messages
+        are written in the same order as the items. If empty string then
+        the messages are written when they are logged.
+        @type bufferedLoggerName: String
+        """
+        self.__workerCount = workerCount
+        if (not self.__workerCount > 0):
+            self.__workerCount = 1
+        self.__threadLogBuffer = None
+        if (len(bufferedLoggerName) > 0):
+            self.__threadLogBuffer = ThreadLogBuffer.getThreadLogBuffer(bufferedLoggerName)
+
+    def getWorkerCount(self):
+        """
+        Returns the maximum number of worker threads.
+
+        @return: Returns the maximum number of worker threads.
+        @rtype: Int
+        """
+        return self.__workerCount
+
+    def __work(self, function, itemQueue, results, errors, logRecords, condition):
+        """
+        The worker thread loop that will process items in the queue until the
+        queue is empty.
+        """
+        while True:
+            try:
+                (index, item) = itemQueue.get_nowait()
+            except Queue.Empty:
+                return
+            if (not self.__threadLogBuffer == None):
+                self.__threadLogBuffer.startBuffering()
+            try:
+                try:
+                    results[index] = function(item)
+                except:
+                    errors.append((index, sys.exc_info()))
+            finally:
+                listOfLogRecords = []
+                if (not self.__threadLogBuffer == None):
+                    listOfLogRecords = self.__threadLogBuffer.stopBuffering()
+                condition.acquire()
+                try:
+                    logRecords[index] = listOfLogRecords
+                    condition.notifyAll()
+                finally:
+                    condition.release()
+
+    def map(self, function, listOfItems):
+        """
+        Returns a list of the results of calling function on each item in
+        listOfItems. The results are in the same order as listOfItems no
+        matter what order the items were processed in.
+
+        If the function raises an exception then the exception for the item
+        with the lowest index is raised again after all workers have exited.
+
+        @return: Returns a list of the results of calling function on each
+        item in listOfItems.
+        @rtype: Array
+
+        @param function: The function that will be called with each item.
+        @type function: Function
+        @param listOfItems: The list of items that will be processed.
+        @type listOfItems: Array
+        """
+        results = [None] * len(listOfItems)
+        if (not len(listOfItems) > 0):
+            return results
+        elif ((self.getWorkerCount() == 1) or (len(listOfItems) == 1)):
+            # No reason to create threads when only 1 worker.
+            for index in range(0, len(listOfItems)):
+                results[index] = function(listOfItems[index])
+            return results
+        itemQueue = Queue.Queue()
+        for index in range(0, len(listOfItems)):
+            itemQueue.put((index, listOfItems[index]))
+        errors = []
+        # Each item is set to the list of log records that were held for the
+        # item when the item has been processed.
+        logRecords = [None] * len(listOfItems)
+        condition = threading.Condition()
+        workers = []
+        for i in range(0, min(self.getWorkerCount(), len(listOfItems))):
+            worker = threading.Thread(target=self.__work, args=(function, itemQueue, results, errors, logRecords, condition))
+            worker.setDaemon(True)
+            worker.start()
+            workers.append(worker)
+        # Write the log records of the items in order as soon as all the
+        # items before them have been processed.
+        nextIndex = 0
+        while (nextIndex < len(listOfItems)):
+            condition.acquire()
+            try:
+                # A timeout is used on wait so that a control-c is not
+                # blocked while waiting on the workers.
+                while (logRecords[nextIndex] == None):
+                    condition.wait(1)
+            finally:
+                condition.release()
+            if (not self.__threadLogBuffer == None):
+                self.__threadLogBuffer.handle(logRecords[nextIndex])
+            nextIndex += 1
+        for worker in workers:
+            while (worker.isAlive()):
+                worker.join(1)
+        if (len(errors) > 0):
+            errors.sort(key=lambda e: e[0])
+            (excType, excValue, excTraceback) = errors[0][1]
+            raise excType, excValue, excTraceback
+        return results
+
+class WorkerQueue:
+    """
+    This class runs a function against items that are submitted one at a
+    time with a fixed number of worker threads, so the items can be
+    processed while the items after them are still being found. The items
+    are started in the order they were submitted.
+    """
+    def __init__(self, function, workerCount=1):
+        """
+        @param function: The function that will be called with each item.
+        @type function: Function
+        @param workerCount: The maximum number of items that will be
+        processed at the same time. If less than 1 then 1 will be used.
+        @type workerCount: Int
+        """
+        self.__function = function
+        self.__workerCount = workerCount
+        if (not self.__workerCount > 0):
+            self.__workerCount = 1
+        self.__itemQueue = Queue.Queue()
+        self.__results = []
+        self.__errors = []
+        self.__workers = []
+        # The number of workers that have not exited. The lock makes sure
+        # a worker does not exit after an item was submitted without
+        # starting another worker.
+        self.__activeWorkerCount = 0
+        self.__lock = threading.Lock()
+
+    def getWorkerCount(self):
+        """
+        Returns the maximum number of worker threads.
+
+        @return: Returns the maximum number of worker threads.
+        @rtype: Int
+        """
+        return self.__workerCount
+
+    def __work(self):
+        """
+        The worker thread loop that will process items in the queue until the
+        queue is empty.
+        """
+        while True:
+            self.__lock.acquire()
+            try:
+                try:
+                    (index, item) = self.__itemQueue.get_nowait()
+                except Queue.Empty:
+                    self.__activeWorkerCount -= 1
+                    return
+            finally:
+                self.__lock.release()
+            try:
+                self.__results[index] = self.__function(item)
+            except:
+                self.__errors.append((index, sys.exc_info()))
+
+    def submit(self, item):
+        """
+        Adds the item to the queue and starts a worker if there are less
+        workers than the maximum number of workers. Returns the index of
+        the item in the results.
+
+        @return: Returns the index of the item in the results.
+        @rtype: Int
+
+        @param item: The item that will be processed.
+        @type item: Object
+        """
+        self.__lock.acquire()
+        try:
+            index = len(self.__results)
+            self.__results.append(None)
+            self.__itemQueue.put((index, item))
+            if (self.__activeWorkerCount < self.__workerCount):
+                worker = threading.Thread(target=self.__work)
+                worker.setDaemon(True)
+                self.__activeWorkerCount += 1
+                self.__workers.append(worker)
+                worker.start()
+            return index
+        finally:
+            self.__lock.release()
+
+    def join(self):
+        """
+        Waits for all the items that were submitted to be processed and
+        returns a list of the results of calling the function on each item
+        in the order the items were submitted. No items should be submitted
+        after this is called.
+
+        If the function raises an exception then the exception for the item
+        with the lowest index is raised again after all workers have exited.
+
+        @return: Returns a list of the results of calling the function on
+        each item.
+        @rtype: Array
+        """
+        for worker in list(self.__workers):
+            # A timeout is used on join so that a control-c is not blocked
+            # while waiting on the workers.
+            while (worker.isAlive()):
+                worker.join(1)
+        if (len(self.__errors) > 0):
+            self.__errors.sort(key=lambda e: e[0])
+            (excType, excValue, excTraceback) = self.__errors[0][1]
+            raise excType, excValue, excTraceback
+        return list(self.__results)
+
+class ThreadLogBuffer(logging.Filter):
+    """
+    This class is a filter for a logger that holds the messages that are
+    logged by the threads that have started buffering instead of writing
+    them. The messages that were held can then be written later in a
+    different order.
+
+    @cvar THREAD_LOG_BUFFERS_MAP: A map of the logger names to the
+    ThreadLogBuffer for the logger.
+    @type THREAD_LOG_BUFFERS_MAP: Dictionary
+    @cvar THREAD_LOG_BUFFERS_LOCK: The lock that protects the map of
+    ThreadLogBuffers.
+    @type THREAD_LOG_BUFFERS_LOCK: Lock
+    """
+    THREAD_LOG_BUFFERS_MAP = {}
+    THREAD_LOG_BUFFERS_LOCK = threading.Lock()
+
+    def __init__(self, loggerName):
+        """
+        @param loggerName: The name of the logger.
+        @type loggerName: String
+        """
+        logging.Filter.__init__(self)
+        self.__logger = logging.getLogger(loggerName)
+        # A map of thread to the list of log records held for the thread.
+        self.__logRecordsMap = {}
+        self.__lock = threading.Lock()
+
+    def getThreadLogBuffer(loggerName):
+        """
+        Returns the ThreadLogBuffer for the logger. The ThreadLogBuffer
+        is added as a filter to the logger the first time it is
+        requested.
+
+        @return: Returns the ThreadLogBuffer for the logger.
+        @rtype: ThreadLogBuffer
+
+        @param loggerName: The name of the logger.
+        @type loggerName: String
+        """
+        ThreadLogBuffer.THREAD_LOG_BUFFERS_LOCK.acquire()
+        try:
+            if (not ThreadLogBuffer.THREAD_LOG_BUFFERS_MAP.has_key(loggerName)):
+                threadLogBuffer = ThreadLogBuffer(loggerName)
+                logging.getLogger(loggerName).addFilter(threadLogBuffer)
+                ThreadLogBuffer.THREAD_LOG_BUFFERS_MAP[loggerName] = threadLogBuffer
+            return ThreadLogBuffer.THREAD_LOG_BUFFERS_MAP.get(loggerName)
+        finally:
+            ThreadLogBuffer.THREAD_LOG_BUFFERS_LOCK.release()
+    getThreadLogBuffer = staticmethod(getThreadLogBuffer)
+
+    def startBuffering(self):
+        """
+        The messages that are logged by the current thread will be held
+        until stopBuffering() is called.
+        """
+        self.__lock.acquire()
+        try:
+            self.__logRecordsMap[threading.currentThread()] = []
+        finally:
+            self.__lock.release()
+
+    def stopBuffering(self):
+        """
+        Returns the list of log records that were held for the current
+        thread and the messages for the thread are written when logged
+        again.
+
+        @return: Returns the list of log records that were held for the
+        current thread.
+        @rtype: Array
+        """
+        self.__lock.acquire()
+        try:
+            return self.__logRecordsMap.pop(threading.currentThread(), [])
+        finally:
+            self.__lock.release()
+
+    def handle(self, listOfLogRecords):
+        """
+        Writes the log records to the logger. If the current thread is
+        buffering then the log records are held for the current thread.
+
+        @param listOfLogRecords: The list of log records.
+        @type listOfLogRecords: Array
+        """
+        for logRecord in listOfLogRecords:
+            self.__logger.handle(logRecord)
+
+    def filter(self, logRecord):
+        """
+        Returns False if the log record was held for the current thread
+        and True if the log record should be written.
+
+        @return: Returns False if the log record was held for the
+        current thread.
+        @rtype: Boolean
+
+        @param logRecord: The log record.
+        @type logRecord: LogRecord
+        """
+        self.__lock.acquire()
+        try:
+            listOfLogRecords = self.__logRecordsMap.get(threading.currentThread())
+            if (listOfLogRecords == None):
+                return True
+            listOfLogRecords.append(logRecord)
+            return False
+        finally:
+            self.__lock.release()
+
+class OrderedTurnstile:
+    """
+    This class allows threads that are running at the same time to enter a
+    section of code in a fixed order. Each thread is given an index and a
+    thread will wait until all the threads with a lower index have passed
+    through the turnstile.
+
+    This is used to keep things like the naming of duplicate directories the
+    same no matter what order the threads finish their work in.
+    """
+    def __init__(self):
+        self.__condition = threading.Condition()
+        self.__nextIndex = 0
+        self.__passedIndexes = []
+
+    def wait(self, index):
+        """
+        This function will block until all the indexes lower than index have
+        passed through the turnstile.
+
+        @param index: The index of the caller.
+        @type index: Int
+        """
+        self.__condition.acquire()
+        try:
+            while (self.__nextIndex < index):
+                self.__condition.wait()
+        finally:
+            self.__condition.release()
+
+    def release(self, index):
+        """
+        Marks that the index has passed through the turnstile. This can be
+        called more than once for the same index and should always be called
+        even if the caller never called wait().
+
+        @param index: The index of the caller.
+        @type index: Int
+        """
+        self.__condition.acquire()
+        try:
+            if ((index >= self.__nextIndex) and (not index in self.__passedIndexes)):
+                self.__passedIndexes.append(index)
+            while (self.__nextIndex in self.__passedIndexes):
+                self.__passedIndexes.remove(self.__nextIndex)
+                self.__nextIndex += 1
+            self.__condition.notifyAll()
+        finally:
+            self.__condition.release()
+
+# ###############################################################################
+# Cache utilities classes
+# ###############################################################################
+class LRUCache:
+    """
+    This class is a cache that has a limit on the total size of the values in
+    the cache. When a value is added and the limit is reached then the values
+    that were least recently used are removed from the cache. The cache is
+    safe to use from more than one thread.
+
+    The cache keeps count of the hits and misses and the total size of the
+    values that were returned from the cache.
+    """
+    def __init__(self, maxSize):
+        """
+        @param maxSize: The maximum total size of the values in the
+        cache. If less than 1 then nothing will be cached.
+        @type maxSize: Int
+        """
+        self.__maxSize = maxSize
+        self.__size = 0
+        # Map of the keys to the entries of the cache. Each entry is a list
+        # of [previous entry, next entry, key, value, size] and the entries
+        # are linked in the order they were used, the most recently used
+        # entry is before the root.
+        self.__entriesMap = {}
+        self.__root = []
+        self.__root[:] = [self.__root, self.__root, None, None, 0]
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__sizeSaved = 0
+
+    def __len__(self):
+        """
+        Returns the number of values in the cache.
+
+        @return: Returns the number of values in the cache.
+        @rtype: Int
+        """
+        return len(self.__entriesMap)
+
+    def getMaxSize(self):
+        """
+        Returns the maximum total size of the values in the cache.
+
+        @return: Returns the maximum total size of the values in the
+        cache.
+        @rtype: Int
+        """
+        return self.__maxSize
+
+    def setMaxSize(self, maxSize):
+        """
+        Sets the maximum total size of the values in the cache. The
+        least recently used values are removed until the values fit.
+
+        @param maxSize: The maximum total size of the values in the
+        cache. If less than 1 then nothing will be cached.
+        @type maxSize: Int
+        """
+        self.__lock.acquire()
+        try:
+            self.__maxSize = maxSize
+            self.__evict(0)
+        finally:
+            self.__lock.release()
+
+    def getSize(self):
+        """
+        Returns the total size of the values in the cache.
+
+        @return: Returns the total size of the values in the cache.
+        @rtype: Int
+        """
+        return self.__size
+
+    def getHits(self):
+        """
+        Returns the number of times a value was found in the cache.
+
+        @return: Returns the number of times a value was found in the
+        cache.
+        @rtype: Int
+        """
+        return self.__hits
+
+    def getMisses(self):
+        """
+        Returns the number of times a value was not found in the cache.
+
+        @return: Returns the number of times a value was not found in
+        the cache.
+        @rtype: Int
+        """
+        return self.__misses
+
+    def getEvictions(self):
+        """
+        Returns the number of values that were removed from the cache to
+        make room for other values.
+
+        @return: Returns the number of values that were removed from the
+        cache to make room for other values.
+        @rtype: Int
+        """
+        return self.__evictions
+
+    def getSizeSaved(self):
+        """
+        Returns the total size of all the values that were returned from
+        the cache.
+
+        @return: Returns the total size of all the values that were
+        returned from the cache.
+        @rtype: Int
+        """
+        return self.__sizeSaved
+
+    def __unlink(self, entry):
+        """
+        Removes the entry from the list of entries.
+
+        @param entry: The entry that will be removed.
+        @type entry: Array
+        """
+        entry[0][1] = entry[1]
+        entry[1][0] = entry[0]
+
+    def __link(self, entry):
+        """
+        Adds the entry to the list of entries as the most recently used
+        entry.
+
+        @param entry: The entry that will be added.
+        @type entry: Array
+        """
+        last = self.__root[0]
+        entry[0] = last
+        entry[1] = self.__root
+        last[1] = entry
+        self.__root[0] = entry
+
+    def __evict(self, size):
+        """
+        Removes the least recently used entries until there is room for
+        a value of the size.
+
+        @param size: The size of the value that needs to fit in the
+        cache.
+        @type size: Int
+        """
+        while ((len(self.__entriesMap) > 0) and (self.__size + size > self.__maxSize)):
+            entry = self.__root[1]
+            self.__unlink(entry)
+            del self.__entriesMap[entry[2]]
+            self.__size -= entry[4]
+            self.__evictions += 1
+
+    def get(self, key, default=None):
+        """
+        Returns the value for the key and marks the value as the most
+        recently used value. The default is returned if the key is not in
+        the cache.
+
+        @return: Returns the value for the key.
+        @rtype: Object
+
+        @param key: The key for the value.
+        @type key: Object
+        @param default: The value that is returned if the key is not in
+        the cache.
+        @type default: Object
+        """
+        self.__lock.acquire()
+        try:
+            entry = self.__entriesMap.get(key)
+            if (entry == None):
+                self.__misses += 1
+                return default
+            self.__unlink(entry)
+            self.__link(entry)
+            self.__hits += 1
+            self.__sizeSaved += entry[4]
+            return entry[3]
+        finally:
+            self.__lock.release()
+
+    def put(self, key, value, size):
+        """
+        Adds the value to the cache as the most recently used value. The
+        value is not added if the size of the value is larger than the
+        maximum size of the cache.
+
+        @return: Returns True if the value was added to the cache.
+        @rtype: Boolean
+
+        @param key: The key for the value.
+        @type key: Object
+        @param value: The value that will be added.
+        @type value: Object
+        @param size: The size of the value.
+        @type size: Int
+        """
+        self.__lock.acquire()
+        try:
+            entry = self.__entriesMap.get(key)
+            if (not entry == None):
+                self.__unlink(entry)
+                del self.__entriesMap[key]
+                self.__size -= entry[4]
+            if (size > self.__maxSize):
+                return False
+            self.__evict(size)
+            entry = [None, None, key, value, size]
+            self.__link(entry)
+            self.__entriesMap[key] = entry
+            self.__size += size
+            return True
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        """
+        Removes all the values from the cache.
+        """
+        self.__lock.acquire()
+        try:
+            self.__entriesMap.clear()
+            self.__root[:] = [self.__root, self.__root, None, None, 0]
+            self.__size = 0
+        finally:
+            self.__lock.release()
+
+# ###############################################################################
+# Extraction utilities classes
+# ###############################################################################
+class ExtractionBudget:
+    """
+    This class decides when a report can be extracted to a filesystem. A
+    report is only extracted if the estimated disk usage of the extracted
+    report fits in the free space of the filesystem, less the reserved
+    space and the estimated disk usage of the reports that are being
+    extracted. The reports that are extracted at the same time can be
+    limited by their total estimated disk usage and the number of files
+    that are extracted each second can be limited.
+
+    The budget is shared by everything in the process that extracts to the
+    same filesystem(see getExtractionBudget()).
+
+    @cvar BLOCK_SIZE: The size of a block on the filesystem that is used
+    to estimate the disk usage of the files.
+    @type BLOCK_SIZE: Int
+    @cvar EXTRACTION_BUDGETS_MAP: A map of the filesystems to their
+    ExtractionBudget.
+    @type EXTRACTION_BUDGETS_MAP: Dictionary
+    @cvar EXTRACTION_BUDGETS_LOCK: The lock that protects the map of
+    ExtractionBudgets.
+    @type EXTRACTION_BUDGETS_LOCK: Lock
+    """
+    BLOCK_SIZE = 4096
+    EXTRACTION_BUDGETS_MAP = {}
+    EXTRACTION_BUDGETS_LOCK = threading.Lock()
+
+    def __init__(self, pathToDirectory):
+        """
+        @param pathToDirectory: The path to a directory on the filesystem.
+        @type pathToDirectory: String
+        """
+        self.__pathToDirectory = pathToDirectory
+        self.__maxBytes = 0
+        self.__maxFilesPerSecond = 0
+        self.__reservedBytes = 0
+        # The estimated disk usage of the reports that are being extracted.
+        self.__admittedBytes = 0
+        self.__condition = threading.Condition()
+        # The time that the next file can be extracted when the number of
+        # files each second is limited.
+        self.__nextFileTime = 0.0
+        self.__throttleLock = threading.Lock()
+
+    def getExtractionBudget(pathToDirectory):
+        """
+        Returns the ExtractionBudget for the filesystem that contains the
+        directory. The ExtractionBudget is created the first time it is
+        requested.
+
+        @return: Returns the ExtractionBudget for the filesystem.
+        @rtype: ExtractionBudget
+
+        @param pathToDirectory: The path to a directory on the filesystem.
+        @type pathToDirectory: String
+        """
+        try:
+            key = os.stat(pathToDirectory).st_dev
+        except (IOError, os.error):
+            key = pathToDirectory
+        ExtractionBudget.EXTRACTION_BUDGETS_LOCK.acquire()
+        try:
+            if (not ExtractionBudget.EXTRACTION_BUDGETS_MAP.has_key(key)):
+                ExtractionBudget.EXTRACTION_BUDGETS_MAP[key] = ExtractionBudget(pathToDirectory)
+            return ExtractionBudget.EXTRACTION_BUDGETS_MAP.get(key)
+        finally:
+            ExtractionBudget.EXTRACTION_BUDGETS_LOCK.release()
+    getExtractionBudget = staticmethod(getExtractionBudget)
+
+    def estimateDiskUsage(listOfSizes):
+        """
+        Returns the estimated disk usage in bytes of the files. Each file
+        uses whole blocks and one more block is added for each file for
+        the directories and metadata.
+
+        @return: Returns the estimated disk usage in bytes of the files.
+        @rtype: Long
+
+        @param listOfSizes: The list of sizes in bytes of the files. A
+        size less than 0 is unknown and only the extra block is added.
+        @type listOfSizes: Array
+        """
+        blockSize = ExtractionBudget.BLOCK_SIZE
+        diskUsage = 0L
+        for size in listOfSizes:
+            diskUsage += blockSize
+            if (size > 0):
+                diskUsage += ((size + blockSize - 1) / blockSize) * blockSize
+        return diskUsage
+    estimateDiskUsage = staticmethod(estimateDiskUsage)
+
+    def setLimits(self, maxBytes, maxFilesPerSecond, reservedBytes):
+        """
+        Sets the limits of the budget.
+
+        @param maxBytes: The maximum total estimated disk usage of the
+        reports that are extracted at the same time. If less than 1 then
+        there is no limit. A report that is larger than the limit is
+        extracted when no other report is being extracted.
+        @type maxBytes: Long
+        @param maxFilesPerSecond: The maximum number of files that are
+        extracted each second. If less than 1 then there is no limit.
+        @type maxFilesPerSecond: Int
+        @param reservedBytes: The number of bytes on the filesystem that
+        are kept free.
+        @type reservedBytes: Long
+        """
+        self.__condition.acquire()
+        try:
+            self.__maxBytes = maxBytes
+            self.__maxFilesPerSecond = maxFilesPerSecond
+            self.__reservedBytes = reservedBytes
+            self.__condition.notifyAll()
+        finally:
+            self.__condition.release()
+
+    def getFreeBytes(self):
+        """
+        Returns the number of bytes that are free on the filesystem for
+        unprivileged users. -1 is returned if the free space could not be
+        found.
+
+        @return: Returns the number of bytes that are free on the
+        filesystem.
+        @rtype: Long
+        """
+        try:
+            fsStat = os.statvfs(self.__pathToDirectory)
+            return long(fsStat.f_bavail) * long(fsStat.f_frsize)
+        except (IOError, os.error, AttributeError):
+            return -1
+
+    def getReservedBytes(self):
+        """
+        Returns the number of bytes on the filesystem that are kept free.
+
+        @return: Returns the number of bytes on the filesystem that are
+        kept free.
+        @rtype: Long
+        """
+        return self.__reservedBytes
+
+    def admit(self, estimatedBytes, pathToFile=""):
+        """
+        Waits until the report fits in the budget and adds the report to
+        the reports that are being extracted. False is returned without
+        waiting if the report will not fit in the free space even when no
+        other report is being extracted. The report must be released when
+        it is done being extracted(see release()).
+
+        @return: Returns True if the report can be extracted.
+        @rtype: Boolean
+
+        @param estimatedBytes: The estimated disk usage of the extracted
+        report.
+        @type estimatedBytes: Long
+        @param pathToFile: The path to the report file that is logged if
+        the report has to wait.
+        @type pathToFile: String
+        """
+        isWaiting = False
+        self.__condition.acquire()
+        try:
+            while (True):
+                freeBytes = self.getFreeBytes()
+                if ((freeBytes >= 0) and (estimatedBytes > (freeBytes - self.__reservedBytes - self.__admittedBytes))):
+                    if (not self.__admittedBytes > 0):
+                        return False
+                elif ((self.__maxBytes > 0) and (self.__admittedBytes > 0) and
+                      ((self.__admittedBytes + estimatedBytes) > self.__maxBytes)):
+                    pass
+                else:
+                    self.__admittedBytes += estimatedBytes
+                    return True
+                if (not isWaiting):
+                    isWaiting = True
+                    message = "The extraction of the file is queued until the reports that are being extracted are done: %s" %(pathToFile)
+                    logging.getLogger(sx.MAIN_LOGGER_NAME).status(message)
+                # A timeout is used on wait so that changes to the free
+                # space by other processes are seen.
+                self.__condition.wait(1)
+        finally:
+            self.__condition.release()
+
+    def release(self, estimatedBytes):
+        """
+        Removes the report from the reports that are being extracted.
+
+        @param estimatedBytes: The estimated disk usage of the extracted
+        report that was admitted.
+        @type estimatedBytes: Long
+        """
+        self.__condition.acquire()
+        try:
+            self.__admittedBytes = max(0, self.__admittedBytes - estimatedBytes)
+            self.__condition.notifyAll()
+        finally:
+            self.__condition.release()
+
+    def throttle(self):
+        """
+        Waits until the next file can be extracted when the number of
+        files that are extracted each second is limited.
+        """
+        if (not self.__maxFilesPerSecond > 0):
+            return
+        self.__throttleLock.acquire()
+        try:
+            currentTime = time.time()
+            fileTime = max(currentTime, self.__nextFileTime)
+            self.__nextFileTime = fileTime + (1.0 / self.__maxFilesPerSecond)
+        finally:
+            self.__throttleLock.release()
+        if (fileTime > currentTime):
+            time.sleep(fileTime - currentTime)
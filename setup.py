@@ -24,7 +24,7 @@ if __name__ == "__main__":
                   "sx.plugins.lib.clusterha", "sx.plugins.lib.storage", "sx.plugins.lib.log",
                   "sx.plugins.lib.kernel", "sx.plugins.lib.networking", "sx.plugins.lib.general",
                   "sx.plugins.lib.rpm", "sx.plugins.lib.gluster"],
-        scripts=["sxconsole"],
+        scripts=["sxconsole", "sxdaemon"],
         package_dir={"":"lib",}
     )
 ################################################################################
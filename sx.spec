@@ -39,6 +39,7 @@ has a class defined.
 %doc LICENSE AUTHORS PKG-INFO CHANGELOG
 %doc doc/*
 %{_bindir}/sxconsole
+%{_bindir}/sxdaemon
 %{python_sitelib}/*
 
 
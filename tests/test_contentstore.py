@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+Tests for the removal of the report files and extracted reports from the
+store that are no longer used by any compressed reports directory.
+
+Run the tests from the top of the source tree:
+$ PYTHONPATH=lib python -m unittest discover -s tests
+
+@author    :  Shane Bradley
+@contact   :  sbradley@redhat.com
+@version   :  2.17
+@copyright :  GPLv2
+"""
+import os
+import os.path
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+
+from sx import ContentStore
+
+class ContentStoreGarbageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__pathToTempDir = tempfile.mkdtemp(prefix="sx-tests-")
+        self.__contentStore = ContentStore(os.path.join(self.__pathToTempDir, "sxarchive"))
+        self.__pathToCompressedReports = os.path.join(self.__pathToTempDir, "sxarchive", "creports", "123")
+        os.makedirs(self.__pathToCompressedReports)
+
+    def tearDown(self):
+        shutil.rmtree(self.__pathToTempDir, True)
+
+    def addReport(self, filename, data):
+        """
+        Adds a report file to the compressed reports directory and to the
+        store with an extracted report.
+
+        @return: Returns a tuple of (path to the report file, digest).
+        @rtype: Tuple
+
+        @param filename: The filename of the report file.
+        @type filename: String
+        @param data: The data of the report file.
+        @type data: String
+        """
+        pathToFile = os.path.join(self.__pathToCompressedReports, filename)
+        fout = open(pathToFile, "w")
+        fout.write(data)
+        fout.close()
+        digest = ContentStore.hashFile(pathToFile)
+        pathToExtractedReport = os.path.join(self.__pathToTempDir, "extracted", digest, "testnode")
+        os.makedirs(pathToExtractedReport)
+        fout = open(os.path.join(pathToExtractedReport, "hostname"), "w")
+        fout.write("testnode.example.com\n")
+        fout.close()
+        self.assertTrue(self.__contentStore.addBlob(digest, pathToFile))
+        self.assertTrue(self.__contentStore.addReference(digest, pathToFile))
+        self.assertTrue(self.__contentStore.addTree(digest, pathToExtractedReport, "sosreport"))
+        # Only the store has the extracted files like when the extracted
+        # report was removed from the archive layout.
+        shutil.rmtree(os.path.dirname(pathToExtractedReport))
+        return (pathToFile, digest)
+
+    def copyBlob(self, digest):
+        """
+        Replaces the report file in the store with a copy, like when the
+        store is on a different filesystem than the report file.
+
+        @param digest: The SHA-256 digest of the report file.
+        @type digest: String
+        """
+        pathToBlob = self.__contentStore.getPathToBlob(digest)
+        pathToCopy = "%s.copy" %(pathToBlob)
+        shutil.copy2(pathToBlob, pathToCopy)
+        os.rename(pathToCopy, pathToBlob)
+        self.assertEqual(os.stat(pathToBlob).st_nlink, 1)
+
+    def assertStored(self, digest):
+        self.assertTrue(self.__contentStore.hasBlob(digest))
+        self.assertNotEqual(self.__contentStore.getTreeInfo(digest), None)
+
+    def assertRemoved(self, digest):
+        self.assertFalse(self.__contentStore.hasBlob(digest))
+        self.assertFalse(os.path.exists(self.__contentStore.getPathToTree(digest)))
+
+    def testKeepHardlinkedBlob(self):
+        (pathToFile, digest) = self.addReport("sosreport-hardlinked.tar.xz", "hardlinked report")
+        # The report file is kept because of the hardlink alone.
+        os.remove(self.__contentStore.getPathToReferences(digest))
+        self.assertEqual(self.__contentStore.collectGarbage(), (0, 0))
+        self.assertStored(digest)
+
+    def testKeepReferencedBlob(self):
+        (pathToFile, digest) = self.addReport("sosreport-copied.tar.xz", "copied report")
+        self.copyBlob(digest)
+        self.assertEqual(self.__contentStore.collectGarbage(), (0, 0))
+        self.assertStored(digest)
+
+    def testRemoveUnreferencedBlob(self):
+        (pathToFile, digest) = self.addReport("sosreport-removed.tar.xz", "removed report")
+        (pathToKeptFile, keptDigest) = self.addReport("sosreport-kept.tar.xz", "kept report")
+        self.copyBlob(digest)
+        os.remove(pathToFile)
+        # The report file and the extracted report are removed.
+        (entriesRemoved, bytesReclaimed) = self.__contentStore.collectGarbage()
+        self.assertEqual(entriesRemoved, 2)
+        # The report file, the extracted file and the info file.
+        self.assertEqual(bytesReclaimed, len("removed report") + len("testnode.example.com\n") + len("sosreport\ntestnode\n"))
+        self.assertRemoved(digest)
+        self.assertFalse(os.path.exists(self.__contentStore.getPathToReferences(digest)))
+        self.assertStored(keptDigest)
+
+    def testRemoveReplacedBlob(self):
+        # A report file that was replaced by a different file with the same
+        # name no longer references the report file in the store.
+        (pathToFile, digest) = self.addReport("sosreport-replaced.tar.xz", "replaced report")
+        self.copyBlob(digest)
+        os.remove(pathToFile)
+        fout = open(pathToFile, "w")
+        fout.write("a different report")
+        fout.close()
+        self.assertEqual(self.__contentStore.collectGarbage()[0], 2)
+        self.assertRemoved(digest)
+
+    def testReadOnlyTree(self):
+        pathToExtractedReport = os.path.join(self.__pathToTempDir, "extracted", "testnode")
+        os.makedirs(pathToExtractedReport)
+        pathToFile = os.path.join(pathToExtractedReport, "hostname")
+        fout = open(pathToFile, "w")
+        fout.write("testnode.example.com\n")
+        fout.close()
+        digest = "1" * 64
+        self.assertTrue(self.__contentStore.addTree(digest, pathToExtractedReport, "sosreport"))
+        # The file in the archive directory is the same file as the one in
+        # the store, so neither can be changed in place.
+        pathToStoredFile = os.path.join(self.__contentStore.getPathToTree(digest), "tree", "hostname")
+        self.assertTrue(os.path.samefile(pathToFile, pathToStoredFile))
+        self.assertFalse(os.stat(pathToStoredFile).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+    def testTemporaryTree(self):
+        pathToTmpTree = os.path.join(self.__contentStore.getPathToStore(), "trees", ".%s.tmp" %("0" * 64))
+        os.makedirs(os.path.join(pathToTmpTree, "tree", "etc"))
+        # The temporary directory could still be filled by another process.
+        self.assertEqual(self.__contentStore.collectGarbage(), (0, 0))
+        self.assertTrue(os.path.isdir(pathToTmpTree))
+        # The temporary directory was left by an interrupted add.
+        modifiedTime = time.time() - ContentStore.TMP_TREE_MAX_AGE - 60
+        for pathToDir in (os.path.join(pathToTmpTree, "tree", "etc"), os.path.join(pathToTmpTree, "tree"), pathToTmpTree):
+            os.utime(pathToDir, (modifiedTime, modifiedTime))
+        self.assertEqual(self.__contentStore.collectGarbage(), (1, 0))
+        self.assertFalse(os.path.exists(pathToTmpTree))
+
+if __name__ == "__main__":
+    unittest.main()
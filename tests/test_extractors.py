@@ -0,0 +1,527 @@
+#!/usr/bin/env python
+"""
+Tests for the detection and extraction of the tarballs that are compressed
+with xz, zstd and lz4 and of zip files, and tests that no member is
+written outside of the extraction directory through a symbolic link. The
+fixtures are created when the tests run and a test is skipped when the
+command to create or decompress a fixture is not installed.
+
+Run the tests from the top of the source tree:
+$ PYTHONPATH=lib python -m unittest discover -s tests
+
+@author    :  Shane Bradley
+@contact   :  sbradley@redhat.com
+@version   :  2.17
+@copyright :  GPLv2
+"""
+import os
+import os.path
+import shutil
+import tarfile
+import StringIO
+import tempfile
+import hashlib
+import stat
+import zipfile
+import subprocess
+import unittest
+
+from sx.extractors import FileTypeSniffer
+from sx.extractors import ArchiveMember
+from sx.extractors import DecompressorPipe
+from sx.extractors import CommandCapabilities
+from sx.extractors.tarextractor import Tarextractor
+from sx.extractors.nativeextractor import Nativeextractor
+from sx.modulesloader import ExtractorsLoader
+
+class CompressedTarballTestCase(unittest.TestCase):
+    """
+    @cvar REPORT_NAME: The name of the directory at the top of the fixture.
+    @type REPORT_NAME: String
+    @cvar FILES_MAP: Map of the path to each file in the fixture to its
+    contents.
+    @type FILES_MAP: Dictionary
+    @cvar COMPRESSORS_MAP: Map of the encoding to the extension of the
+    fixture and the command that compresses the tarball to stdout.
+    @type COMPRESSORS_MAP: Dictionary
+    """
+    REPORT_NAME = "sosreport-testnode-123456"
+    FILES_MAP = {"hostname":"testnode.example.com\n",
+                 "uname":"Linux testnode 2.6.32-431.el6.x86_64 #1 SMP x86_64 GNU/Linux\n",
+                 "sos_commands/general/date":"Mon May  5 10:00:00 EDT 2014\n",
+                 "etc/hosts":"127.0.0.1   localhost localhost.localdomain\n" * 64}
+    COMPRESSORS_MAP = {"xz":(".tar.xz", ["xz", "-c"]),
+                       "zstd":(".tar.zst", ["zstd", "-q", "-c"]),
+                       "lz4":(".tar.lz4", ["lz4", "-q", "-c"])}
+
+    def setUp(self):
+        self.__pathToTempDir = tempfile.mkdtemp(prefix="sx-tests-")
+
+    def tearDown(self):
+        shutil.rmtree(self.__pathToTempDir, True)
+
+    def __createTarball(self):
+        """
+        Returns the path to an uncompressed tarball that has the files in
+        FILES_MAP under the REPORT_NAME directory.
+
+        @return: Returns the path to the uncompressed tarball.
+        @rtype: String
+        """
+        pathToSourceDir = os.path.join(self.__pathToTempDir, "source")
+        for (pathToFile, data) in CompressedTarballTestCase.FILES_MAP.items():
+            pathToSourceFile = os.path.join(pathToSourceDir, CompressedTarballTestCase.REPORT_NAME, pathToFile)
+            if (not os.path.isdir(os.path.dirname(pathToSourceFile))):
+                os.makedirs(os.path.dirname(pathToSourceFile))
+            fout = open(pathToSourceFile, "w")
+            fout.write(data)
+            fout.close()
+        pathToTarball = os.path.join(self.__pathToTempDir, "%s.tar" %(CompressedTarballTestCase.REPORT_NAME))
+        tfile = tarfile.open(pathToTarball, "w")
+        try:
+            tfile.add(os.path.join(pathToSourceDir, CompressedTarballTestCase.REPORT_NAME), CompressedTarballTestCase.REPORT_NAME)
+        finally:
+            tfile.close()
+        return pathToTarball
+
+    def createFixture(self, encoding):
+        """
+        Returns the path to a tarball that is compressed with the
+        encoding. The test is skipped if the commands to compress or
+        decompress the encoding are not installed.
+
+        @return: Returns the path to the compressed tarball.
+        @rtype: String
+
+        @param encoding: The compression of the tarball.
+        @type encoding: String
+        """
+        (extension, listOfCommand) = CompressedTarballTestCase.COMPRESSORS_MAP.get(encoding)
+        pathToCommand = CommandCapabilities.findCommand(listOfCommand[0])
+        if (not len(pathToCommand) > 0):
+            self.skipTest("The %s command is not installed." %(listOfCommand[0]))
+        elif (DecompressorPipe.getCommand(encoding) == None):
+            self.skipTest("There is no command installed that decompresses %s." %(encoding))
+        pathToTarball = self.__createTarball()
+        pathToFixture = os.path.join(self.__pathToTempDir, "%s%s" %(CompressedTarballTestCase.REPORT_NAME, extension))
+        fin = open(pathToTarball, "rb")
+        fout = open(pathToFixture, "wb")
+        try:
+            returncode = subprocess.call([pathToCommand] + listOfCommand[1:], stdin=fin, stdout=fout)
+        finally:
+            fin.close()
+            fout.close()
+        os.remove(pathToTarball)
+        self.assertEqual(returncode, 0)
+        return pathToFixture
+
+    def writeChecksumFile(self, pathToFixture, digest):
+        """
+        Writes the .sha256 file that is uploaded with a report.
+
+        @param pathToFixture: The path to the compressed tarball.
+        @type pathToFixture: String
+        @param digest: The digest that is written to the checksum file.
+        @type digest: String
+        """
+        fout = open("%s.sha256" %(pathToFixture), "w")
+        fout.write("%s  %s\n" %(digest, os.path.basename(pathToFixture)))
+        fout.close()
+
+    def getSha256Digest(self, pathToFile):
+        """
+        @return: Returns the sha256 hex digest of the file.
+        @rtype: String
+
+        @param pathToFile: The path to the file.
+        @type pathToFile: String
+        """
+        fin = open(pathToFile, "rb")
+        try:
+            return hashlib.sha256(fin.read()).hexdigest()
+        finally:
+            fin.close()
+
+    def assertExtracted(self, extractor):
+        """
+        Extracts the fixture with the extractor and checks that all the
+        files were extracted with the top directory stripped.
+
+        @param extractor: The extractor for the fixture.
+        @type extractor: Extractor
+        """
+        pathToExtractDir = os.path.join(self.__pathToTempDir, "extracted-%s" %(extractor.getName().lower()))
+        # The report creates the directory before the file is extracted.
+        os.makedirs(pathToExtractDir)
+        self.assertTrue(extractor.extract(pathToExtractDir, 1))
+        self.assertFalse(extractor.isCorrupt())
+        for (pathToFile, data) in CompressedTarballTestCase.FILES_MAP.items():
+            fin = open(os.path.join(pathToExtractDir, pathToFile), "r")
+            try:
+                self.assertEqual(fin.read(), data)
+            finally:
+                fin.close()
+        manifest = extractor.getManifest()
+        self.assertNotEqual(manifest, None)
+        self.assertEqual(manifest.getArchiveDigest(), self.getSha256Digest(extractor.getPathToFile()))
+
+    def assertRejected(self, extractor):
+        """
+        Checks that the fixture is not extracted because the digest does
+        not match the checksum file.
+
+        @param extractor: The extractor for the fixture.
+        @type extractor: Extractor
+        """
+        pathToExtractDir = os.path.join(self.__pathToTempDir, "rejected-%s" %(extractor.getName().lower()))
+        # The report creates the directory before the file is extracted.
+        os.makedirs(pathToExtractDir)
+        self.assertFalse(extractor.extract(pathToExtractDir, 1))
+        self.assertTrue(extractor.isCorrupt())
+
+    def __testSniff(self, encoding):
+        pathToFixture = self.createFixture(encoding)
+        self.assertEqual(FileTypeSniffer.sniff(pathToFixture), (FileTypeSniffer.TYPE_TAR, encoding))
+        # The type is found from the contents and not the filename.
+        pathToRenamedFixture = os.path.join(self.__pathToTempDir, "report-without-extension")
+        os.rename(pathToFixture, pathToRenamedFixture)
+        self.assertEqual(FileTypeSniffer.sniff(pathToRenamedFixture), (FileTypeSniffer.TYPE_TAR, encoding))
+
+    def __testExtract(self, encoding):
+        pathToFixture = self.createFixture(encoding)
+        self.writeChecksumFile(pathToFixture, self.getSha256Digest(pathToFixture))
+        self.assertExtracted(Tarextractor(pathToFixture))
+        self.assertExtracted(Nativeextractor(pathToFixture))
+
+    def __testDigestMismatch(self, encoding):
+        pathToFixture = self.createFixture(encoding)
+        self.writeChecksumFile(pathToFixture, "0" * 64)
+        self.assertRejected(Tarextractor(pathToFixture))
+        self.assertRejected(Nativeextractor(pathToFixture))
+
+    def testExtractorOrder(self):
+        pathToTarball = self.__createTarball()
+        try:
+            # The default extractor is used when there is no preferred
+            # extractor.
+            self.assertEqual(ExtractorsLoader().getExtractor(pathToTarball).getName(), ExtractorsLoader.DEFAULT_EXTRACTOR_NAME)
+            ExtractorsLoader.setPreferredExtractor("TARextractor")
+            self.assertEqual(ExtractorsLoader().getExtractor(pathToTarball).getName(), "TARextractor")
+        finally:
+            ExtractorsLoader.setPreferredExtractor("")
+
+    def testSniffXz(self):
+        self.__testSniff("xz")
+
+    def testSniffZstd(self):
+        self.__testSniff("zstd")
+
+    def testSniffLz4(self):
+        self.__testSniff("lz4")
+
+    def testExtractXz(self):
+        self.__testExtract("xz")
+
+    def testExtractZstd(self):
+        self.__testExtract("zstd")
+
+    def testExtractLz4(self):
+        self.__testExtract("lz4")
+
+    def testDigestMismatchXz(self):
+        self.__testDigestMismatch("xz")
+
+    def testDigestMismatchZstd(self):
+        self.__testDigestMismatch("zstd")
+
+    def testDigestMismatchLz4(self):
+        self.__testDigestMismatch("lz4")
+
+class ZipFileTestCase(unittest.TestCase):
+    """
+    @cvar REPORT_NAME: The name of the directory at the top of the fixture.
+    @type REPORT_NAME: String
+    """
+    REPORT_NAME = "rhevlogcollector-testnode"
+
+    def setUp(self):
+        self.__pathToTempDir = tempfile.mkdtemp(prefix="sx-tests-")
+
+    def tearDown(self):
+        shutil.rmtree(self.__pathToTempDir, True)
+
+    def __addMember(self, zfile, name, mode, data=""):
+        """
+        Adds a member to the zip file with the unix mode in the external
+        attributes like the zip command does.
+
+        @param zfile: The zip file that is being written.
+        @type zfile: ZipFile
+        @param name: The path to the member in the zip file.
+        @type name: String
+        @param mode: The unix mode of the member.
+        @type mode: Int
+        @param data: The data of the member.
+        @type data: String
+        """
+        zinfo = zipfile.ZipInfo("%s/%s" %(ZipFileTestCase.REPORT_NAME, name))
+        zinfo.create_system = 3
+        zinfo.external_attr = mode << 16
+        zfile.writestr(zinfo, data)
+
+    def createFixture(self):
+        """
+        Returns the path to a zip file that has an executable file, a
+        read-only directory and symbolic links in and out of the
+        extracted tree.
+
+        @return: Returns the path to the zip file.
+        @rtype: String
+        """
+        pathToFixture = os.path.join(self.__pathToTempDir, "%s.zip" %(ZipFileTestCase.REPORT_NAME))
+        zfile = zipfile.ZipFile(pathToFixture, "w")
+        try:
+            self.__addMember(zfile, "hostname", stat.S_IFREG | 0644, "testnode.example.com\n")
+            self.__addMember(zfile, "collect.sh", stat.S_IFREG | 0755, "#!/bin/sh\n")
+            self.__addMember(zfile, "readonly/", stat.S_IFDIR | 0555)
+            self.__addMember(zfile, "readonly/hosts", stat.S_IFREG | 0444, "127.0.0.1 localhost\n")
+            self.__addMember(zfile, "hostname-link", stat.S_IFLNK | 0777, "hostname")
+            self.__addMember(zfile, "passwd-link", stat.S_IFLNK | 0777, "/etc/passwd")
+            # The file after the link must not be written through the link.
+            self.__addMember(zfile, "outside", stat.S_IFLNK | 0777, "../..")
+            self.__addMember(zfile, "outside/escaped", stat.S_IFREG | 0644, "escaped\n")
+        finally:
+            zfile.close()
+        return pathToFixture
+
+    def testExtract(self):
+        extractor = Nativeextractor(self.createFixture())
+        self.assertTrue(extractor.isExtractedFileFunctionSupported())
+        listOfExtractedNames = []
+        def fileExtracted(pathToExtractedFile, pathToFileInExtractDir):
+            self.assertTrue(os.path.isfile(pathToExtractedFile))
+            listOfExtractedNames.append(pathToFileInExtractDir)
+        extractor.setExtractedFileFunction(fileExtracted)
+        pathToExtractDir = os.path.join(self.__pathToTempDir, "extracted")
+        os.makedirs(pathToExtractDir)
+        self.assertTrue(extractor.extract(pathToExtractDir, 1))
+        pathToReport = os.path.join(pathToExtractDir, ZipFileTestCase.REPORT_NAME)
+        try:
+            self.assertEqual(listOfExtractedNames, ["%s/hostname" %(ZipFileTestCase.REPORT_NAME),
+                                                    "%s/collect.sh" %(ZipFileTestCase.REPORT_NAME),
+                                                    "%s/readonly/hosts" %(ZipFileTestCase.REPORT_NAME),
+                                                    "%s/outside/escaped" %(ZipFileTestCase.REPORT_NAME)])
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(pathToReport, "collect.sh")).st_mode), 0755)
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(pathToReport, "readonly")).st_mode), 0555)
+            self.assertEqual(os.readlink(os.path.join(pathToReport, "hostname-link")), "hostname")
+            self.assertEqual(os.readlink(os.path.join(pathToReport, "passwd-link")), "/etc/passwd")
+            # The link that points outside of the tree is created last, so
+            # the file is written to a directory in the tree and the link
+            # is not created.
+            self.assertFalse(os.path.islink(os.path.join(pathToReport, "outside")))
+            self.assertTrue(os.path.isfile(os.path.join(pathToReport, "outside", "escaped")))
+            self.assertFalse(os.path.lexists(os.path.join(self.__pathToTempDir, "escaped")))
+            # The symbolic links are listed as symbolic links in the index.
+            member = extractor.getMemberIndex().getMember("%s/passwd-link" %(ZipFileTestCase.REPORT_NAME))
+            self.assertEqual(member.getMemberType(), ArchiveMember.TYPE_SYMLINK)
+            self.assertEqual(member.getLinkName(), "/etc/passwd")
+        finally:
+            os.chmod(os.path.join(pathToReport, "readonly"), 0755)
+
+class SymlinkTarballTestCase(unittest.TestCase):
+    """
+    Tests that the members of a tarball are never written outside of the
+    extraction directory through a symbolic link.
+
+    @cvar REPORT_NAME: The name of the directory at the top of the fixture.
+    @type REPORT_NAME: String
+    """
+    REPORT_NAME = "sosreport-testnode-123456"
+
+    def setUp(self):
+        self.__pathToTempDir = tempfile.mkdtemp(prefix="sx-tests-")
+        # The directory outside of the extraction directory that the
+        # symbolic links point to.
+        self.__pathToOutsideDir = os.path.join(self.__pathToTempDir, "outside")
+        os.makedirs(self.__pathToOutsideDir)
+        fout = open(os.path.join(self.__pathToOutsideDir, "victim"), "w")
+        fout.write("original\n")
+        fout.close()
+        self.__pathToExtractDir = os.path.join(self.__pathToTempDir, "extracted")
+        os.makedirs(self.__pathToExtractDir)
+
+    def tearDown(self):
+        shutil.rmtree(self.__pathToTempDir, True)
+
+    def createFixture(self, filename, listOfMembers):
+        """
+        Returns the path to an uncompressed tarball that has the members
+        under the REPORT_NAME directory.
+
+        @return: Returns the path to the tarball.
+        @rtype: String
+
+        @param filename: The filename of the tarball.
+        @type filename: String
+        @param listOfMembers: A list of tuples of (name, data, path the
+        link points to). A member with a path the link points to is a
+        symbolic link and any other member is a regular file.
+        @type listOfMembers: Array
+        """
+        pathToFixture = os.path.join(self.__pathToTempDir, filename)
+        tfile = tarfile.open(pathToFixture, "w")
+        try:
+            for (name, data, linkName) in listOfMembers:
+                tarinfo = tarfile.TarInfo("%s/%s" %(SymlinkTarballTestCase.REPORT_NAME, name))
+                if (len(linkName) > 0):
+                    tarinfo.type = tarfile.SYMTYPE
+                    tarinfo.linkname = linkName
+                    tfile.addfile(tarinfo)
+                else:
+                    tarinfo.size = len(data)
+                    tfile.addfile(tarinfo, StringIO.StringIO(data))
+        finally:
+            tfile.close()
+        return pathToFixture
+
+    def extract(self, pathToFixture):
+        extractor = Nativeextractor(pathToFixture)
+        self.assertTrue(extractor.extract(self.__pathToExtractDir, 1))
+
+    def assertNothingWrittenOutside(self):
+        """
+        Checks that the directory outside of the extraction directory
+        only has the file it was created with and that the file was not
+        changed.
+        """
+        self.assertEqual(os.listdir(self.__pathToOutsideDir), ["victim"])
+        fin = open(os.path.join(self.__pathToOutsideDir, "victim"), "r")
+        try:
+            self.assertEqual(fin.read(), "original\n")
+        finally:
+            fin.close()
+        listOfTopNames = sorted(os.listdir(self.__pathToTempDir))
+        listOfTopNames.remove("escape.tar")
+        if ("overwrite.tar" in listOfTopNames):
+            listOfTopNames.remove("overwrite.tar")
+        self.assertEqual(listOfTopNames, ["extracted", "outside"])
+
+    def __createEscapeFixture(self):
+        return self.createFixture("escape.tar",
+                                  [("hostname", "testnode.example.com\n", ""),
+                                   ("absolute-link", "", self.__pathToOutsideDir),
+                                   ("absolute-link/written", "written\n", ""),
+                                   ("victim-link", "", os.path.join(self.__pathToOutsideDir, "victim")),
+                                   ("parent-link", "", "../outside"),
+                                   ("parent-link/written", "written\n", ""),
+                                   ("sos_commands/parent-link", "", "../../outside"),
+                                   ("sos_commands/parent-link/written", "written\n", "")])
+
+    def testAbsoluteSymlink(self):
+        self.extract(self.__createEscapeFixture())
+        self.assertNothingWrittenOutside()
+        # The file is written to a directory in the tree since the link
+        # is created after the other members.
+        self.assertTrue(os.path.isfile(os.path.join(self.__pathToExtractDir, "absolute-link", "written")))
+        self.assertFalse(os.path.islink(os.path.join(self.__pathToExtractDir, "absolute-link")))
+
+    def testParentSymlink(self):
+        self.extract(self.__createEscapeFixture())
+        self.assertNothingWrittenOutside()
+        self.assertTrue(os.path.isfile(os.path.join(self.__pathToExtractDir, "parent-link", "written")))
+        self.assertTrue(os.path.isfile(os.path.join(self.__pathToExtractDir, "sos_commands", "parent-link", "written")))
+
+    def testWriteThroughExtractedSymlink(self):
+        self.extract(self.__createEscapeFixture())
+        # The links that were not replaced by a directory are created last.
+        self.assertEqual(os.readlink(os.path.join(self.__pathToExtractDir, "victim-link")), os.path.join(self.__pathToOutsideDir, "victim"))
+        os.symlink(self.__pathToOutsideDir, os.path.join(self.__pathToExtractDir, "outside-link"))
+        # A report that is extracted over the tree must not follow the links
+        # that were already extracted.
+        self.extract(self.createFixture("overwrite.tar",
+                                        [("victim-link", "overwritten\n", ""),
+                                         ("outside-link/written", "written\n", ""),
+                                         ("outside-link/victim", "overwritten\n", "")]))
+        self.assertNothingWrittenOutside()
+        self.assertFalse(os.path.islink(os.path.join(self.__pathToExtractDir, "victim-link")))
+        fin = open(os.path.join(self.__pathToExtractDir, "victim-link"), "r")
+        try:
+            self.assertEqual(fin.read(), "overwritten\n")
+        finally:
+            fin.close()
+
+class TarMemberNamesTestCase(unittest.TestCase):
+    """
+    Tests that the names of the members that GNU tar lists are the same as
+    the names in the tarball.
+
+    @cvar MEMBERS: A list of tuples of (name, type, path the link points
+    to) for the members of the fixture.
+    @type MEMBERS: Array
+    """
+    MEMBERS = [("top/ leading space", tarfile.REGTYPE, ""),
+               ("top/new\nline", tarfile.REGTYPE, ""),
+               ("top/back\\slash", tarfile.REGTYPE, ""),
+               ("top/double\"quote", tarfile.REGTYPE, ""),
+               ("top/tab\tand\xc3\xa9", tarfile.REGTYPE, ""),
+               ("top/file -> arrow", tarfile.REGTYPE, ""),
+               ("top/file link to", tarfile.REGTYPE, ""),
+               ("top/link -> arrow", tarfile.SYMTYPE, "target -> arrow"),
+               ("top/hard link to", tarfile.LNKTYPE, "top/file -> arrow")]
+
+    def setUp(self):
+        self.__pathToTempDir = tempfile.mkdtemp(prefix="sx-tests-")
+
+    def tearDown(self):
+        shutil.rmtree(self.__pathToTempDir, True)
+
+    def createFixture(self, mode, extension):
+        """
+        Returns the path to a tarball that has the members in MEMBERS.
+        The data of each regular file is its name.
+
+        @return: Returns the path to the tarball.
+        @rtype: String
+
+        @param mode: The mode tarfile writes the tarball with.
+        @type mode: String
+        @param extension: The extension of the tarball.
+        @type extension: String
+        """
+        pathToFixture = os.path.join(self.__pathToTempDir, "names%s" %(extension))
+        tfile = tarfile.open(pathToFixture, mode)
+        try:
+            for (name, memberType, linkName) in TarMemberNamesTestCase.MEMBERS:
+                tarinfo = tarfile.TarInfo(name)
+                tarinfo.type = memberType
+                tarinfo.linkname = linkName
+                if (memberType == tarfile.REGTYPE):
+                    tarinfo.size = len(name)
+                    tfile.addfile(tarinfo, StringIO.StringIO(name))
+                else:
+                    tfile.addfile(tarinfo)
+        finally:
+            tfile.close()
+        return pathToFixture
+
+    def __testNames(self, pathToFixture):
+        extractor = Tarextractor(pathToFixture)
+        extractor.setFileType(FileTypeSniffer.sniff(pathToFixture))
+        listOfMembers = []
+        for member in extractor.getMemberIndex().getMembers():
+            listOfMembers.append((member.getName(), member.getLinkName()))
+        self.assertEqual(listOfMembers, map(lambda member: (member[0], member[2]), TarMemberNamesTestCase.MEMBERS))
+        for (name, memberType, linkName) in TarMemberNamesTestCase.MEMBERS:
+            if (memberType == tarfile.REGTYPE):
+                # The path to the file is relative to the top directory.
+                self.assertEqual("".join(extractor.getDataFromFile(name.split("/", 1)[1])), name)
+
+    def testUncompressedNames(self):
+        self.__testNames(self.createFixture("w", ".tar"))
+
+    def testCompressedNames(self):
+        # The data is read with tar instead of from the offsets.
+        self.__testNames(self.createFixture("w:gz", ".tar.gz"))
+
+if __name__ == "__main__":
+    unittest.main()